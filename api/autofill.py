@@ -1,3 +1,4 @@
+import os
 import traceback
 
 from flask import Flask, request, Response, render_template_string
@@ -5,9 +6,20 @@ from flask import Flask, request, Response, render_template_string
 from .config import load_config
 # Assuming these are relative imports in the project structure
 from .sync import autofill_page_by_page_id
+from .job_queue import register_job_handler, submit_job
+from .singleflight import SingleFlight
+from .resilience import health_report
+from .profiling import profile_request, add_profile_debug
+from .job_routes import (
+    jobs_blueprint,
+    wants_async,
+    requested_priority,
+    job_accepted_response,
+)
 
 # --- Flask App Initialization ---
 app = Flask(__name__)
+app.register_blueprint(jobs_blueprint)
 
 # --- HTML Template for User Feedback (Kept in Estonian as user-facing) ---
 RESULT_HTML = """
@@ -35,6 +47,9 @@ RESULT_HTML = """
         {% if company_name %}
             <p><strong>Ettevõte:</strong> {{ company_name }}</p>
         {% endif %}
+        {% if debug_info %}
+            <pre>{{ debug_info }}</pre>
+        {% endif %}
         <hr>
         <p><small>Võid selle akna nüüd sulgeda.</small></p>
     </div>
@@ -43,6 +58,37 @@ RESULT_HTML = """
 """
 
 
+# --- Duplicate Click Coalescing ---
+
+# Double clicks and repeated Notion automations often autofill the same page at
+# once. Concurrent calls for a page share one run, and a successful result is
+# reused for AUTOFILL_MEMO_SECONDS.
+AUTOFILL_MEMO_SECONDS = float(os.getenv("AUTOFILL_MEMO_SECONDS", "10"))
+_autofill_flights = SingleFlight(memo_seconds=AUTOFILL_MEMO_SECONDS)
+
+
+def autofill_page_coalesced(page_id, config):
+    """Runs autofill_page_by_page_id once per page, sharing the result with concurrent duplicates."""
+    key = page_id.replace("-", "").lower()
+    return _autofill_flights.do(
+        key,
+        lambda: autofill_page_by_page_id(page_id, config),
+        memoize_if=lambda result: bool(result.get("success")),
+    )
+
+
+# --- Background Jobs ---
+
+
+def run_autofill_job(payload, report_progress):
+    """Job handler: runs the autofill for the queued page."""
+    report_progress(10, "Täidan Notioni lehte")
+    return autofill_page_coalesced(payload["page_id"], load_config())
+
+
+register_job_handler("autofill", run_autofill_job)
+
+
 # --- API Endpoints ---
 
 
@@ -51,6 +97,8 @@ def autofill():
     """
     Triggers the autofill process.
     Returns a minimal HTML page that automatically CLOSES THE TAB (does not keep reports on screen).
+    With `async=1` (and ASYNC_JOBS_ENABLED) the work is queued and a job status page is returned immediately.
+    A synchronous request can be profiled (see api/profiling.py).
     """
     page_id = None
     config = load_config()
@@ -65,14 +113,22 @@ def autofill():
         if not page_id:
             return "Viga: pageId puudub", 400
 
+        if wants_async():
+            job_id = submit_job(
+                "autofill", {"page_id": page_id}, priority=requested_priority()
+            )
+            return job_accepted_response(job_id)
+
         # Käivitame sünkroonimise
-        result = autofill_page_by_page_id(page_id, config)
+        with profile_request("autofill") as profile:
+            result = autofill_page_coalesced(page_id, config)
 
         return render_template_string(
             RESULT_HTML,
             success=result.get("success"),
             message=result.get("message"),
-            company_name=result.get("company_name")
+            company_name=result.get("company_name"),
+            debug_info=add_profile_debug(None, profile),
         )
 
     except Exception as e:
@@ -84,11 +140,13 @@ def autofill():
 @app.route("/", methods=["GET"])
 def health_check():
     """
-    Simple health check endpoint to confirm the API is running.
+    Simple health check endpoint to confirm the API is running. Also
+    reports the bulkhead and circuit breaker state of every dependency.
     """
     return {
         "status": "ok",
         "message": "Notioni automaatse täitmise API töötab",
+        "dependencies": health_report(),
     }
 
 
@@ -0,0 +1,157 @@
+"""
+Loader for the register's dataset of the people entered on each company's
+registry card (`ettevotja_rekvisiidid__kaardile_kantud_isikud`), keyed by
+ariregistri_kood. Used to create Contacts from the management board
+without an LLM or a website fetch.
+
+Caching works like in json_loader: the ZIP is downloaded at most once a
+day (the stale file is used if the download fails), each company's result
+is cached in its own JSON file, and many codes are resolved in one ijson
+pass. Only the current board members' names and roles are cached (no
+personal codes). Codes that a complete pass did not find are cached as
+empty, so the dump is not scanned again for them.
+"""
+
+import json
+import os
+import time
+import zipfile
+from typing import Any, Dict, Iterable, List, Optional
+
+import ijson
+
+from .json_loader import CACHE_DIR, CACHE_EXPIRATION, _ensure_zip_cache, clean_value
+
+# --- Configuration ---
+BOARD_JSON_URL = os.getenv(
+    "ARIREGISTER_BOARD_JSON_URL",
+    "https://avaandmed.ariregister.rik.ee/sites/default/files/avaandmed/ettevotja_rekvisiidid__kaardile_kantud_isikud.json.zip",
+)
+BOARD_CACHE_FILE_PATH = os.path.join(CACHE_DIR, "ariregister_board.zip")
+# Role texts (isiku_roll_tekstina) that make a person a board member
+BOARD_ROLE_KEYWORDS = ("juhatuse liige", "juhatuse esimees")
+
+
+def get_board_cache_path(target_code: str) -> str:
+    """The result cache file of one company's board members."""
+    return os.path.join(CACHE_DIR, f"board_{target_code}.json")
+
+
+def board_members_from_record(record: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    The current board members of a dataset record as staff dictionaries
+    (name, role, email, phone), in the shape sync_staff_data expects.
+    Ended entries and legal persons are left out.
+    """
+    members = []
+    seen = set()
+    for person in record.get("kaardile_kantud_isikud") or []:
+        role = clean_value(person.get("isiku_roll_tekstina"))
+        if not role or not any(k in role.lower() for k in BOARD_ROLE_KEYWORDS):
+            continue
+        if clean_value(person.get("lopp_kpv")) or person.get("isiku_tyyp") != "F":
+            continue
+        name = " ".join(
+            part
+            for part in (
+                clean_value(person.get("eesnimi")),
+                clean_value(person.get("nimi_arinimi")),
+            )
+            if part
+        )
+        if not name or (name, role) in seen:
+            continue
+        seen.add((name, role))
+        members.append({"name": name, "role": role, "email": None, "phone": None})
+    return members
+
+
+def _read_cached(code: str) -> Optional[List[Dict[str, Any]]]:
+    path = get_board_cache_path(code)
+    if (
+        os.path.exists(path)
+        and (time.time() - os.path.getmtime(path)) < CACHE_EXPIRATION.total_seconds()
+    ):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return None
+
+
+def _write_cached(code: str, members: List[Dict[str, Any]]) -> None:
+    with open(get_board_cache_path(code), "w", encoding="utf-8") as out:
+        json.dump(members, out, ensure_ascii=False, indent=2)
+
+
+def load_board_members_batch(
+    url: str, target_codes: Iterable[str]
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Looks up the board members of many companies with a single pass over
+    the dataset.
+
+    Args:
+        url: The URL of the dataset ZIP file.
+        target_codes: Registry codes to search for.
+
+    Returns:
+        Dictionary mapping registry code -> board members (an empty list if
+        the company has none or is not in the dataset). Codes are missing
+        only if the pass ended early because of a broken file.
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    found: Dict[str, List[Dict[str, Any]]] = {}
+    remaining = set()
+
+    # 1. Result cache for specific companies
+    for code in {str(c) for c in target_codes}:
+        cached = _read_cached(code)
+        if cached is None:
+            remaining.add(code)
+        else:
+            found[code] = cached
+
+    print(
+        f"VAHEMÄLU: {len(found)} ettevõtte juhatus vahemälust, otsin {len(remaining)} andmestikust."
+    )
+    if not remaining:
+        return found
+
+    # 2. Check/Download the dataset ZIP file
+    _ensure_zip_cache(url, BOARD_CACHE_FILE_PATH)
+
+    # 3. One streaming pass over the JSON for all remaining codes
+    complete = True
+    with zipfile.ZipFile(BOARD_CACHE_FILE_PATH) as z:
+        with z.open(z.namelist()[0]) as f:
+            try:
+                for obj in ijson.items(f, "item"):
+                    code = str(obj.get("ariregistri_kood"))
+                    if code in remaining:
+                        remaining.discard(code)
+                        found[code] = board_members_from_record(obj)
+                        _write_cached(code, found[code])
+                        if not remaining:
+                            break
+            except ijson.common.IncompleteJSONError:
+                complete = False
+                print(
+                    "Hoiatus: JSON-i parsimine lõppes enneaegselt (võimalik ZIP faili viga)."
+                )
+
+    if remaining and complete:
+        print(f"⚠️ {len(remaining)} registrikoodi ei leitud isikute andmestikust.")
+        for code in remaining:
+            found[code] = []
+            _write_cached(code, [])
+    return found
+
+
+def find_board_members(url: str, regcode: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    The current board members of one company.
+
+    Returns:
+        List of staff dictionaries (empty if there are none), or None if the
+        dataset could not be read to the end.
+    """
+    return load_board_members_batch(url, [regcode]).get(str(regcode))
@@ -0,0 +1,450 @@
+"""
+Bulk autofill of the whole Companies database (CLI: `main.py --autofill-all`).
+
+The run has three phases:
+1. Scan the Companies database 100 pages per query and select rows that have
+   a Registrikood but empty or placeholder fields.
+2. Resolve all selected registry codes with one pass over the register dump.
+3. Write the updates with bounded concurrency.
+
+Progress is saved to a checkpoint file, so an interrupted run resumes where it
+stopped (scan cursor during phase 1, finished pages during phase 3).
+
+With Google search enabled, pages are processed in order of CRM importance and
+the searches go through the quota-aware CseScheduler. Searches that do not fit
+into today's quota are deferred to a persisted backlog, which a run on a later
+day picks up first.
+"""
+
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Callable, Optional
+
+from .clients.notion_client import NotionClient
+from .cse_scheduler import CseQuotaExceeded, CseScheduler
+from .json_loader import CACHE_DIR, find_companies_by_regcodes, clean_value
+from .tax_loader import ensure_tax_index, lookup_tax_stats, tax_csv_urls
+from .sync import (
+    AUTOFILL_FIELDS_TO_CHECK,
+    TAX_FIELDS,
+    _build_properties_from_company,
+    _extract_regcode,
+    _fill_missing_website,
+    _is_placeholder_value,
+    _write_autofill_update,
+    google_search_company,
+)
+
+CHECKPOINT_PATH = os.path.join(CACHE_DIR, "bulk_autofill_checkpoint.json")
+BULK_PAGE_SIZE = 100
+BULK_MAX_WORKERS = 4
+# Checkpoint is written after this many finished pages (and at the end)
+CHECKPOINT_EVERY = 20
+
+# CRM importance: an optional priority property (number, or select/status with
+# one of these option names) plus the number of linked contacts
+CRM_PRIORITY_PROPERTY = os.getenv("CRM_PRIORITY_PROPERTY", "Prioriteet")
+PRIORITY_LEVELS = {
+    "kõrge": 3,
+    "high": 3,
+    "keskmine": 2,
+    "medium": 2,
+    "madal": 1,
+    "low": 1,
+}
+
+
+def _field_is_empty(prop: Dict[str, Any]) -> bool:
+    """True if a Notion property has no value or only a placeholder."""
+    prop_type = prop.get("type")
+    if prop_type in ("url", "email", "phone_number"):
+        return _is_placeholder_value(prop.get(prop_type), prop_type)
+    if prop_type in ("rich_text", "title"):
+        texts = prop.get(prop_type) or []
+        return not any(
+            (t.get("plain_text") or t.get("text", {}).get("content") or "").strip()
+            for t in texts
+        )
+    if prop_type == "multi_select":
+        return not prop.get("multi_select")
+    if prop_type == "number":
+        return prop.get("number") is None
+    return False
+
+
+def page_needs_autofill(props: Dict[str, Any], with_tax: bool = False) -> bool:
+    """
+    True if any autofilled field that exists on the page is empty or a
+    placeholder (with_tax: also the EMTA figures).
+    """
+    fields = AUTOFILL_FIELDS_TO_CHECK + (TAX_FIELDS if with_tax else [])
+    return any(_field_is_empty(props[field]) for field in fields if field in props)
+
+
+def crm_importance(props: Dict[str, Any]) -> float:
+    """Higher = more important. Used to spend the Google CSE quota on key accounts first."""
+    level = 0.0
+    prop = props.get(CRM_PRIORITY_PROPERTY) or {}
+    prop_type = prop.get("type")
+    if prop_type == "number" and prop.get("number") is not None:
+        level = float(prop["number"])
+    elif prop_type in ("select", "status") and prop.get(prop_type):
+        level = PRIORITY_LEVELS.get(prop[prop_type].get("name", "").lower(), 0)
+
+    contacts = (props.get("Kontaktisikud") or {}).get("relation") or []
+    return level * 10 + min(len(contacts), 9)
+
+
+class BulkCheckpoint:
+    """JSON checkpoint of a bulk autofill run, written atomically."""
+
+    def __init__(self, path: str, database_id: str):
+        self.path = path
+        self.database_id = database_id
+        self.state = self._new_state()
+
+    def _new_state(self) -> Dict[str, Any]:
+        return {
+            "database_id": self.database_id,
+            "scan_cursor": None,
+            "scan_complete": False,
+            "scanned": 0,
+            "regcode_counts": {},
+            "candidates": [],
+            "done": {},
+            "finished": False,
+        }
+
+    def load(self) -> bool:
+        """Loads an unfinished checkpoint for the same database. Returns True if resumed."""
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logging.warning(f"Checkpointi lugemine ebaõnnestus, alustan otsast: {e}")
+            return False
+        if state.get("finished") or state.get("database_id") != self.database_id:
+            return False
+        self.state = state
+        return True
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+def _autofill_props(props: Dict[str, Any]) -> Dict[str, Any]:
+    """Only the fields the write step compares against."""
+    return {
+        k: v
+        for k, v in props.items()
+        if k in AUTOFILL_FIELDS_TO_CHECK or k in TAX_FIELDS
+    }
+
+
+def _refresh_deferred_candidate(
+    notion: NotionClient, candidate: Dict[str, Any], with_tax: bool
+) -> Optional[Dict[str, Any]]:
+    """
+    Re-reads a page that is only in the CSE backlog. This scan left it out,
+    so it may have been filled in by hand or archived since it was
+    deferred; its saved props must not be written over.
+
+    Returns:
+        The candidate with the page's current props, or None if the page no
+        longer needs autofill (it is dropped from the backlog then).
+
+    Raises:
+        Exception: If the page cannot be read (it stays in the backlog).
+    """
+    page = notion.get_page(candidate["page_id"])
+    props = page.get("properties", {})
+    reg_prop = props.get("Registrikood")
+    regcode = _extract_regcode(reg_prop) if reg_prop else None
+    if page.get("archived") or not regcode or not page_needs_autofill(props, with_tax):
+        return None
+    return {
+        **candidate,
+        "regcode": regcode,
+        "importance": crm_importance(props),
+        "props": _autofill_props(props),
+    }
+
+
+def _scan_companies(
+    notion: NotionClient,
+    checkpoint: BulkCheckpoint,
+    progress: Callable[[str], None],
+    with_tax: bool = False,
+):
+    """Phase 1: pages through the database and records the pages to fill."""
+    state = checkpoint.state
+    while not state["scan_complete"]:
+        res = notion.query_database_page(
+            start_cursor=state["scan_cursor"], page_size=BULK_PAGE_SIZE
+        )
+        for page in res.get("results", []):
+            if page.get("archived"):
+                continue
+            props = page.get("properties", {})
+            reg_prop = props.get("Registrikood")
+            regcode = _extract_regcode(reg_prop) if reg_prop else None
+            if not regcode:
+                continue
+            counts = state["regcode_counts"]
+            counts[regcode] = counts.get(regcode, 0) + 1
+            if page_needs_autofill(props, with_tax):
+                state["candidates"].append(
+                    {
+                        "page_id": page["id"],
+                        "regcode": regcode,
+                        "importance": crm_importance(props),
+                        "props": _autofill_props(props),
+                    }
+                )
+        state["scanned"] += len(res.get("results", []))
+        state["scan_cursor"] = res.get("next_cursor")
+        state["scan_complete"] = not res.get("has_more")
+        checkpoint.save()
+        progress(
+            f"Skaneeritud {state['scanned']} lehte, täitmist vajab {len(state['candidates'])}."
+        )
+
+
+def _autofill_candidate(
+    notion: NotionClient,
+    candidate: Dict[str, Any],
+    company: Optional[Dict[str, Any]],
+    scheduler: Optional[CseScheduler],
+    with_tax: bool = False,
+) -> Dict[str, Any]:
+    """
+    Phase 3 task: builds and writes the update for one page.
+
+    With with_tax, the EMTA figures are joined from the tax index.
+
+    With a scheduler, a missing website is searched within the CSE quota; if
+    the quota is used up, the page is written without it and deferred.
+    """
+    regcode = candidate["regcode"]
+    if not company:
+        return {
+            "success": False,
+            "message": f"Ettevõtet registrikoodiga {regcode} ei leitud JSON andmetest.",
+            "step": "company_not_found",
+        }
+
+    company_name = clean_value(company.get("nimi"))
+    tax_stats = lookup_tax_stats(regcode) if with_tax else None
+    properties, empty_fields, _ = _build_properties_from_company(
+        company, regcode, company_name, tax_stats
+    )
+    deferred = False
+    if scheduler:
+
+        def scheduled_search(name: str):
+            nonlocal deferred
+            try:
+                return google_search_company(
+                    name, acquire=scheduler.acquire, release=scheduler.release
+                )
+            except CseQuotaExceeded:
+                deferred = True
+                return None
+
+        _fill_missing_website(
+            properties,
+            empty_fields,
+            company_name,
+            candidate["props"],
+            search_fn=scheduled_search,
+        )
+
+    result = _write_autofill_update(
+        notion,
+        candidate["page_id"],
+        candidate["props"],
+        properties,
+        empty_fields,
+        company_name,
+        regcode,
+    )
+    result["company_name"] = company_name
+    if scheduler and result.get("success"):
+        if deferred:
+            scheduler.backlog.defer(
+                candidate["page_id"], candidate, candidate.get("importance", 0)
+            )
+        else:
+            scheduler.backlog.remove(candidate["page_id"])
+    result["deferred"] = deferred
+    return result
+
+
+def run_bulk_autofill(
+    config: Dict[str, Any],
+    max_workers: int = BULK_MAX_WORKERS,
+    restart: bool = False,
+    use_google: bool = False,
+    checkpoint_path: str = CHECKPOINT_PATH,
+    progress: Callable[[str], None] = print,
+) -> Dict[str, int]:
+    """
+    Autofills every company page that has a Registrikood but empty or
+    placeholder fields.
+
+    Args:
+        config: The application configuration dictionary.
+        max_workers: Maximum number of concurrent Notion updates.
+        restart: Ignore an existing checkpoint and start from the beginning.
+        use_google: Also look up missing websites via Google CSE, within the
+            daily quota (see cse_scheduler).
+        checkpoint_path: Where the run state is saved.
+        progress: Receives human-readable progress lines.
+
+    Returns:
+        Counters of the run: updated, failed, not_found, duplicates,
+        skipped_done and deferred (Google search postponed to a later day).
+    """
+    notion = NotionClient(
+        config["notion"]["token"],
+        config["notion"]["database_id"],
+        config["notion"].get("api_version"),
+    )
+    checkpoint = BulkCheckpoint(checkpoint_path, notion.database_id)
+    if not restart and checkpoint.load():
+        progress(
+            f"Jätkan katkestatud tööd: {len(checkpoint.state['done'])} lehte juba tehtud."
+        )
+    state = checkpoint.state
+
+    # EMTA figures are joined only if the files are configured and indexed
+    tax_urls = tax_csv_urls(config.get("emta", {}).get("tax_csv_url"))
+    with_tax = False
+    if tax_urls:
+        quarters = ensure_tax_index(tax_urls)
+        with_tax = bool(quarters)
+        progress(f"Maksuandmed: {', '.join(quarters) or 'puuduvad'}.")
+
+    # 1. Scan
+    _scan_companies(notion, checkpoint, progress, with_tax)
+
+    stats = {
+        "updated": 0,
+        "failed": 0,
+        "not_found": 0,
+        "duplicates": 0,
+        "skipped_done": 0,
+        "deferred": 0,
+    }
+    pending = []
+    for candidate in state["candidates"]:
+        if candidate["page_id"] in state["done"]:
+            stats["skipped_done"] += 1
+        elif state["regcode_counts"].get(candidate["regcode"], 0) > 1:
+            # Same code on several pages: leave it for a human, like single autofill does
+            stats["duplicates"] += 1
+            state["done"][candidate["page_id"]] = "duplicate_registrikood"
+        else:
+            pending.append(candidate)
+
+    scheduler = CseScheduler() if use_google else None
+    if scheduler:
+        # Searches deferred on earlier days are not necessarily in this scan
+        queued = {c["page_id"] for c in pending}
+        for candidate in scheduler.backlog.due():
+            if candidate["page_id"] in queued or candidate["page_id"] in state["done"]:
+                continue
+            try:
+                refreshed = _refresh_deferred_candidate(notion, candidate, with_tax)
+            except Exception as e:
+                logging.warning(
+                    f"Edasi lükatud lehe {candidate['page_id']} lugemine ebaõnnestus: {e}"
+                )
+                continue
+            if refreshed is None:
+                scheduler.backlog.remove(candidate["page_id"])
+                continue
+            pending.append(refreshed)
+            queued.add(candidate["page_id"])
+        # The most important pages get today's quota
+        pending.sort(key=lambda c: c.get("importance", 0), reverse=True)
+        progress(
+            f"Google CSE kvooti täna alles: {scheduler.quota.remaining()} päringut."
+        )
+
+    # 2. Resolve all codes with one register pass
+    progress(f"Otsin {len(pending)} ettevõtet Äriregistri andmetest...")
+    companies = find_companies_by_regcodes(
+        config["ariregister"]["json_url"], [c["regcode"] for c in pending]
+    )
+
+    # 3. Write with bounded concurrency
+    lock = threading.Lock()
+    finished = 0
+    total = len(pending)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {
+            executor.submit(
+                _autofill_candidate,
+                notion,
+                candidate,
+                companies.get(candidate["regcode"]),
+                scheduler,
+                with_tax,
+            ): candidate
+            for candidate in pending
+        }
+        for future in as_completed(futures):
+            candidate = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"success": False, "message": str(e), "step": "general_error"}
+
+            with lock:
+                finished += 1
+                if result.get("deferred"):
+                    stats["deferred"] += 1
+                if result.get("success"):
+                    stats["updated"] += 1
+                    outcome = "ok"
+                elif result.get("step") == "company_not_found":
+                    stats["not_found"] += 1
+                    outcome = "company_not_found"
+                else:
+                    stats["failed"] += 1
+                    outcome = result.get("step", "error")
+                # Failed writes are not marked done, so a resumed run retries them
+                if outcome in ("ok", "company_not_found"):
+                    state["done"][candidate["page_id"]] = outcome
+                if finished % CHECKPOINT_EVERY == 0:
+                    checkpoint.save()
+
+            name = result.get("company_name") or candidate["regcode"]
+            progress(f"[{finished}/{total}] {name}: {outcome}")
+    except KeyboardInterrupt:
+        executor.shutdown(wait=False, cancel_futures=True)
+        checkpoint.save()
+        progress("Katkestatud. Käivita sama käsk uuesti, et jätkata.")
+        raise
+    finally:
+        executor.shutdown(wait=True)
+
+    state["finished"] = True
+    checkpoint.save()
+    progress(
+        "Valmis: {updated} uuendatud, {not_found} ei leitud, {failed} ebaõnnestus, "
+        "{duplicates} duplikaati, {skipped_done} varem tehtud, "
+        "{deferred} Google otsingut edasi lükatud.".format(**stats)
+    )
+    return stats
@@ -0,0 +1,138 @@
+"""
+Bulk board member sync of the whole Companies database (CLI: `main.py
+--board-members`).
+
+The run has three phases:
+1. Scan the Companies database 100 pages per query and collect the pages
+   that have a Registrikood.
+2. Look up the board members of all codes with one pass over the register's
+   dataset of people (see board_loader).
+3. Sync every company's Contacts with bounded concurrency.
+
+Unlike the website update, no page is fetched and Gemini is not called, so
+the whole database can be refreshed in one run.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List
+
+from .board_loader import BOARD_JSON_URL, load_board_members_batch
+from .bulk_autofill import BULK_MAX_WORKERS, BULK_PAGE_SIZE
+from .clients.notion_client import NotionClient
+from .staff_update_services import (
+    get_database_properties,
+    run_board_update,
+    validate_config,
+)
+from .sync import _extract_regcode
+
+
+def _scan_company_regcodes(
+    notion: NotionClient, progress: Callable[[str], None]
+) -> List[Dict[str, str]]:
+    """Phase 1: the (page_id, regcode) of every company page with a Registrikood."""
+    companies = []
+    cursor = None
+    scanned = 0
+    while True:
+        res = notion.query_database_page(start_cursor=cursor, page_size=BULK_PAGE_SIZE)
+        for page in res.get("results", []):
+            if page.get("archived"):
+                continue
+            reg_prop = page.get("properties", {}).get("Registrikood")
+            regcode = _extract_regcode(reg_prop) if reg_prop else None
+            if regcode:
+                companies.append({"page_id": page["id"], "regcode": regcode})
+        scanned += len(res.get("results", []))
+        progress(f"Skaneeritud {scanned} lehte, registrikoodiga {len(companies)}.")
+        cursor = res.get("next_cursor")
+        if not res.get("has_more") or not cursor:
+            return companies
+
+
+def run_bulk_board_update(
+    config: Dict[str, Any],
+    max_workers: int = BULK_MAX_WORKERS,
+    progress: Callable[[str], None] = print,
+) -> Dict[str, int]:
+    """
+    Syncs the current management board of every company in the Companies
+    database to the Contacts database.
+
+    Args:
+        config: The application configuration dictionary.
+        max_workers: Maximum number of companies synced at the same time.
+        progress: Receives human-readable progress lines.
+
+    Returns:
+        Counters of the run: updated, unchanged, no_board, not_read and
+        failed.
+    """
+    api_key, database_id = validate_config()
+    notion = NotionClient(
+        config["notion"]["token"],
+        config["notion"]["database_id"],
+        config["notion"].get("api_version"),
+    )
+
+    # 1. Scan
+    companies = _scan_company_regcodes(notion, progress)
+
+    # 2. Resolve all codes with one pass over the dataset
+    progress(f"Otsin {len(companies)} ettevõtte juhatust Äriregistri andmetest...")
+    url = config.get("ariregister", {}).get("board_json_url") or BOARD_JSON_URL
+    boards = load_board_members_batch(url, [c["regcode"] for c in companies])
+
+    # Contacts database properties are the same for every company
+    contacts = NotionClient(api_key, database_id, config["notion"].get("api_version"))
+    page_properties = get_database_properties(contacts)
+
+    # 3. Sync with bounded concurrency
+    stats = {"updated": 0, "unchanged": 0, "no_board": 0, "not_read": 0, "failed": 0}
+    finished = 0
+    pending = []
+    for company in companies:
+        if company["regcode"] in boards:
+            pending.append(company)
+        else:
+            # The dataset could not be read to the end
+            stats["not_read"] += 1
+    total = len(pending)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {
+            executor.submit(
+                run_board_update,
+                company["page_id"],
+                company["regcode"],
+                board_members=boards[company["regcode"]],
+                page_properties=page_properties,
+            ): company
+            for company in pending
+        }
+        for future in as_completed(futures):
+            company = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"success": False, "kind": "error", "message": str(e)}
+
+            if not result.get("success") or result.get("status_class") == "error":
+                outcome = "failed"
+            elif result.get("kind") == "warning":
+                outcome = "no_board"
+            elif result.get("unchanged"):
+                outcome = "unchanged"
+            else:
+                outcome = "updated"
+            finished += 1
+            stats[outcome] += 1
+            progress(
+                f"[{finished}/{total}] {company['regcode']}: {result.get('message')}"
+            )
+
+    progress(
+        "Valmis: {updated} uuendatud, {unchanged} muutusteta, {no_board} juhatuseta, "
+        "{not_read} lugemata, {failed} ebaõnnestus.".format(**stats)
+    )
+    return stats
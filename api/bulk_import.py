@@ -0,0 +1,172 @@
+"""
+Bulk import of companies from a list of registry codes
+(CLI: `main.py --regcodes-file codes.txt` or `main.py --stdin < codes.ndjson`).
+
+All codes are resolved with one pass over the register dump, then created or
+updated in Notion concurrently through process_company_sync. One JSON line per
+code is written to the output as soon as it finishes, so the result can be
+piped into other tools.
+"""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Iterable, List, TextIO, Tuple
+
+from .json_loader import find_companies_by_regcodes
+from .sync import prepare_company_data, process_company_sync
+
+IMPORT_MAX_WORKERS = 4
+
+
+def read_regcodes_file(lines: Iterable[str]) -> List[str]:
+    """
+    Reads registry codes from a plain text file: one code per line. Empty
+    lines and lines starting with '#' are ignored; for CSV-like lines only
+    the first column is used.
+    """
+    codes = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        codes.append(line.replace(";", ",").split(",")[0].strip())
+    return codes
+
+
+def read_regcodes_ndjson(lines: Iterable[str]) -> List[str]:
+    """
+    Reads registry codes from NDJSON: each line is either an object with a
+    "regcode" key or a bare code (number or string).
+    """
+    codes = []
+    for line_no, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            value = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Vigane JSON real {line_no}: {e}") from e
+        if isinstance(value, dict):
+            value = value.get("regcode")
+        codes.append("" if value is None else str(value).strip())
+    return codes
+
+
+def dedupe_regcodes(codes: Iterable[str]) -> Tuple[List[str], List[str]]:
+    """
+    Deduplicates codes, keeping the first occurrence order.
+
+    Returns:
+        (valid unique codes, invalid values)
+    """
+    seen = set()
+    valid, invalid = [], []
+    for code in codes:
+        code = str(code).strip()
+        if code.endswith(".0"):
+            # Codes exported from spreadsheets as floats
+            code = code[:-2]
+        if code in seen:
+            continue
+        seen.add(code)
+        if code.isdigit():
+            valid.append(code)
+        else:
+            invalid.append(code)
+    return valid, invalid
+
+
+def _import_one(
+    regcode: str, company: Dict[str, Any], config: Dict[str, Any]
+) -> Dict[str, Any]:
+    if not company:
+        return {
+            "status": "error",
+            "message": f"Ettevõtet registrikoodiga {regcode} ei leitud Äriregistri andmetest (JSON).",
+        }
+    return process_company_sync(prepare_company_data(company, regcode), config)
+
+
+def run_bulk_import(
+    codes: Iterable[str],
+    config: Dict[str, Any],
+    out: TextIO,
+    max_workers: int = IMPORT_MAX_WORKERS,
+) -> Dict[str, int]:
+    """
+    Creates or updates a Notion page for every registry code.
+
+    Args:
+        codes: Registry codes (duplicates and invalid values are allowed).
+        config: The application configuration dictionary.
+        out: Receives one JSON line per code:
+            {"regcode", "status", "message", "company_name"}.
+        max_workers: Maximum number of concurrent Notion writes.
+
+    Returns:
+        Counters per status: success, warning, error.
+    """
+    regcodes, invalid = dedupe_regcodes(codes)
+    stats = {"success": 0, "warning": 0, "error": 0}
+    lock = threading.Lock()
+
+    def emit(regcode: str, result: Dict[str, Any]):
+        line = json.dumps(
+            {
+                "regcode": regcode,
+                "status": result["status"],
+                "message": result["message"],
+                "company_name": result.get("company_name"),
+            },
+            ensure_ascii=False,
+        )
+        with lock:
+            stats[result["status"]] = stats.get(result["status"], 0) + 1
+            out.write(line + "\n")
+            out.flush()
+
+    for value in invalid:
+        emit(
+            value,
+            {
+                "status": "error",
+                "message": "Registrikood puudub või sisaldab mittenumbrilisi märke (peab olema number).",
+            },
+        )
+
+    if not regcodes:
+        return stats
+
+    try:
+        companies = find_companies_by_regcodes(
+            config["ariregister"]["json_url"], regcodes
+        )
+    except Exception as e:
+        for regcode in regcodes:
+            emit(
+                regcode,
+                {"status": "error", "message": f"Viga faili laadimisel: {e}"},
+            )
+        return stats
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                _import_one, regcode, companies.get(regcode), config
+            ): regcode
+            for regcode in regcodes
+        }
+        for future in as_completed(futures):
+            regcode = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {
+                    "status": "error",
+                    "message": f"❌ Üldine sünkroniseerimise viga: {type(e).__name__}: {e}",
+                }
+            emit(regcode, result)
+
+    return stats
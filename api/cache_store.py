@@ -0,0 +1,177 @@
+"""
+Persistent key-value cache backed by SQLite, shared by the lookups that are
+worth remembering between runs (Google CSE results, etc.).
+
+Each cache has its own namespace, a default TTL and optional bounds on the
+number of entries / total size. Values are stored as JSON, so `None` is a
+valid cached value (e.g. a remembered "nothing found").
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Any, Dict, Iterator, Optional
+
+from .json_loader import CACHE_DIR
+
+CACHE_DB_PATH = os.path.join(CACHE_DIR, "cache.sqlite3")
+
+# Returned by get() when the key is missing or expired
+CACHE_MISS = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS cache_expiry ON cache (namespace, expires_at);
+"""
+
+
+def hash_key(*parts: Any) -> str:
+    """Builds a compact cache key from arbitrary parts (e.g. a long prompt)."""
+    raw = "\x1f".join(str(p) for p in parts)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class PersistentCache:
+    """A namespaced TTL cache in a SQLite file."""
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: timedelta,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        db_path: Optional[str] = None,
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # Resolved at use time, so tests can point CACHE_DB_PATH elsewhere
+        self._db_path = db_path
+        self._initialized_path = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def db_path(self) -> str:
+        return self._db_path or CACHE_DB_PATH
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        path = self.db_path
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        try:
+            if self._initialized_path != path:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                self._initialized_path = path
+            yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str, default: Any = CACHE_MISS) -> Any:
+        """Returns the cached value, or `default` if missing or expired."""
+        now = time.time()
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT value FROM cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (self.namespace, key, now),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE cache SET hits = hits + 1, accessed_at = ? WHERE namespace = ? AND key = ?",
+                    (now, self.namespace, key),
+                )
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return default if row is None else json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: Optional[timedelta] = None):
+        """Stores a JSON-serializable value for `ttl` (defaults to the cache TTL)."""
+        now = time.time()
+        data = json.dumps(value, ensure_ascii=False)
+        expires_at = now + (ttl or self.ttl).total_seconds()
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache "
+                "(namespace, key, value, size, created_at, expires_at, accessed_at, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                (self.namespace, key, data, len(data), now, expires_at, now),
+            )
+            self._evict(conn, now)
+
+    def delete(self, key: str):
+        with self._connection() as conn:
+            conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            )
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """Drops expired entries, then least recently used ones over the bounds."""
+        conn.execute(
+            "DELETE FROM cache WHERE namespace = ? AND expires_at <= ?",
+            (self.namespace, now),
+        )
+        if self.max_entries is not None:
+            conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key IN ("
+                "SELECT key FROM cache WHERE namespace = ? "
+                "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.namespace, self.namespace, self.max_entries),
+            )
+        if self.max_bytes is not None:
+            total = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM cache WHERE namespace = ?",
+                (self.namespace,),
+            ).fetchone()[0]
+            if total > self.max_bytes:
+                rows = conn.execute(
+                    "SELECT key, size FROM cache WHERE namespace = ? ORDER BY accessed_at",
+                    (self.namespace,),
+                ).fetchall()
+                for key, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    conn.execute(
+                        "DELETE FROM cache WHERE namespace = ? AND key = ?",
+                        (self.namespace, key),
+                    )
+                    total -= size
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of this process plus stored entry totals."""
+        with self._connection() as conn:
+            entries, size, stored_hits = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(hits), 0) "
+                "FROM cache WHERE namespace = ? AND expires_at > ?",
+                (self.namespace, time.time()),
+            ).fetchone()
+        return {
+            "namespace": self.namespace,
+            "entries": entries,
+            "bytes": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stored_hits": stored_hits,
+        }
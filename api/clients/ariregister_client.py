@@ -1,12 +1,17 @@
 import requests
 
+from ..resilience import ariregister as ariregister_dependency
+
 
 class AriregisterClient:
 
-    def __init__(self):
-        pass
+    def __init__(self, dependency=ariregister_dependency):
+        # Other open-data downloads (EMTA) pass their own bulkhead and breaker
+        self.dependency = dependency
 
-    def get_csv(self, url, headers, stream=False):
-        response = requests.get(url, headers=headers, stream=stream)
+    def get_csv(self, url, headers, stream=False, timeout=60):
+        response = self.dependency.call(
+            requests.get, url, headers=headers, stream=stream, timeout=timeout
+        )
         response.raise_for_status()
         return response
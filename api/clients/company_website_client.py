@@ -1,12 +1,209 @@
-import requests
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from urllib.parse import urlparse
+
+from ..cache_store import PersistentCache, CACHE_MISS
+from ..resilience import DependencyUnavailable, websites
+from .hedged_fetch import hedged_get
+from .html_extract import (
+    BS4_FEATURES,
+    MAX_PAGE_BYTES,
+    decode_body,
+    extract_links,
+    extract_text,
+    has_structured_markup,
+    read_body,
+)
+
+# A cached page younger than this is used without asking the server (unless
+# the request_scope asks to revalidate)
+PAGE_FRESH_SECONDS = 6 * 60 * 60
+# After that it is revalidated (ETag / Last-Modified) until the entry expires
+PAGE_CACHE_TTL = timedelta(days=7)
+PAGE_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+
+def _make_soup(html):
+    # bs4 is imported on first use: most requests only need text and links
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(html, BS4_FEATURES)
+
+
+def _breaker_host(url):
+    """Host (with port) the breaker is kept for; www. and apex share it."""
+    netloc = urlparse(url if "://" in url else "https://" + url).netloc.lower()
+    return netloc[4:] if netloc.startswith("www.") else netloc
+
+
+class WebPage:
+    """A downloaded page (live or from the cache)."""
+
+    def __init__(self, url, text, status_code=200, headers=None):
+        self.url = url
+        self.text = text
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def default_page_cache():
+    """Persistent page cache shared by the staff search steps."""
+    return PersistentCache("web_pages", PAGE_CACHE_TTL, max_bytes=PAGE_CACHE_MAX_BYTES)
 
 
 class CompanyWebsiteClient:
+    """
+    Downloads company web pages.
+
+    Bodies are streamed and cut at max_bytes, and decoded with the charset
+    from the headers or the page (see html_extract). A host that does not
+    answer on the given URL is tried as https/http x apex/www (hedged_fetch).
+
+    Two cache levels:
+    - request_scope(): within one staff search, a URL is downloaded and parsed
+      only once (the link scan, the structured data and the text extraction
+      share the results)
+    - page_cache (optional PersistentCache): pages are kept between runs and
+      revalidated with If-None-Match / If-Modified-Since when no longer fresh,
+      or always within request_scope(revalidate=True)
+
+    Downloads go through the websites bulkhead and a circuit breaker per host
+    (resilience). While a host's breaker is open, its cached copy is returned
+    however old it is.
+    """
 
-    def __init__(self):
-        pass
+    def __init__(self, page_cache=None, max_bytes=MAX_PAGE_BYTES):
+        self.page_cache = page_cache
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+
+    @contextmanager
+    def request_scope(self, revalidate=False):
+        """
+        Memoizes downloads and parsed soups until the block ends.
+
+        With revalidate=True a cached page is never used without asking the
+        server (a conditional request), however fresh it is. For reads that
+        must see the live page, e.g. the unchanged-page check.
+        """
+        previous = (
+            getattr(self._local, "memo", None),
+            getattr(self._local, "revalidate", False),
+        )
+        self._local.memo = {}
+        self._local.revalidate = revalidate
+        try:
+            yield
+        finally:
+            self._local.memo, self._local.revalidate = previous
+
+    def _memo(self):
+        return getattr(self._local, "memo", None)
 
     def get_company_website(self, website_url, headers, timeout=10):
-        response = requests.get(website_url, headers=headers, timeout=timeout)
-        response.raise_for_status()
-        return response
+        memo = self._memo()
+        if memo is not None and website_url in memo:
+            return memo[website_url]["page"]
+
+        page = self._fetch(website_url, headers, timeout)
+        if memo is not None:
+            memo[website_url] = {"page": page}
+        return page
+
+    def _parsed(self, website_url, headers, timeout, kind, parse):
+        """Runs parse(page.text) once per URL and kind within request_scope()."""
+        page = self.get_company_website(website_url, headers, timeout)
+        memo = self._memo()
+        entry = memo.get(website_url) if memo is not None else None
+        if entry is not None and kind in entry:
+            return entry[kind]
+
+        result = parse(page.text)
+        if entry is not None:
+            entry[kind] = result
+        return result
+
+    def get_soup(self, website_url, headers, timeout=10):
+        """
+        Returns the parsed page (lxml when installed). Within request_scope()
+        the same soup object is returned to every caller, so callers must not
+        modify it.
+        """
+        return self._parsed(
+            website_url,
+            headers,
+            timeout,
+            "soup",
+            _make_soup,
+        )
+
+    def get_text(self, website_url, headers, timeout=10):
+        """The page's visible text, one block per line (no DOM is built)."""
+        return self._parsed(website_url, headers, timeout, "text", extract_text)
+
+    def get_links(self, website_url, headers, timeout=10):
+        """(link text, href) of every <a href> on the page (no DOM is built)."""
+        return self._parsed(website_url, headers, timeout, "links", extract_links)
+
+    def has_structured_markup(self, website_url, headers, timeout=10):
+        """Whether the page may have structured contacts (no DOM is built)."""
+        return self._parsed(
+            website_url, headers, timeout, "structured", has_structured_markup
+        )
+
+    def _fetch(self, website_url, headers, timeout):
+        cached = (
+            self.page_cache.get(website_url)
+            if self.page_cache is not None
+            else CACHE_MISS
+        )
+        if cached is not CACHE_MISS:
+            fresh = time.time() - cached["fetched_at"] < PAGE_FRESH_SECONDS
+            if fresh and not getattr(self._local, "revalidate", False):
+                return WebPage(cached["url"], cached["text"])
+            headers = dict(headers)
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        host = _breaker_host(website_url)
+        try:
+            response = websites.call(
+                hedged_get, website_url, headers, timeout, breaker_key=host
+            )
+        except DependencyUnavailable:
+            if cached is CACHE_MISS:
+                raise
+            # The host is failing: an old copy is better than nothing
+            logging.info(f"{host} ei vasta, kasutan vahemälus olevat lehte")
+            return WebPage(cached["url"], cached["text"])
+
+        with response:
+            if cached is not CACHE_MISS and response.status_code == 304:
+                cached["fetched_at"] = time.time()
+                self.page_cache.set(website_url, cached)
+                return WebPage(cached["url"], cached["text"])
+
+            response.raise_for_status()
+            body, truncated = read_body(response, self.max_bytes)
+        if truncated:
+            logging.info(f"Leht lõigati {self.max_bytes} baidi juures: {website_url}")
+        text = decode_body(body, response.headers.get("Content-Type"))
+
+        page = WebPage(response.url, text, response.status_code, response.headers)
+        if self.page_cache is not None:
+            self.page_cache.set(
+                website_url,
+                {
+                    "url": response.url,
+                    "text": text,
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "fetched_at": time.time(),
+                },
+            )
+        return page
@@ -1,5 +1,14 @@
+import os
+
 import requests
 
+from ..resilience import google_cse as google_cse_dependency
+
+# Overridable so load tests can point the client at a local stand-in
+GOOGLE_CSE_URL = os.getenv(
+    "GOOGLE_CSE_URL", "https://www.googleapis.com/customsearch/v1"
+)
+
 
 class GoogleClient:
     """Class for communicating with Google API"""
@@ -20,8 +29,11 @@ class GoogleClient:
             "gl": gl,
             "lr": lr,
         }
-        r = requests.get(
-            "https://www.googleapis.com/customsearch/v1", params=params, timeout=timeout
+        r = google_cse_dependency.call(
+            requests.get,
+            GOOGLE_CSE_URL,
+            params=params,
+            timeout=timeout,
         )
         r.raise_for_status()
         return r.json()
@@ -0,0 +1,157 @@
+"""
+Hedged GET across the URL variants of a company website.
+
+The register often stores bare domains, and some hosts answer only on www.
+or only over http://. Instead of waiting for the full timeout on the wrong
+variant, the variants (https/http x apex/www) are started one after another
+with a short stagger. The first good response wins, and the rest are
+cancelled or closed. The winning variant is remembered per domain, so later
+calls start with it.
+"""
+
+import ipaddress
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+from typing import Callable, List, Optional
+from urllib.parse import urlparse, urlunparse
+
+import requests
+
+from ..cache_store import PersistentCache, CACHE_MISS
+
+# Delay before the next variant is started if the previous ones have not answered
+HEDGE_STAGGER_SECONDS = 0.3
+VARIANT_CACHE_TTL = timedelta(days=30)
+variant_cache = PersistentCache("url_variants", VARIANT_CACHE_TTL)
+
+
+def _bare_host(host: str) -> str:
+    host = host.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _has_www_variant(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+        return False
+    except ValueError:
+        return "." in host
+
+
+def url_variants(url: str, preferred: Optional[dict] = None) -> List[str]:
+    """
+    The URL in every scheme/host variant, the given (or remembered) one first.
+
+    Args:
+        url: With or without a scheme ("firma.ee/meeskond" means https).
+        preferred: Remembered {"scheme", "www"} winner for the domain.
+    """
+    if "://" not in url:
+        url = "https://" + url
+    parsed = urlparse(url)
+    host = parsed.hostname or ""
+    bare = _bare_host(host)
+    port = f":{parsed.port}" if parsed.port else ""
+
+    schemes = [parsed.scheme] + [s for s in ("https", "http") if s != parsed.scheme]
+    hosts = [host]
+    if _has_www_variant(bare):
+        hosts += [h for h in (bare, "www." + bare) if h != host]
+
+    variants = [(scheme, h) for scheme in schemes for h in hosts]
+    if preferred:
+        remembered = (
+            preferred["scheme"],
+            "www." + bare if preferred["www"] else bare,
+        )
+        if remembered in variants:
+            variants.remove(remembered)
+            variants.insert(0, remembered)
+    return [urlunparse(parsed._replace(scheme=s, netloc=h + port)) for s, h in variants]
+
+
+def remembered_variant(url: str) -> Optional[dict]:
+    host = urlparse(url if "://" in url else "https://" + url).hostname or ""
+    value = variant_cache.get(_bare_host(host))
+    return None if value is CACHE_MISS else value
+
+
+def remember_variant(url: str) -> None:
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower()
+    variant_cache.set(
+        _bare_host(host), {"scheme": parsed.scheme, "www": host.startswith("www.")}
+    )
+
+
+def _close(future) -> None:
+    try:
+        response = future.result()
+    except Exception:
+        return
+    response.close()
+
+
+def hedged_get(
+    url: str,
+    headers: dict,
+    timeout: float,
+    stagger: float = HEDGE_STAGGER_SECONDS,
+    get: Callable[..., requests.Response] = requests.get,
+) -> requests.Response:
+    """
+    GETs the first answering variant of url (stream=True, caller closes).
+
+    A response below 400 (304 included) wins. If no variant wins, the first
+    variant's response is returned (so raise_for_status reports it) or its
+    exception is raised.
+    """
+    preferred = remembered_variant(url)
+    variants = url_variants(url, preferred)
+    executor = ThreadPoolExecutor(max_workers=len(variants))
+    futures = {}
+    winner = None
+
+    def request(variant):
+        return get(variant, headers=headers, timeout=timeout, stream=True)
+
+    try:
+        pending = set()
+        next_variant = 0
+        while winner is None:
+            if next_variant < len(variants):
+                future = executor.submit(request, variants[next_variant])
+                futures[future] = variants[next_variant]
+                pending.add(future)
+                next_variant += 1
+                wait_for = stagger if next_variant < len(variants) else None
+            elif not pending:
+                break
+            else:
+                wait_for = None
+
+            done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+            # Several answers at once: the preferred variant wins
+            for future in sorted(done, key=lambda f: variants.index(futures[f])):
+                if future.exception() is None and future.result().status_code < 400:
+                    winner = future
+                    break
+    finally:
+        # Not started variants are cancelled, running ones closed when they finish
+        executor.shutdown(wait=False, cancel_futures=True)
+        for future in futures:
+            if future is not winner:
+                future.add_done_callback(_close)
+
+    if winner is not None:
+        winning_url = futures[winner]
+        if winning_url != variants[0]:
+            logging.info(f"{url} vastas variandil {winning_url}")
+        if winning_url != variants[0] or preferred is None:
+            remember_variant(winning_url)
+        return winner.result()
+
+    # Closed already, but the status is enough for raise_for_status()
+    first = next(f for f, v in futures.items() if v == variants[0])
+    return first.result()
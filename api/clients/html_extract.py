@@ -0,0 +1,208 @@
+"""
+Bounded, fast HTML handling for CompanyWebsiteClient.
+
+- read_body: streams the response body up to a byte cap
+- decode_body: charset from the Content-Type header, the <meta> tag or the
+  content itself
+- extract_text: visible page text without <script>/<style> (selectolax when
+  installed, otherwise a streaming parse without building a DOM)
+- extract_links: only the <a href> links, also without a DOM
+- has_structured_markup: whether the page can have structured contacts at
+  all (one regex scan, so the DOM is only built when it can)
+- normalize_text: whitespace cleanup in one pass, one text block per line
+
+lxml and selectolax are optional; without them the standard library parser
+is used.
+"""
+
+import codecs
+import os
+import re
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+
+try:
+    from selectolax.parser import HTMLParser as FastHTMLParser
+except ImportError:
+    FastHTMLParser = None
+
+try:
+    import lxml  # noqa: F401
+
+    BS4_FEATURES = "lxml"
+except ImportError:
+    BS4_FEATURES = "html.parser"
+
+try:
+    from charset_normalizer import from_bytes as detect_charset
+except ImportError:
+    detect_charset = None
+
+# Larger pages are cut (the team section is rarely after the first 2 MB)
+MAX_PAGE_BYTES = int(os.getenv("MAX_PAGE_BYTES", str(2 * 1024 * 1024)))
+READ_CHUNK_BYTES = 64 * 1024
+# The <meta charset> tag must be near the start of the document
+CHARSET_SNIFF_BYTES = 4096
+
+SKIPPED_TAGS = ("script", "style")
+HEADER_CHARSET_RE = re.compile(r"charset=[\"']?([\w.:-]+)", re.IGNORECASE)
+META_CHARSET_RE = re.compile(rb"<meta[^>]+charset=[\"']?([\w.:-]+)", re.IGNORECASE)
+# JSON-LD, microdata, hCard or e-mail links (see structured_contacts)
+STRUCTURED_MARKUP_RE = re.compile(
+    r"application/ld\+json|\bitemprop\b|\bvcard\b|\bh-card\b|mailto:",
+    re.IGNORECASE,
+)
+# Line breaks (as in str.splitlines) and runs of two or more spaces
+BLOCK_BREAK_RE = re.compile(r"[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]| {2,}")
+
+
+def read_body(response, max_bytes: int = MAX_PAGE_BYTES) -> Tuple[bytes, bool]:
+    """
+    Reads a streamed (stream=True) response up to max_bytes.
+
+    Returns:
+        (body, truncated)
+    """
+    chunks = []
+    size = 0
+    for chunk in response.iter_content(READ_CHUNK_BYTES):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= max_bytes:
+            return b"".join(chunks)[:max_bytes], True
+    return b"".join(chunks), False
+
+
+def _valid_charset(name: Optional[str]) -> Optional[str]:
+    if not name:
+        return None
+    try:
+        return codecs.lookup(
+            name.decode("ascii") if isinstance(name, bytes) else name
+        ).name
+    except (LookupError, UnicodeDecodeError):
+        return None
+
+
+def decode_body(body: bytes, content_type: Optional[str] = None) -> str:
+    """
+    Decodes a page body. The charset is taken from the Content-Type header,
+    then from a <meta> tag; without either, UTF-8 is tried before guessing.
+    A multibyte character cut by the byte cap is dropped, not an error.
+    """
+    if body.startswith(codecs.BOM_UTF8):
+        return body[len(codecs.BOM_UTF8) :].decode("utf-8", errors="replace")
+
+    header_match = HEADER_CHARSET_RE.search(content_type or "")
+    meta_match = META_CHARSET_RE.search(body[:CHARSET_SNIFF_BYTES])
+    charset = _valid_charset(header_match and header_match.group(1)) or _valid_charset(
+        meta_match and meta_match.group(1)
+    )
+    if charset:
+        return codecs.getincrementaldecoder(charset)(errors="replace").decode(body)
+
+    try:
+        # final=False: an incomplete character at the end is not an error
+        return codecs.getincrementaldecoder("utf-8")().decode(body, final=False)
+    except UnicodeDecodeError:
+        pass
+    if detect_charset is not None:
+        best = detect_charset(body).best()
+        if best is not None:
+            return str(best)
+    return body.decode("cp1252", errors="replace")
+
+
+def normalize_text(text: str) -> str:
+    """Strips every line and splits it at double spaces; empty blocks are dropped."""
+    blocks = (block.strip() for block in BLOCK_BREAK_RE.split(text))
+    return "\n".join(block for block in blocks if block)
+
+
+class _TextCollector(HTMLParser):
+    """Collects text outside <script>/<style> while parsing."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._skipped = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skipped += 1
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS and self._skipped:
+            self._skipped -= 1
+
+    def handle_data(self, data):
+        if not self._skipped:
+            self.parts.append(data)
+
+
+class _LinkCollector(HTMLParser):
+    """Collects (link text, href) of <a> tags while parsing."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links = []
+        self._href = None
+        self._text = []
+
+    def _close_link(self):
+        if self._href is not None:
+            text = "".join(part.strip() for part in self._text)
+            self.links.append((text, self._href))
+        self._href = None
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            self._close_link()
+            href = dict(attrs).get("href")
+            if href is not None:
+                self._href = href
+
+    def handle_endtag(self, tag):
+        if tag == "a":
+            self._close_link()
+
+    def handle_data(self, data):
+        if self._href is not None:
+            self._text.append(data)
+
+    def close(self):
+        super().close()
+        self._close_link()
+
+
+def extract_text(html: str) -> str:
+    """Visible text of the page (normalize_text format)."""
+    if FastHTMLParser is not None:
+        tree = FastHTMLParser(html)
+        tree.strip_tags(list(SKIPPED_TAGS))
+        text = tree.root.text(separator="") if tree.root is not None else ""
+    else:
+        collector = _TextCollector()
+        collector.feed(html)
+        collector.close()
+        text = "".join(collector.parts)
+    return normalize_text(text)
+
+
+def has_structured_markup(html: str) -> bool:
+    """True if the page has JSON-LD, microdata, hCard or mailto: markup."""
+    return STRUCTURED_MARKUP_RE.search(html) is not None
+
+
+def extract_links(html: str) -> List[Tuple[str, str]]:
+    """(link text, href) for every <a href> on the page, in page order."""
+    if FastHTMLParser is not None:
+        return [
+            (node.text(strip=True), node.attributes.get("href") or "")
+            for node in FastHTMLParser(html).css("a[href]")
+        ]
+    collector = _LinkCollector()
+    collector.feed(html)
+    collector.close()
+    return collector.links
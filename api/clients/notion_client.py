@@ -1,6 +1,29 @@
+import os
+import time
+
 import requests
 import logging
 
+from ..resilience import notion as notion_dependency
+
+# Overridable so load tests can point the client at a local stand-in
+NOTION_API_URL = os.getenv("NOTION_API_URL", "https://api.notion.com/v1").rstrip("/")
+# Seconds; without a timeout a hanging request would hold a bulkhead slot forever
+NOTION_TIMEOUT = 30
+# Rate-limited (429) requests are retried this many times, waiting as long as
+# Retry-After says (at most NOTION_MAX_RETRY_WAIT seconds per wait)
+NOTION_MAX_RETRIES = int(os.getenv("NOTION_MAX_RETRIES", "3"))
+NOTION_MAX_RETRY_WAIT = 30
+
+
+def _retry_after_seconds(value, attempt: int) -> float:
+    """Seconds to wait from a Retry-After header, or an exponential backoff without one."""
+    try:
+        wait = float(value)
+    except (TypeError, ValueError):
+        wait = 2**attempt
+    return min(max(wait, 0), NOTION_MAX_RETRY_WAIT)
+
 
 class NotionClient:
     """Class for communicating with the Notion API."""
@@ -16,35 +39,58 @@ class NotionClient:
             "Notion-Version": self.api_version,
         }
 
+    def _request(self, method: str, url: str, **kwargs):
+        """
+        Sends a request through the Notion bulkhead and circuit breaker.
+
+        Notion allows about 3 requests per second per integration; a 429
+        answer is retried after its Retry-After (outside the bulkhead), up
+        to NOTION_MAX_RETRIES times. The last answer is returned as is.
+        """
+        kwargs.setdefault("timeout", NOTION_TIMEOUT)
+        for attempt in range(NOTION_MAX_RETRIES + 1):
+            r = notion_dependency.call(
+                requests.request, method, url, headers=self.headers, **kwargs
+            )
+            if r.status_code != 429 or attempt == NOTION_MAX_RETRIES:
+                return r
+            wait = _retry_after_seconds(r.headers.get("Retry-After"), attempt)
+            logging.info(
+                f"Notion piiras päringuid (429), proovin uuesti {wait:.1f} s pärast"
+            )
+            time.sleep(wait)
+
     def get_page(self, page_id: str):
         """Returns data of a specific page."""
-        url = f"https://api.notion.com/v1/pages/{page_id}"
-        r = requests.get(url, headers=self.headers)
+        url = f"{NOTION_API_URL}/pages/{page_id}"
+        r = self._request("GET", url)
         r.raise_for_status()
         return r.json()
 
     def create_page(self, payload: dict):
         """Adds a new page (entry) to the database."""
-        url = "https://api.notion.com/v1/pages"
-        r = requests.post(url, headers=self.headers, json=payload)
+        url = f"{NOTION_API_URL}/pages"
+        r = self._request("POST", url, json=payload)
         if not r.ok:
             error_detail = r.text
-            logging.error(f"Notion API error creating page: {r.status_code} - {error_detail}")
+            logging.error(
+                f"Notion API error creating page: {r.status_code} - {error_detail}"
+            )
             logging.error(f"Payload sent: {payload}")
         r.raise_for_status()
         return r.json()
 
     def update_page(self, page_id: str, properties: dict):
         """Updates an existing page (entry)."""
-        url = f"https://api.notion.com/v1/pages/{page_id}"
-        r = requests.patch(url, headers=self.headers, json={"properties": properties})
+        url = f"{NOTION_API_URL}/pages/{page_id}"
+        r = self._request("PATCH", url, json={"properties": properties})
         r.raise_for_status()
         return r.json()
 
     def get_database(self):
         """Retrieves database schema/properties."""
-        url = f"https://api.notion.com/v1/databases/{self.database_id}"
-        r = requests.get(url, headers=self.headers)
+        url = f"{NOTION_API_URL}/databases/{self.database_id}"
+        r = self._request("GET", url)
         r.raise_for_status()
         return r.json()
 
@@ -65,7 +111,7 @@ class NotionClient:
         Returns:
             The first matching page (excluding exclude_page_id if provided), or None
         """
-        url = f"https://api.notion.com/v1/databases/{self.database_id}/query"
+        url = f"{NOTION_API_URL}/databases/{self.database_id}/query"
 
         payload = {
             "filter": {"property": "Registrikood", "number": {"equals": int(regcode)}}
@@ -80,7 +126,7 @@ class NotionClient:
             if next_cursor:
                 payload["start_cursor"] = next_cursor
 
-            r = requests.post(url, headers=self.headers, json=payload)
+            r = self._request("POST", url, json=payload)
             r.raise_for_status()
             res = r.json()
 
@@ -126,21 +172,55 @@ class NotionClient:
 
     def query_database(self, filter_dict: dict):
         """Queries the database with a custom filter."""
-        url = f"https://api.notion.com/v1/databases/{self.database_id}/query"
+        url = f"{NOTION_API_URL}/databases/{self.database_id}/query"
         payload = {"filter": filter_dict}
-        r = requests.post(url, headers=self.headers, json=payload)
+        r = self._request("POST", url, json=payload)
         if not r.ok:
             error_detail = r.text
-            logging.error(f"Notion API error querying database: {r.status_code} - {error_detail}")
+            logging.error(
+                f"Notion API error querying database: {r.status_code} - {error_detail}"
+            )
             logging.error(f"Filter used: {filter_dict}")
         r.raise_for_status()
         res = r.json()
         return res.get("results", [])
 
+    def query_database_page(
+        self,
+        filter_dict: dict = None,
+        start_cursor: str = None,
+        page_size: int = 100,
+    ):
+        """Returns one page of query results, including 'has_more' and 'next_cursor'."""
+        url = f"{NOTION_API_URL}/databases/{self.database_id}/query"
+        payload = {"page_size": page_size}
+        if filter_dict:
+            payload["filter"] = filter_dict
+        if start_cursor:
+            payload["start_cursor"] = start_cursor
+        r = self._request("POST", url, json=payload)
+        if not r.ok:
+            logging.error(
+                f"Notion API error querying database: {r.status_code} - {r.text}"
+            )
+        r.raise_for_status()
+        return r.json()
+
+    def query_database_all(self, filter_dict: dict = None):
+        """Returns all results of a query, following the pagination cursor."""
+        results = []
+        cursor = None
+        while True:
+            res = self.query_database_page(filter_dict, start_cursor=cursor)
+            results.extend(res.get("results", []))
+            cursor = res.get("next_cursor")
+            if not res.get("has_more") or not cursor:
+                return results
+
     def delete_page(self, page_id: str):
         """Archives (soft deletes) a page in Notion."""
-        url = f"https://api.notion.com/v1/pages/{page_id}"
+        url = f"{NOTION_API_URL}/pages/{page_id}"
         payload = {"archived": True}
-        r = requests.patch(url, headers=self.headers, json=payload)
+        r = self._request("PATCH", url, json=payload)
         r.raise_for_status()
         return r.json()
@@ -6,7 +6,7 @@ def load_config() -> Dict[str, Any]:
     """
     Loads required configuration settings from environment variables.
     Returns:
-        A dictionary containing 'notion','ariregister' and 'google' configuration
+        A dictionary containing 'notion','ariregister', 'emta' and 'google' configuration
     """
     google_ai_model = "gemini-2.5-flash-lite"
     notion_token = os.getenv("NOTION_API_KEY")
@@ -16,6 +16,10 @@ def load_config() -> Dict[str, Any]:
     ariregister_url = os.getenv("ARIREGISTER_JSON_URL") or os.getenv(
         "ARIREGISTER_CSV_URL"
     )
+    # Dataset of the people on the registry card (board members)
+    ariregister_board_url = os.getenv("ARIREGISTER_BOARD_JSON_URL")
+    # EMTA quarterly tax statistics files (comma-separated), optional
+    emta_tax_csv_url = os.getenv("EMTA_TAX_CSV_URL")
     google_api_key = os.getenv("GOOGLE_API_KEY")
     google_cse_cx = os.getenv("GOOGLE_CSE_CX")
 
@@ -25,7 +29,11 @@ def load_config() -> Dict[str, Any]:
             "database_id": notion_db,
             "api_version": notion_api_version,
         },
-        "ariregister": {"json_url": ariregister_url},
+        "ariregister": {
+            "json_url": ariregister_url,
+            "board_json_url": ariregister_board_url,
+        },
+        "emta": {"tax_csv_url": emta_tax_csv_url},
         "google": {
             "api_key": "dummy_key",
             "cse_cx": "dummy_id",
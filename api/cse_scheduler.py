@@ -0,0 +1,222 @@
+"""
+Quota-aware scheduling of Google Custom Search queries.
+
+The CSE API allows a fixed number of queries per day (the quota resets at
+midnight Pacific time) and rejects bursts with 429. This module keeps:
+- a local count of today's queries, shared by all processes (SQLite),
+- a rate limiter that spaces queries to GOOGLE_CSE_QPS,
+- a persisted backlog of bulk searches that did not fit into today's quota.
+
+Interactive autofills use the whole quota; bulk runs leave
+GOOGLE_CSE_INTERACTIVE_RESERVE queries of it for them.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+from zoneinfo import ZoneInfo
+
+from .json_loader import CACHE_DIR
+
+CSE_DB_PATH = os.path.join(CACHE_DIR, "google_cse.sqlite3")
+GOOGLE_CSE_QPS = float(os.getenv("GOOGLE_CSE_QPS", "1"))
+GOOGLE_CSE_DAILY_QUOTA = int(os.getenv("GOOGLE_CSE_DAILY_QUOTA", "100"))
+GOOGLE_CSE_INTERACTIVE_RESERVE = int(os.getenv("GOOGLE_CSE_INTERACTIVE_RESERVE", "10"))
+# Google resets the daily CSE quota at midnight Pacific time
+QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cse_usage (
+    day TEXT PRIMARY KEY,
+    used INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cse_backlog (
+    key TEXT PRIMARY KEY,
+    priority REAL NOT NULL,
+    payload TEXT NOT NULL,
+    deferred_on TEXT NOT NULL
+);
+"""
+
+
+class CseQuotaExceeded(Exception):
+    """Raised when a bulk search does not fit into today's quota."""
+
+
+def quota_day(now: Optional[datetime] = None) -> str:
+    """The quota window (date in Pacific time) the given moment belongs to."""
+    return (
+        (now or datetime.now(QUOTA_TIMEZONE))
+        .astimezone(QUOTA_TIMEZONE)
+        .strftime("%Y-%m-%d")
+    )
+
+
+@contextmanager
+def _connection(db_path: Optional[str]) -> Iterator[sqlite3.Connection]:
+    # Resolved at use time, so tests can point CSE_DB_PATH elsewhere
+    path = db_path or CSE_DB_PATH
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        yield conn
+    finally:
+        conn.close()
+
+
+class CseQuota:
+    """Local count of today's CSE queries."""
+
+    def __init__(
+        self, daily_quota: int = GOOGLE_CSE_DAILY_QUOTA, db_path: Optional[str] = None
+    ):
+        self.daily_quota = daily_quota
+        self.db_path = db_path
+
+    def try_acquire(self, reserve: int = 0) -> bool:
+        """
+        Takes one query from today's quota.
+
+        Args:
+            reserve: Number of queries that must stay available for others.
+
+        Returns:
+            True if the query may be sent, False if the quota is used up.
+        """
+        day = quota_day()
+        with _connection(self.db_path) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT used FROM cse_usage WHERE day = ?", (day,)
+            ).fetchone()
+            used = row[0] if row else 0
+            if used + 1 > self.daily_quota - reserve:
+                conn.execute("ROLLBACK")
+                return False
+            conn.execute(
+                "INSERT INTO cse_usage (day, used) VALUES (?, 1) "
+                "ON CONFLICT(day) DO UPDATE SET used = used + 1",
+                (day,),
+            )
+            conn.execute("COMMIT")
+        return True
+
+    def release(self) -> None:
+        """Gives back a query that was taken but not served (network error or 5xx)."""
+        with _connection(self.db_path) as conn:
+            conn.execute(
+                "UPDATE cse_usage SET used = used - 1 WHERE day = ? AND used > 0",
+                (quota_day(),),
+            )
+
+    def remaining(self) -> int:
+        with _connection(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT used FROM cse_usage WHERE day = ?", (quota_day(),)
+            ).fetchone()
+        return max(self.daily_quota - (row[0] if row else 0), 0)
+
+
+class RateLimiter:
+    """Spaces calls at least 1/qps seconds apart across threads."""
+
+    def __init__(self, qps: float):
+        self.interval = 1.0 / qps if qps > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class CseBacklog:
+    """Persisted searches deferred to a later quota window."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path
+
+    def defer(self, key: str, payload: Dict[str, Any], priority: float = 0):
+        with _connection(self.db_path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cse_backlog (key, priority, payload, deferred_on) "
+                "VALUES (?, ?, ?, ?)",
+                (key, priority, json.dumps(payload, ensure_ascii=False), quota_day()),
+            )
+
+    def due(self) -> List[Dict[str, Any]]:
+        """Work deferred in an earlier quota window, most important first."""
+        with _connection(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT payload FROM cse_backlog WHERE deferred_on < ? "
+                "ORDER BY priority DESC, deferred_on",
+                (quota_day(),),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def remove(self, key: str):
+        with _connection(self.db_path) as conn:
+            conn.execute("DELETE FROM cse_backlog WHERE key = ?", (key,))
+
+    def __len__(self) -> int:
+        with _connection(self.db_path) as conn:
+            return conn.execute("SELECT COUNT(*) FROM cse_backlog").fetchone()[0]
+
+
+class CseScheduler:
+    """Admits bulk CSE queries within the rate limit and the daily quota."""
+
+    def __init__(
+        self,
+        quota: Optional[CseQuota] = None,
+        max_qps: float = GOOGLE_CSE_QPS,
+        reserve: int = GOOGLE_CSE_INTERACTIVE_RESERVE,
+        backlog: Optional[CseBacklog] = None,
+    ):
+        self.quota = quota or CseQuota()
+        self.limiter = RateLimiter(max_qps)
+        self.reserve = reserve
+        self.backlog = backlog or CseBacklog()
+
+    def acquire(self) -> bool:
+        """
+        Blocks until the next query may be sent.
+
+        Raises:
+            CseQuotaExceeded: today's quota (minus the interactive reserve) is used up.
+        """
+        if not self.quota.try_acquire(reserve=self.reserve):
+            raise CseQuotaExceeded(
+                f"Google CSE päevane kvoot ({self.quota.daily_quota}) on täis."
+            )
+        self.limiter.wait()
+        return True
+
+    def release(self) -> None:
+        """Returns a query taken by acquire() that Google did not serve."""
+        self.quota.release()
+
+
+# Quota used by single (interactive) autofills; the count itself is shared via SQLite
+cse_quota = CseQuota()
+
+
+def acquire_interactive() -> bool:
+    """Quota check for single autofills: may use the whole daily quota."""
+    return cse_quota.try_acquire()
+
+
+def release_interactive() -> None:
+    """Gives back a query taken by acquire_interactive() that was not served."""
+    cse_quota.release()
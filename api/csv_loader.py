@@ -3,8 +3,7 @@ import math
 import os
 import time
 from datetime import timedelta
-
-import pandas as pd
+from typing import TYPE_CHECKING
 
 from .clients.ariregister_client import AriregisterClient
 
@@ -12,12 +11,18 @@ CACHE_FILE_PATH = "/tmp/ariregister_data.csv"
 CACHE_EXPIRATION = timedelta(hours=24)
 ariregister_client = AriregisterClient()
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
-def load_csv(url: str) -> pd.DataFrame:
+def load_csv(url: str) -> "pd.DataFrame":
     """
     Loads a CSV file from a URL, using a local cache to avoid
     re-downloading the data within a 24-hour period.
     """
+    # pandas is imported on first use, not when the module is imported
+    import pandas as pd
+
     # Check if a valid cache file exists
     if os.path.exists(CACHE_FILE_PATH):
         file_mod_time = os.path.getmtime(CACHE_FILE_PATH)
@@ -55,7 +60,7 @@ def load_csv(url: str) -> pd.DataFrame:
     return df
 
 
-def find_company_by_regcode(df: pd.DataFrame, regcode: str) -> dict | None:
+def find_company_by_regcode(df: "pd.DataFrame", regcode: str) -> dict | None:
     """Finds company by registry code."""
 
     row = df[df["ariregistri_kood"].astype(str) == str(regcode)]
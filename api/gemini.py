@@ -1,32 +1,134 @@
 import os
-import google.generativeai as genai
+import threading
 import json
 import requests
+from datetime import timedelta
+from functools import partial
 from dotenv import load_dotenv
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse  # Required for fixing links
 from .config import load_config
-
-
-from .clients.company_website_client import CompanyWebsiteClient
+from .cache_store import PersistentCache, CACHE_MISS, hash_key
+from .link_ranking import rank_links, confident_choice
+from .resilience import gemini as gemini_dependency
+from .sitemap_discovery import find_contact_page_from_sitemap, sitemap_page_urls
+from .staff_crawl import crawl_staff_pages
+from .text_compaction import compact_text
+from .staff_roles import role_prompt_section
+from .structured_contacts import (
+    extract_structured_contacts,
+    has_enough_roles,
+    unreverse_email,
+)
+
+from .clients.company_website_client import CompanyWebsiteClient, default_page_cache
 
 # Load .env file variables
 load_dotenv()
 
-config = load_config()
-AI_MODEL = config["google"]["ai_model"]
-# Configure the client
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+AI_MODEL = load_config()["google"]["ai_model"]
+
+
+# Identical prompts (e.g. an unchanged homepage link list) reuse the earlier answer
+GEMINI_CACHE_TTL = timedelta(days=7)
+GEMINI_CACHE_MAX_BYTES = 20 * 1024 * 1024
+
+
+class CachedResponse:
+    """The part of a Gemini response the callers use."""
 
+    def __init__(self, text):
+        self.text = text
 
-try:
-    # Initialize the Gemini model
-    model = genai.GenerativeModel(AI_MODEL)
-except Exception as e:
-    print(f"Viga mudeli initsialiseerimisel: {e}")
-    exit()
 
-company_website_client = CompanyWebsiteClient()
+class CachedGenerativeModel:
+    """
+    Wraps a Gemini model with a persistent response cache keyed on
+    (model name, normalized prompt). Prompts are normalized by collapsing
+    whitespace, so indentation changes in the templates do not miss the cache.
+
+    Only answers the caller can use are cached: with `valid` given, an answer
+    it rejects (empty, cut off, not JSON) is not stored, and such an entry
+    left from before is dropped instead of replayed. `refresh=True` skips the
+    cache read (forced updates) and stores the new answer.
+    """
+
+    def __init__(self, model, model_name, cache):
+        self.model = model
+        self.model_name = model_name
+        self.cache = cache
+        self.saved_tokens = 0
+        self._lock = threading.Lock()
+
+    def _key(self, prompt):
+        return hash_key(self.model_name, " ".join(prompt.split()))
+
+    def generate_content(self, prompt, valid=None, refresh=False):
+        key = self._key(prompt)
+        cached = CACHE_MISS if refresh else self.cache.get(key)
+        if cached is not CACHE_MISS:
+            if valid is None or valid(cached["text"]):
+                with self._lock:
+                    self.saved_tokens += cached.get("tokens") or 0
+                return CachedResponse(cached["text"])
+            self.cache.delete(key)
+
+        response = self.model.generate_content(prompt)
+        text = response.text
+        usage = getattr(response, "usage_metadata", None)
+        tokens = getattr(usage, "total_token_count", 0) if usage else 0
+        if valid is None or valid(text):
+            self.cache.set(key, {"text": text, "tokens": tokens})
+        return CachedResponse(text)
+
+    def stats(self):
+        """Hit/miss counters of the cache and the tokens saved by hits."""
+        stats = self.cache.stats()
+        stats["saved_tokens"] = self.saved_tokens
+        return stats
+
+
+class LazyGenerativeModel:
+    """
+    Imports google-generativeai, configures it and builds the model on the
+    first call instead of at import time (the import alone takes most of a
+    cold start). Thread-safe: concurrent first calls build the model once.
+    """
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _get_model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    try:
+                        import google.generativeai as genai
+
+                        genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+                        self._model = genai.GenerativeModel(self.model_name)
+                    except Exception as e:
+                        raise RuntimeError(
+                            f"Viga mudeli initsialiseerimisel: {e}"
+                        ) from e
+        return self._model
+
+    def generate_content(self, prompt):
+        model = self._get_model()
+        return gemini_dependency.call(model.generate_content, prompt)
+
+
+# The Gemini model; nothing is loaded before the first uncached prompt
+model = CachedGenerativeModel(
+    LazyGenerativeModel(AI_MODEL),
+    AI_MODEL,
+    PersistentCache(
+        "gemini_responses", GEMINI_CACHE_TTL, max_bytes=GEMINI_CACHE_MAX_BYTES
+    ),
+)
+
+company_website_client = CompanyWebsiteClient(page_cache=default_page_cache())
 
 
 def get_website_text(url):
@@ -36,21 +138,9 @@ def get_website_text(url):
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36"
         }
-        # Use the injected CompanyWebsiteClient to fetch the page
-        response = company_website_client.get_company_website(url, headers)
-
-        # Parse the HTML content
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        # Remove script and style elements
-        for script_or_style in soup(["script", "style"]):
-            script_or_style.decompose()
-
-        # Extract text, clean up line breaks and multiple spaces
-        text = soup.get_text()
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        cleaned_text = "\n".join(chunk for chunk in chunks if chunk)
+        # Use the injected CompanyWebsiteClient to fetch the page and extract the
+        # text (reuses the homepage download from step 1 within the same search)
+        cleaned_text = company_website_client.get_text(url, headers)
 
         print("   ... Sisu edukalt alla laetud ja puhastatud.")
         return cleaned_text
@@ -60,42 +150,117 @@ def get_website_text(url):
         return None
 
 
-def find_contact_page_url(base_url):
+def get_page_text(url, revalidate=False):
     """
-    Step 1: Finds all links on the homepage and asks Gemini
-    which one is most likely to contain contact information.
+    get_website_text in a request scope of its own (e.g. in a worker thread).
+    With revalidate=True the server is always asked whether the page changed.
     """
-    print(f"Step 1: Searching for the contact page on the homepage {base_url}...")
+    with company_website_client.request_scope(revalidate=revalidate):
+        return get_website_text(url)
+
+
+def _same_domain_links(page_links, base_url):
+    """Returns (lowercase link text, absolute URL) for every same-domain link."""
+    links = []
+    for link_text, link_href in page_links:
+        link_text = link_text.lower()
+
+        # Convert relative links (e.g., /contact) to full URLs
+        full_url = urljoin(base_url, link_href)
+
+        # Only include links that stay on the same domain
+        if urlparse(full_url).netloc == urlparse(base_url).netloc:
+            links.append((link_text, full_url))
+    return links
+
 
+def find_structured_staff(url):
+    """
+    Contacts from the page's structured data (JSON-LD, microdata, hCard,
+    mailto/tel links). The DOM is only built if the page has such markup, and
+    an unexpected page never fails the staff search (the result is then []).
+    """
     try:
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36"
         }
-        # Use the injected CompanyWebsiteClient to fetch the page
-        response = company_website_client.get_company_website(base_url, headers)
+        if not company_website_client.has_structured_markup(url, headers):
+            return []
+        soup = company_website_client.get_soup(url, headers)
+    except requests.exceptions.RequestException:
+        return []
+    try:
+        return extract_structured_contacts(soup)
+    except Exception as e:
+        print(f"   ... Struktureeritud andmete lugemine ebaõnnestus ({url}): {e}")
+        return []
 
-        soup = BeautifulSoup(response.text, "html.parser")
 
-        links = []
-        # Find all <a> (link) tags
-        for a_tag in soup.find_all("a", href=True):
-            link_text = a_tag.get_text(strip=True).lower()
-            link_href = a_tag["href"]
+def rank_site_pages(base_url):
+    """
+    Ranks the site's pages (sitemap URLs and homepage links) by how likely
+    they contain staff or contact information. Used by the crawl mode.
+    """
+    link_pairs = [("", url) for url in sitemap_page_urls(base_url)]
+    try:
+        headers = {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36"
+        }
+        page_links = company_website_client.get_links(base_url, headers)
+        link_pairs += _same_domain_links(page_links, base_url)
+    except requests.exceptions.RequestException as e:
+        print(f"   ... Viga pealehe allalaadimisel: {e}")
+    return [url for _, url in rank_links(link_pairs, base_url)]
 
-            # Convert relative links (e.g., /contact) to full URLs
-            full_url = urljoin(base_url, link_href)
 
-            # Only include links that stay on the same domain
-            if urlparse(full_url).netloc == urlparse(base_url).netloc:
-                links.append(f"{link_text}: {full_url}")
+def find_contact_page_url(base_url, refresh=False):
+    """
+    Step 1: Finds the page most likely to contain contact information.
+    The site's sitemap is checked first; otherwise all homepage links are
+    ranked. A clear winner of the keyword ranking (link_ranking) is used
+    directly; Gemini is only asked when it is ambiguous (refresh=True does
+    not reuse a cached answer).
+    """
+    print(f"Step 1: Searching for the contact page on the homepage {base_url}...")
 
-        # Remove duplicates
-        unique_links = list(set(links))
+    # The sitemap often lists the team page directly: no homepage parse, no LLM
+    sitemap_url = find_contact_page_from_sitemap(base_url)
+    if sitemap_url:
+        print(f"   ... Sitemap listed the contact page: {sitemap_url}")
+        return sitemap_url
+
+    try:
+        headers = {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36"
+        }
+        # Use the injected CompanyWebsiteClient to fetch the page and collect its links
+        page_links = company_website_client.get_links(base_url, headers)
+
+        link_pairs = _same_domain_links(page_links, base_url)
+
+        # Remove duplicates (sorted, so the same page gives the same prompt)
+        unique_links = sorted(
+            set(f"{link_text}: {full_url}" for link_text, full_url in link_pairs)
+        )
 
         if not unique_links:
             print("   ... Did not find any links on the homepage.")
             return base_url  # Return the original URL if no links are found
 
+        ranked = rank_links(link_pairs, base_url)
+        chosen_url = confident_choice(ranked)
+        if chosen_url:
+            print(
+                f"   ... Link ranking chose the contact page (score={ranked[0][0]:.1f}): {chosen_url}"
+            )
+            return chosen_url
+
+        if not gemini_dependency.available():
+            # Gemini is failing: the best-ranked link is a better guess than the homepage
+            fallback_url = ranked[0][1] if ranked else base_url
+            print(f"   ... Gemini ei ole saadaval, kasutan: {fallback_url}")
+            return fallback_url
+
         # Construct the prompt for Gemini
         prompt = f"""
         The following is a list of links found on the website {base_url}.
@@ -113,7 +278,9 @@ def find_contact_page_url(base_url):
         print(prompt)
 
         # Ask Gemini
-        response = model.generate_content(prompt)
+        response = model.generate_content(
+            prompt, valid=lambda text: bool(text.strip()), refresh=refresh
+        )
         suggested_url = response.text.strip()
 
         if "NONE" in suggested_url or "http" not in suggested_url:
@@ -146,17 +313,102 @@ def run_full_staff_search(base_url):
 
         Returns None if there was an error fetching the website content.
     """
-    # 1. Step: Find the correct subpage (e.g., /team)
-    contact_page_url = find_contact_page_url(base_url)
+    result = run_staff_page_search(base_url)
+    return result["staff"] if result else None
+
+
+def run_staff_page_search(base_url, crawl_pages=0, revalidate=False):
+    """
+    Like run_full_staff_search, but also returns the page the staff list was
+    extracted from, so that later runs can detect an unchanged page.
 
-    # 2. Step: Download the content of that subpage
-    print(f"\nStep 2: Downloading content from the identified page...")
-    website_text = get_website_text(contact_page_url)
+    With revalidate=True every cached page is revalidated with the server
+    instead of being used while fresh, and Gemini is asked again instead of
+    reusing a cached answer (forced updates).
+
+    With crawl_pages > 1 (opt-in crawl mode), the next best ranked pages of the
+    site are downloaded in parallel as well and merged with the contact page
+    into one deduplicated, token-budgeted document (see staff_crawl).
+
+    Returns:
+        Dictionary with contact_url, website_text and staff (None if the
+        Gemini answer could not be parsed), or None if the page content
+        could not be fetched.
+    """
+    # Pages are downloaded and parsed once per search, even if Gemini picks the homepage
+    with company_website_client.request_scope(revalidate=revalidate):
+        # 1. Step: Find the correct subpage (e.g., /team)
+        contact_page_url = find_contact_page_url(base_url, refresh=revalidate)
+
+        # Structured data (JSON-LD, microdata, mailto links) may make Gemini unnecessary
+        structured_staff = find_structured_staff(contact_page_url)
+        fast_path = has_enough_roles(structured_staff)
+
+        # 2. Step: Download the content of that subpage
+        print(f"\nStep 2: Downloading content from the identified page...")
+        website_text = get_website_text(contact_page_url)
+
+        if website_text and crawl_pages > 1 and not fast_path:
+            extra_urls = [
+                url
+                for url in rank_site_pages(base_url)
+                if url.rstrip("/") != contact_page_url.rstrip("/")
+            ][: crawl_pages - 1]
+            print(f"   ... Crawl mode: also reading {len(extra_urls)} pages.")
+            website_text = crawl_staff_pages(
+                contact_page_url,
+                website_text,
+                extra_urls,
+                partial(get_page_text, revalidate=revalidate),
+            )
 
     if not website_text:
         print("Ei saanud veebilehe sisu kätte. Katkestan.")
         return None
 
+    if fast_path:
+        print(
+            f"\nStep 3: Found {len(structured_staff)} contacts in the page's structured data, skipping Gemini."
+        )
+        staff = structured_staff
+    else:
+        staff = extract_staff_from_text(website_text, refresh=revalidate)
+
+    return {
+        "contact_url": contact_page_url,
+        "website_text": website_text,
+        "staff": staff,
+    }
+
+
+def _strip_code_fence(text):
+    return text.strip().lstrip("```json").lstrip("```").rstrip("```")
+
+
+def _is_json_list(text):
+    """True for an answer that parses as a JSON array (cacheable)."""
+    try:
+        return isinstance(json.loads(_strip_code_fence(text)), list)
+    except ValueError:
+        return False
+
+
+def extract_staff_from_text(website_text, refresh=False):
+    """
+    Steps 3-4: asks Gemini for the staff list in the cleaned page text and
+    fixes reversed e-mail addresses. Only an answer that parses as a JSON
+    array is cached; refresh=True asks Gemini even if one is.
+
+    Returns:
+        List of staff dictionaries, or None if the request or parsing failed.
+    """
+    # Keep only the contact-related parts of long pages
+    compacted_text = compact_text(website_text)
+    if len(compacted_text) < len(website_text):
+        print(
+            f"   ... Text compacted from {len(website_text)} to {len(compacted_text)} characters."
+        )
+
     # 3. Step: Construct a new prompt and send it to Gemini
     prompt = f"""
     Your task is to act as a data analyst. Analyze the following website text and extract
@@ -174,29 +426,7 @@ def run_full_staff_search(base_url):
     KEY ROLES TO FIND (by priority):
     I am interested ONLY in these roles. Please include Estonian equivalents.
 
-    1. STRATEGIC LEADERSHIP:
-       - 'CEO', 'Tegevjuht'
-       - 'COO', 'Chief Operating Officer'
-       - 'CIO', 'Chief Information Officer'
-       - 'CTO', 'Chief Technology Officer'
-       - 'Managing Director'
-       - 'Founder'
-
-    2. DEVELOPMENT / TECHNOLOGY:
-       - 'Arendusjuht', 'Head of Development'
-       - 'IT-juht', 'IT Manager', 'Head of IT'
-       - 'Innovatsioonijuht', 'Head of Innovation'
-
-    3. PROJECT MANAGEMENT:
-       - 'Projektijuht', 'Project Manager'
-
-    4. PERSONNEL / MARKETING:
-       - 'HR Manager', 'Personalijuht'
-       - 'Head of Marketing', 'Turundusjuht'
-       - 'Head of Sales', 'Müügijuht'
-
-    5. GENERAL CONTACT:
-       - 'General Contact'
+    {role_prompt_section()}
 
     RULES:
     1. Find the name, role, email, AND phone number.
@@ -209,20 +439,18 @@ def run_full_staff_search(base_url):
 
     TEXT CONTENT:
     ---
-    {website_text[:30000]} 
+    {compacted_text}
     ---
     Finish analysis and return ONLY JSON.
     """
 
     print("\nStep 3: Sending cleaned text to Gemini for analysis...")
     try:
-        response = model.generate_content(prompt)
+        response = model.generate_content(prompt, valid=_is_json_list, refresh=refresh)
 
         print("\n--- Response (Raw Content) ---")
         # Clean up the response to show only JSON
-        json_response = (
-            response.text.strip().lstrip("```json").lstrip("```").rstrip("```")
-        )
+        json_response = _strip_code_fence(response.text)
 
         # Fix reversed email addresses (a common anti-bot technique)
         print("\nStep 4: Fixing reversed email addresses...")
@@ -235,20 +463,7 @@ def run_full_staff_search(base_url):
                         and "email" in item
                         and isinstance(item["email"], str)
                     ):
-                        # Assuming the anti-bot technique reverses the email, e.g., "ee.tnak_tsim_oin" -> "nio_mist_kante.ee"
-                        if item["email"].startswith("ee.") or item["email"].startswith(
-                            "moc."
-                        ):
-                            # This specific check for "ee." seems tailored to a local/specific reversal pattern.
-                            # A more general reversal check is:
-                            # if '.' in item['email'] and '@' in item['email'] and item['email'] == item['email'][::-1][::-1]:
-                            # For the specific anti-bot technique where the email is literally reversed:
-                            # if item['email'] == item['email'][::-1]: # Check if it's a palindrome (unlikely)
-
-                            # Sticking to the original logic which checks for a start pattern indicating a reversed string
-                            # and performs a reversal:
-
-                            item["email"] = item["email"][::-1]
+                        item["email"] = unreverse_email(item["email"])
             fixed_json = json.dumps(data, indent=2, ensure_ascii=False)
             print(fixed_json)
             print("--------------------------------\n")
@@ -0,0 +1,337 @@
+"""
+Durable local job queue (SQLite) and worker threads for running autofill and
+staff updates outside of the HTTP request.
+
+Jobs are stored in a SQLite file next to the register cache, so a queued job
+survives a process restart. Workers pick the job with the lowest priority
+number first (interactive clicks before bulk jobs), then the oldest one.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+from .json_loader import CACHE_DIR
+
+JOBS_DB_PATH = os.path.join(CACHE_DIR, "jobs.sqlite3")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# The workers are threads of the web process, so the job mode needs a process
+# that keeps running after the response (not a serverless function, where
+# nothing is guaranteed to run once the response has been sent)
+ASYNC_JOBS_ENABLED = os.getenv("ASYNC_JOBS_ENABLED", "").lower() in ("1", "true", "yes")
+# A running job not updated for this long is considered orphaned by a dead process
+STALE_JOB_SECONDS = 15 * 60
+
+# Lower number = picked first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 10
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+# Handler signature: handler(payload, report_progress) -> result dict
+# report_progress(percent, message) updates the job row while it is running.
+JobHandler = Callable[[Dict[str, Any], Callable[[int, str], None]], Dict[str, Any]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    progress INTEGER NOT NULL DEFAULT 0,
+    message TEXT,
+    result TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_pick ON jobs (status, priority, created_at);
+"""
+
+
+class JobQueue:
+    """SQLite-backed job queue. Safe to share between threads and processes."""
+
+    def __init__(self, db_path: str = JOBS_DB_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+        self._has_work = threading.Condition()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def enqueue(
+        self, kind: str, payload: Dict[str, Any], priority: int = PRIORITY_INTERACTIVE
+    ) -> str:
+        """Adds a job to the queue and wakes up an idle worker. Returns the job id."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, payload, priority, status, message, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job_id,
+                    kind,
+                    json.dumps(payload, ensure_ascii=False),
+                    priority,
+                    STATUS_QUEUED,
+                    "Ootab järjekorras",
+                    now,
+                    now,
+                ),
+            )
+        with self._has_work:
+            self._has_work.notify()
+        return job_id
+
+    def claim_next(
+        self, kinds: Iterable[str], max_priority: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Atomically marks the next queued job of one of the given kinds as
+        running and returns it. Only kinds this process can execute are claimed,
+        so several apps can share one queue file. With `max_priority`, jobs with
+        a larger priority number (e.g. bulk jobs) are left for other workers.
+        """
+        kinds = list(kinds)
+        if not kinds:
+            return None
+        placeholders = ", ".join("?" for _ in kinds)
+        priority_limit = 2**31 if max_priority is None else max_priority
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                f"SELECT * FROM jobs WHERE status = ? AND kind IN ({placeholders}) "
+                "AND priority <= ? ORDER BY priority, created_at LIMIT 1",
+                (STATUS_QUEUED, *kinds, priority_limit),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, message = ?, updated_at = ? WHERE id = ?",
+                (STATUS_RUNNING, "Töös", time.time(), row["id"]),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        job = self._row_to_dict(row)
+        job["status"] = STATUS_RUNNING
+        return job
+
+    def update_progress(self, job_id: str, progress: int, message: str):
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE jobs SET progress = ?, message = ?, updated_at = ? WHERE id = ?",
+                (max(0, min(100, int(progress))), message, time.time(), job_id),
+            )
+
+    def finish(self, job_id: str, result: Dict[str, Any], failed: bool = False):
+        status = STATUS_FAILED if failed else STATUS_DONE
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, progress = 100, message = ?, result = ?, updated_at = ? WHERE id = ?",
+                (
+                    status,
+                    result.get("message"),
+                    json.dumps(result, ensure_ascii=False, default=str),
+                    time.time(),
+                    job_id,
+                ),
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connection() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def requeue_interrupted(self, stale_after: float = STALE_JOB_SECONDS) -> int:
+        """Puts jobs left 'running' by a crashed/restarted process back in the queue."""
+        now = time.time()
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, message = ?, updated_at = ? "
+                "WHERE status = ? AND updated_at < ?",
+                (
+                    STATUS_QUEUED,
+                    "Taaskäivitatud",
+                    now,
+                    STATUS_RUNNING,
+                    now - stale_after,
+                ),
+            )
+            return cursor.rowcount
+
+    def wait_for_work(self, timeout: float):
+        with self._has_work:
+            self._has_work.wait(timeout)
+
+    def wake_all(self):
+        with self._has_work:
+            self._has_work.notify_all()
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"]) if job["payload"] else {}
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+
+class JobWorkerPool:
+    """
+    Background threads that execute queued jobs with the registered handlers.
+
+    With more than one worker, the first one only takes interactive jobs, so a
+    click is never stuck behind a long bulk run.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: Dict[str, JobHandler],
+        num_workers: int = JOB_WORKERS,
+        poll_interval: float = 2.0,
+    ):
+        self.queue = queue
+        self.handlers = handlers
+        self.num_workers = num_workers
+        self.poll_interval = poll_interval
+        self._threads = []
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._threads:
+            return
+        self.queue.requeue_interrupted()
+        for i in range(self.num_workers):
+            max_priority = (
+                PRIORITY_INTERACTIVE if i == 0 and self.num_workers > 1 else None
+            )
+            thread = threading.Thread(
+                target=self._run,
+                args=(max_priority,),
+                name=f"job-worker-{i}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        self.queue.wake_all()
+
+    def run_one(self, max_priority: Optional[int] = None) -> bool:
+        """Claims and executes a single job. Returns False if the queue was empty."""
+        job = self.queue.claim_next(self.handlers.keys(), max_priority)
+        if job is None:
+            return False
+
+        job_id = job["id"]
+        handler = self.handlers.get(job["kind"])
+        if handler is None:
+            self.queue.finish(
+                job_id,
+                {"success": False, "message": f"Tundmatu töö tüüp: {job['kind']}"},
+                failed=True,
+            )
+            return True
+
+        def report_progress(progress: int, message: str):
+            self.queue.update_progress(job_id, progress, message)
+
+        logging.info(f"Job {job_id} ({job['kind']}) started.")
+        try:
+            result = handler(job["payload"], report_progress) or {}
+            self.queue.finish(job_id, result, failed=not result.get("success", True))
+        except Exception as e:
+            logging.error(f"Job {job_id} failed: {e}")
+            self.queue.finish(
+                job_id,
+                {
+                    "success": False,
+                    "message": f"Kriitiline viga: {type(e).__name__}: {e}",
+                    "debug_info": traceback.format_exc(),
+                },
+                failed=True,
+            )
+        logging.info(f"Job {job_id} finished.")
+        return True
+
+    def _run(self, max_priority: Optional[int]):
+        while not self._stop.is_set():
+            try:
+                if not self.run_one(max_priority):
+                    self.queue.wait_for_work(self.poll_interval)
+            except Exception as e:
+                logging.error(f"Job worker error: {e}")
+                time.sleep(self.poll_interval)
+
+
+# --- Process-wide queue and workers ---
+
+_handlers: Dict[str, JobHandler] = {}
+_queue: Optional[JobQueue] = None
+_pool: Optional[JobWorkerPool] = None
+_lock = threading.Lock()
+
+
+def register_job_handler(kind: str, handler: JobHandler):
+    """Registers the function that executes jobs of the given kind."""
+    _handlers[kind] = handler
+
+
+def get_job_queue() -> JobQueue:
+    global _queue
+    with _lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
+
+
+def ensure_workers_started() -> JobWorkerPool:
+    """Starts the worker threads of this process on first use."""
+    global _pool
+    queue = get_job_queue()
+    with _lock:
+        if _pool is None:
+            _pool = JobWorkerPool(queue, _handlers)
+            _pool.start()
+        return _pool
+
+
+def submit_job(
+    kind: str, payload: Dict[str, Any], priority: int = PRIORITY_INTERACTIVE
+) -> str:
+    """Enqueues a job and makes sure this process has workers running."""
+    job_id = get_job_queue().enqueue(kind, payload, priority)
+    ensure_workers_started()
+    return job_id
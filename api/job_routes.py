@@ -0,0 +1,149 @@
+"""
+Flask routes and helpers for the asynchronous job mode.
+
+`/api/autofill` and `/api/update-staff` enqueue a job instead of doing the work
+in the request when called with `async=1`. The job status page is served by the
+app that queued the job: `/api/jobs/<job_id>` for autofill and
+`/api/update-staff/jobs/<job_id>` for staff updates (HTML, or JSON with
+`?format=json`).
+
+The job mode is only for deployments with a persistent process (see
+ASYNC_JOBS_ENABLED); otherwise `async=1` is ignored and the work runs in the
+request as usual.
+"""
+
+from flask import Blueprint, request, render_template_string, url_for
+
+from .job_queue import (
+    ASYNC_JOBS_ENABLED,
+    get_job_queue,
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    STATUS_QUEUED,
+    STATUS_RUNNING,
+)
+
+jobs_blueprint = Blueprint("jobs", __name__)
+
+# Job kind -> status page endpoint of the app that runs it
+_STATUS_ENDPOINTS = {
+    "autofill": "jobs.job_status",
+    "update_staff": "jobs.staff_job_status",
+}
+
+# --- HTML Template for the job status page (Kept in Estonian as user-facing) ---
+JOB_STATUS_HTML = """
+<!doctype html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>Töö olek</title>
+    {% if in_progress %}<meta http-equiv="refresh" content="2{% if status_url %};url={{ status_url }}{% endif %}">{% endif %}
+    <style>
+        body { font-family: sans-serif; line-height: 1.6; padding: 20px; max-width: 600px; margin: 0 auto; }
+        .card { border: 1px solid #ddd; padding: 20px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
+        .success { color: #2ecc71; }
+        .warning { color: #f39c12; }
+        .error { color: #e74c3c; }
+        h2 { margin-top: 0; }
+        progress { width: 100%; }
+        pre { background: #f8f9fa; padding: 10px; border-radius: 4px; overflow-x: auto; white-space: pre-wrap; }
+    </style>
+</head>
+<body>
+    <div class="card">
+        {% if in_progress %}
+            <h2 class="warning">⏳ {{ 'Järjekorras' if job.status == 'queued' else 'Töös' }}</h2>
+            <progress value="{{ job.progress }}" max="100"></progress>
+        {% elif job.status == 'done' %}
+            <h2 class="success">✅ Valmis!</h2>
+        {% else %}
+            <h2 class="error">❌ Viga!</h2>
+        {% endif %}
+        <p>{{ job.message or '' }}</p>
+        <p><small>Töö ID: {{ job.id }}</small></p>
+        {% if job.result and job.result.debug_info %}
+            <pre>{{ job.result.debug_info }}</pre>
+        {% endif %}
+        {% if notion_url and not in_progress %}
+            <p><a href="{{ notion_url }}">Mine tagasi Notioni lehele</a></p>
+        {% endif %}
+        <hr>
+        <p><small>{{ 'Leht värskendab end automaatselt.' if in_progress else 'Võid selle akna nüüd sulgeda.' }}</small></p>
+    </div>
+</body>
+</html>
+"""
+
+
+def wants_async() -> bool:
+    """
+    True if the request asks for the job mode (`async=1` in the query or JSON
+    body) and the deployment has persistent workers for it.
+    """
+    if not ASYNC_JOBS_ENABLED:
+        return False
+    value = request.args.get("async")
+    if value is None and request.method == "POST":
+        data = request.get_json(silent=True) or {}
+        value = data.get("async")
+    return str(value).lower() in ("1", "true", "yes")
+
+
+def requested_priority() -> int:
+    """Interactive by default; `priority=bulk` lets bulk tools queue behind clicks."""
+    value = request.args.get("priority")
+    if value is None and request.method == "POST":
+        data = request.get_json(silent=True) or {}
+        value = data.get("priority")
+    return PRIORITY_BULK if value == "bulk" else PRIORITY_INTERACTIVE
+
+
+def job_accepted_response(job_id: str):
+    """202 response pointing the caller to the job status page."""
+    job = get_job_queue().get(job_id)
+    endpoint = _STATUS_ENDPOINTS.get(job["kind"], "jobs.job_status")
+    status_url = url_for(endpoint, job_id=job_id)
+    if request.args.get("format") == "json":
+        return {
+            "job_id": job_id,
+            "status": STATUS_QUEUED,
+            "status_url": status_url,
+        }, 202
+    return (
+        render_template_string(
+            JOB_STATUS_HTML, job=job, in_progress=True, status_url=status_url
+        ),
+        202,
+        {"Location": status_url},
+    )
+
+
+@jobs_blueprint.route("/api/jobs/<job_id>", methods=["GET"])
+@jobs_blueprint.route(
+    "/api/update-staff/jobs/<job_id>", methods=["GET"], endpoint="staff_job_status"
+)
+def job_status(job_id):
+    """Reports the status, progress and result of a queued job."""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        if request.args.get("format") == "json":
+            return {"error": "Tööd ei leitud"}, 404
+        return "Viga: Tööd ei leitud", 404
+
+    if request.args.get("format") == "json":
+        return {
+            "job_id": job["id"],
+            "kind": job["kind"],
+            "status": job["status"],
+            "progress": job["progress"],
+            "message": job["message"],
+            "result": job["result"],
+        }
+
+    return render_template_string(
+        JOB_STATUS_HTML,
+        job=job,
+        in_progress=job["status"] in (STATUS_QUEUED, STATUS_RUNNING),
+        notion_url=job["payload"].get("notion_url"),
+    )
@@ -1,15 +1,17 @@
 import json
 import math
 import os
+import tempfile
 import time
 import zipfile
 from datetime import timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable
 
 import ijson
-from requests import HTTPError
+from requests import RequestException
 
 from .clients.ariregister_client import AriregisterClient
+from .resilience import Dependency, ariregister
 
 # --- Configuration ---
 CACHE_DIR = "/tmp/cache"
@@ -54,6 +56,57 @@ def clean_value(val: Any) -> Optional[Any]:
     return val
 
 
+def _ensure_zip_cache(
+    url: str, cache_path: Optional[str] = None, dependency: Optional[Dependency] = None
+):
+    """
+    Downloads the register ZIP file into the cache if it is missing or expired.
+    If downloading fails (or the download is paused by its circuit breaker),
+    the stale cache file is used and an error is logged. The new file is
+    written next to the old one and swapped in only when complete.
+
+    Args:
+        url: The URL of the ZIP file.
+        cache_path: Where the ZIP is cached (default: CACHE_FILE_PATH).
+        dependency: Bulkhead and breaker of the download (default: ariregister).
+    """
+    cache_path = cache_path or CACHE_FILE_PATH
+    if (not os.path.exists(cache_path)) or (
+        time.time() - os.path.getmtime(cache_path)
+    ) > CACHE_EXPIRATION.total_seconds():
+        print(f"VAHEMÄLU PUUDUB: Laen alla uue ZIP faili: {url}")
+        partial_path = None
+        try:
+            headers = {"User-Agent": "Mozilla/5.0"}
+
+            # Prevents loading the whole file into memory
+            ariregister_client = AriregisterClient(dependency or ariregister)
+            with ariregister_client.get_csv(
+                url.strip(), headers=headers, stream=True
+            ) as r:
+                r.raise_for_status()
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                # A unique name: concurrent refreshes never write the same file
+                with tempfile.NamedTemporaryFile(
+                    dir=os.path.dirname(cache_path),
+                    prefix=os.path.basename(cache_path) + ".",
+                    suffix=".part",
+                    delete=False,
+                ) as f:
+                    partial_path = f.name
+                    for chunk in r.iter_content(chunk_size=1024 * 1024):  # 1MB chunks
+                        f.write(chunk)
+            os.replace(partial_path, cache_path)
+            print("ZIP fail laetud alla ja salvestatud vahemällu.")
+        except RequestException as e:
+            print(f"ERROR: Allalaadimine ebaõnnestus, kasutan vananenud faili. {e}")
+        finally:
+            if partial_path and os.path.exists(partial_path):
+                os.remove(partial_path)
+    else:
+        print("Kasutan olemasolevat ZIP vahemälu faili.")
+
+
 def load_json(url: str, target_code: str) -> Optional[Dict[str, Any]]:
     """
     Downloads the Estonian Business Register (Äriregister) data ZIP file,
@@ -86,26 +139,7 @@ def load_json(url: str, target_code: str) -> Optional[Dict[str, Any]]:
                 return json.load(f)
 
     # 2. Check/Download main ZIP file
-    if (not os.path.exists(CACHE_FILE_PATH)) or (
-        time.time() - os.path.getmtime(CACHE_FILE_PATH)
-    ) > CACHE_EXPIRATION.total_seconds():
-        print(f"VAHEMÄLU PUUDUB: Laen alla uue ZIP faili: {url}")
-        try:
-            headers = {"User-Agent": "Mozilla/5.0"}
-
-            # Prevents loading the whole file into memory
-            ariregister_client = AriregisterClient()
-            with ariregister_client.get_csv(url.strip(), headers=headers, stream=True) as r:
-                r.raise_for_status()
-                os.makedirs(os.path.dirname(CACHE_FILE_PATH), exist_ok=True)
-                with open(CACHE_FILE_PATH, "wb") as f:
-                    for chunk in r.iter_content(chunk_size=1024 * 1024):  # 1MB chunks
-                        f.write(chunk)
-            print("ZIP fail laetud alla ja salvestatud vahemällu.")
-        except HTTPError as e:
-            print(f"ERROR: Allalaadimine ebaõnnestus, kasutan vananenud faili. {e}")
-    else:
-        print("Kasutan olemasolevat ZIP vahemälu faili.")
+    _ensure_zip_cache(url)
 
     # 3. Search inside the JSON file using ijson
     with zipfile.ZipFile(CACHE_FILE_PATH) as z:
@@ -152,3 +186,90 @@ def find_company_by_regcode(url: str, regcode: str) -> Optional[Dict[str, Any]]:
         # Clean all values in the dictionary
         return {k: clean_value(v) for k, v in data.items()}
     return None
+
+
+def load_json_batch(url: str, target_codes: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Looks up many registry codes with a single pass over the register JSON.
+
+    Codes with a fresh result cache file are read from the cache; all other
+    codes are resolved in one ijson scan of the ZIP, and the found records are
+    written to the result cache like load_json does.
+
+    Args:
+        url: The URL to the ZIP file containing the JSON data.
+        target_codes: Registry codes to search for.
+
+    Returns:
+        Dictionary mapping registry code -> raw company record (only found codes).
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    found: Dict[str, Dict[str, Any]] = {}
+    remaining = set()
+
+    # 1. Result cache for specific companies
+    for code in {str(c) for c in target_codes}:
+        result_cache_file = get_result_cache_path(code)
+        if (
+            os.path.exists(result_cache_file)
+            and (time.time() - os.path.getmtime(result_cache_file))
+            < CACHE_EXPIRATION.total_seconds()
+        ):
+            with open(result_cache_file, "r", encoding="utf-8") as f:
+                found[code] = json.load(f)
+        else:
+            remaining.add(code)
+
+    print(
+        f"VAHEMÄLU: {len(found)} ettevõtet vahemälust, otsin {len(remaining)} andmestikust."
+    )
+    if not remaining:
+        return found
+
+    # 2. Check/Download main ZIP file
+    _ensure_zip_cache(url)
+
+    # 3. One streaming pass over the JSON for all remaining codes
+    with zipfile.ZipFile(CACHE_FILE_PATH) as z:
+        json_filename = z.namelist()[0]
+        with z.open(json_filename) as f:
+            try:
+                for obj in ijson.items(f, "item"):
+                    code = str(obj.get("ariregistri_kood"))
+                    if code in remaining:
+                        remaining.discard(code)
+                        found[code] = obj
+                        with open(
+                            get_result_cache_path(code), "w", encoding="utf-8"
+                        ) as out:
+                            json.dump(obj, out, ensure_ascii=False, indent=2)
+                        if not remaining:
+                            break
+            except ijson.common.IncompleteJSONError:
+                print(
+                    "Hoiatus: JSON-i parsimine lõppes enneaegselt (võimalik ZIP faili viga)."
+                )
+
+    if remaining:
+        print(f"⚠️ {len(remaining)} registrikoodi ei leitud andmestikust.")
+    return found
+
+
+def find_companies_by_regcodes(
+    url: str, regcodes: Iterable[str]
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Batch version of find_company_by_regcode: resolves all codes in one
+    register pass and cleans the resulting records.
+
+    Args:
+        url: The URL to the Business Register JSON ZIP file.
+        regcodes: The registry codes to search for.
+
+    Returns:
+        Dictionary mapping registry code -> cleaned company record (only found codes).
+    """
+    return {
+        code: {k: clean_value(v) for k, v in data.items()}
+        for code, data in load_json_batch(url, regcodes).items()
+    }
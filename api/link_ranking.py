@@ -0,0 +1,108 @@
+"""
+Deterministic ranking of website links by how likely they lead to the
+company's team or contact page.
+
+Used by find_contact_page_url before asking Gemini: when one link clearly
+wins, the Gemini round trip is skipped.
+"""
+
+from typing import Iterable, List, Optional, Tuple
+from urllib.parse import unquote, urldefrag, urlparse
+
+# (keywords, weight). The first matching group counts, so order matters.
+LINK_KEYWORDS = [
+    (
+        (
+            "meeskond",
+            "tiim",
+            "team",
+            "töötajad",
+            "tootajad",
+            "staff",
+            "inimesed",
+            "people",
+            "juhatus",
+        ),
+        10,
+    ),
+    (("kontakt", "contact", "yhendust", "ühendust"), 7),
+    (("meist", "about", "ettevottest", "ettevõttest", "firmast"), 2),
+]
+# Links that are never the team page
+NEGATIVE_KEYWORDS = (
+    "blog",
+    "uudis",
+    "news",
+    "privaatsus",
+    "privacy",
+    "cookie",
+    "kupsis",
+    "login",
+    "cart",
+    "ostukorv",
+    "karjaar",
+    "career",
+    "jobs",
+)
+SKIPPED_EXTENSIONS = (".pdf", ".jpg", ".jpeg", ".png", ".gif", ".zip", ".doc", ".docx")
+# Anchor text is a weaker signal than the URL path
+TEXT_WEIGHT = 0.6
+
+# A link is chosen without Gemini if it scores at least this much...
+CONFIDENT_SCORE = 7
+# ...and beats the next different link by at least this margin
+CONFIDENT_MARGIN = 3
+
+
+def _keyword_weight(text: str) -> float:
+    for keywords, weight in LINK_KEYWORDS:
+        if any(k in text for k in keywords):
+            return weight
+    return 0
+
+
+def score_link(link_text: str, url: str) -> float:
+    """Scores one link by its URL path and anchor text (higher = more likely)."""
+    path = unquote(urlparse(url).path).lower()
+    if path.endswith(SKIPPED_EXTENSIONS):
+        return 0
+    text = (link_text or "").lower()
+
+    score = _keyword_weight(path) + TEXT_WEIGHT * _keyword_weight(text)
+    if score and any(k in path for k in NEGATIVE_KEYWORDS):
+        score -= 5
+    # Prefer /meeskond over /en/about/team/history
+    depth = len([segment for segment in path.split("/") if segment])
+    if score and depth > 2:
+        score -= depth - 2
+    return max(score, 0)
+
+
+def rank_links(
+    links: Iterable[Tuple[str, str]], base_url: str
+) -> List[Tuple[float, str]]:
+    """
+    Ranks (link text, URL) pairs, best first. URLs are compared without the
+    fragment and trailing slash; the homepage itself and zero-score links are
+    left out.
+    """
+    base = urldefrag(base_url)[0].rstrip("/")
+    best = {}
+    for link_text, url in links:
+        url = urldefrag(url)[0]
+        key = url.rstrip("/")
+        if key == base:
+            continue
+        score = score_link(link_text, url)
+        if score > best.get(key, (0, url))[0]:
+            best[key] = (score, url)
+    return sorted(best.values(), key=lambda t: (-t[0], t[1]))
+
+
+def confident_choice(ranked: List[Tuple[float, str]]) -> Optional[str]:
+    """Returns the top URL if the ranking is unambiguous, otherwise None."""
+    if not ranked or ranked[0][0] < CONFIDENT_SCORE:
+        return None
+    if len(ranked) > 1 and ranked[0][0] - ranked[1][0] < CONFIDENT_MARGIN:
+        return None
+    return ranked[0][1]
@@ -0,0 +1,344 @@
+"""
+On-demand profiling of single /api/autofill and /api/update-staff requests.
+
+Profiling is off unless it is asked for:
+- PROFILE_REQUESTS=1 profiles every synchronous request (for local runs or
+  a short investigation in production),
+- a signed `profile` query parameter (or JSON field) profiles one request.
+  The token is `<expiry unix time>.<HMAC-SHA256 of "<path>|<expiry>">` with
+  the PROFILE_SECRET key, made with profile_token(); without a secret no
+  token is accepted.
+
+The request's work runs under cProfile (saved as .pstats, open with
+`python -m pstats` or snakeviz) or, with PROFILE_MODE=sampling or
+`profiler=sampling`, under a sampling profiler that reads the request
+thread's stack every PROFILE_SAMPLE_INTERVAL_MS (saved as speedscope JSON,
+open at https://www.speedscope.app). Both only see the request thread:
+work done in thread pools shows up as time spent waiting for it. The file
+is written to PROFILE_DIR under the request id, and the hottest functions
+are added to the debug section of the response page.
+"""
+
+import cProfile
+import hashlib
+import hmac
+import json
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from flask import request
+
+PROFILE_REQUESTS = os.getenv("PROFILE_REQUESTS", "").lower() in ("1", "true", "yes")
+PROFILE_SECRET = os.getenv("PROFILE_SECRET")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "/tmp/profiles")
+PROFILE_MODE = os.getenv("PROFILE_MODE", "cprofile")
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+PROFILE_TOP = int(os.getenv("PROFILE_TOP", "15"))
+PROFILE_TOKEN_TTL_SECONDS = 3600
+
+MODES = ("cprofile", "sampling")
+
+# (file, line, function) as in pstats
+FunctionKey = Tuple[str, int, str]
+
+
+# --- Enabling ---
+
+
+def _signature(path: str, expires: int, secret: str) -> str:
+    message = f"{path}|{expires}".encode("utf-8")
+    return hmac.new(secret.encode("utf-8"), message, hashlib.sha256).hexdigest()
+
+
+def profile_token(
+    path: str, ttl: int = PROFILE_TOKEN_TTL_SECONDS, secret: Optional[str] = None
+) -> str:
+    """
+    Makes the value of the `profile` parameter that enables profiling of
+    requests to `path` for `ttl` seconds, e.g.
+    `python -c "from api.profiling import profile_token; print(profile_token('/api/autofill'))"`
+    with PROFILE_SECRET set.
+    """
+    secret = secret or PROFILE_SECRET
+    if not secret:
+        raise ValueError("PROFILE_SECRET puudub")
+    expires = int(time.time()) + ttl
+    return f"{expires}.{_signature(path, expires, secret)}"
+
+
+def valid_profile_token(
+    token: Optional[str], path: str, now: Optional[float] = None
+) -> bool:
+    """Whether `token` is an unexpired token for `path` signed with PROFILE_SECRET."""
+    if not token or not PROFILE_SECRET:
+        return False
+    expires, _, signature = str(token).partition(".")
+    if not expires.isdigit() or not signature:
+        return False
+    if int(expires) < (time.time() if now is None else now):
+        return False
+    expected = _signature(path, int(expires), PROFILE_SECRET)
+    return hmac.compare_digest(signature, expected)
+
+
+def _request_value(name: str) -> Optional[str]:
+    value = request.args.get(name)
+    if value is None and request.method == "POST":
+        data = request.get_json(silent=True) or {}
+        value = data.get(name)
+    return value
+
+
+def wants_profile() -> bool:
+    """True if this request should be profiled (PROFILE_REQUESTS or a valid signed flag)."""
+    if PROFILE_REQUESTS:
+        return True
+    token = _request_value("profile")
+    if token is None:
+        return False
+    if valid_profile_token(token, request.path):
+        return True
+    logging.warning(f"Profileerimise lipp on vale või aegunud: {request.path}")
+    return False
+
+
+def request_id() -> str:
+    """The id of the current request (from the proxy headers, or a new one), safe for file names."""
+    value = (
+        request.headers.get("X-Request-Id")
+        or request.headers.get("X-Vercel-Id")
+        or uuid.uuid4().hex[:12]
+    )
+    return (
+        re.sub(r"[^A-Za-z0-9_-]+", "-", value).strip("-")[:64] or uuid.uuid4().hex[:12]
+    )
+
+
+# --- Sampling profiler ---
+
+
+class SamplingProfiler:
+    """
+    Reads the stack of one thread at a fixed interval from a background
+    thread. Cheaper than cProfile for long requests, and the stacks keep
+    their order, which the speedscope flame chart shows.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        # (stack from the outermost frame, milliseconds the sample stands for)
+        self.samples: List[Tuple[Tuple[FunctionKey, ...], float]] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="request-profiler", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            if frame is None:
+                break
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            self.samples.append((tuple(reversed(stack)), (now - last) * 1000))
+            last = now
+
+    def hot_functions(self) -> List[Tuple[FunctionKey, float, float, int]]:
+        """[(function, self ms, total ms, samples)], most self time first."""
+        self_ms: Counter = Counter()
+        total_ms: Counter = Counter()
+        count: Counter = Counter()
+        for stack, weight in self.samples:
+            if not stack:
+                continue
+            self_ms[stack[-1]] += weight
+            for function in set(stack):
+                total_ms[function] += weight
+                count[function] += 1
+        return sorted(
+            ((f, self_ms[f], total_ms[f], count[f]) for f in total_ms),
+            key=lambda item: (-item[1], -item[2]),
+        )
+
+    def speedscope(self, name: str) -> Dict[str, Any]:
+        """The samples in the speedscope file format (one sampled profile)."""
+        frames: List[Dict[str, Any]] = []
+        index: Dict[FunctionKey, int] = {}
+        samples = []
+        for stack, _ in self.samples:
+            row = []
+            for function in stack:
+                if function not in index:
+                    index[function] = len(frames)
+                    filename, line, func_name = function
+                    frames.append({"name": func_name, "file": filename, "line": line})
+                row.append(index[function])
+            samples.append(row)
+        weights = [round(weight, 3) for _, weight in self.samples]
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": round(sum(weights), 3),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+            "name": name,
+            "exporter": "api.profiling",
+        }
+
+
+# --- Request profiles ---
+
+
+def _function_label(function: FunctionKey) -> str:
+    filename, line, name = function
+    if filename == "~":
+        return name  # built-in functions in pstats
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+
+class RequestProfile:
+    """The profile of one request: where it was saved and its hottest functions."""
+
+    def __init__(self, name: str, mode: str, request_id: str):
+        self.name = name
+        self.mode = mode
+        self.request_id = request_id
+        self.elapsed_ms = 0.0
+        self.path: Optional[str] = None
+        # [(function, self ms, total ms, calls or samples)]
+        self.hot: List[Tuple[FunctionKey, float, float, int]] = []
+
+    def summary(self, top: Optional[int] = None) -> str:
+        """Plain text for the debug section of the response page."""
+        top = PROFILE_TOP if top is None else top
+        count_label = "kutsed" if self.mode == "cprofile" else "proovid"
+        lines = [
+            f"Profiil {self.request_id} ({self.mode}, {self.elapsed_ms:.0f} ms)",
+            f"Fail: {self.path}" if self.path else "Faili ei salvestatud",
+            "",
+            f"{'oma ms':>9} {'kokku ms':>9} {count_label:>8}  funktsioon",
+        ]
+        for function, self_ms, total_ms, count in self.hot[:top]:
+            lines.append(
+                f"{self_ms:>9.1f} {total_ms:>9.1f} {count:>8}  {_function_label(function)}"
+            )
+        return "\n".join(lines)
+
+
+def _save(profile: RequestProfile, write) -> None:
+    extension = ".pstats" if profile.mode == "cprofile" else ".speedscope.json"
+    filename = f"{time.strftime('%Y%m%d-%H%M%S')}_{profile.name}_{profile.request_id}{extension}"
+    path = os.path.join(PROFILE_DIR, filename)
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        write(path)
+        profile.path = path
+        logging.info(f"Profiil salvestatud: {path}")
+    except OSError as e:
+        logging.warning(f"Profiili salvestamine ebaõnnestus ({path}): {e}")
+
+
+@contextmanager
+def profile_request(name: str) -> Iterator[Optional[RequestProfile]]:
+    """
+    Profiles the enclosed work if the current request asks for it.
+
+    Yields None when profiling is not enabled; otherwise a RequestProfile
+    that is filled in (saved file, hottest functions) when the block exits.
+    """
+    if not wants_profile():
+        yield None
+        return
+
+    mode = _request_value("profiler") or PROFILE_MODE
+    if mode not in MODES:
+        mode = "cprofile"
+    profile = RequestProfile(name, mode, request_id())
+
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # Another profiler is already active (e.g. a concurrent profiled request)
+            logging.warning(f"Profileerimine vahele jäetud: {e}")
+            yield None
+            return
+    else:
+        profiler = SamplingProfiler(
+            threading.get_ident(), PROFILE_SAMPLE_INTERVAL_MS / 1000
+        )
+        profiler.start()
+
+    started = time.perf_counter()
+    try:
+        yield profile
+    finally:
+        if mode == "cprofile":
+            profiler.disable()
+        else:
+            profiler.stop()
+        profile.elapsed_ms = (time.perf_counter() - started) * 1000
+
+        if mode == "cprofile":
+            stats = pstats.Stats(profiler)
+            profile.hot = sorted(
+                (
+                    (function, tt * 1000, ct * 1000, nc)
+                    for function, (_, nc, tt, ct, _) in stats.stats.items()
+                ),
+                key=lambda item: (-item[1], -item[2]),
+            )
+            _save(profile, stats.dump_stats)
+        else:
+            profile.hot = profiler.hot_functions()
+            document = profiler.speedscope(f"{name} {profile.request_id}")
+
+            def write(path):
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(document, f)
+
+            _save(profile, write)
+
+
+def add_profile_debug(
+    debug_info: Optional[Union[str, Dict[str, Any]]],
+    profile: Optional[RequestProfile],
+) -> Optional[Union[str, Dict[str, Any]]]:
+    """Appends the profile summary to a response's debug info."""
+    if profile is None:
+        return debug_info
+    if isinstance(debug_info, dict):
+        debug_info = json.dumps(debug_info, indent=2, ensure_ascii=False)
+    summary = profile.summary()
+    return f"{debug_info}\n\n{summary}" if debug_info else summary
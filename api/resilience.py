@@ -0,0 +1,377 @@
+"""
+Bulkheads and circuit breakers around the external dependencies.
+
+Every dependency (Notion, Google CSE, Gemini, the Äriregister download and
+the company websites) gets:
+- a bulkhead: at most `max_in_flight` concurrent calls; a caller waits up
+  to `acquire_timeout` seconds for a free slot, then fails fast,
+- a circuit breaker: after `failure_threshold` consecutive failures the
+  breaker opens and calls fail immediately for `reset_timeout` seconds.
+  Then it is half-open: one probe call is let through; its success closes
+  the breaker, its failure opens it again.
+
+A failure is a network error, a timeout or an answer with 5xx. 4xx
+answers mean the service is up, so they do not count; neither does 429,
+which asks the caller to slow down rather than saying the service is down
+(counting it let a short burst over Notion's rate limit stop all Notion
+calls for the whole reset timeout).
+
+Rejected calls raise DependencyUnavailable. It is a RequestException, so the
+existing error handling (stale caches, skipped steps) applies to it as well.
+The websites have one breaker per host and one shared bulkhead. At most
+`max_keys` per-key breakers are kept: beyond that the least recently used
+closed ones (or, if none is closed, the least recently used) are dropped.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+import requests
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def _env_number(name: str, default: float, cast=int):
+    return cast(os.getenv(name, str(default)))
+
+
+class DependencyUnavailable(requests.exceptions.RequestException):
+    """Raised instead of calling a dependency whose breaker is open or bulkhead full."""
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    if status is None:
+        # google.api_core errors carry the HTTP status as .code
+        status = getattr(error, "code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_failure_status(status: Optional[int]) -> bool:
+    """True for answers that say the service itself is in trouble."""
+    return status is not None and (status >= 500 or status == 408)
+
+
+def is_failure(error: BaseException) -> bool:
+    """Whether an exception should count against the breaker."""
+    if isinstance(error, DependencyUnavailable):
+        return False
+    status = _status_code(error)
+    if status is not None and 400 <= status < 500:
+        return is_failure_status(status)
+    return True
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with half-open probing."""
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_probes: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self.times_opened = 0
+
+    def _current_state(self) -> str:
+        # Caller holds the lock
+        if self._state == OPEN and (
+            self._clock() - self._opened_at >= self.reset_timeout
+        ):
+            self._state = HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go ahead. In the half-open state this reserves one
+        of the probe slots, so the caller must report the outcome.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                return True
+            return False
+
+    def release(self) -> None:
+        """Gives back a probe slot of a call that did not run."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes:
+                self._probes -= 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probes = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            state = self._current_state()
+            self._failures += 1
+            if state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if state != OPEN:
+                    self.times_opened += 1
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self._probes = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self._current_state()
+            snapshot = {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "times_opened": self.times_opened,
+            }
+            if state == OPEN:
+                snapshot["retry_in_seconds"] = round(
+                    max(0.0, self.reset_timeout - (self._clock() - self._opened_at)),
+                    1,
+                )
+            return snapshot
+
+
+class Bulkhead:
+    """Limits the number of concurrent calls to one dependency."""
+
+    def __init__(self, max_in_flight: int, acquire_timeout: float = 30.0):
+        self.max_in_flight = max_in_flight
+        self.acquire_timeout = acquire_timeout
+        self._semaphore = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+
+    def acquire(self) -> bool:
+        if not self._semaphore.acquire(timeout=self.acquire_timeout):
+            with self._lock:
+                self.rejected += 1
+            return False
+        with self._lock:
+            self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+        self._semaphore.release()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "rejected": self.rejected,
+            }
+
+
+class Dependency:
+    """
+    One external dependency: a bulkhead and a circuit breaker (one breaker
+    per key when calls are made with a key, e.g. per website host).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_in_flight: int,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        acquire_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+        max_keys: int = 1024,
+    ):
+        self.name = name
+        self.bulkhead = Bulkhead(max_in_flight, acquire_timeout)
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.max_keys = max_keys
+        # Least recently used first
+        self._breakers: "OrderedDict[Optional[str], CircuitBreaker]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def breaker(self, key: Optional[str] = None) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    self.failure_threshold, self.reset_timeout, clock=self._clock
+                )
+                self._breakers[key] = breaker
+                self._evict_keys()
+            else:
+                self._breakers.move_to_end(key)
+            return breaker
+
+    def _evict_keys(self) -> None:
+        """Drops per-key breakers beyond max_keys (caller holds the lock)."""
+        keyed = [key for key in self._breakers if key is not None]
+        excess = len(keyed) - self.max_keys
+        if excess <= 0:
+            return
+        closed = [key for key in keyed if self._breakers[key].state == CLOSED]
+        closed_keys = set(closed)
+        others = [key for key in keyed if key not in closed_keys]
+        for key in (closed + others)[:excess]:
+            del self._breakers[key]
+
+    def available(self, key: Optional[str] = None) -> bool:
+        """False while the breaker is open (does not reserve a probe slot)."""
+        return self.breaker(key).state != OPEN
+
+    def call(
+        self, fn: Callable[..., Any], *args, breaker_key: Optional[str] = None, **kwargs
+    ) -> Any:
+        """
+        Runs fn(*args, **kwargs) through the bulkhead and the breaker.
+
+        A returned response with a 5xx status is passed to the caller
+        unchanged but counts as a failure.
+
+        Raises:
+            DependencyUnavailable: The breaker is open or no slot freed up in time.
+        """
+        breaker = self.breaker(breaker_key)
+        target = f"{self.name} ({breaker_key})" if breaker_key else self.name
+        if not breaker.allow():
+            raise DependencyUnavailable(
+                f"{target} ei ole saadaval (kaitselüliti avatud)"
+            )
+        if not self.bulkhead.acquire():
+            breaker.release()
+            raise DependencyUnavailable(
+                f"{target} on ülekoormatud (liiga palju päringuid)"
+            )
+
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if is_failure(e):
+                self._record_failure(breaker, target)
+            else:
+                self._record_success(breaker, breaker_key)
+            raise
+        finally:
+            self.bulkhead.release()
+
+        if is_failure_status(getattr(result, "status_code", None)):
+            self._record_failure(breaker, target)
+        else:
+            self._record_success(breaker, breaker_key)
+        return result
+
+    def _record_success(self, breaker: CircuitBreaker, key: Optional[str]) -> None:
+        breaker.record_success()
+        if key is not None:
+            # A closed breaker without failures is the same as a new one
+            with self._lock:
+                if self._breakers.get(key) is breaker:
+                    del self._breakers[key]
+
+    def _record_failure(self, breaker: CircuitBreaker, target: str) -> None:
+        was_open = breaker.state == OPEN
+        breaker.record_failure()
+        if not was_open and breaker.state == OPEN:
+            logging.warning(
+                f"{target}: kaitselüliti avati, päringud peatatud {self.reset_timeout:.0f} s"
+            )
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            keyed = {k: b for k, b in self._breakers.items() if k is not None}
+        snapshot = self.bulkhead.snapshot()
+        if not keyed:
+            snapshot.update(self.breaker().snapshot())
+            return snapshot
+        # Per-host breakers: only the ones that are not closed are listed
+        states = {key: breaker.snapshot() for key, breaker in keyed.items()}
+        snapshot["tracked_keys"] = len(states)
+        snapshot["open_breakers"] = {
+            key: state for key, state in states.items() if state["state"] != CLOSED
+        }
+        return snapshot
+
+
+def _dependency(name: str, prefix: str, max_in_flight: int, **defaults) -> Dependency:
+    return Dependency(
+        name,
+        max_in_flight=_env_number(f"{prefix}_MAX_IN_FLIGHT", max_in_flight),
+        failure_threshold=_env_number(
+            f"{prefix}_BREAKER_FAILURES", defaults.get("failure_threshold", 5)
+        ),
+        reset_timeout=_env_number(
+            f"{prefix}_BREAKER_RESET_SECONDS",
+            defaults.get("reset_timeout", 30.0),
+            float,
+        ),
+        acquire_timeout=_env_number(
+            f"{prefix}_ACQUIRE_TIMEOUT_SECONDS",
+            defaults.get("acquire_timeout", 30.0),
+            float,
+        ),
+        max_keys=_env_number(f"{prefix}_MAX_BREAKER_KEYS", 1024),
+    )
+
+
+# Notion allows about 3 requests per second per integration
+notion = _dependency("notion", "NOTION", 4)
+google_cse = _dependency("google_cse", "GOOGLE_CSE", 2, failure_threshold=3)
+gemini = _dependency("gemini", "GEMINI", 4, reset_timeout=60.0)
+# The register dump is one large download: waiters get the fresh file or the stale one
+ariregister = _dependency(
+    "ariregister",
+    "ARIREGISTER",
+    1,
+    failure_threshold=2,
+    reset_timeout=300.0,
+    acquire_timeout=120.0,
+)
+# The EMTA tax files: their failures must not pause the register download
+emta = _dependency(
+    "emta",
+    "EMTA",
+    1,
+    failure_threshold=2,
+    reset_timeout=300.0,
+    acquire_timeout=120.0,
+)
+websites = _dependency(
+    "websites", "WEBSITES", 16, failure_threshold=3, reset_timeout=120.0
+)
+
+DEPENDENCIES = {
+    dependency.name: dependency
+    for dependency in (notion, google_cse, gemini, ariregister, emta, websites)
+}
+
+
+def health_report() -> Dict[str, Dict[str, Any]]:
+    """Bulkhead and breaker state of every dependency, for the health endpoints."""
+    return {name: dependency.snapshot() for name, dependency in DEPENDENCIES.items()}
@@ -0,0 +1,85 @@
+"""
+In-flight request coalescing ("single flight") with a short result memo.
+
+Concurrent calls with the same key run the work once: the first caller
+executes it, the others wait for and share its result. Successful results
+can be remembered for a few seconds so that repeated clicks return instantly.
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Tuple
+
+
+def _always(result: Any) -> bool:
+    return True
+
+
+class SingleFlight:
+    """Coalesces concurrent calls per key and memoizes results for `memo_seconds`."""
+
+    def __init__(self, memo_seconds: float = 0.0):
+        self.memo_seconds = memo_seconds
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self._memo: Dict[str, Tuple[float, Any]] = {}
+
+    def do(
+        self,
+        key: str,
+        fn: Callable[[], Any],
+        memoize_if: Callable[[Any], bool] = _always,
+    ) -> Any:
+        """
+        Runs fn() unless a call with the same key is already running or was
+        memoized recently; in both cases the existing result is returned.
+
+        Args:
+            key: Coalescing key (e.g. normalized page id)
+            fn: The work to run
+            memoize_if: Decides whether a result may be reused within the memo window
+
+        Returns:
+            The (possibly shared) result of fn(). Exceptions are shared as well.
+        """
+        with self._lock:
+            memo = self._memo.get(key)
+            if memo and memo[0] > time.monotonic():
+                return memo[1]
+
+            future = self._in_flight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if self.memo_seconds > 0 and memoize_if(result):
+                now = time.monotonic()
+                self._memo[key] = (now + self.memo_seconds, result)
+                # Drop expired entries so the memo does not grow without bound
+                for stale_key in [
+                    k for k, (exp, _) in self._memo.items() if exp <= now
+                ]:
+                    del self._memo[stale_key]
+
+        future.set_result(result)
+        return result
+
+    def forget(self, key: str):
+        """Removes a memoized result (e.g. after the page was edited)."""
+        with self._lock:
+            self._memo.pop(key, None)
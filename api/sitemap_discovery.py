@@ -0,0 +1,191 @@
+"""
+Contact page discovery from the website's sitemaps.
+
+Sitemaps are found from robots.txt ("Sitemap:" lines) or the usual
+/sitemap.xml locations, parsed as a stream (nested sitemap indexes and
+.xml.gz files included) and the listed page URLs are ranked with the same
+keyword ranking as homepage links. The URL list is cached per site, so the
+next staff update does not download the sitemaps again.
+
+Every fetch goes through the `websites` bulkhead and the site's breaker, and
+the whole discovery (robots.txt and all sitemaps) shares one deadline of
+SITEMAP_DEADLINE_SECONDS: a slow site costs a few seconds, not six per file.
+"""
+
+import gzip
+import logging
+import os
+import time
+import xml.etree.ElementTree as ET
+from datetime import timedelta
+from typing import Iterator, List, Optional, Set
+from urllib.parse import urljoin, urlparse
+
+import requests
+
+from .cache_store import PersistentCache, CACHE_MISS
+from .clients.company_website_client import _breaker_host
+from .link_ranking import rank_links, confident_choice
+from .resilience import websites
+
+SITEMAP_TIMEOUT = 6
+# Time budget of one discovery (robots.txt and every sitemap together)
+SITEMAP_DEADLINE_SECONDS = float(os.getenv("SITEMAP_DEADLINE_SECONDS", "4"))
+SITEMAP_HEADERS = {"User-Agent": "Mozilla/5.0"}
+DEFAULT_SITEMAP_PATHS = ("/sitemap.xml", "/sitemap_index.xml")
+# Limits for large or deeply nested sitemaps
+MAX_SITEMAP_DEPTH = 2
+MAX_SITEMAPS = 10
+MAX_SITEMAP_URLS = 5000
+MAX_SITEMAP_BYTES = 10 * 1024 * 1024
+
+SITEMAP_CACHE_TTL = timedelta(days=3)
+sitemap_cache = PersistentCache("sitemaps", SITEMAP_CACHE_TTL)
+
+
+class _CappedStream:
+    """File-like wrapper that stops reading after `limit` bytes."""
+
+    def __init__(self, raw, limit: int):
+        self.raw = raw
+        self.remaining = limit
+
+    def read(self, size: int = -1) -> bytes:
+        if self.remaining <= 0:
+            return b""
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.raw.read(size)
+        self.remaining -= len(data)
+        return data
+
+
+def _site_root(base_url: str) -> str:
+    parsed = urlparse(base_url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def _same_site(url: str, base_url: str) -> bool:
+    def host(u):
+        h = (urlparse(u).hostname or "").lower()
+        return h[4:] if h.startswith("www.") else h
+
+    return host(url) == host(base_url)
+
+
+def _get(url: str, deadline: float, **kwargs) -> requests.Response:
+    """GET through the websites breaker, with at most the time left until deadline."""
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise requests.Timeout(f"Sitemapi otsingu aeg sai otsa ({url})")
+    return websites.call(
+        requests.get,
+        url,
+        headers=SITEMAP_HEADERS,
+        timeout=min(SITEMAP_TIMEOUT, remaining),
+        breaker_key=_breaker_host(url),
+        **kwargs,
+    )
+
+
+def sitemap_locations(base_url: str, deadline: Optional[float] = None) -> List[str]:
+    """Sitemap URLs listed in robots.txt, or the default locations."""
+    if deadline is None:
+        deadline = time.monotonic() + SITEMAP_DEADLINE_SECONDS
+    root = _site_root(base_url)
+    try:
+        response = _get(f"{root}/robots.txt", deadline)
+        if response.ok:
+            listed = [
+                line.split(":", 1)[1].strip()
+                for line in response.text.splitlines()
+                if line.lower().startswith("sitemap:")
+            ]
+            if listed:
+                return [urljoin(root, url) for url in listed]
+    except requests.RequestException as e:
+        logging.info(f"robots.txt lugemine ebaõnnestus ({root}): {e}")
+    return [root + path for path in DEFAULT_SITEMAP_PATHS]
+
+
+def _iter_locs(sitemap_url: str, deadline: float) -> Iterator[tuple]:
+    """
+    Streams one sitemap document, stopping at the deadline.
+
+    Yields:
+        ("sitemap", url) for entries of a sitemap index, ("page", url) otherwise.
+    """
+    with _get(sitemap_url, deadline, stream=True) as response:
+        if not response.ok:
+            return
+        response.raw.decode_content = True
+        stream = _CappedStream(response.raw, MAX_SITEMAP_BYTES)
+        if sitemap_url.endswith(".gz"):
+            stream = gzip.GzipFile(fileobj=stream)
+
+        kind = "page"
+        for event, elem in ET.iterparse(stream, events=("start", "end")):
+            tag = elem.tag.rsplit("}", 1)[-1]
+            if event == "start":
+                if tag == "sitemapindex":
+                    kind = "sitemap"
+                continue
+            if tag == "loc" and elem.text:
+                if time.monotonic() > deadline:
+                    logging.info(f"Sitemapi lugemine katkestati ({sitemap_url})")
+                    return
+                yield kind, elem.text.strip()
+            elif tag in ("url", "sitemap"):
+                # Keep memory flat on large sitemaps
+                elem.clear()
+
+
+def collect_sitemap_urls(base_url: str) -> List[str]:
+    """
+    All same-site page URLs from the site's sitemaps (bounded, see MAX_* and
+    SITEMAP_DEADLINE_SECONDS).
+    """
+    deadline = time.monotonic() + SITEMAP_DEADLINE_SECONDS
+    pending = [(url, 0) for url in sitemap_locations(base_url, deadline)]
+    seen_sitemaps: Set[str] = set()
+    pages: List[str] = []
+
+    while pending and len(seen_sitemaps) < MAX_SITEMAPS and time.monotonic() < deadline:
+        sitemap_url, depth = pending.pop(0)
+        if sitemap_url in seen_sitemaps:
+            continue
+        seen_sitemaps.add(sitemap_url)
+        try:
+            for kind, url in _iter_locs(sitemap_url, deadline):
+                if kind == "sitemap":
+                    if depth < MAX_SITEMAP_DEPTH:
+                        pending.append((url, depth + 1))
+                elif _same_site(url, base_url):
+                    pages.append(url)
+                    if len(pages) >= MAX_SITEMAP_URLS:
+                        return pages
+        except (requests.RequestException, ET.ParseError, OSError) as e:
+            logging.info(f"Sitemapi lugemine ebaõnnestus ({sitemap_url}): {e}")
+    return pages
+
+
+def sitemap_page_urls(base_url: str) -> List[str]:
+    """collect_sitemap_urls with a per-site cache."""
+    root = _site_root(base_url)
+    urls = sitemap_cache.get(root)
+    if urls is CACHE_MISS:
+        urls = collect_sitemap_urls(base_url)
+        sitemap_cache.set(root, urls)
+    return urls
+
+
+def find_contact_page_from_sitemap(base_url: str) -> Optional[str]:
+    """
+    Returns the team/contact page URL if the sitemap ranking has a clear
+    winner, otherwise None (the caller falls back to the homepage links).
+    """
+    urls = sitemap_page_urls(base_url)
+    if not urls:
+        return None
+    ranked = rank_links((("", url) for url in urls), base_url)
+    return confident_choice(ranked)
@@ -0,0 +1,131 @@
+"""
+Opt-in multi-page crawl for the staff search.
+
+Besides the chosen contact page, the next best ranked pages of the same site
+(e.g. "Meist" with the management and "Kontakt" with the general contact) are
+downloaded in parallel. Text blocks repeated across pages (menus, footers) are
+kept only once and the pages are merged into one document that fits the
+extraction prompt's token budget.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+
+from .text_compaction import CHARS_PER_TOKEN, STAFF_PROMPT_TOKEN_BUDGET
+
+# Pages crawled when the request just says crawl=1
+STAFF_CRAWL_PAGES = int(os.getenv("STAFF_CRAWL_PAGES", "3"))
+CRAWL_MAX_PAGES = 6
+CRAWL_MAX_WORKERS = 4
+# Downloads still running after this are left out of the document
+CRAWL_TIMEOUT_SECONDS = 20
+# Pages are not downloaded anymore once this much text has been collected
+CRAWL_MAX_BYTES = 2 * 1024 * 1024
+# Size of the merged document in tokens: twice the prompt budget, so that the
+# compaction before the prompt (text_compaction) still has lines to choose from
+CRAWL_TOKEN_BUDGET = 2 * STAFF_PROMPT_TOKEN_BUDGET
+
+
+def _block_key(block: str) -> str:
+    normalized = " ".join(block.lower().split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def merge_pages(
+    pages: List[Dict[str, str]], token_budget: int = CRAWL_TOKEN_BUDGET
+) -> str:
+    """
+    Merges cleaned page texts into one document.
+
+    Lines already seen on an earlier page are dropped. Every page gets an
+    equal share of the budget; what a short page does not use is passed on
+    to the following pages.
+
+    Args:
+        pages: [{"url", "text"}] in ranking order (best first).
+        token_budget: Size limit of the merged document in tokens.
+    """
+    remaining = token_budget * CHARS_PER_TOKEN
+    seen = set()
+    parts = []
+    for index, page in enumerate(pages):
+        share = remaining // (len(pages) - index)
+        header = f"=== Leht: {page['url']} ==="
+        used = len(header) + 1
+        lines = [header]
+        for block in page["text"].splitlines():
+            block = block.strip()
+            if not block:
+                continue
+            key = _block_key(block)
+            if key in seen:
+                continue
+            if used + len(block) + 1 > share:
+                break
+            seen.add(key)
+            lines.append(block)
+            used += len(block) + 1
+        if len(lines) > 1:
+            parts.append("\n".join(lines))
+            remaining -= used + 2
+    return "\n\n".join(parts)
+
+
+def crawl_staff_pages(
+    first_url: str,
+    first_text: str,
+    extra_urls: List[str],
+    fetch_text: Callable[[str], Optional[str]],
+    max_workers: int = CRAWL_MAX_WORKERS,
+    max_bytes: int = CRAWL_MAX_BYTES,
+    token_budget: int = CRAWL_TOKEN_BUDGET,
+) -> str:
+    """
+    Downloads `extra_urls` in parallel and merges them after the already
+    downloaded first page.
+
+    Args:
+        first_url, first_text: The chosen contact page and its cleaned text.
+        extra_urls: Further pages, best first.
+        fetch_text: Returns the cleaned text of a page (None on errors).
+
+    Returns:
+        The merged, deduplicated and budgeted document.
+    """
+    collected = {"bytes": len(first_text.encode("utf-8"))}
+    lock = threading.Lock()
+
+    def fetch(url: str) -> Optional[str]:
+        with lock:
+            if collected["bytes"] >= max_bytes:
+                return None
+        text = fetch_text(url)
+        if text:
+            with lock:
+                collected["bytes"] += len(text.encode("utf-8"))
+        return text
+
+    texts: Dict[str, Optional[str]] = {}
+    if extra_urls:
+        executor = ThreadPoolExecutor(max_workers=min(max_workers, len(extra_urls)))
+        try:
+            futures = {executor.submit(fetch, url): url for url in extra_urls}
+            done, not_done = wait(futures, timeout=CRAWL_TIMEOUT_SECONDS)
+            for future in done:
+                try:
+                    texts[futures[future]] = future.result()
+                except Exception as e:
+                    logging.info(f"Lehe allalaadimine ebaõnnestus: {e}")
+            if not_done:
+                logging.info(f"{len(not_done)} lehte jäi aja lõppemise tõttu välja.")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    pages = [{"url": first_url, "text": first_text}] + [
+        {"url": url, "text": texts[url]} for url in extra_urls if texts.get(url)
+    ]
+    return merge_pages(pages, token_budget)
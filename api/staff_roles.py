@@ -0,0 +1,104 @@
+"""
+The contact roles the staff search looks for.
+
+One dictionary shared by the Gemini extraction prompt, the structured-data
+extractor and the prompt text compaction, so all of them agree on which
+roles count.
+"""
+
+import re
+from typing import Optional
+
+GENERAL_CONTACT = "General Contact"
+
+# (group title, role titles); every inner tuple lists equivalent titles
+ROLE_GROUPS = (
+    (
+        "STRATEGIC LEADERSHIP",
+        (
+            ("CEO", "Tegevjuht"),
+            ("COO", "Chief Operating Officer"),
+            ("CIO", "Chief Information Officer"),
+            ("CTO", "Chief Technology Officer"),
+            ("Managing Director",),
+            ("Founder",),
+        ),
+    ),
+    (
+        "DEVELOPMENT / TECHNOLOGY",
+        (
+            ("Arendusjuht", "Head of Development"),
+            ("IT-juht", "IT Manager", "Head of IT"),
+            ("Innovatsioonijuht", "Head of Innovation"),
+        ),
+    ),
+    ("PROJECT MANAGEMENT", (("Projektijuht", "Project Manager"),)),
+    (
+        "PERSONNEL / MARKETING",
+        (
+            ("HR Manager", "Personalijuht"),
+            ("Head of Marketing", "Turundusjuht"),
+            ("Head of Sales", "Müügijuht"),
+        ),
+    ),
+    ("GENERAL CONTACT", ((GENERAL_CONTACT,),)),
+)
+
+# Estonian and English variants of the listed roles used on websites
+ROLE_SYNONYMS = (
+    "Chief Executive Officer",
+    "Co-Founder",
+    "Asutaja",
+    "Kaasasutaja",
+    "Tehnoloogiajuht",
+    "Sales Manager",
+    "Marketing Manager",
+)
+
+# Not searched for, but a sign of a contact person nearby
+RELATED_KEYWORDS = (
+    "juhatuse liige",
+    "juhatuse esimees",
+    "board member",
+)
+
+ROLE_TITLES = (
+    tuple(title for _, roles in ROLE_GROUPS for titles in roles for title in titles)
+    + ROLE_SYNONYMS
+)
+
+# Lowercase keywords for the prompt text compaction
+ROLE_KEYWORDS = tuple(
+    dict.fromkeys(title.lower() for title in ROLE_TITLES + RELATED_KEYWORDS)
+)
+
+_ROLE_RE = re.compile(
+    r"\b(?:"
+    + "|".join(
+        re.escape(title.lower()) for title in ROLE_TITLES if title != GENERAL_CONTACT
+    )
+    + r")\b",
+    re.IGNORECASE,
+)
+
+
+def match_role(title: Optional[str]) -> Optional[str]:
+    """
+    Returns the job title (stripped) if it contains one of the searched
+    roles, otherwise None.
+    """
+    if not title:
+        return None
+    title = " ".join(str(title).split())
+    return title if _ROLE_RE.search(title) else None
+
+
+def role_prompt_section() -> str:
+    """The numbered role list of the extraction prompt."""
+    blocks = []
+    for number, (group, roles) in enumerate(ROLE_GROUPS, start=1):
+        lines = [f"{number}. {group}:"]
+        for titles in roles:
+            lines.append("   - " + ", ".join(f"'{title}'" for title in titles))
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks)
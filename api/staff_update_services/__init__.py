@@ -3,25 +3,41 @@ Staff update functionality module.
 """
 
 from .staff_config import validate_config
-from .request_validator import extract_request_params, normalize_website_url
+from .request_validator import (
+    extract_request_params,
+    normalize_website_url,
+    wants_force_refresh,
+    requested_crawl_pages,
+    requested_source,
+    requested_regcode,
+)
 from .staff_fetcher import fetch_staff_data
 from .notion_staff_service import get_database_properties, sync_staff_data
 from .response_renderer import (
     render_error_response,
     render_warning_response,
     render_success_response,
+    render_staff_update_result,
     prepare_result_message,
 )
+from .staff_updater import run_staff_update, run_board_update
 
 __all__ = [
     "validate_config",
     "extract_request_params",
     "normalize_website_url",
+    "wants_force_refresh",
+    "requested_crawl_pages",
+    "requested_source",
+    "requested_regcode",
     "fetch_staff_data",
     "get_database_properties",
     "sync_staff_data",
     "render_error_response",
     "render_warning_response",
     "render_success_response",
+    "render_staff_update_result",
     "prepare_result_message",
+    "run_staff_update",
+    "run_board_update",
 ]
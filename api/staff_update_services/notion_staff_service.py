@@ -2,15 +2,22 @@
 Notion API operations for staff/contact person management.
 """
 
+import os
 import requests
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, Any, List, Tuple, Optional
 from datetime import datetime
 from ..clients.notion_client import NotionClient
+from ..staff_roles import GENERAL_CONTACT
 import logging
 
 logging.basicConfig(level=logging.INFO)
 
+# Concurrent Notion writes of one company's staff sync (the Notion bulkhead
+# caps all Notion calls of the process as well)
+STAFF_SYNC_MAX_WORKERS = int(os.getenv("STAFF_SYNC_MAX_WORKERS", "3"))
+
 
 def get_database_properties(notion: NotionClient) -> Optional[Dict[str, Any]]:
     """
@@ -24,41 +31,6 @@ def get_database_properties(notion: NotionClient) -> Optional[Dict[str, Any]]:
         return None
 
 
-def find_staff_page_by_name_and_role(
-    notion: NotionClient, name: str, role: str, company_page_id: Optional[str]
-) -> Optional[Dict[str, Any]]:
-    """
-    Finds a single existing staff page by person's name (title) and role.
-    """
-    try:
-        filters = []
-
-        if name:
-            filters.append({"property": "Name", "title": {"equals": name}})
-
-        if role:
-            filters.append({"property": "Amet", "rich_text": {"contains": role}})
-
-        if company_page_id:
-            filters.append(
-                {"property": "Organisatsioon", "relation": {"contains": company_page_id}}
-            )
-
-        if len(filters) < 2:
-            return None
-
-        existing_pages = notion.query_database({"and": filters})
-
-        for page in existing_pages:
-            if not page.get("archived", False):
-                return page
-
-        return None
-    except Exception as e:
-        logging.error(f"Error querying Notion database for existing staff: {e}")
-        return None
-
-
 def map_staff_to_properties(
     staff_member: Dict[str, Any], page_id: Optional[str]
 ) -> Dict[str, Any]:
@@ -108,25 +80,123 @@ def build_notion_properties(
     return notion_properties
 
 
-def sync_staff_data(
-    notion: NotionClient,
+def load_company_contacts(
+    notion: NotionClient, company_page_id: Optional[str], names: List[str]
+) -> List[Dict[str, Any]]:
+    """
+    Loads the Contacts pages a sync can match with one paginated query: the
+    pages related to the company or, without a company, the pages with one
+    of the given names. Archived pages are left out.
+    """
+    if company_page_id:
+        filters = [
+            {"property": "Organisatsioon", "relation": {"contains": company_page_id}}
+        ]
+    else:
+        names = sorted({name for name in names if name})
+        # Notion allows 100 conditions in one compound filter
+        filters = [
+            {
+                "or": [
+                    {"property": "Name", "title": {"equals": name}}
+                    for name in names[i : i + 100]
+                ]
+            }
+            for i in range(0, len(names), 100)
+        ]
+
+    pages = []
+    for filter_dict in filters:
+        pages.extend(notion.query_database_all(filter_dict))
+    return [page for page in pages if not page.get("archived", False)]
+
+
+def _is_former(role: Optional[str]) -> bool:
+    upper = (role or "").upper()
+    return "AEGUNUD" in upper or "ENDINE" in upper
+
+
+def _role_matches(existing_role: Optional[str], role: str) -> bool:
+    # Same as Notion's case-insensitive rich_text "contains"
+    return role.lower() in (existing_role or "").lower()
+
+
+def _same_person(flat: Dict[str, Any], staff_member: Dict[str, Any]) -> bool:
+    """Same name or, for a nameless contact with an e-mail, the same e-mail."""
+    if staff_member.get("name"):
+        return flat.get("Name") == staff_member["name"]
+    email = staff_member.get("email")
+    return not email or flat.get("E-mail") == email
+
+
+def _is_duplicate(other: Dict[str, Any], matched: Dict[str, Any]) -> bool:
+    """
+    True if a page is a stale copy of the matched one: same non-empty name,
+    role text, e-mail and phone. Nameless pages (General Contact) are never
+    duplicates, since a company can have several of them.
+    """
+    if not matched.get("Name") or _role_matches(matched.get("Amet"), GENERAL_CONTACT):
+        return False
+    return all(
+        (other.get(key) or "").strip().lower()
+        == (matched.get(key) or "").strip().lower()
+        for key in ("Name", "Amet", "E-mail", "Tel. nr")
+    )
+
+
+def plan_staff_sync(
     staff_data: List[Dict[str, Any]],
+    contacts: List[Dict[str, Any]],
     page_id: Optional[str],
     database_id: str,
     page_properties: Optional[Dict[str, Any]],
-) -> Tuple[int, int, int, int, List[str]]:
+    retire_missing: bool = False,
+) -> Dict[str, Any]:
     """
-    Synchronizes staff members with the following logic:
-    1. Same name and role → update
-    2. Same role, different name → expire old, create new
+    Decides what to write for the staff list, given the company's existing
+    Contacts pages (see load_company_contacts):
+    1. Same name and role → update (skip if e-mail and phone are unchanged,
+       a former holder's page gets the role back)
+    2. Same role, different name → mark old as (endine), create new
     3. New role → create
+
+    All name and role matches are claimed before the role-only matches, so
+    several people with the same role (e.g. board members) do not retire
+    each other, and one existing page is matched by one person at most.
+    Further pages with the same name, role text, e-mail and phone as a
+    matched page are stale duplicates and are archived (never nameless
+    General Contact pages). With retire_missing (the staff list
+    is complete, as in the register), unmatched pages with one of the
+    listed roles are marked (endine).
+
+    Returns:
+        Dictionary with tasks (each a list of steps for one person or page,
+        and the counter it adds to when done), skipped, failed and errors.
     """
-    created_count = 0
-    updated_count = 0
+    contacts = [
+        (page, extract_notion_properties_for_comparison(page)) for page in contacts
+    ]
+    claimed = set()
+    tasks = []
+    errors = []
     failed_count = 0
     skipped_count = 0
-    errors = []
 
+    def properties_for(staff_member: Dict[str, Any]) -> Dict[str, Any]:
+        return build_notion_properties(
+            map_staff_to_properties(staff_member, page_id), page_properties
+        )
+
+    def create_step(staff_member: Dict[str, Any]):
+        payload = {
+            "parent": {"database_id": database_id},
+            "properties": properties_for(staff_member),
+        }
+        return ("create", None, payload)
+
+    # Pass 1: validation and name + role matches
+    unmatched = []
+    seen = set()
     for staff_member in staff_data:
         person_name = staff_member.get("name")
         person_role = staff_member.get("role")
@@ -136,111 +206,201 @@ def sync_staff_data(
             errors.append(f"Puudulikud andmed: {staff_member}")
             continue
 
-        try:
-            existing_page = find_staff_page_by_name_and_role(
-                notion, person_name, person_role, page_id
+        # Nameless General Contacts are told apart by their e-mail or phone
+        identity = (
+            person_name or staff_member.get("email") or staff_member.get("phone") or ""
+        )
+        key = (identity, person_role.lower())
+        if key in seen:
+            skipped_count += 1
+            continue
+        seen.add(key)
+
+        match = None
+        if person_name or page_id:
+            # A current page before a former one (someone who is back in the role)
+            match = min(
+                (
+                    (page, flat)
+                    for page, flat in contacts
+                    if page["id"] not in claimed
+                    and _same_person(flat, staff_member)
+                    and _role_matches(flat.get("Amet"), person_role)
+                ),
+                key=lambda item: _is_former(item[1].get("Amet")),
+                default=None,
             )
+        if not match:
+            unmatched.append(staff_member)
+            continue
 
-            current_staff_member_data = staff_member.copy()
-
-            if existing_page:
-                existing_flat_data = extract_notion_properties_for_comparison(
-                    existing_page
+        page, flat = match
+        claimed.add(page["id"])
+        for other, other_flat in contacts:
+            if other["id"] not in claimed and _is_duplicate(other_flat, flat):
+                claimed.add(other["id"])
+                tasks.append(
+                    {
+                        "staff": None,
+                        "steps": [("archive", other["id"], None)],
+                        "counts_as": None,
+                    }
                 )
 
-                email_changed = (
-                    current_staff_member_data.get("email")
-                    != existing_flat_data.get("E-mail")
-                )
-                phone_changed = (
-                    current_staff_member_data.get("phone")
-                    != existing_flat_data.get("Tel. nr")
-                )
+        email_changed = staff_member.get("email") != flat.get("E-mail")
+        phone_changed = staff_member.get("phone") != flat.get("Tel. nr")
+        if email_changed or phone_changed or _is_former(flat.get("Amet")):
+            tasks.append(
+                {
+                    "staff": staff_member,
+                    "steps": [("update", page["id"], properties_for(staff_member))],
+                    "counts_as": "updated",
+                }
+            )
+        else:
+            skipped_count += 1
 
-                if email_changed or phone_changed:
-                    notion.update_page(
-                        existing_page["id"],
-                        build_notion_properties(
-                            map_staff_to_properties(current_staff_member_data, page_id),
-                            page_properties,
-                        ),
-                    )
-                    updated_count += 1
-                else:
-                    skipped_count += 1
-            else:
-                # No page with this name+role: same name + different role → we will create
-                # a new page (no existing_role_page for the new role), or same role +
-                # different name → create new. Never overwrite or delete the old page.
-                existing_role_page = find_staff_page_by_role_only(
-                    notion, person_role, page_id, exclude_aegunud=True
-                )
+    # Pass 2: role-only matches for the rest. Never overwrite or delete the
+    # previous holder's page.
+    for staff_member in unmatched:
+        person_name = staff_member.get("name")
+        person_role = staff_member.get("role")
+        match = None
+        # A nameless contact with an e-mail is a new address, not a successor
+        if person_name or not staff_member.get("email"):
+            match = next(
+                (
+                    (page, flat)
+                    for page, flat in contacts
+                    if page["id"] not in claimed
+                    and not _is_former(flat.get("Amet"))
+                    and _role_matches(flat.get("Amet"), person_role)
+                ),
+                None,
+            )
+        if not match:
+            tasks.append(
+                {
+                    "staff": staff_member,
+                    "steps": [create_step(staff_member)],
+                    "counts_as": "created",
+                }
+            )
+            continue
 
-                if existing_role_page:
-                    existing_flat_data = extract_notion_properties_for_comparison(
-                        existing_role_page
-                    )
-                    existing_name = existing_flat_data.get("Name")
-
-                    if existing_name and existing_name != person_name:
-                        # Different person with same role: mark previous holder as (endine), then add new
-                        existing_role = existing_flat_data.get("Amet") or person_role
-                        mark_page_as_endine(
-                            notion,
-                            existing_role_page["id"],
-                            existing_role,
-                        )
-                        current_staff_member_data["role"] = person_role
-
-                        notion.create_page(
-                            {
-                                "parent": {"database_id": database_id},
-                                "properties": build_notion_properties(
-                                    map_staff_to_properties(
-                                        current_staff_member_data, page_id
-                                    ),
-                                    page_properties,
-                                ),
-                            }
-                        )
-                        created_count += 1
-                    else:
-                        # Same person, update existing page
-                        notion.update_page(
-                            existing_role_page["id"],
-                            build_notion_properties(
-                                map_staff_to_properties(
-                                    current_staff_member_data, page_id
-                                ),
-                                page_properties,
-                            ),
-                        )
-                        updated_count += 1
-                else:
-                    # Keep original role without date suffix
-                    current_staff_member_data["role"] = person_role
-
-                    notion.create_page(
-                        {
-                            "parent": {"database_id": database_id},
-                            "properties": build_notion_properties(
-                                map_staff_to_properties(
-                                    current_staff_member_data, page_id
-                                ),
-                                page_properties,
-                            ),
-                        }
-                    )
-                    created_count += 1
-
-        except requests.HTTPError as e:
-            failed_count += 1
-            errors.append(str(e))
-        except Exception as e:
-            failed_count += 1
-            errors.append(str(e))
+        page, flat = match
+        claimed.add(page["id"])
+        existing_name = flat.get("Name")
+        if existing_name and existing_name != person_name:
+            # Different person with same role: mark previous holder as (endine), then add new
+            existing_role = flat.get("Amet") or person_role
+            steps = [("endine", page["id"], existing_role), create_step(staff_member)]
+            tasks.append(
+                {"staff": staff_member, "steps": steps, "counts_as": "created"}
+            )
+        else:
+            # Same person, update existing page
+            steps = [("update", page["id"], properties_for(staff_member))]
+            tasks.append(
+                {"staff": staff_member, "steps": steps, "counts_as": "updated"}
+            )
+
+    if retire_missing:
+        roles = {key[1] for key in seen}
+        for page, flat in contacts:
+            if (
+                page["id"] not in claimed
+                and not _is_former(flat.get("Amet"))
+                and any(_role_matches(flat.get("Amet"), role) for role in roles)
+            ):
+                claimed.add(page["id"])
+                steps = [("endine", page["id"], flat.get("Amet"))]
+                tasks.append({"staff": None, "steps": steps, "counts_as": "updated"})
+
+    return {
+        "tasks": tasks,
+        "skipped": skipped_count,
+        "failed": failed_count,
+        "errors": errors,
+    }
 
-    return created_count, updated_count, failed_count, skipped_count, errors
+
+def _run_staff_task(notion: NotionClient, task: Dict[str, Any]) -> None:
+    for operation, target_id, payload in task["steps"]:
+        if operation == "create":
+            notion.create_page(payload)
+        elif operation == "update":
+            notion.update_page(target_id, payload)
+        elif operation == "endine":
+            # Stops the task, so a new holder is not created next to an unmarked page
+            if not mark_page_as_endine(notion, target_id, payload):
+                raise RuntimeError(f"Lehe {target_id} märkimine (endine) ebaõnnestus")
+        elif operation == "archive":
+            notion.delete_page(target_id)
+
+
+def sync_staff_data(
+    notion: NotionClient,
+    staff_data: List[Dict[str, Any]],
+    page_id: Optional[str],
+    database_id: str,
+    page_properties: Optional[Dict[str, Any]],
+    retire_missing: bool = False,
+    max_workers: int = STAFF_SYNC_MAX_WORKERS,
+) -> Tuple[int, int, int, int, List[str]]:
+    """
+    Synchronizes staff members with the company's Contacts pages: loads the
+    existing pages with one query, plans the writes (see plan_staff_sync)
+    and runs them with at most max_workers concurrent Notion calls.
+
+    Returns:
+        Tuple of (created, updated, failed, skipped, errors). Pages marked
+        (endine) by retire_missing count as updated.
+    """
+    try:
+        contacts = load_company_contacts(
+            notion, page_id, [member.get("name") for member in staff_data]
+        )
+    except Exception as e:
+        # Without the existing pages every write could be a duplicate
+        logging.error(f"Error loading existing staff pages: {e}")
+        return (
+            0,
+            0,
+            len(staff_data),
+            0,
+            [f"Kontaktisikute laadimine Notionist ebaõnnestus: {e}"],
+        )
+
+    plan = plan_staff_sync(
+        staff_data, contacts, page_id, database_id, page_properties, retire_missing
+    )
+    counts = {"created": 0, "updated": 0}
+    failed_count = plan["failed"]
+    errors = list(plan["errors"])
+
+    if plan["tasks"]:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {
+                executor.submit(_run_staff_task, notion, task): task
+                for task in plan["tasks"]
+            }
+            for future in as_completed(futures):
+                task = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    if task["counts_as"] is None:
+                        # Archiving a duplicate is cleanup, not a staff member
+                        logging.error(f"Error cleaning up staff page: {e}")
+                        continue
+                    failed_count += 1
+                    errors.append(str(e))
+                    continue
+                if task["counts_as"]:
+                    counts[task["counts_as"]] += 1
+
+    return counts["created"], counts["updated"], failed_count, plan["skipped"], errors
 
 
 def extract_notion_properties_for_comparison(page: Dict[str, Any]) -> Dict[str, Any]:
@@ -273,52 +433,6 @@ def extract_notion_properties_for_comparison(page: Dict[str, Any]) -> Dict[str,
     return extracted
 
 
-def find_staff_page_by_role_only(
-    notion: NotionClient,
-    role: str,
-    company_page_id: Optional[str] = None,
-    exclude_aegunud: bool = True,
-) -> Optional[Dict[str, Any]]:
-    """
-    Finds a staff page by role only.
-    """
-    try:
-        filters = []
-
-        if role:
-            filters.append({"property": "Amet", "rich_text": {"contains": role}})
-
-        if company_page_id:
-            filters.append(
-                {"property": "Organisatsioon", "relation": {"contains": company_page_id}}
-            )
-
-        if not filters:
-            return None
-
-        existing_pages = notion.query_database(
-            {"and": filters} if len(filters) > 1 else filters[0]
-        )
-
-        for page in existing_pages:
-            if page.get("archived", False):
-                continue
-
-            if exclude_aegunud:
-                role_prop = page.get("properties", {}).get("Amet", {})
-                if role_prop.get("type") == "rich_text" and role_prop.get("rich_text"):
-                    plain = role_prop["rich_text"][0].get("plain_text", "").upper()
-                    if "AEGUNUD" in plain or "ENDINE" in plain:
-                        continue
-
-            return page
-
-        return None
-    except Exception as e:
-        logging.error(f"Error querying Notion database for staff by role: {e}")
-        return None
-
-
 def _base_role_for_suffix(role: str) -> str:
     """Strip (endine), AEGUNUD, and other parenthetical suffixes to get base role."""
     base = role
@@ -346,23 +460,3 @@ def mark_page_as_endine(notion: NotionClient, page_id: str, current_role: str) -
     except Exception as e:
         logging.error(f"Error marking page as endine: {e}")
         return False
-
-
-def mark_page_as_aegunud(notion: NotionClient, page_id: str, current_role: str) -> bool:
-    """
-    Marks a staff page as AEGUNUD by updating the role property.
-    """
-    try:
-        base_role = _base_role_for_suffix(current_role)
-        notion.update_page(
-            page_id,
-            {
-                "Amet": {
-                    "rich_text": [{"text": {"content": f"{base_role} AEGUNUD"}}]
-                }
-            },
-        )
-        return True
-    except Exception as e:
-        logging.error(f"Error marking page as AEGUNUD: {e}")
-        return False
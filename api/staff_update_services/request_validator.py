@@ -5,6 +5,8 @@ Request parameter extraction and validation for staff update endpoint.
 from flask import request
 from typing import Tuple, Optional
 
+from ..staff_crawl import STAFF_CRAWL_PAGES, CRAWL_MAX_PAGES
+
 
 def extract_request_params() -> Tuple[Optional[str], Optional[str], Optional[str]]:
     """
@@ -27,6 +29,56 @@ def extract_request_params() -> Tuple[Optional[str], Optional[str], Optional[str
     return page_id, notion_url, website_url
 
 
+def wants_force_refresh() -> bool:
+    """True if the request asks to analyse the page even if it has not changed (force=1)."""
+    value = request.args.get("force")
+    if value is None and request.method == "POST":
+        value = (request.get_json(silent=True) or {}).get("force")
+    return str(value).lower() in ("1", "true", "yes")
+
+
+def requested_crawl_pages() -> int:
+    """
+    Number of pages to read in crawl mode (crawl=1 uses STAFF_CRAWL_PAGES,
+    crawl=<n> asks for n pages, capped at CRAWL_MAX_PAGES). 0 = crawl mode off.
+    """
+    value = request.args.get("crawl")
+    if value is None and request.method == "POST":
+        value = (request.get_json(silent=True) or {}).get("crawl")
+    value = str(value).lower()
+    if value in ("true", "yes"):
+        return STAFF_CRAWL_PAGES
+    try:
+        pages = int(value)
+    except ValueError:
+        return 0
+    if pages == 1:
+        return STAFF_CRAWL_PAGES
+    return max(0, min(pages, CRAWL_MAX_PAGES))
+
+
+def requested_source() -> str:
+    """
+    Where the staff comes from: "register" (source=register, the board
+    members in the business register) or "website" (default).
+    """
+    value = request.args.get("source")
+    if value is None and request.method == "POST":
+        value = (request.get_json(silent=True) or {}).get("source")
+    return (
+        "register" if str(value).lower() in ("register", "ariregister") else "website"
+    )
+
+
+def requested_regcode() -> Optional[str]:
+    """The optional registry code (regcode); otherwise it is read from the company page."""
+    value = request.args.get("regcode")
+    if value is None and request.method == "POST":
+        value = (request.get_json(silent=True) or {}).get("regcode")
+    value = "".join(ch for ch in str(value or "") if ch.isdigit())
+    return value or None
+
+
 def normalize_website_url(website_url: str) -> str:
     """
     Normalizes website URL by adding https:// if missing.
@@ -38,7 +38,7 @@ HTML_TEMPLATE = """
         {% endif %}
 
         {% if debug_info %}
-        <h2>Silumisinfo (Ainult vigade korral)</h2>
+        <h2>Silumisinfo</h2>
         <pre>{{ debug_info }}</pre>
         {% endif %}
     </div>
@@ -53,6 +53,7 @@ def prepare_result_message(
     failed_count: int,
     staff_found_count: int,
     errors: List[str],
+    source: str = "veebilehelt",
 ) -> Tuple[str, str, str, Optional[Dict[str, Any]]]:
     """
     Prepares the result message and status for the response.
@@ -63,6 +64,8 @@ def prepare_result_message(
         failed_count: Number of failed page creations
         staff_found_count: Total number of staff members found
         errors: List of error messages
+        source: Where the staff was found, for the message ("veebilehelt",
+            "Äriregistrist")
 
     Returns:
         Tuple of (status_text, status_class, message, debug_info)
@@ -71,7 +74,7 @@ def prepare_result_message(
         # All failed
         status_text = "Viga"
         status_class = "error"
-        result_message = f"❌ Ei õnnestunud luua ühtegi kontaktisiku lehte. Leitud {staff_found_count} kontaktisikut veebilehelt."
+        result_message = f"❌ Ei õnnestunud luua ühtegi kontaktisiku lehte. Leitud {staff_found_count} kontaktisikut {source}."
         if errors:
             result_message += f" Vead: {'; '.join(errors[:3])}"  # Show first 3 errors
     elif failed_count > 0:
@@ -91,9 +94,9 @@ def prepare_result_message(
         status_class = "success"
         new_count = created_count - replaced_count
         if replaced_count > 0:
-            result_message = f"✅ Edukalt loodud {created_count} kontaktisiku lehte veebilehelt leitud kontaktisikute põhjal ({new_count} uut, {replaced_count} uuendatud)."
+            result_message = f"✅ Edukalt loodud {created_count} kontaktisiku lehte {source} leitud kontaktisikute põhjal ({new_count} uut, {replaced_count} uuendatud)."
         else:
-            result_message = f"✅ Edukalt loodud {created_count} kontaktisiku lehte veebilehelt leitud kontaktisikute põhjal."
+            result_message = f"✅ Edukalt loodud {created_count} kontaktisiku lehte {source} leitud kontaktisikute põhjal."
 
     # Prepare debug info if there are many errors
     debug_info = None
@@ -174,7 +177,7 @@ def render_success_response(
     status_class: str,
     message: str,
     notion_url: Optional[str] = None,
-    debug_info: Optional[Dict[str, Any]] = None,
+    debug_info: Optional[Union[str, Dict[str, Any]]] = None,
 ) -> str:
     """
     Renders a success response HTML page.
@@ -189,8 +192,8 @@ def render_success_response(
     Returns:
         Rendered HTML
     """
-    debug_info_str = None
-    if debug_info:
+    debug_info_str = debug_info or None
+    if isinstance(debug_info, dict):
         debug_info_str = json.dumps(debug_info, indent=2, ensure_ascii=False)
 
     return render_template_string(
@@ -201,3 +204,40 @@ def render_success_response(
         redirect_url=notion_url,
         debug_info=debug_info_str,
     )
+
+
+def render_staff_update_result(
+    result: Dict[str, Any], notion_url: Optional[str] = None
+) -> Union[str, Tuple[str, int]]:
+    """
+    Renders the outcome of run_staff_update with the matching template.
+
+    Args:
+        result: Result dictionary from run_staff_update
+        notion_url: Optional redirect URL
+
+    Returns:
+        Rendered HTML (with status code for errors)
+    """
+    if result["kind"] == "error":
+        # Configuration errors do not offer a way back to Notion
+        return render_error_response(
+            status=result["status"],
+            message=result["message"],
+            notion_url=notion_url if result.get("step") != "config_check" else None,
+            debug_info=result.get("debug_info"),
+            status_code=result.get("status_code", 400),
+        )
+    if result["kind"] == "warning":
+        return render_warning_response(
+            message=result["message"],
+            notion_url=notion_url,
+            debug_info=result.get("debug_info"),
+        )
+    return render_success_response(
+        status=result["status"],
+        status_class=result["status_class"],
+        message=result["message"],
+        notion_url=notion_url,
+        debug_info=result.get("debug_info"),
+    )
@@ -3,7 +3,9 @@ Staff data fetching from websites using Gemini.
 """
 
 from typing import Dict, Any, List, Tuple, Optional
-from ..gemini import run_full_staff_search
+from ..gemini import run_staff_page_search, get_page_text
+
+FETCH_ERROR_MESSAGE = "Viga: Ei saanud veebilehe sisu hankida või analüüsida. Palun kontrolli veebilehe URL-i ja proovi uuesti."
 
 
 def fetch_staff_data(
@@ -21,15 +23,42 @@ def fetch_staff_data(
         - If failed to fetch: (None, error_message)
         - If no staff found: ([], None)
     """
-    staff_data = run_full_staff_search(website_url)
+    page, error = fetch_staff_page(website_url)
+    if error:
+        return None, error
+    return page["staff"], None
+
+
+def fetch_staff_page(
+    website_url: str,
+    crawl_pages: int = 0,
+    revalidate: bool = False,
+) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Like fetch_staff_data, but also returns the page the staff list came from.
+    With crawl_pages > 1 the best ranked pages of the site are read together
+    (see run_staff_page_search). With revalidate=True no cached page is used
+    without asking the server whether it changed.
+
+    Returns:
+        Tuple of (page, error_message), where page has contact_url,
+        website_text and staff (a list, empty if no staff was found).
+    """
+    page = run_staff_page_search(website_url, crawl_pages, revalidate)
+
+    if page is None or page["staff"] is None:
+        return None, FETCH_ERROR_MESSAGE
 
-    if staff_data is None:
-        return (
-            None,
-            "Viga: Ei saanud veebilehe sisu hankida või analüüsida. Palun kontrolli veebilehe URL-i ja proovi uuesti.",
-        )
+    if not page["staff"]:
+        page["staff"] = []
 
-    if not staff_data or len(staff_data) == 0:
-        return [], None
+    return page, None
 
-    return staff_data, None
+
+def fetch_page_text(url: str) -> Optional[str]:
+    """
+    Downloads and cleans a page without asking Gemini (None on errors). A
+    cached copy is always revalidated with the server, so a page changed
+    within the cache's freshness window is not missed.
+    """
+    return get_page_text(url, revalidate=True)
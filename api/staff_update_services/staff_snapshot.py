@@ -0,0 +1,51 @@
+"""
+Snapshots of the last staff extraction per company, used to skip the Gemini
+calls and the Notion sync when the company's team page has not changed.
+
+A snapshot is stored per (Notion page id, website URL) and holds the page the
+staff list was extracted from, a hash of its cleaned text and the staff list.
+"""
+
+from datetime import timedelta
+from typing import Dict, Any, List, Optional
+
+from ..cache_store import PersistentCache, hash_key
+
+# After this the page is analysed again even if it has not changed
+STAFF_SNAPSHOT_TTL = timedelta(days=30)
+
+staff_snapshots = PersistentCache("staff_snapshots", STAFF_SNAPSHOT_TTL)
+
+
+def snapshot_key(page_id: Optional[str], website_url: str) -> str:
+    normalized_page_id = (page_id or "").replace("-", "").lower()
+    return f"{normalized_page_id}|{website_url}"
+
+
+def text_hash(text: str) -> str:
+    return hash_key(text)
+
+
+def load_snapshot(page_id: Optional[str], website_url: str) -> Optional[Dict[str, Any]]:
+    return staff_snapshots.get(snapshot_key(page_id, website_url), None)
+
+
+def save_snapshot(
+    page_id: Optional[str],
+    website_url: str,
+    contact_url: str,
+    website_text: str,
+    staff: List[Dict[str, Any]],
+):
+    staff_snapshots.set(
+        snapshot_key(page_id, website_url),
+        {
+            "contact_url": contact_url,
+            "text_hash": text_hash(website_text),
+            "staff": staff,
+        },
+    )
+
+
+def forget_snapshot(page_id: Optional[str], website_url: str):
+    staff_snapshots.delete(snapshot_key(page_id, website_url))
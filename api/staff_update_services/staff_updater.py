@@ -0,0 +1,320 @@
+"""
+The staff update pipelines (fetch from website or the business register ->
+sync to Notion) as plain functions, shared by the HTTP endpoint, the
+background job worker and the bulk CLI mode.
+"""
+
+import json
+import time
+from typing import Dict, Any, List, Optional, Callable
+
+import requests
+
+from ..config import load_config
+from ..board_loader import BOARD_JSON_URL, find_board_members
+from ..clients.notion_client import NotionClient
+from ..sync import _extract_regcode
+from .staff_config import validate_config
+from .request_validator import normalize_website_url
+from .staff_fetcher import fetch_staff_page, fetch_page_text
+from .staff_snapshot import load_snapshot, save_snapshot, text_hash
+from .notion_staff_service import get_database_properties, sync_staff_data
+from .response_renderer import prepare_result_message
+
+
+def _no_progress(progress: int, message: str):
+    pass
+
+
+def run_staff_update(
+    website_url: str,
+    page_id: Optional[str],
+    report_progress: Callable[[int, str], None] = _no_progress,
+    force: bool = False,
+    crawl_pages: int = 0,
+) -> Dict[str, Any]:
+    """
+    Runs the whole staff update for one company.
+
+    If the team page found last time still has the same cleaned text, the
+    Gemini calls and the Notion sync are skipped and "unchanged" is reported.
+
+    Args:
+        website_url: The company website URL (required)
+        page_id: The company's Notion page ID used for the relation (optional)
+        report_progress: Callback receiving (percent, message) after each step
+        force: Ignore the stored snapshot and analyse the page again
+        crawl_pages: If > 1, read this many of the site's best ranked pages
+            instead of only the contact page (the snapshot is not used then,
+            since it covers a single page)
+
+    Returns:
+        Dictionary with keys:
+        - success: False only for errors
+        - kind: "error", "warning" or "success" (selects the response template)
+        - status, status_class, message, debug_info
+        - status_code and step (errors only)
+    """
+    # Validate configuration
+    try:
+        api_key, database_id = validate_config()
+        config = load_config()
+        api_version = config.get("notion", {}).get("api_version")
+    except ValueError as e:
+        config = load_config()
+        return {
+            "success": False,
+            "kind": "error",
+            "status": "Viga",
+            "message": f"Kriitiline API viga: {str(e)}. Kontrolli Vercel/Keskkonna seadeid.",
+            "debug_info": json.dumps(config, indent=2, ensure_ascii=False),
+            "status_code": 500,
+            "step": "config_check",
+        }
+
+    # Normalize website URL
+    website_url = normalize_website_url(website_url)
+
+    # Short-circuit if the team page has not changed since the last update
+    use_snapshot = not force and crawl_pages <= 1
+    snapshot = load_snapshot(page_id, website_url) if use_snapshot else None
+    if snapshot:
+        report_progress(5, "Kontrollin, kas meeskonnaleht on muutunud")
+        started_at = time.perf_counter()
+        current_text = fetch_page_text(snapshot["contact_url"])
+        if (
+            current_text is not None
+            and text_hash(current_text) == snapshot["text_hash"]
+        ):
+            elapsed_ms = (time.perf_counter() - started_at) * 1000
+            return {
+                "success": True,
+                "kind": "success",
+                "status": "Muutusteta",
+                "status_class": "success",
+                "message": f"✅ Meeskonnaleht pole pärast viimast uuendust muutunud ({len(snapshot['staff'])} kontaktisikut on juba Notionis).",
+                "debug_info": f"Leht: {snapshot['contact_url']} (kontrollitud {elapsed_ms:.0f} ms)",
+                "unchanged": True,
+            }
+
+    # Fetch staff data from website
+    report_progress(10, "Otsin veebilehelt kontaktisikuid")
+    page, fetch_error = fetch_staff_page(website_url, crawl_pages, revalidate=force)
+    staff_data = page["staff"] if page else None
+
+    if fetch_error:
+        return {
+            "success": False,
+            "kind": "error",
+            "status": "Viga",
+            "message": fetch_error,
+            "debug_info": f"Website URL: {website_url}",
+            "status_code": 400,
+            "step": "fetch_staff_data",
+        }
+
+    if staff_data == []:
+        if crawl_pages <= 1:
+            save_snapshot(
+                page_id, website_url, page["contact_url"], page["website_text"], []
+            )
+        return {
+            "success": True,
+            "kind": "warning",
+            "status": "Hoiatus",
+            "status_class": "warning",
+            "message": "⚠️ Veebilehelt ei leitud kontaktisikute infot. Veebileht ei pruugi sisaldada kontaktinfot määratud rollide jaoks (Tegevjuht, Personalijuht, Turundusjuht, Müügijuht või Üldine kontakt).",
+            "debug_info": f"Veebilehe URL: {website_url}",
+        }
+
+    # Initialize Notion client
+    report_progress(60, f"Leitud {len(staff_data)} kontaktisikut, uuendan Notionit")
+    notion = NotionClient(api_key, database_id, api_version)
+
+    # Get database properties for type checking
+    page_properties = get_database_properties(notion)
+
+    # Create pages for all staff members
+    created_count, updated_count, failed_count, skipped_count, errors = sync_staff_data(
+        notion, staff_data, page_id, database_id, page_properties
+    )
+
+    # Remember the page only if every contact reached Notion
+    if failed_count == 0 and crawl_pages <= 1:
+        save_snapshot(
+            page_id, website_url, page["contact_url"], page["website_text"], staff_data
+        )
+
+    # Prepare result messages
+    status_text, status_class, message, debug_info = prepare_result_message(
+        created_count, updated_count, failed_count, skipped_count, errors
+    )
+
+    return {
+        "success": True,
+        "kind": "success",
+        "status": status_text,
+        "status_class": status_class,
+        "message": message,
+        "debug_info": debug_info,
+    }
+
+
+def _error(
+    message: str, step: str, status_code: int, debug_info=None
+) -> Dict[str, Any]:
+    return {
+        "success": False,
+        "kind": "error",
+        "status": "Viga",
+        "message": message,
+        "debug_info": debug_info,
+        "status_code": status_code,
+        "step": step,
+    }
+
+
+def run_board_update(
+    page_id: Optional[str],
+    regcode: Optional[str] = None,
+    report_progress: Callable[[int, str], None] = _no_progress,
+    board_members: Optional[List[Dict[str, Any]]] = None,
+    page_properties: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Creates the company's Contacts from the current management board in the
+    business register, without reading the website or calling Gemini.
+
+    The register lists the whole board, so board members who are no longer
+    in it are marked (endine).
+
+    Args:
+        page_id: The company's Notion page ID (relation target, and the
+            source of the registry code if regcode is not given)
+        regcode: The company's registry code (optional)
+        report_progress: Callback receiving (percent, message) after each step
+        board_members: Already looked up board members (bulk mode), skips
+            the register lookup
+        page_properties: Contacts database properties (bulk mode, read once)
+
+    Returns:
+        Dictionary in the same format as run_staff_update.
+    """
+    try:
+        api_key, database_id = validate_config()
+    except ValueError as e:
+        config = load_config()
+        return _error(
+            f"Kriitiline API viga: {str(e)}. Kontrolli Vercel/Keskkonna seadeid.",
+            "config_check",
+            500,
+            json.dumps(config, indent=2, ensure_ascii=False),
+        )
+    config = load_config()
+    notion_config = config.get("notion", {})
+    api_version = notion_config.get("api_version")
+
+    if board_members is None and not regcode:
+        if not page_id:
+            return _error(
+                "Kriitiline viga: Nõutud parameeter 'pageId' või 'regcode' puudub.",
+                "regcode_missing",
+                400,
+            )
+        if not notion_config.get("token"):
+            return _error(
+                "Puudub konfiguratsioon (NOTION_API_KEY) ettevõtte registrikoodi lugemiseks.",
+                "config_check",
+                500,
+            )
+        report_progress(5, "Loen ettevõtte registrikoodi")
+        companies = NotionClient(
+            notion_config["token"], notion_config.get("database_id"), api_version
+        )
+        try:
+            props = companies.get_page(page_id).get("properties", {})
+        except requests.RequestException as e:
+            return _error(
+                f"Ettevõtte lehe lugemine Notionist ebaõnnestus: {e}",
+                "fetch_company_page",
+                502,
+            )
+        reg_prop = props.get("Registrikood")
+        regcode = _extract_regcode(reg_prop) if reg_prop else None
+        if not regcode:
+            return _error(
+                "Ettevõtte lehel puudub Registrikood.", "regcode_missing", 400
+            )
+
+    if board_members is None:
+        report_progress(10, "Otsin juhatuse liikmeid Äriregistrist")
+        url = config.get("ariregister", {}).get("board_json_url") or BOARD_JSON_URL
+        board_members = find_board_members(url, regcode)
+        if board_members is None:
+            return _error(
+                "Äriregistri isikute andmeid ei õnnestunud lõpuni lugeda.",
+                "fetch_board_members",
+                502,
+                f"Andmestik: {url}",
+            )
+
+    if not board_members:
+        return {
+            "success": True,
+            "kind": "warning",
+            "status": "Hoiatus",
+            "status_class": "warning",
+            "message": "⚠️ Äriregistrist ei leitud ettevõtte kehtivaid juhatuse liikmeid.",
+            "debug_info": f"Registrikood: {regcode}",
+        }
+
+    report_progress(
+        60, f"Leitud {len(board_members)} juhatuse liiget, uuendan Notionit"
+    )
+    notion = NotionClient(api_key, database_id, api_version)
+    if page_properties is None:
+        page_properties = get_database_properties(notion)
+
+    created_count, updated_count, failed_count, skipped_count, errors = sync_staff_data(
+        notion,
+        board_members,
+        page_id,
+        database_id,
+        page_properties,
+        retire_missing=True,
+    )
+
+    if failed_count == 0 and created_count == 0:
+        # Only updates and (endine) marks, or nothing at all
+        if updated_count == 0:
+            status_text = "Muutusteta"
+            message = f"✅ Juhatus pole muutunud ({len(board_members)} juhatuse liiget on juba Notionis)."
+        else:
+            status_text = "Edukas"
+            message = f"✅ Uuendatud {updated_count} kontaktisiku lehte Äriregistri juhatuse põhjal."
+        return {
+            "success": True,
+            "kind": "success",
+            "status": status_text,
+            "status_class": "success",
+            "message": message,
+            "debug_info": None,
+            "unchanged": updated_count == 0,
+        }
+
+    status_text, status_class, message, debug_info = prepare_result_message(
+        created_count,
+        updated_count,
+        failed_count,
+        skipped_count,
+        errors,
+        source="Äriregistrist",
+    )
+    return {
+        "success": True,
+        "kind": "success",
+        "status": status_text,
+        "status_class": status_class,
+        "message": message,
+        "debug_info": debug_info,
+    }
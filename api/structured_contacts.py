@@ -0,0 +1,343 @@
+"""
+Deterministic contact extraction from structured page data.
+
+Reads schema.org Person/Organization data (JSON-LD and microdata), hCard
+(vCard) markup and mailto:/tel: links next to a name and a role. Roles are
+matched with the same dictionary as the Gemini prompt (staff_roles). When
+enough searched roles are found, the staff search uses this result and does
+not call Gemini.
+"""
+
+import json
+import logging
+import os
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import unquote
+
+from .staff_roles import GENERAL_CONTACT, match_role
+from .text_compaction import EMAIL_RE, NAME_RE, PHONE_RE
+
+# Named people with a searched role needed to skip Gemini
+STAFF_FAST_PATH_MIN_ROLES = int(os.getenv("STAFF_FAST_PATH_MIN_ROLES", "2"))
+
+# Parent elements checked around a mailto: link for the person's name and role
+CARD_MAX_LEVELS = 3
+CARD_MAX_CHARS = 400
+NAME_LINE_MAX_LENGTH = 60
+
+# Anti-bot reversed addresses start with a reversed top-level domain
+REVERSED_TLDS = ("ee.", "moc.", "ue.", "ten.", "gro.", "if.", "vl.", "tl.", "ed.")
+REVERSED_EMAIL_RE = re.compile(
+    r"(?<![\w.])(?:"
+    + "|".join(re.escape(tld) for tld in REVERSED_TLDS)
+    + r")[\w.-]+@[\w.+-]+",
+    re.IGNORECASE,
+)
+OBFUSCATED_AT_RE = re.compile(r"\s*[\[({]\s*(?:at|ät|@)\s*[\])}]\s*", re.IGNORECASE)
+OBFUSCATED_DOT_RE = re.compile(
+    r"\s*[\[({]\s*(?:dot|punkt|\.)\s*[\])}]\s*", re.IGNORECASE
+)
+GENERIC_MAILBOXES = (
+    "info",
+    "hello",
+    "tere",
+    "kontakt",
+    "contact",
+    "office",
+    "mail",
+    "sales",
+    "myyk",
+    "muuk",
+)
+ORGANIZATION_TYPES = ("organization", "corporation", "localbusiness")
+# JSON-LD keys whose Person values have an implied role
+IMPLIED_ROLES = {"founder": "Founder"}
+HCARD_CLASSES = {
+    "name": ("fn", "p-name"),
+    "role": ("title", "role", "p-job-title", "p-role"),
+    "email": ("email", "u-email"),
+    "phone": ("tel", "p-tel"),
+}
+
+
+def unreverse_email(email: str) -> str:
+    """Fixes addresses written backwards as an anti-bot measure."""
+    email = email.strip()
+    if "@" in email and email.lower().startswith(REVERSED_TLDS):
+        return email[::-1]
+    return email
+
+
+def recover_emails(text: str) -> List[str]:
+    """E-mail addresses in text, including "nimi [at] firma [dot] ee" and reversed forms."""
+    text = OBFUSCATED_DOT_RE.sub(".", OBFUSCATED_AT_RE.sub("@", text))
+    matches = sorted(
+        list(EMAIL_RE.finditer(text)) + list(REVERSED_EMAIL_RE.finditer(text)),
+        key=lambda m: m.start(),
+    )
+    emails = (unreverse_email(match.group(0)) for match in matches)
+    return list(dict.fromkeys(emails))
+
+
+def _clean_email(value: Any) -> Optional[str]:
+    if not isinstance(value, str):
+        return None
+    value = unquote(value.strip())
+    if value.lower().startswith("mailto:"):
+        value = value[len("mailto:") :]
+    emails = recover_emails(value.split("?", 1)[0])
+    return emails[0] if emails else None
+
+
+def _clean_phone(value: Any) -> Optional[str]:
+    if not isinstance(value, str):
+        return None
+    value = unquote(value.strip())
+    if value.lower().startswith("tel:"):
+        value = value[len("tel:") :]
+    value = " ".join(value.split())
+    return value if sum(c.isdigit() for c in value) >= 7 else None
+
+
+def _first(value: Any) -> Any:
+    return value[0] if isinstance(value, list) and value else value
+
+
+def _text_value(value: Any) -> Optional[str]:
+    """
+    A JSON-LD text value as a string: plain, a {"@value": ...} object or the
+    first of a list of those. Anything else is None.
+    """
+    value = _first(value)
+    if isinstance(value, dict):
+        value = value.get("@value")
+    return value if isinstance(value, str) and value.strip() else None
+
+
+def _person(name, role, email=None, phone=None) -> Dict[str, Optional[str]]:
+    return {
+        "name": " ".join(name.split()) if isinstance(name, str) else None,
+        "role": role,
+        "email": _clean_email(_first(email)),
+        "phone": _clean_phone(_first(phone)),
+    }
+
+
+# --- JSON-LD ---
+
+
+def _walk(data: Any, key: Optional[str] = None) -> Iterator[Tuple[dict, Optional[str]]]:
+    """Yields every JSON-LD node with the key it was found under."""
+    if isinstance(data, list):
+        for item in data:
+            yield from _walk(item, key)
+    elif isinstance(data, dict):
+        yield data, key
+        for child_key, value in data.items():
+            if isinstance(value, (dict, list)):
+                yield from _walk(value, child_key)
+
+
+def _types(node: dict) -> List[str]:
+    types = node.get("@type") or []
+    if isinstance(types, str):
+        types = [types]
+    return [str(t).lower() for t in types]
+
+
+def _job_title_role(node: dict) -> Optional[str]:
+    titles = node.get("jobTitle") or node.get("roleName") or []
+    if not isinstance(titles, list):
+        titles = [titles]
+    for title in titles:
+        title = _text_value(title)
+        role = match_role(title) if title else None
+        if role:
+            return role
+    return None
+
+
+def _jsonld_contacts(soup) -> Iterator[Dict[str, Optional[str]]]:
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string or script.get_text(), strict=False)
+        except ValueError as e:
+            logging.info(f"JSON-LD parsimine ebaõnnestus: {e}")
+            continue
+
+        for node, key in _walk(data):
+            types = _types(node)
+            if "person" in types:
+                name = _text_value(node.get("name")) or " ".join(
+                    filter(
+                        None,
+                        [
+                            _text_value(node.get("givenName")),
+                            _text_value(node.get("familyName")),
+                        ],
+                    )
+                )
+                role = _job_title_role(node) or IMPLIED_ROLES.get(key)
+                if name and role:
+                    yield _person(name, role, node.get("email"), node.get("telephone"))
+            elif any(t in types for t in ORGANIZATION_TYPES) or "contactpoint" in types:
+                if node.get("email") or node.get("telephone"):
+                    yield _person(
+                        None, GENERAL_CONTACT, node.get("email"), node.get("telephone")
+                    )
+
+
+# --- Microdata and hCard ---
+
+
+def _microdata_props(item) -> Dict[str, str]:
+    values = {}
+    for element in item.find_all(attrs={"itemprop": True}):
+        # Properties of nested items (e.g. worksFor) belong to those items
+        if element.has_attr("itemscope") or (
+            element.find_parent(attrs={"itemscope": True}) is not item
+        ):
+            continue
+        value = (
+            element.get("content")
+            or element.get("href")
+            or element.get_text(" ", strip=True)
+        )
+        for prop in element["itemprop"].split():
+            values.setdefault(prop, value)
+    return values
+
+
+def _microdata_contacts(soup) -> Iterator[Dict[str, Optional[str]]]:
+    person_type = re.compile(r"schema\.org/Person", re.IGNORECASE)
+    for item in soup.find_all(attrs={"itemtype": person_type}):
+        props = _microdata_props(item)
+        role = match_role(props.get("jobTitle"))
+        if props.get("name") and role:
+            yield _person(
+                props["name"], role, props.get("email"), props.get("telephone")
+            )
+
+
+def _hcard_value(card, classes) -> Optional[str]:
+    element = card.find(class_=lambda c: c in classes)
+    if element is None:
+        return None
+    return element.get("href") or element.get_text(" ", strip=True)
+
+
+def _hcard_contacts(soup) -> Iterator[Dict[str, Optional[str]]]:
+    for card in soup.find_all(class_=lambda c: c in ("vcard", "h-card")):
+        values = {
+            field: _hcard_value(card, classes)
+            for field, classes in HCARD_CLASSES.items()
+        }
+        role = match_role(values["role"])
+        if values["name"] and role:
+            yield _person(values["name"], role, values["email"], values["phone"])
+
+
+# --- mailto:/tel: links ---
+
+
+def _card_around(link):
+    """The largest parent element (within limits) holding only this e-mail link."""
+    card = None
+    node = link
+    for _ in range(CARD_MAX_LEVELS):
+        node = node.parent
+        if node is None or node.name in ("body", "html", "[document]"):
+            break
+        if len(node.get_text(" ", strip=True)) > CARD_MAX_CHARS:
+            break
+        if len(node.select('a[href^="mailto:"]')) > 1:
+            break
+        card = node
+    return card
+
+
+def _name_line(lines: List[str]) -> Optional[str]:
+    for line in lines:
+        if (
+            len(line) <= NAME_LINE_MAX_LENGTH
+            and NAME_RE.fullmatch(line)
+            and not match_role(line)
+        ):
+            return line
+    return None
+
+
+def _linked_contacts(soup) -> Iterator[Dict[str, Optional[str]]]:
+    for link in soup.select('a[href^="mailto:"]'):
+        email = _clean_email(link.get("href"))
+        if not email:
+            continue
+        card = _card_around(link)
+        lines = card.get_text("\n", strip=True).splitlines() if card else []
+
+        role = next(filter(None, (match_role(line) for line in lines)), None)
+        name = _name_line(lines)
+        phone = None
+        if card is not None:
+            tel = card.select_one('a[href^="tel:"]')
+            if tel is not None:
+                phone = tel.get("href")
+            else:
+                phone = next(
+                    (m.group(0) for m in map(PHONE_RE.search, lines) if m), None
+                )
+
+        if role and name:
+            yield _person(name, role, email, phone)
+        elif email.split("@")[0].lower() in GENERIC_MAILBOXES:
+            yield _person(None, GENERAL_CONTACT, email, phone)
+
+
+def _merge(contacts: Iterator[Dict[str, Optional[str]]]) -> List[Dict[str, Any]]:
+    """Deduplicates contacts (same name and role, or same general e-mail)."""
+    merged: Dict[tuple, Dict[str, Any]] = {}
+    for contact in contacts:
+        if contact["role"] == GENERAL_CONTACT:
+            key = (GENERAL_CONTACT, contact["email"] or contact["phone"])
+            if key[1] is None:
+                continue
+        elif isinstance(contact["name"], str):
+            key = (contact["name"].lower(), contact["role"].lower())
+        else:
+            # A person without a usable name cannot be matched to a contact
+            continue
+        existing = merged.get(key)
+        if existing is None:
+            merged[key] = dict(contact)
+        else:
+            for field in ("email", "phone"):
+                existing[field] = existing[field] or contact[field]
+    return list(merged.values())
+
+
+def extract_structured_contacts(soup) -> List[Dict[str, Any]]:
+    """
+    Contacts found in the page's structured data, in the same format as the
+    Gemini extraction ({"name", "role", "email", "phone"}).
+    """
+
+    def all_contacts():
+        yield from _jsonld_contacts(soup)
+        yield from _microdata_contacts(soup)
+        yield from _hcard_contacts(soup)
+        yield from _linked_contacts(soup)
+
+    return _merge(all_contacts())
+
+
+def has_enough_roles(
+    contacts: List[Dict[str, Any]], min_roles: int = STAFF_FAST_PATH_MIN_ROLES
+) -> bool:
+    """True if the contacts include at least `min_roles` named people with a searched role."""
+    people = {
+        (c["name"], c["role"])
+        for c in contacts
+        if c["name"] and c["role"] != GENERAL_CONTACT
+    }
+    return len(people) >= min_roles
@@ -1,6 +1,12 @@
+import ipaddress
 import logging
 import re
-from typing import Tuple, Dict, Any, Optional
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from datetime import timedelta
+from typing import Callable, Tuple, Dict, Any, Optional
 from urllib.parse import urlparse
 
 import requests
@@ -13,15 +19,29 @@ logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 
 # Assuming these are relative imports in the project structure
 from .json_loader import find_company_by_regcode, clean_value
+from .tax_loader import TAX_PROPERTIES, find_tax_stats
 from .clients.notion_client import NotionClient
+from .singleflight import SingleFlight
+from .cache_store import PersistentCache, CACHE_MISS, hash_key
+from .cse_scheduler import acquire_interactive, release_interactive
+from .resilience import DependencyUnavailable, is_failure_status
+from .resilience import google_cse as google_cse_dependency
 
 # --------------------------------------------------------------------
 # GOOGLE CUSTOM SEARCH – Finding the company website if missing in Business Register
 # --------------------------------------------------------------------
 
-config = load_config()
-GOOGLE_API_KEY = config.get("google", {}).get("api_key")
-GOOGLE_CSE_CX = config.get("google", {}).get("cse_cx")
+# Read from the configuration on first use unless set here
+GOOGLE_API_KEY = None
+GOOGLE_CSE_CX = None
+GOOGLE_CSE_GL = "ee"
+GOOGLE_CSE_LR = "lang_et|lang_en"
+
+# Every CSE query is paid, so answers (including "no candidate") are remembered
+GOOGLE_CACHE_TTL = timedelta(days=30)
+GOOGLE_NEGATIVE_CACHE_TTL = timedelta(days=7)
+# v2: {"homepage", "linkedin", "socials"} (the first version stored {"url"})
+google_cache = PersistentCache("google_cse_v2", GOOGLE_CACHE_TTL)
 
 # Blacklist of domains we DON'T want as the "homepage"
 BLACKLIST_HOSTS = {
@@ -88,64 +108,483 @@ def _score_candidate(host: str, company_name: str) -> int:
     return score
 
 
-def google_find_website(company_name: str) -> Optional[str]:
+def _google_credentials() -> Tuple[Optional[str], Optional[str]]:
+    """(API key, CSE cx) from the module settings or the configuration."""
+    google = load_config().get("google", {})
+    return (
+        GOOGLE_API_KEY or google.get("api_key"),
+        GOOGLE_CSE_CX or google.get("cse_cx"),
+    )
+
+
+def _google_cache_key(company_name: str, gl: str, lr: str) -> str:
+    """Cache key: normalized company name + the query parameters that affect results."""
+    normalized = " ".join(company_name.lower().split())
+    return f"{normalized}|gl={gl}|lr={lr}"
+
+
+# Social networks harvested from the same search results (canonical host first)
+SOCIAL_NETWORKS = {
+    "linkedin": ("linkedin.com",),
+    "facebook": ("facebook.com", "fb.com"),
+    "instagram": ("instagram.com",),
+    "youtube": ("youtube.com",),
+    "twitter": ("x.com", "twitter.com"),
+}
+# First path segments that are posts, share links etc. rather than profiles
+SOCIAL_NON_PROFILE_SEGMENTS = {
+    "sharer",
+    "share",
+    "posts",
+    "p",
+    "reel",
+    "watch",
+    "events",
+    "groups",
+    "hashtag",
+    "search",
+    "pages",
+    "login",
+    "intent",
+    "home",
+}
+
+
+def _social_profile(url: str, host: str) -> Optional[Tuple[str, str]]:
+    """
+    Recognizes a social media profile URL.
+
+    Returns:
+        (network, canonical profile URL), or None if the URL is not a profile
+        (e.g. a post, a share link or a personal LinkedIn page).
+    """
+    network = next(
+        (
+            name
+            for name, hosts in SOCIAL_NETWORKS.items()
+            if any(host == h or host.endswith("." + h) for h in hosts)
+        ),
+        None,
+    )
+    if not network:
+        return None
+
+    segments = [s for s in urlparse(url).path.split("/") if s]
+    canonical_host = "www." + SOCIAL_NETWORKS[network][0]
+    if network == "linkedin":
+        # Only company pages; /in/ profiles belong to people
+        if len(segments) < 2 or segments[0] not in ("company", "school", "showcase"):
+            return None
+        return network, f"https://{canonical_host}/{segments[0]}/{segments[1]}"
+    if network == "youtube":
+        if segments and segments[0].startswith("@"):
+            return network, f"https://{canonical_host}/{segments[0]}"
+        if len(segments) > 1 and segments[0] in ("channel", "c", "user"):
+            return network, f"https://{canonical_host}/{segments[0]}/{segments[1]}"
+        return None
+    if (
+        not segments
+        or segments[0].lower() in SOCIAL_NON_PROFILE_SEGMENTS
+        or segments[0].endswith(".php")
+    ):
+        return None
+    return network, f"https://{canonical_host}/{segments[0]}"
+
+
+def _pick_search_results(items, company_name: str) -> Dict[str, Any]:
+    """
+    Processes up to 10 Google CSE items into a structured result.
+
+    - homepage: the best-scored item whose host is not blacklisted
+      (_score_candidate; the first one in case of a tie)
+    - linkedin: the best LinkedIn company page
+    - socials: the best profile per other social network
+
+    Profiles whose slug contains a company name token are preferred; otherwise
+    the first one in result order wins.
     """
-    Uses the Google Custom Search JSON API to find the company's website.
+    tokens = _name_tokens(company_name)
+    candidates = []
+    profiles: Dict[str, list] = {}
+    for item in items:
+        url = item.get("link")
+        if not url:
+            continue
+        host = _normalize_host(url)
+        if not host:
+            continue
+
+        profile = _social_profile(url, host)
+        if profile:
+            network, profile_url = profile
+            slug = profile_url.rstrip("/").rsplit("/", 1)[-1].lower()
+            score = 2 if any(t in slug for t in tokens) else 0
+            profiles.setdefault(network, []).append((score, profile_url))
+            continue
+        if _host_blacklisted(host):
+            # Avoid register and directory pages, social media posts, etc.
+            continue
+
+        score = _score_candidate(host, company_name)
+        candidates.append((score, url, host))
+
+    homepage = None
+    if candidates:
+        # Sort by score (highest first); maintains original order for ties.
+        candidates.sort(key=lambda t: t[0], reverse=True)
+        best_score, homepage, best_host = candidates[0]
+        logging.info(
+            f"Google CSE valis sobiva kodulehe (score={best_score}): {best_host} -> {homepage}"
+        )
+    else:
+        logging.info(
+            "Google CSE 10 esimese tulemuse seas ei leitud ühtegi sobivat kodulehe kandidaati."
+        )
+
+    best_profiles = {}
+    for network, found in profiles.items():
+        found.sort(key=lambda t: t[0], reverse=True)
+        best_profiles[network] = found[0][1]
+
+    return {
+        "homepage": homepage,
+        "linkedin": best_profiles.pop("linkedin", None),
+        "socials": best_profiles,
+    }
+
+
+def google_search_company(
+    company_name: str,
+    acquire: Callable[[], bool] = acquire_interactive,
+    release: Callable[[], None] = release_interactive,
+) -> Optional[Dict[str, Any]]:
+    """
+    Uses the Google Custom Search JSON API to find the company's website and
+    social media profiles with one query.
 
     Logic:
     - Query: "<company name> official website"
-    - Takes up to the first 10 results.
-    - Filters out:
-        * URLs with a blacklisted host (registers, directories, social media, etc.)
-    - Among the remaining candidates:
-        * Calculates a score (_score_candidate):
-            - prefers .ee domains
-            - prefers hosts that contain a company name token
-        * Selects the candidate with the highest score (the first one in case of a tie)
-    - Returns None if no suitable candidate is found.
+    - Takes up to the first 10 results and processes them with
+      _pick_search_results (homepage, LinkedIn company page, other socials).
+
+    Answers are kept in a persistent cache (google_cache) keyed by the
+    normalized name and query parameters; the cache is checked before any
+    network call, and answers without a homepage or LinkedIn page are cached
+    for a shorter time.
+
+    Args:
+        company_name: The company's name.
+        acquire: Called right before the paid query; returns False (or raises,
+            see CseScheduler.acquire) when the daily quota does not allow it.
+        release: Gives the query back when it was not served (network error,
+            timeout, 5xx or a breaker/bulkhead rejection).
+
+    Returns:
+        {"homepage", "linkedin", "socials"}, or None if the search could not run.
     """
     if not company_name:
         return None
-    if not GOOGLE_API_KEY or not GOOGLE_CSE_CX:
+
+    cache_key = _google_cache_key(company_name, GOOGLE_CSE_GL, GOOGLE_CSE_LR)
+    cached = google_cache.get(cache_key)
+    if isinstance(cached, dict):
+        result = {
+            "homepage": cached.get("homepage"),
+            "linkedin": cached.get("linkedin"),
+            "socials": cached.get("socials") or {},
+        }
+        logging.info(
+            f"Google CSE vahemälu tabamus: {company_name} -> {result['homepage']}"
+        )
+        return result
+
+    api_key, cse_cx = _google_credentials()
+    if not api_key or not cse_cx:
         logging.info("Google API võti/cx puudub – jätan veebilehe otsingu vahele.")
         return None
 
+    # Checked before the quota: a query that would fail fast must not use it up
+    if not google_cse_dependency.available():
+        logging.warning("Google CSE kaitselüliti on avatud – jätan otsingu vahele.")
+        return None
+
+    if not acquire():
+        logging.warning("Google CSE päevane kvoot on täis – jätan otsingu vahele.")
+        return None
+
     try:
-        google_client = GoogleClient(GOOGLE_API_KEY, GOOGLE_CSE_CX)
-        results = google_client.get_search_results(f"{company_name} official website")
+        google_client = GoogleClient(api_key, cse_cx)
+        results = google_client.get_search_results(
+            f"{company_name} official website", gl=GOOGLE_CSE_GL, lr=GOOGLE_CSE_LR
+        )
         items = results.get("items", []) or []
+    except Exception as e:
+        logging.warning(f"Google CSE päring ebaõnnestus: {e}")
+        if _cse_query_not_served(e):
+            release()
+        return None
 
-        candidates = []
-        for item in items:
-            url = item.get("link")
-            if not url:
-                continue
-            host = _normalize_host(url)
-            if not host or _host_blacklisted(host):
-                # Avoid register and directory pages, social media, etc.
-                continue
-
-            score = _score_candidate(host, company_name)
-            candidates.append((score, url, host))
-
-        if not candidates:
-            logging.info(
-                "Google CSE 10 esimese tulemuse seas ei leitud ühtegi sobivat kodulehe kandidaati."
-            )
+    result = _pick_search_results(items, company_name)
+    found_anything = result["homepage"] or result["linkedin"]
+    google_cache.set(
+        cache_key,
+        result,
+        ttl=None if found_anything else GOOGLE_NEGATIVE_CACHE_TTL,
+    )
+    return result
+
+
+def _cse_query_not_served(error: Exception) -> bool:
+    """
+    Whether a failed CSE query should be given back to the daily quota:
+    it never reached Google or got a 5xx/408 answer. 4xx answers and
+    unreadable 200 answers are counted by Google, so they stay used.
+    """
+    if isinstance(
+        error, (DependencyUnavailable, requests.ConnectionError, requests.Timeout)
+    ):
+        return True
+    response = getattr(error, "response", None)
+    return is_failure_status(getattr(response, "status_code", None))
+
+
+def google_find_website(company_name: str) -> Optional[str]:
+    """
+    Finds the company's homepage via Google CSE (see google_search_company).
+    Returns None if no suitable candidate is found.
+    """
+    result = google_search_company(company_name)
+    return result["homepage"] if result else None
+
+
+# --------------------------------------------------------------------
+# WEBSITE INFERENCE – guessing the website from e-mail domains and the name
+# before paying for a Google CSE query
+# --------------------------------------------------------------------
+
+# Mailbox providers: an address there says nothing about the company's website
+FREEMAIL_DOMAINS = {
+    "gmail.com",
+    "googlemail.com",
+    "hotmail.com",
+    "outlook.com",
+    "live.com",
+    "msn.com",
+    "yahoo.com",
+    "icloud.com",
+    "me.com",
+    "proton.me",
+    "protonmail.com",
+    "gmx.com",
+    "gmx.net",
+    "hot.ee",
+    "mail.ee",
+    "online.ee",
+    "neti.ee",
+    "suhtlus.ee",
+    "zone.ee",
+    "mail.ru",
+    "yandex.ru",
+    "inbox.lv",
+}
+
+PROBE_SCHEMES = ("https", "http")
+PROBE_TIMEOUT = 4
+# Name-based guesses are only accepted if the page mentions the company;
+# this many bytes of the page are read for that check
+PROBE_MAX_BYTES = 64 * 1024
+MAX_NAME_CANDIDATES = 3
+PROBE_HEADERS = {"User-Agent": "Mozilla/5.0"}
+# The whole inference gives up after this; Google CSE is asked instead
+INFER_DEADLINE_SECONDS = 3
+# Probe verdicts are remembered, so bulk reruns do not probe the same domains
+probe_cache = PersistentCache("website_probes", timedelta(days=7))
+PROBE_NEGATIVE_CACHE_TTL = timedelta(days=1)
+
+
+def _email_domain(email: Optional[str]) -> Optional[str]:
+    """
+    Returns the lowercase domain of an e-mail address, or None. IP literals
+    (e.g. "x@10.0.0.1") are rejected: CRM data must not make the server
+    request internal addresses.
+    """
+    if not email or "@" not in email:
+        return None
+    domain = email.rsplit("@", 1)[1].strip().strip(".").lower()
+    if "." not in domain or ":" in domain or domain.startswith("["):
+        return None
+    try:
+        ipaddress.ip_address(domain)
+        return None
+    except ValueError:
+        return domain
+
+
+def website_candidates(emails, company_name: str):
+    """
+    Candidate domains for the company website, best first:
+    - domains of non-freemail e-mail addresses (www. stripped)
+    - <tokens>.ee, <token-token>.ee and <first token>.ee from the company name
+
+    Returns:
+        A list of (domain, source) tuples, where source is "email" or "name".
+    """
+    candidates = []
+    seen = set()
+
+    def add(domain: str, source: str):
+        if domain.startswith("www."):
+            domain = domain[4:]
+        if domain and domain not in seen and not _host_blacklisted(domain):
+            seen.add(domain)
+            candidates.append((domain, source))
+
+    for email in emails:
+        domain = _email_domain(email)
+        if domain and domain not in FREEMAIL_DOMAINS:
+            add(domain, "email")
+
+    tokens = _name_tokens(company_name or "")
+    if tokens:
+        guesses = ["".join(tokens) + ".ee"]
+        if len(tokens) > 1:
+            guesses += ["-".join(tokens) + ".ee", tokens[0] + ".ee"]
+        for domain in guesses[:MAX_NAME_CANDIDATES]:
+            add(domain, "name")
+
+    return candidates
+
+
+def _page_mentions_company(
+    response: requests.Response, company_name: str, regcode: Optional[str]
+) -> bool:
+    """Reads the start of the page and looks for the regcode or all name tokens."""
+    content = b""
+    for chunk in response.iter_content(chunk_size=8192):
+        content += chunk
+        if len(content) >= PROBE_MAX_BYTES:
+            break
+    text = content.decode(response.encoding or "utf-8", errors="ignore").lower()
+    if regcode and str(regcode) in text:
+        return True
+    tokens = _name_tokens(company_name or "")
+    return bool(tokens) and all(t in text for t in tokens)
+
+
+def probe_website(
+    domain: str, source: str, company_name: str, regcode: Optional[str] = None
+) -> Optional[str]:
+    """
+    Checks whether a candidate domain serves a website.
+
+    E-mail domains belong to the company, so any successful HEAD (or GET, if
+    HEAD is not allowed) response is enough. Name-based guesses must also
+    mention the company (registry code or all name tokens) on the page.
+
+    Returns:
+        The site's base URL (after redirects), or None.
+    """
+    for scheme in PROBE_SCHEMES:
+        url = f"{scheme}://{domain}"
+        try:
+            if source == "email":
+                response = requests.head(
+                    url,
+                    headers=PROBE_HEADERS,
+                    timeout=PROBE_TIMEOUT,
+                    allow_redirects=True,
+                )
+                if response.status_code in (403, 405, 501):
+                    response = requests.get(
+                        url,
+                        headers=PROBE_HEADERS,
+                        timeout=PROBE_TIMEOUT,
+                        allow_redirects=True,
+                        stream=True,
+                    )
+                    response.close()
+                valid = response.status_code < 400
+            else:
+                with requests.get(
+                    url,
+                    headers=PROBE_HEADERS,
+                    timeout=PROBE_TIMEOUT,
+                    allow_redirects=True,
+                    stream=True,
+                ) as response:
+                    valid = response.status_code < 400 and _page_mentions_company(
+                        response, company_name, regcode
+                    )
+        except requests.RequestException:
+            continue
+
+        final = urlparse(response.url)
+        host = (final.hostname or "").lower()
+        if valid and host and not _host_blacklisted(host):
+            return f"{final.scheme}://{host}"
+        if response.status_code < 500:
+            # The server answered; the other scheme will not change the verdict
             return None
+    return None
 
-        # Sort by score (highest first); maintains original order for ties.
-        candidates.sort(key=lambda t: t[0], reverse=True)
-        best_score, best_url, best_host = candidates[0]
-        logging.info(
-            f"Google CSE valis sobiva kodulehe (score={best_score}): {best_host} -> {best_url}"
-        )
-        return best_url
 
-    except Exception as e:
-        logging.warning(f"Google CSE päring ebaõnnestus: {e}")
+def _probe_cached(
+    domain: str, source: str, company_name: str, regcode: Optional[str]
+) -> Optional[str]:
+    """probe_website with the verdict cached per domain and company."""
+    key = hash_key(domain, source, str(regcode or company_name))
+    cached = probe_cache.get(key)
+    if isinstance(cached, dict):
+        return cached.get("url")
+    url = probe_website(domain, source, company_name, regcode)
+    probe_cache.set(key, {"url": url}, ttl=None if url else PROBE_NEGATIVE_CACHE_TTL)
+    return url
+
+
+def infer_website(
+    emails, company_name: str, regcode: Optional[str] = None
+) -> Optional[str]:
+    """
+    Infers the company website without a search engine: candidate domains
+    from e-mail addresses and the company name are probed concurrently and
+    the best validated candidate (in website_candidates order) wins. The
+    probes share one INFER_DEADLINE_SECONDS deadline, so a dead domain does
+    not hold up the autofill.
+
+    Args:
+        emails: Known e-mail addresses of the company.
+        company_name: The company's name.
+        regcode: The registry code (used to validate name-based guesses).
+
+    Returns:
+        The website's base URL, or None if no candidate validated.
+    """
+    candidates = website_candidates(emails, company_name)
+    if not candidates:
         return None
 
+    deadline = time.monotonic() + INFER_DEADLINE_SECONDS
+    executor = ThreadPoolExecutor(max_workers=len(candidates))
+    try:
+        futures = [
+            executor.submit(_probe_cached, domain, source, company_name, regcode)
+            for domain, source in candidates
+        ]
+        # Results are taken in preference order; slower, worse candidates are
+        # abandoned as soon as a better one validates
+        for (domain, source), future in zip(candidates, futures):
+            try:
+                url = future.result(timeout=max(0, deadline - time.monotonic()))
+            except FutureTimeout:
+                logging.info(f"Veebilehe tuletamise aeg sai otsa ({domain})")
+                return None
+            if url:
+                logging.info(f"Veebileht tuletatud ({source}: {domain}) -> {url}")
+                return url
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return None
+
 
 # --------------------------------------------------------------------
 # --- EMTAK (Estonian Classification of Economic Activities) Ranges ---
@@ -244,7 +683,10 @@ def _prepare_notion_properties(
 
 
 def _build_properties_from_company(
-    company: Dict[str, Any], regcode: str, company_name: str
+    company: Dict[str, Any],
+    regcode: str,
+    company_name: str,
+    tax_stats: Optional[Dict[str, Any]] = None,
 ) -> Tuple[Dict[str, Any], list, str]:
     """
     Constructs the Notion properties object based on cleaned JSON data.
@@ -253,10 +695,13 @@ def _build_properties_from_company(
     - Põhitegevus (Main Activity): Uses the detailed EMTAK text from JSON.
     - Tegevusvaldkond (Industry Section): Uses the 2-digit EMTAK code to map
       to a broader section (EMTAK_MAP).
+    - Käive, Töötajate arv, Tasutud maksud: The latest quarterly EMTA
+      figures, if given (see tax_loader). Optional, never an empty field.
 
     @param company: The cleaned company dictionary.
     @param regcode: The company's registry code.
     @param company_name: The company's name.
+    @param tax_stats: The company's EMTA figures (lookup_tax_stats), or None.
     @return: A tuple containing (properties, empty_fields, company_name).
     """
 
@@ -386,6 +831,10 @@ def _build_properties_from_company(
     if not linkedin_val:
         properties["LinkedIn"] = {"url": None}
 
+    for field, prop_name in TAX_PROPERTIES.items():
+        if tax_stats and tax_stats.get(field) is not None:
+            properties[prop_name] = {"number": tax_stats[field]}
+
     return properties, empty_fields, company_name or ""
 
 
@@ -420,21 +869,36 @@ def load_company_data(regcode: str, config: Dict[str, Any]) -> Dict[str, Any]:
             "message": f"Ettevõtet registrikoodiga {regcode} ei leitud Äriregistri andmetest (JSON).",
         }
 
+    data = prepare_company_data(company, regcode)
+
+    return {
+        "status": "ready",
+        "data": data,
+        "message": f"Andmed leitud: {data['company_name']} ({regcode}).",
+    }
+
+
+def prepare_company_data(company: Dict[str, Any], regcode: str) -> Dict[str, Any]:
+    """
+    Builds the process_company_sync payload from a cleaned register record.
+
+    Args:
+        company: The company record (values already cleaned with clean_value).
+        regcode: The registry code of the company.
+
+    Returns:
+        A dictionary with regcode, properties, empty_fields and company_name.
+    """
     company_name = clean_value(company.get("nimi"))
     # Prepare properties using the corrected logic
     properties, empty_fields, company_name = _build_properties_from_company(
         company, regcode, company_name
     )
-
     return {
-        "status": "ready",
-        "data": {
-            "regcode": regcode,
-            "properties": properties,  # Data for Notion API
-            "empty_fields": empty_fields,
-            "company_name": company_name,
-        },
-        "message": f"Andmed leitud: {company_name} ({regcode}).",
+        "regcode": regcode,
+        "properties": properties,  # Data for Notion API
+        "empty_fields": empty_fields,
+        "company_name": company_name,
     }
 
 
@@ -515,6 +979,16 @@ def process_company_sync(
 
 # --- Web/API Autofill Logic ---
 
+# Duplicate check, register lookup, EMTA lookup and the Google CSE stage run in parallel
+AUTOFILL_MAX_WORKERS = 4
+
+# Concurrent autofills of pages with the same registry code share one register scan
+_register_lookups = SingleFlight()
+
+
+def _find_company_coalesced(url: str, regcode: str) -> Optional[Dict[str, Any]]:
+    return _register_lookups.do(regcode, lambda: find_company_by_regcode(url, regcode))
+
 
 def _is_placeholder_value(prop_value: Any, prop_type: str) -> bool:
     """
@@ -585,11 +1059,178 @@ def _get_property_value(props: Dict[str, Any], field_name: str) -> Tuple[Any, st
     return None, prop_type
 
 
+def _extract_regcode(reg_prop: Dict[str, Any]) -> Optional[str]:
+    """
+    Extracts the registry code from a 'Registrikood' property regardless of its
+    type (Number, Title, Rich Text). Returns None if the value is empty.
+    """
+    regcode = None
+    prop_type = reg_prop.get("type")
+
+    if prop_type == "number":
+        val = reg_prop.get("number")
+        if val is not None:
+            regcode = str(int(val))
+    elif prop_type in ("title", "rich_text"):
+        texts = reg_prop.get(prop_type) or []
+        if texts:
+            # Use plain_text or text content and extract only digits
+            content = texts[0].get("plain_text") or texts[0].get("text", {}).get(
+                "content"
+            )
+            if content:
+                regcode = "".join(ch for ch in content if ch.isdigit())
+
+    return regcode or None
+
+
+def _duplicate_page_message(existing_page: Dict[str, Any], regcode: str) -> str:
+    """
+    Builds the Estonian error message shown when the registry code already
+    belongs to another page in the Companies database.
+    """
+    existing_props = existing_page.get("properties", {})
+    nimi_prop = existing_props.get("Nimi", {})
+    company_name = ""
+
+    # Extract company name from existing page
+    if nimi_prop:
+        prop_type = nimi_prop.get("type")
+        if prop_type == "title":
+            title_array = nimi_prop.get("title", [])
+            if title_array and len(title_array) > 0:
+                company_name = clean_value(
+                    title_array[0].get("text", {}).get("content", "")
+                )
+
+    if company_name:
+        return f"Ettevõte registrikoodiga {regcode} ({company_name}) on juba olemas Notionis."
+    return f"Ettevõte registrikoodiga {regcode} on juba olemas Notionis."
+
+
+def _prepare_autofill_payload(
+    company_future: Future,
+    page_props: Dict[str, Any],
+    regcode: str,
+    cancelled: threading.Event,
+    tax_future: Optional[Future] = None,
+) -> Optional[Tuple[Dict[str, Any], list, str]]:
+    """
+    Autofill stage that depends only on the register lookup (and the EMTA
+    figures, if looked up): builds the Notion properties and, if the website
+    is missing, asks Google CSE for it.
+
+    Runs on the autofill thread pool next to the duplicate check. The Google
+    call is skipped when `cancelled` is set (a duplicate page was found).
+
+    Returns:
+        (properties, empty_fields, company_name), or None if the company was not found.
+    """
+    company = company_future.result()
+    if not company:
+        return None
+
+    company_name = clean_value(company.get("nimi"))
+    tax_stats = tax_future.result() if tax_future else None
+    properties, empty_fields, _ = _build_properties_from_company(
+        company, regcode, company_name, tax_stats
+    )
+    logging.debug("Built properties payload to send to Notion.")
+
+    if not cancelled.is_set():
+        _fill_missing_website(properties, empty_fields, company_name, page_props)
+
+    return properties, empty_fields, company_name
+
+
+def _website_missing(properties: Dict[str, Any], page_props: Dict[str, Any]) -> bool:
+    """True if neither the register data nor the Notion page has a website."""
+    existing_url = properties.get("Veebileht", {}).get("url")
+    return (
+        not existing_url or existing_url == "Veebilehte ei leitud."
+    ) and not page_props.get("Veebileht", {}).get("url")
+
+
+def _linkedin_missing(properties: Dict[str, Any], page_props: Dict[str, Any]) -> bool:
+    """True if neither the register data nor the Notion page has a LinkedIn URL."""
+    return _is_placeholder_value(
+        properties.get("LinkedIn", {}).get("url"), "url"
+    ) and _is_placeholder_value(page_props.get("LinkedIn", {}).get("url"), "url")
+
+
+def _set_found_url(
+    properties: Dict[str, Any], empty_fields: list, prop: str, field: str, url: str
+):
+    properties.setdefault(prop, {})["url"] = url
+    # Remove the field from empty_fields if it was successfully found
+    if field in empty_fields:
+        empty_fields.remove(field)
+
+
+def _fill_missing_website(
+    properties: Dict[str, Any],
+    empty_fields: list,
+    company_name: str,
+    page_props: Dict[str, Any],
+    search_fn: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None,
+):
+    """
+    If the website is missing, first tries inferring it from e-mail domains and
+    the company name (cheap probes), then via Google CSE (first 10, scored).
+    A LinkedIn company page found by the same Google query fills LinkedIn too.
+
+    `search_fn` replaces google_search_company (bulk runs pass a quota-scheduled one).
+    """
+    if not _website_missing(properties, page_props):
+        return
+
+    emails = [
+        prop.get("email")
+        for prop in (
+            properties.get("E-post", {}),
+            page_props.get("E-post", {}),
+            page_props.get("E-post 2", {}),
+        )
+        if not _is_placeholder_value(prop.get("email"), "email")
+    ]
+    regcode = properties.get("Registrikood", {}).get("number")
+    homepage = infer_website(emails, company_name, regcode)
+    search = None
+
+    if not homepage:
+        logging.info(
+            "Veebileht puudub Äriregistri andmetes – proovime leida Google CSE abil."
+        )
+        search = (search_fn or google_search_company)(company_name)
+        homepage = search["homepage"] if search else None
+    if homepage:
+        _set_found_url(
+            properties, empty_fields, "Veebileht", "Veebileht (Website)", homepage
+        )
+    else:
+        logging.info(
+            "Google ei leidnud sobivat kodulehte (10 esimese tulemuse seas), jätame Veebileht tühjaks."
+        )
+
+    if search and search["linkedin"] and _linkedin_missing(properties, page_props):
+        logging.info(f"Google CSE leidis LinkedIn lehe: {search['linkedin']}")
+        _set_found_url(
+            properties, empty_fields, "LinkedIn", "LinkedIn", search["linkedin"]
+        )
+
+
 def autofill_page_by_page_id(page_id: str, config: Dict[str, Any]) -> Dict[str, Any]:
     """
     Fetches the 'Registrikood' from a given Notion page, finds the corresponding
     company data, and updates the Notion page properties.
 
+    Once the registry code is known, the remaining stages run as a small
+    dependency graph on a thread pool:
+        - duplicate check (Notion query)
+        - register lookup -> properties -> Google CSE (if website missing)
+    Both branches start at the same time; a duplicate finding cancels the
+    register/Google branch and returns immediately.
+
     Args:
         page_id: The ID of the Notion page to autofill.
         config: The application configuration dictionary.
@@ -598,12 +1239,14 @@ def autofill_page_by_page_id(page_id: str, config: Dict[str, Any]) -> Dict[str,
         A dictionary with the result status and message.
     """
     logging.info(f"--- Starting autofill for page_id: {page_id} ---")
+    started_at = time.perf_counter()
 
     # Extract configuration variables
     NOTION_API_KEY = config.get("notion", {}).get("token")
     NOTION_DATABASE_ID = config.get("notion", {}).get("database_id")
     ARIREGISTER_JSON_URL = config.get("ariregister", {}).get("json_url")
     NOTION_API_VERSION = config.get("notion", {}).get("api_version")
+    EMTA_TAX_CSV_URL = config.get("emta", {}).get("tax_csv_url")
 
     # Configuration validation
     if not all([NOTION_API_KEY, NOTION_DATABASE_ID, ARIREGISTER_JSON_URL]):
@@ -640,22 +1283,7 @@ def autofill_page_by_page_id(page_id: str, config: Dict[str, Any]) -> Dict[str,
                 "step": "missing_registrikood",
             }
 
-        # Logic to extract regcode regardless of property type (Number, Title, Rich Text)
-        prop_type = reg_prop.get("type")
-
-        if prop_type == "number":
-            val = reg_prop.get("number")
-            if val is not None:
-                regcode = str(int(val))
-        elif prop_type in ("title", "rich_text"):
-            texts = reg_prop.get(prop_type) or []
-            if texts:
-                # Use plain_text or text content and extract only digits
-                content = texts[0].get("plain_text") or texts[0].get("text", {}).get(
-                    "content"
-                )
-                if content:
-                    regcode = "".join(ch for ch in content if ch.isdigit())
+        regcode = _extract_regcode(reg_prop)
 
         if not regcode:
             error_msg = (
@@ -670,40 +1298,64 @@ def autofill_page_by_page_id(page_id: str, config: Dict[str, Any]) -> Dict[str,
 
         logging.info(f"Found Registrikood: {regcode}")
 
+    except Exception as e:
+        error_msg = f"Lehe hankimine või andmete eraldamine Notionist ebaõnnestus: {e}"
+        logging.error(error_msg)
+        return {"success": False, "message": error_msg, "step": "fetch_page_or_extract"}
+
+    # 2. Run the duplicate check, the register lookup (+ Google) and the EMTA lookup concurrently
+    cancelled = threading.Event()
+    executor = ThreadPoolExecutor(
+        max_workers=AUTOFILL_MAX_WORKERS, thread_name_prefix="autofill"
+    )
+    try:
         # Check if a company with this registry code already exists (on a different page)
         # Exclude the current page from the search - use actual_page_id from Notion for consistency
         logging.debug(
             f"Checking for duplicate registrikood {regcode}, excluding page_id: {actual_page_id}"
         )
-        existing_page = notion.query_by_regcode(regcode, exclude_page_id=actual_page_id)
+        duplicate_future = executor.submit(
+            notion.query_by_regcode, regcode, exclude_page_id=actual_page_id
+        )
+        company_future = executor.submit(
+            _find_company_coalesced, ARIREGISTER_JSON_URL, regcode
+        )
+        # Index lookup only: a missing or stale index is refreshed in the background
+        tax_future = (
+            executor.submit(find_tax_stats, regcode, EMTA_TAX_CSV_URL)
+            if EMTA_TAX_CSV_URL
+            else None
+        )
+        payload_future = executor.submit(
+            _prepare_autofill_payload,
+            company_future,
+            props,
+            regcode,
+            cancelled,
+            tax_future,
+        )
+
+        try:
+            existing_page = duplicate_future.result()
+        except Exception as e:
+            cancelled.set()
+            error_msg = (
+                f"Lehe hankimine või andmete eraldamine Notionist ebaõnnestus: {e}"
+            )
+            logging.error(error_msg)
+            return {
+                "success": False,
+                "message": error_msg,
+                "step": "fetch_page_or_extract",
+            }
+
         if existing_page:
-            existing_page_id = existing_page.get("id")
+            # Company with this registry code already exists on another page
+            cancelled.set()
             logging.warning(
-                f"Found duplicate: existing page_id={existing_page_id}, current page_id={page_id}"
+                f"Found duplicate: existing page_id={existing_page.get('id')}, current page_id={page_id}"
             )
-            # Company with this registry code already exists on another page
-            existing_props = existing_page.get("properties", {})
-            nimi_prop = existing_props.get("Nimi", {})
-            company_name = ""
-
-            # Extract company name from existing page
-            if nimi_prop:
-                prop_type = nimi_prop.get("type")
-                if prop_type == "title":
-                    title_array = nimi_prop.get("title", [])
-                    if title_array and len(title_array) > 0:
-                        company_name = clean_value(
-                            title_array[0].get("text", {}).get("content", "")
-                        )
-
-            # Create error message in Estonian
-            if company_name:
-                error_msg = f"Ettevõte registrikoodiga {regcode} ({company_name}) on juba olemas Notionis."
-            else:
-                error_msg = (
-                    f"Ettevõte registrikoodiga {regcode} on juba olemas Notionis."
-                )
-
+            error_msg = _duplicate_page_message(existing_page, regcode)
             logging.warning(error_msg)
             return {
                 "success": False,
@@ -711,75 +1363,109 @@ def autofill_page_by_page_id(page_id: str, config: Dict[str, Any]) -> Dict[str,
                 "step": "duplicate_registrikood",
             }
 
-    except Exception as e:
-        error_msg = f"Lehe hankimine või andmete eraldamine Notionist ebaõnnestus: {e}"
-        logging.error(error_msg)
-        return {"success": False, "message": error_msg, "step": "fetch_page_or_extract"}
+        # 3. Wait for the register lookup (and Google CSE, if it was needed)
+        try:
+            company = company_future.result()
+            logging.info("Edukalt laetud andmed ja otsitud ettevõte.")
+        except Exception as e:
+            error_msg = f"JSON-i laadimine või ettevõtte otsimine ebaõnnestus: {e}"
+            logging.error(error_msg)
+            return {
+                "success": False,
+                "message": error_msg,
+                "step": "load_json_or_search",
+            }
 
-    # 2. Fetch Company Data from JSON
-    try:
-        company = find_company_by_regcode(ARIREGISTER_JSON_URL, regcode)
-        logging.info("Edukalt laetud andmed ja otsitud ettevõte.")
-    except Exception as e:
-        error_msg = f"JSON-i laadimine või ettevõtte otsimine ebaõnnestus: {e}"
-        logging.error(error_msg)
-        return {"success": False, "message": error_msg, "step": "load_json_or_search"}
+        if not company:
+            error_msg = f"Ettevõtet registrikoodiga {regcode} ei leitud JSON andmetest."
+            logging.warning(error_msg)
+            # Translate message
+            return {
+                "success": False,
+                "message": f"Viga: {error_msg}",
+                "step": "company_not_found",
+                "regcode": regcode,
+            }
 
-    if not company:
-        error_msg = f"Ettevõtet registrikoodiga {regcode} ei leitud JSON andmetest."
-        logging.warning(error_msg)
-        # Translate message
-        return {
-            "success": False,
-            "message": f"Viga: {error_msg}",
-            "step": "company_not_found",
-            "regcode": regcode,
-        }
+        logging.info(
+            f"Found matching company in JSON: {clean_value(company.get('nimi'))}"
+        )
+        try:
+            properties, empty_fields, company_name = payload_future.result()
+        except Exception as e:
+            error_msg = f"Andmete ettevalmistamine ebaõnnestus: {e}"
+            logging.error(error_msg)
+            return {
+                "success": False,
+                "message": error_msg,
+                "step": "prepare_payload",
+            }
+    finally:
+        # Drops stages that have not started yet; running ones finish in the background
+        executor.shutdown(wait=False, cancel_futures=True)
 
-    logging.info(f"Found matching company in JSON: {clean_value(company.get('nimi'))}")
+    logging.info(
+        f"Autofill stages finished in {(time.perf_counter() - started_at) * 1000:.0f} ms."
+    )
 
-    # 3. Prepare Payload and Update Notion
-    company_name = clean_value(company.get("nimi"))
-    properties, empty_fields, _ = _build_properties_from_company(
-        company, regcode, company_name
+    # 4. Update only fields that are empty or contain placeholders
+    return _write_autofill_update(
+        notion, page_id, props, properties, empty_fields, company_name, regcode
     )
-    logging.debug("Built properties payload to send to Notion.")
 
-    # 3.1 If Website is missing, try finding it via Google CSE (first 10, scored)
-    veeb_prop = properties.get("Veebileht", {})
-    existing_url = veeb_prop.get("url")
-    if (not existing_url or existing_url == "Veebilehte ei leitud.") and not props.get("Veebileht", {}).get("url"):
-        logging.info(
-            "Veebileht puudub Äriregistri andmetes – proovime leida Google CSE abil."
-        )
-        homepage = google_find_website(company_name)
-        if homepage:
-            properties["Veebileht"]["url"] = homepage
-            # Remove "Veebileht (Website)" from empty_fields if it was successfully found
-            if "Veebileht (Website)" in empty_fields:
-                empty_fields.remove("Veebileht (Website)")
-        else:
-            logging.info(
-                "Google ei leidnud sobivat kodulehte (10 esimese tulemuse seas), jätame Veebileht tühjaks."
-            )
 
-    # 3.2 Filter properties to only update fields that are empty or contain placeholders
+AUTOFILL_FIELDS_TO_CHECK = [
+    "E-post",
+    "E-post 2",
+    "Tel. nr",
+    "Veebileht",
+    "LinkedIn",
+    "Aadress",
+    "Maakond",
+    "Põhitegevus",
+    "Tegevusvaldkond",
+]
+
+# Number properties filled from the EMTA tax statistics
+TAX_FIELDS = list(TAX_PROPERTIES.values())
+
+
+def _write_autofill_update(
+    notion: NotionClient,
+    page_id: str,
+    props: Dict[str, Any],
+    properties: Dict[str, Any],
+    empty_fields: list,
+    company_name: str,
+    regcode: str,
+) -> Dict[str, Any]:
+    """
+    Writes the prepared properties to an existing company page, keeping
+    manually added content. Shared by single-page and bulk autofill.
+
+    Args:
+        notion: Notion client for the Companies database.
+        page_id: The page to update.
+        props: The page's current properties (from Notion).
+        properties: Properties built from the register data.
+        empty_fields: Fields that stayed empty (for the warning message).
+        company_name: The company's name.
+        regcode: The company's registry code.
+
+    Returns:
+        A dictionary with the result status and message.
+    """
+    # Filter properties to only update fields that are empty or contain placeholders
     # This preserves manually added content
     filtered_properties = {}
-    fields_to_check = [
-        "E-post",
-        "E-post 2",
-        "Tel. nr",
-        "Veebileht",
-        "LinkedIn",
-        "Aadress",
-        "Maakond",
-        "Põhitegevus",
-        "Tegevusvaldkond"
-    ]
 
     for field_name in properties.keys():
-        if field_name in fields_to_check:
+        if field_name in TAX_FIELDS:
+            # Optional EMTA figures: written only if the database has the
+            # property, and refreshed every quarter
+            if field_name in props:
+                filtered_properties[field_name] = properties[field_name]
+        elif field_name in AUTOFILL_FIELDS_TO_CHECK:
             # Get existing value from Notion page
             existing_value, prop_type = _get_property_value(props, field_name)
 
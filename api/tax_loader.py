@@ -0,0 +1,331 @@
+"""
+Loader for the Tax and Customs Board (EMTA) quarterly statistics of paid
+taxes, turnover and number of employees, keyed by registry code.
+
+The quarterly CSV files are large (one row per company), so they are never
+held in memory: a file is downloaded into the cache like the register dump
+(at most once per TAX_CACHE_EXPIRATION, the stale file is kept if the
+download fails), then streamed and written TAX_CHUNK_ROWS rows at a time
+into a SQLite index with one row per (registry code, quarter). A company's
+figures are then a single primary key lookup, the same for one autofill
+and for every page of a bulk run.
+
+Only the bulk run (and the CLI) downloads and indexes before it starts. A
+single autofill never waits for a download: it reads whatever is indexed and,
+if the index is missing or stale, starts a refresh in a background thread
+for the clicks after it.
+
+EMTA_TAX_CSV_URL lists the quarterly files to index (comma-separated); the
+quarter is read from the file name (e.g. `..._2025_ii_kvartal.csv` ->
+`2025-Q2`) and lookups return the latest indexed quarter. Without the
+setting the tax figures are simply left out.
+"""
+
+import csv
+import io
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import zipfile
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .json_loader import CACHE_DIR, _ensure_zip_cache
+from .resilience import emta as emta_dependency
+
+# --- Configuration ---
+TAX_INDEX_PATH = os.path.join(CACHE_DIR, "emta_tax.sqlite3")
+TAX_CACHE_EXPIRATION = timedelta(hours=24)
+TAX_CHUNK_ROWS = int(os.getenv("EMTA_TAX_CHUNK_ROWS", "50000"))
+
+# Notion properties filled from the figures (only if the database has them)
+TAX_PROPERTIES = {
+    "revenue": "Käive",
+    "employees": "Töötajate arv",
+    "taxes": "Tasutud maksud",
+}
+
+# CSV column (lowercase header) -> field
+_COLUMNS = {
+    "registrikood": "regcode",
+    "käive": "revenue",
+    "töötajate arv": "employees",
+    "riiklikud maksud": "taxes",
+}
+_ROMAN_QUARTERS = {"i": 1, "ii": 2, "iii": 3, "iv": 4}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tax_quarters (
+    quarter TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    loaded_at REAL NOT NULL,
+    rows INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tax_stats (
+    regcode TEXT NOT NULL,
+    quarter TEXT NOT NULL,
+    revenue REAL,
+    employees INTEGER,
+    taxes REAL,
+    PRIMARY KEY (regcode, quarter)
+) WITHOUT ROWID;
+"""
+
+# One index build at a time in this process
+_build_lock = threading.Lock()
+# The background refresh started by single autofill (at most one at a time,
+# and after a failed one not again for TAX_REFRESH_RETRY_SECONDS)
+TAX_REFRESH_RETRY_SECONDS = 10 * 60
+_refresh_thread: Optional[threading.Thread] = None
+_refresh_started_at = float("-inf")
+_refresh_lock = threading.Lock()
+# Resolved at use time, so tests can point TAX_INDEX_PATH elsewhere
+_initialized_path = None
+
+
+def tax_csv_urls(value: Optional[str]) -> List[str]:
+    """The quarterly file URLs of a comma-separated EMTA_TAX_CSV_URL value."""
+    return [url.strip() for url in (value or "").split(",") if url.strip()]
+
+
+def quarter_from_url(url: str) -> str:
+    """The quarter label of a quarterly file, e.g. "2025-Q2" (else the file name)."""
+    name = os.path.basename(url.split("?")[0]).lower()
+    match = re.search(r"(\d{4})[_-](i{1,3}|iv|[1-4])[_-]?kv", name)
+    if match:
+        year, quarter = match.groups()
+        number = _ROMAN_QUARTERS.get(quarter) or int(quarter)
+        return f"{year}-Q{number}"
+    return re.sub(r"\.(csv|zip)$", "", name.replace(".csv.zip", ""))
+
+
+def parse_amount(value: Optional[str]) -> Optional[float]:
+    """
+    Parses an amount as written in the EMTA files ("1 234 567,89"). Empty
+    values are None.
+    """
+    if value is None:
+        return None
+    value = re.sub(r"[\s ]", "", value).replace(",", ".")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def iter_tax_rows(
+    lines: Iterable[str],
+) -> Iterator[Tuple[str, Optional[float], Optional[int], Optional[float]]]:
+    """
+    Streams (regcode, revenue, employees, taxes) rows from the lines of a
+    quarterly CSV file (semicolon-separated, header row first). Rows
+    without a registry code are skipped.
+    """
+    reader = csv.reader(lines, delimiter=";")
+    header = next(reader, None)
+    if not header:
+        return
+    positions = {}
+    for index, column in enumerate(header):
+        field = _COLUMNS.get(column.strip().strip('"').lower())
+        if field:
+            positions[field] = index
+    if "regcode" not in positions:
+        raise ValueError(f"Maksuandmete failis puudub Registrikood veerg: {header}")
+
+    def cell(row, field):
+        index = positions.get(field)
+        return row[index] if index is not None and index < len(row) else None
+
+    for row in reader:
+        regcode = "".join(ch for ch in (cell(row, "regcode") or "") if ch.isdigit())
+        if not regcode:
+            continue
+        employees = parse_amount(cell(row, "employees"))
+        yield (
+            regcode,
+            parse_amount(cell(row, "revenue")),
+            int(employees) if employees is not None else None,
+            parse_amount(cell(row, "taxes")),
+        )
+
+
+@contextmanager
+def _connection() -> Iterator[sqlite3.Connection]:
+    global _initialized_path
+    path = TAX_INDEX_PATH
+    if _initialized_path != path:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        if _initialized_path != path:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            _initialized_path = path
+        yield conn
+    finally:
+        conn.close()
+
+
+@contextmanager
+def _open_lines(path: str) -> Iterator[Iterable[str]]:
+    """The text lines of a downloaded file (a CSV, or a ZIP with one CSV)."""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as z:
+            with z.open(z.namelist()[0]) as raw:
+                yield io.TextIOWrapper(raw, encoding="utf-8-sig", errors="replace")
+    else:
+        with open(path, "r", encoding="utf-8-sig", errors="replace", newline="") as f:
+            yield f
+
+
+def _index_quarter(conn: sqlite3.Connection, url: str, quarter: str, path: str):
+    """Replaces one quarter in the index with the rows of the downloaded file."""
+    started = time.perf_counter()
+    rows = 0
+    # One transaction: lookups see the old quarter until the new one is complete
+    with conn:
+        conn.execute("DELETE FROM tax_stats WHERE quarter = ?", (quarter,))
+        with _open_lines(path) as lines:
+            chunk = []
+            for regcode, revenue, employees, taxes in iter_tax_rows(lines):
+                chunk.append((regcode, quarter, revenue, employees, taxes))
+                if len(chunk) >= TAX_CHUNK_ROWS:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO tax_stats VALUES (?, ?, ?, ?, ?)", chunk
+                    )
+                    rows += len(chunk)
+                    chunk = []
+            conn.executemany(
+                "INSERT OR REPLACE INTO tax_stats VALUES (?, ?, ?, ?, ?)", chunk
+            )
+            rows += len(chunk)
+        conn.execute(
+            "INSERT OR REPLACE INTO tax_quarters VALUES (?, ?, ?, ?)",
+            (quarter, url, os.path.getmtime(path), rows),
+        )
+    print(
+        f"MAKSUANDMED: {quarter} indekseeritud ({rows} ettevõtet, "
+        f"{time.perf_counter() - started:.1f} s)."
+    )
+
+
+def _is_fresh(row: Optional[Tuple[float]], path: str) -> bool:
+    """True if the quarter's index row is newer than its file and not expired."""
+    return (
+        row is not None
+        and os.path.exists(path)
+        and os.path.getmtime(path) <= row[0]
+        and time.time() - row[0] < TAX_CACHE_EXPIRATION.total_seconds()
+    )
+
+
+def _quarter_state(
+    conn: sqlite3.Connection, url: str
+) -> Tuple[str, str, Optional[Tuple[float]]]:
+    """The quarter of a file, its download path and its index row (if any)."""
+    quarter = quarter_from_url(url)
+    path = os.path.join(CACHE_DIR, f"emta_tax_{quarter}.data")
+    row = conn.execute(
+        "SELECT loaded_at FROM tax_quarters WHERE quarter = ?", (quarter,)
+    ).fetchone()
+    return quarter, path, row
+
+
+def tax_index_is_fresh(urls: Iterable[str]) -> bool:
+    """True if every quarterly file is indexed and none needs a refresh (no download)."""
+    with _connection() as conn:
+        for url in urls:
+            _, path, row = _quarter_state(conn, url)
+            if not _is_fresh(row, path):
+                return False
+    return True
+
+
+def ensure_tax_index(urls: Iterable[str]) -> List[str]:
+    """
+    Makes sure every quarterly file is downloaded and indexed, refreshing
+    those older than TAX_CACHE_EXPIRATION.
+
+    Returns:
+        The quarters that are available in the index.
+    """
+    available = []
+    with _build_lock, _connection() as conn:
+        for url in urls:
+            quarter, path, row = _quarter_state(conn, url)
+            if not _is_fresh(row, path):
+                try:
+                    _ensure_zip_cache(url, path, dependency=emta_dependency)
+                    if os.path.exists(path) and (
+                        row is None or os.path.getmtime(path) > row[0]
+                    ):
+                        _index_quarter(conn, url, quarter, path)
+                except Exception as e:
+                    # The previous index of the quarter (if any) stays in use
+                    logging.warning(f"Maksuandmete laadimine ebaõnnestus ({url}): {e}")
+            if conn.execute(
+                "SELECT 1 FROM tax_quarters WHERE quarter = ?", (quarter,)
+            ).fetchone():
+                available.append(quarter)
+    return available
+
+
+def lookup_tax_stats(regcode: str) -> Optional[Dict[str, Any]]:
+    """
+    The latest indexed figures of one company (no download), or None.
+
+    Returns:
+        Dictionary with quarter, revenue, employees and taxes.
+    """
+    with _connection() as conn:
+        row = conn.execute(
+            "SELECT quarter, revenue, employees, taxes FROM tax_stats "
+            "WHERE regcode = ? ORDER BY quarter DESC LIMIT 1",
+            (str(regcode),),
+        ).fetchone()
+    if row is None:
+        return None
+    return dict(zip(("quarter", "revenue", "employees", "taxes"), row))
+
+
+def refresh_tax_index_in_background(urls: List[str]) -> None:
+    """
+    Starts ensure_tax_index in a daemon thread, unless one is already running
+    or was started less than TAX_REFRESH_RETRY_SECONDS ago.
+    """
+    global _refresh_thread, _refresh_started_at
+    with _refresh_lock:
+        if _refresh_thread is not None and _refresh_thread.is_alive():
+            return
+        if time.monotonic() - _refresh_started_at < TAX_REFRESH_RETRY_SECONDS:
+            return
+        _refresh_started_at = time.monotonic()
+        _refresh_thread = threading.Thread(
+            target=ensure_tax_index, args=(urls,), name="tax-index", daemon=True
+        )
+        _refresh_thread.start()
+
+
+def find_tax_stats(regcode: str, urls_value: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    The latest indexed figures of one company, for interactive requests: never
+    downloads, a missing or stale index is refreshed in the background. Tax
+    figures are optional: any error is logged and gives None.
+    """
+    urls = tax_csv_urls(urls_value)
+    if not urls:
+        return None
+    try:
+        if not tax_index_is_fresh(urls):
+            refresh_tax_index_in_background(urls)
+        return lookup_tax_stats(regcode)
+    except Exception as e:
+        logging.warning(f"Maksuandmete otsing ebaõnnestus ({regcode}): {e}")
+        return None
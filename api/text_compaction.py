@@ -0,0 +1,141 @@
+"""
+Relevance-focused compaction of the cleaned website text before the staff
+extraction prompt.
+
+Instead of cutting the text at a fixed length (which keeps the menus and
+footers at the top and can cut off the team section), only windows of lines
+around role titles, person names, e-mail addresses and phone numbers are kept,
+best matches first, until the token budget is used up. The kept lines stay in
+their original order.
+"""
+
+import os
+import re
+from typing import List
+
+from .staff_roles import ROLE_KEYWORDS
+
+# Rough size of one token in characters for Estonian/English web text
+CHARS_PER_TOKEN = 4
+# Size limit of the page text in the extraction prompt
+STAFF_PROMPT_TOKEN_BUDGET = int(os.getenv("STAFF_PROMPT_TOKEN_BUDGET", "4000"))
+# Lines kept before and after every matching line (name above the role,
+# e-mail and phone below it)
+WINDOW_LINES = 2
+# Lines further from the match are dropped first
+DISTANCE_PENALTY = 0.25
+GAP_MARKER = "..."
+# Share of the budget left for gap markers and page headers
+MARKER_RESERVE = 0.1
+PAGE_HEADER_PREFIX = "=== Leht:"
+
+ROLE_RE = re.compile(
+    r"\b(?:" + "|".join(re.escape(k) for k in ROLE_KEYWORDS) + r")\b", re.IGNORECASE
+)
+# Other Estonian managers (finantsjuht, juhataja, ...)
+MANAGER_RE = re.compile(r"\w*juh(?:t|tkond|ataja)\b", re.IGNORECASE)
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE_RE = re.compile(r"(?:\+\d{3}[\s-]?)?(?<!\d)(?:\d[\s-]?){6,10}\d(?!\d)")
+CONTACT_WORD_RE = re.compile(
+    r"\b(?:tel|telefon|phone|mob|e-post|e-mail|email)\b", re.IGNORECASE
+)
+NAME_RE = re.compile(r"\b[A-ZÕÄÖÜŠŽ][a-zõäöüšž]+(?:[ -][A-ZÕÄÖÜŠŽ][a-zõäöüšž]+)+\b")
+# Longer lines are paragraphs, not name lines
+NAME_LINE_MAX_LENGTH = 60
+
+
+def line_score(line: str) -> float:
+    """How strongly one line points to a contact person (0 = not at all)."""
+    score = 0
+    if ROLE_RE.search(line):
+        score += 3
+    elif MANAGER_RE.search(line):
+        score += 2
+    if EMAIL_RE.search(line):
+        score += 3
+    if PHONE_RE.search(line):
+        score += 2
+    elif CONTACT_WORD_RE.search(line):
+        score += 1
+    if len(line) <= NAME_LINE_MAX_LENGTH and NAME_RE.search(line):
+        score += 1
+    return score
+
+
+def compact_text(text: str, token_budget: int = STAFF_PROMPT_TOKEN_BUDGET) -> str:
+    """
+    Shrinks the page text to the token budget, keeping the contact-related
+    parts.
+
+    Texts within the budget are returned unchanged. If nothing in the text
+    looks like a contact, the beginning of the text is kept.
+
+    Args:
+        text: Cleaned page text, one block per line.
+        token_budget: Size limit in tokens.
+    """
+    limit = token_budget * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+
+    lines = text.splitlines()
+    scores = [
+        0 if line.startswith(PAGE_HEADER_PREFIX) else line_score(line) for line in lines
+    ]
+
+    # Every line gets the score of the best match near it
+    priority = [0.0] * len(lines)
+    for index, score in enumerate(scores):
+        if not score:
+            continue
+        start = max(0, index - WINDOW_LINES)
+        end = min(len(lines), index + WINDOW_LINES + 1)
+        for near in range(start, end):
+            value = score - DISTANCE_PENALTY * abs(near - index)
+            if value > priority[near]:
+                priority[near] = value
+
+    if not any(priority):
+        return text[:limit]
+
+    # Best lines first, earlier lines first on ties; repeated context lines
+    # (menus, footers) only once
+    kept = set()
+    seen_lines = set()
+    used = 0
+    line_limit = limit * (1 - MARKER_RESERVE)
+    for index in sorted(
+        (i for i, p in enumerate(priority) if p > 0), key=lambda i: (-priority[i], i)
+    ):
+        line = lines[index]
+        if not scores[index] and line in seen_lines:
+            continue
+        cost = len(line) + 1
+        if used + cost > line_limit:
+            continue
+        kept.add(index)
+        seen_lines.add(line)
+        used += cost
+
+    return _join_kept(lines, kept)[:limit]
+
+
+def _join_kept(lines: List[str], kept: set) -> str:
+    """Kept lines in order, with a gap marker and the page header where needed."""
+    parts = []
+    header = None
+    previous = None
+    for index, line in enumerate(lines):
+        if line.startswith(PAGE_HEADER_PREFIX):
+            header = line
+            continue
+        if index not in kept:
+            continue
+        if header:
+            parts.append(header)
+            header = None
+        elif previous is not None and index != previous + 1:
+            parts.append(GAP_MARKER)
+        parts.append(line)
+        previous = index
+    return "\n".join(parts)
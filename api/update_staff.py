@@ -6,24 +6,54 @@ from flask import Flask
 import traceback
 import json
 from .config import load_config
-from .clients.notion_client import NotionClient
+from .gemini import model as gemini_model
+from .resilience import health_report
+from .profiling import profile_request, add_profile_debug
+from .job_queue import register_job_handler, submit_job
+from .job_routes import (
+    jobs_blueprint,
+    wants_async,
+    requested_priority,
+    job_accepted_response,
+)
 
 from .staff_update_services import (
     validate_config,
     extract_request_params,
-    normalize_website_url,
-    fetch_staff_data,
-    get_database_properties,
-    sync_staff_data,
+    wants_force_refresh,
+    requested_crawl_pages,
+    requested_source,
+    requested_regcode,
+    run_staff_update,
+    run_board_update,
     render_error_response,
-    render_warning_response,
-    render_success_response,
-    prepare_result_message,
+    render_staff_update_result,
 )
 
 # --- Flask App Initialization ---
 app = Flask(__name__)
+app.register_blueprint(jobs_blueprint)
+
+
+# --- Background Jobs ---
+
+
+def run_staff_update_job(payload, report_progress):
+    """Job handler: runs the staff update for the queued company."""
+    if payload.get("source") == "register":
+        return run_board_update(
+            payload.get("page_id"), payload.get("regcode"), report_progress
+        )
+    return run_staff_update(
+        payload["website_url"],
+        payload.get("page_id"),
+        report_progress,
+        force=payload.get("force", False),
+        crawl_pages=payload.get("crawl_pages", 0),
+    )
+
 
+register_job_handler("update_staff", run_staff_update_job)
 
 
 # --- API Endpoints ---
@@ -36,20 +66,27 @@ def update_staff():
 
     It loads configuration, extracts company page ID and website URL, runs Gemini to get staff information
     from the company website, creates staff member pages, and links them to the company via relation.
+    With source=register the current management board is taken from the business register instead.
 
     Expected request format:
-    - websiteUrl: The company website URL to search for staff information (required)
+    - websiteUrl: The company website URL to search for staff information (required unless source=register)
     - pageId: The company's Notion page ID - used to create the relation between staff members and the company (optional)
     - notionUrl: Optional redirect URL back to Notion page
+    - async: Optional; "1" queues the update as a background job and returns a job status page
+      (only with ASYNC_JOBS_ENABLED, otherwise the update runs in the request)
+    - force: Optional; "1" analyses the website even if the team page has not changed
+    - crawl: Optional; "1" also reads the next best ranked pages of the site (e.g. "Meist"),
+      a number sets how many pages to read in total
+    - source: Optional; "register" creates the contacts from the board members in the business register
+    - regcode: Optional; the registry code for source=register (otherwise read from the company page)
+    - profile: Optional; a signed token that profiles this request (see api/profiling.py)
     """
     notion_url = None
 
     try:
         # Validate configuration
         try:
-            api_key, database_id = validate_config()
-            config = load_config()
-            api_version = config.get("notion", {}).get("api_version")
+            validate_config()
         except ValueError as e:
             config = load_config()
             return render_error_response(
@@ -62,8 +99,19 @@ def update_staff():
         # Extract request parameters
         page_id, notion_url, website_url = extract_request_params()
 
+        source = requested_source()
+        regcode = requested_regcode()
+
         # Validate required parameters
-        if not website_url:
+        if source == "register":
+            if not page_id and not regcode:
+                return render_error_response(
+                    status="Viga",
+                    message="Kriitiline viga: Nõutud parameeter 'pageId' või 'regcode' puudub.",
+                    debug_info='Näide: {"pageId": "...", "source": "register"}',
+                    status_code=400,
+                )
+        elif not website_url:
             return render_error_response(
                 status="Viga",
                 message="Kriitiline viga: Nõutud parameeter 'websiteUrl' puudub. Palun sisesta ettevõtte veebilehe URL.",
@@ -71,52 +119,34 @@ def update_staff():
                 status_code=400,
             )
 
-        # Normalize website URL
-        website_url = normalize_website_url(website_url)
-
-        # Fetch staff data from website
-        staff_data, fetch_error = fetch_staff_data(website_url)
-
-        if fetch_error:
-            return render_error_response(
-                status="Viga",
-                message=fetch_error,
-                notion_url=notion_url,
-                debug_info=f"Website URL: {website_url}",
-                status_code=400,
-            )
-
-        if staff_data == []:
-            return render_warning_response(
-                message="⚠️ Veebilehelt ei leitud kontaktisikute infot. Veebileht ei pruugi sisaldada kontaktinfot määratud rollide jaoks (Tegevjuht, Personalijuht, Turundusjuht, Müügijuht või Üldine kontakt).",
-                notion_url=notion_url,
-                debug_info=f"Veebilehe URL: {website_url}",
+        if wants_async():
+            job_id = submit_job(
+                "update_staff",
+                {
+                    "source": source,
+                    "regcode": regcode,
+                    "website_url": website_url,
+                    "page_id": page_id,
+                    "notion_url": notion_url,
+                    "force": wants_force_refresh(),
+                    "crawl_pages": requested_crawl_pages(),
+                },
+                priority=requested_priority(),
             )
-
-        # Initialize Notion client
-        notion = NotionClient(api_key, database_id, api_version)
-
-        # Get database properties for type checking
-        page_properties = get_database_properties(notion)
-
-        # Create pages for all staff members
-        created_count, updated_count, failed_count, skipped_count, errors = sync_staff_data(
-            notion, staff_data, page_id, database_id, page_properties
-        )
-
-        # Prepare result messages
-        status_text, status_class, message, debug_info = prepare_result_message(
-            created_count, updated_count, failed_count, skipped_count, errors
-        )
-
-        # Render success response
-        return render_success_response(
-            status=status_text,
-            status_class=status_class,
-            message=message,
-            notion_url=notion_url,
-            debug_info=debug_info,
-        )
+            return job_accepted_response(job_id)
+
+        with profile_request("update-staff") as profile:
+            if source == "register":
+                result = run_board_update(page_id, regcode)
+            else:
+                result = run_staff_update(
+                    website_url,
+                    page_id,
+                    force=wants_force_refresh(),
+                    crawl_pages=requested_crawl_pages(),
+                )
+        result["debug_info"] = add_profile_debug(result.get("debug_info"), profile)
+        return render_staff_update_result(result, notion_url)
 
     except Exception as e:
         traceback.print_exc()
@@ -132,11 +162,14 @@ def update_staff():
 @app.route("/api/update-staff/health", methods=["GET"])
 def health_check():
     """
-    Simple health check endpoint to confirm the API is running.
+    Simple health check endpoint to confirm the API is running. Also
+    reports the bulkhead and circuit breaker state of every dependency.
     """
     return {
         "status": "ok",
         "message": "Kontaktisikute uuendamise API töötab",
+        "gemini_cache": gemini_model.stats(),
+        "dependencies": health_report(),
     }
 
 
@@ -0,0 +1,112 @@
+"""
+Benchmark of the text sent to the staff extraction prompt: the old blind
+truncation (first 30 000 characters) against relevance-focused compaction.
+
+For every saved sample page it reports the prompt text size, the compaction
+time and the recall of the expected names and e-mails in the text that would
+be sent. With --gemini, the compacted text is also sent to Gemini (response
+cache disabled) and the Gemini latency and the recall of the extracted names
+are reported.
+
+Usage (from the repository root):
+    python -m benchmarks.compaction_benchmark [--budget 4000] [--gemini]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api.text_compaction import (
+    CHARS_PER_TOKEN,
+    STAFF_PROMPT_TOKEN_BUDGET,
+    compact_text,
+)
+
+SAMPLES_DIR = Path(__file__).parent / "sample_pages"
+TRUNCATE_CHARS = 30000
+ROUNDS = 20
+
+
+def recall(text, expected):
+    found = sum(1 for value in expected if value.lower() in text.lower())
+    return found / len(expected) if expected else 1.0
+
+
+def bench_page(text, expected, budget):
+    wanted = expected["names"] + expected["emails"]
+    truncated = text[:TRUNCATE_CHARS]
+
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        compacted = compact_text(text, budget)
+    compact_ms = (time.perf_counter() - started) * 1000 / ROUNDS
+
+    return {
+        "page_chars": len(text),
+        "truncated_tokens": len(truncated) // CHARS_PER_TOKEN,
+        "truncated_recall": recall(truncated, wanted),
+        "compacted_tokens": len(compacted) // CHARS_PER_TOKEN,
+        "compacted_recall": recall(compacted, wanted),
+        "compact_ms": compact_ms,
+        "compacted": compacted,
+    }
+
+
+def bench_gemini(compacted, expected):
+    from api.gemini import extract_staff_from_text
+
+    started = time.perf_counter()
+    staff = extract_staff_from_text(compacted) or []
+    latency = time.perf_counter() - started
+    names = " ".join(str(person.get("name")) for person in staff)
+    return latency, recall(names, expected["names"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--budget", type=int, default=STAFF_PROMPT_TOKEN_BUDGET)
+    parser.add_argument("--gemini", action="store_true")
+    args = parser.parse_args()
+
+    if args.gemini:
+        # Fresh response cache, so every run really calls Gemini
+        from api import cache_store
+
+        cache_store.CACHE_DB_PATH = Path(tempfile.mkdtemp()) / "cache.sqlite3"
+
+    expected_all = json.loads((SAMPLES_DIR / "expected.json").read_text("utf-8"))
+    print(f"Token budget: {args.budget}\n")
+    header = f"{'page':<22}{'chars':>8}{'trunc tok':>11}{'recall':>8}{'compact tok':>13}{'recall':>8}{'ms':>8}"
+    print(header)
+    print("-" * len(header))
+
+    results = {}
+    for name, expected in expected_all.items():
+        text = (SAMPLES_DIR / name).read_text("utf-8")
+        result = bench_page(text, expected, args.budget)
+        results[name] = result
+        print(
+            f"{name:<22}{result['page_chars']:>8}"
+            f"{result['truncated_tokens']:>11}{result['truncated_recall']:>8.0%}"
+            f"{result['compacted_tokens']:>13}{result['compacted_recall']:>8.0%}"
+            f"{result['compact_ms']:>8.2f}"
+        )
+
+    if args.gemini:
+        if not os.getenv("GOOGLE_API_KEY"):
+            print("\nGOOGLE_API_KEY puudub, Gemini test jääb vahele.")
+            return
+        print(f"\n{'page':<22}{'latency s':>10}{'name recall':>13}")
+        for name, expected in expected_all.items():
+            latency, name_recall = bench_gemini(results[name]["compacted"], expected)
+            print(f"{name:<22}{latency:>10.2f}{name_recall:>13.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Benchmark of page fetching and HTML text/link extraction: the previous
+BeautifulSoup(html.parser) + multi-generator cleanup against html_extract.
+
+For every saved .html page in sample_pages it reports the text and link
+extraction time of both versions and whether they give the same output.
+The fetch part serves an oversized page from a local HTTP server and
+compares an unbounded requests.get() with the bounded CompanyWebsiteClient.
+
+Usage (from the repository root):
+    python -m benchmarks.html_extract_benchmark [--rounds 5]
+"""
+
+import argparse
+import sys
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import requests
+from bs4 import BeautifulSoup
+
+from api.clients.company_website_client import CompanyWebsiteClient
+from api.clients.html_extract import (
+    BS4_FEATURES,
+    FastHTMLParser,
+    MAX_PAGE_BYTES,
+    extract_links,
+    extract_text,
+)
+
+SAMPLES_DIR = Path(__file__).parent / "sample_pages"
+OVERSIZED_PAGE_BYTES = 20 * 1024 * 1024
+
+
+def old_text(html):
+    soup = BeautifulSoup(html, "html.parser")
+    for script_or_style in soup(["script", "style"]):
+        script_or_style.decompose()
+    text = soup.get_text()
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    return "\n".join(chunk for chunk in chunks if chunk)
+
+
+def old_links(html):
+    soup = BeautifulSoup(html, "html.parser")
+    return [(a.get_text(strip=True), a["href"]) for a in soup.find_all("a", href=True)]
+
+
+def timed(function, html, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        result = function(html)
+    return (time.perf_counter() - started) * 1000 / rounds, result
+
+
+def bench_extraction(rounds):
+    header = f"{'page':<22}{'KB':>6}{'old text':>10}{'new text':>10}{'same':>6}{'old links':>11}{'new links':>11}{'same':>6}"
+    print(header)
+    print("-" * len(header))
+    for path in sorted(SAMPLES_DIR.glob("*.html")):
+        html = path.read_text("utf-8")
+        old_text_ms, old_text_result = timed(old_text, html, rounds)
+        new_text_ms, new_text_result = timed(extract_text, html, rounds)
+        old_links_ms, old_links_result = timed(old_links, html, rounds)
+        new_links_ms, new_links_result = timed(extract_links, html, rounds)
+        print(
+            f"{path.name:<22}{len(html.encode()) // 1024:>6}"
+            f"{old_text_ms:>9.1f}ms{new_text_ms:>8.1f}ms"
+            f"{str(old_text_result == new_text_result):>6}"
+            f"{old_links_ms:>9.1f}ms{new_links_ms:>9.1f}ms"
+            f"{str(old_links_result == new_links_result):>6}"
+        )
+
+
+class OversizedPageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        chunk = b"<p>" + b"x" * 1017 + b"</p>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(OVERSIZED_PAGE_BYTES))
+        self.end_headers()
+        try:
+            for _ in range(OVERSIZED_PAGE_BYTES // len(chunk)):
+                self.wfile.write(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+def measure(function):
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = len(function())
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed_ms, size, peak
+
+
+def bench_fetch():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), OversizedPageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    try:
+        results = {
+            "requests.get().text": measure(lambda: requests.get(url, timeout=30).text),
+            "CompanyWebsiteClient": measure(
+                lambda: CompanyWebsiteClient().get_company_website(url, {}).text
+            ),
+        }
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print(
+        f"\nFetch of a {OVERSIZED_PAGE_BYTES // (1024 * 1024)} MB page (cap {MAX_PAGE_BYTES // 1024} KB)"
+    )
+    for name, (elapsed_ms, size, peak) in results.items():
+        print(
+            f"{name:<22}{elapsed_ms:>9.1f}ms{size // 1024:>8} KB text"
+            f"{peak // (1024 * 1024):>6} MB peak"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    backend = "selectolax" if FastHTMLParser is not None else "html.parser (streaming)"
+    print(f"Text/link backend: {backend}, soup parser: {BS4_FEATURES}\n")
+    bench_extraction(args.rounds)
+    bench_fetch()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Cold-import time of the API entry points (what a Vercel cold start pays
+before routing the first request).
+
+Every round imports the module in a fresh interpreter with
+`python -X importtime` and reads the cumulative time of the module. The
+median is reported together with the slowest imported modules of the last
+round. With --budget-ms the script exits with status 1 if a median is over
+the budget, so it can guard against heavy imports creeping back.
+
+Usage (from the repository root):
+    python -m benchmarks.import_time_benchmark [--rounds 5] [--top 8] [--budget-ms 600]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+MODULES = ("api.autofill", "api.update_staff")
+
+
+def import_times(module):
+    """{module name: (self µs, cumulative µs)} of one cold import."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = [part.strip() for part in line[len("import time:") :].split("|")]
+        if not parts[0].isdigit():
+            continue  # the header line
+        times[parts[2].strip()] = (int(parts[0]), int(parts[1]))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8)
+    parser.add_argument("--budget-ms", type=float)
+    args = parser.parse_args()
+
+    over_budget = []
+    for module in MODULES:
+        rounds = [import_times(module) for _ in range(args.rounds)]
+        cumulative = [times[module][1] / 1000 for times in rounds]
+        median = statistics.median(cumulative)
+        print(
+            f"{module}: median {median:.0f} ms "
+            f"(min {min(cumulative):.0f}, max {max(cumulative):.0f}, {args.rounds} rounds)"
+        )
+        slowest = sorted(rounds[-1].items(), key=lambda item: -item[1][0])
+        for name, (self_us, _) in slowest[: args.top]:
+            print(f"    {self_us / 1000:>7.1f} ms  {name}")
+        if args.budget_ms is not None and median > args.budget_ms:
+            over_budget.append(module)
+
+    if over_budget:
+        print(f"\nÜle {args.budget_ms:.0f} ms eelarve: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
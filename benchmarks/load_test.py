@@ -0,0 +1,391 @@
+"""
+Load test of /api/autofill and /api/update-staff against local stand-ins.
+
+The register dump, Notion, Google CSE, Gemini and the company websites are
+played by benchmarks.standins with configurable latency, rate limits and
+injected errors; the fake Notion databases store what the API writes. The
+Flask apps run in this process (the real code paths, caches in a temporary
+directory) and are driven at the given concurrency. Reported per endpoint:
+p50/p95/p99 latency, throughput and the outcome counts, then what every
+stand-in answered and the bulkhead/breaker state at the end.
+
+Company mix: 60% have a website in the register, 20% have one at the domain
+guessed from the name, 10% are found through Google CSE and 10% have none.
+
+Usage (from the repository root):
+    python -m benchmarks.load_test [--companies 100] [--requests 100]
+        [--concurrency 8] [--endpoints autofill,update-staff]
+        [--latency notion=150:800] [--rate-limit notion=3]
+        [--error-rate gemini=0.05] [--scale 1.0] [--structured-share 0.3]
+"""
+
+import argparse
+import contextlib
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlencode
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.standins import (
+    ARIREGISTER_HOST,
+    GOOGLE_HOST,
+    NOTION_HOST,
+    FakeGemini,
+    FakeGoogle,
+    FakeNotion,
+    FakeRegister,
+    FakeWebsites,
+    ServiceProfile,
+    StandInGenerativeModel,
+    StandInServer,
+)
+from benchmarks.synthetic_register import FIRST_REGCODE, company_record
+
+# (median ms, p99 ms) per service; Notion allows about 3 requests per second
+# per integration (the companies and the contacts keys count separately)
+DEFAULT_LATENCY = {
+    "notion": (150, 800),
+    "google_cse": (300, 1200),
+    "gemini": (1500, 6000),
+    "ariregister": (200, 1000),
+    "websites": (120, 1500),
+}
+DEFAULT_RATE_LIMIT = {"notion": 3.0, "google_cse": 10.0}
+
+COMPANIES_SCHEMA = {
+    "Nimi": "title",
+    "Registrikood": "number",
+    "Aadress": "rich_text",
+    "Maakond": "multi_select",
+    "E-post": "email",
+    "E-post 2": "email",
+    "Tel. nr": "phone_number",
+    "Veebileht": "url",
+    "LinkedIn": "url",
+    "Põhitegevus": "rich_text",
+    "Tegevusvaldkond": "multi_select",
+}
+CONTACTS_SCHEMA = {
+    "Name": "title",
+    "Amet": "rich_text",
+    "E-mail": "email",
+    "Tel. nr": "phone_number",
+    "Organisatsioon": "relation",
+}
+
+FIRST_NAMES = ("Mari", "Jaan", "Kati", "Peeter", "Liis", "Andres", "Kadri", "Toomas")
+LAST_NAMES = ("Tamm", "Saar", "Sepp", "Kask", "Kukk", "Ilves", "Rebane", "Lepp")
+ROLES = ("Tegevjuht", "Müügijuht", "Turundusjuht", "Projektijuht", "IT-juht")
+
+
+# --- Dataset ---
+
+
+def build_companies(count, structured_share, rng):
+    companies = []
+    for i in range(count):
+        name = f"Koormustest{i} OÜ"
+        domain = f"koormustest{i}.ee"
+        staff = []
+        for role in rng.sample(ROLES, rng.randint(2, 4)):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            staff.append(
+                {
+                    "name": f"{first} {last}",
+                    "role": role,
+                    "email": f"{first}.{last}@{domain}".lower(),
+                    "phone": f"+372 5{rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+                }
+            )
+        category = i % 10
+        companies.append(
+            {
+                "regcode": FIRST_REGCODE + i,
+                "name": name,
+                "domain": domain if category < 8 else f"kt{i}-grupp.ee",
+                # 0-5 in the register, 6-7 guessable, 8 via Google, 9 no website
+                "source": ("register", "guess", "google", None)[
+                    min(max(category - 5, 0), 3)
+                ],
+                "staff": staff,
+                "structured": rng.random() < structured_share,
+            }
+        )
+    return companies
+
+
+def register_record(company):
+    # A full synthetic record, with the name and contacts of the load test company
+    record = company_record(
+        company["regcode"] - FIRST_REGCODE, random.Random(company["regcode"])
+    )
+    contacts = [
+        {"liik": "EMAIL", "sisu": f"info.koormustest{company['regcode']}@gmail.com"},
+        {"liik": "TEL", "sisu": company["staff"][0]["phone"]},
+    ]
+    if company["source"] == "register":
+        contacts.append({"liik": "WWW", "sisu": f"http://{company['domain']}"})
+    record["ariregistri_kood"] = company["regcode"]
+    record["nimi"] = company["name"]
+    record["yldandmed"]["arinimed"][0]["sisu"] = company["name"]
+    record["yldandmed"]["sidevahendid"] = contacts
+    return record
+
+
+def site_pages(company):
+    people = []
+    for person in company["staff"]:
+        if company["structured"]:
+            people.append(
+                f"<div class='person'><h3>{person['name']}</h3><p>{person['role']}</p>"
+                f"<a href='mailto:{person['email']}'>{person['email']}</a>"
+                f"<a href='tel:{person['phone']}'>{person['phone']}</a></div>"
+            )
+        else:
+            people.append(
+                f"<div><h3>{person['name']}</h3><p>{person['role']}</p>"
+                f"<p>{person['email']}</p><p>{person['phone']}</p></div>"
+            )
+    return {
+        "/": (
+            f"<html><body><h1>{company['name']}</h1>"
+            f"<p>Registrikood {company['regcode']}</p>"
+            "<nav><a href='/tooted'>Tooted</a> <a href='/meeskond'>Meeskond</a></nav>"
+            "</body></html>"
+        ),
+        "/meeskond": (
+            f"<html><body><h1>Meeskond</h1>{''.join(people)}"
+            "<p>Kirjuta meile!</p></body></html>"
+        ),
+        "/tooted": "<html><body><h1>Tooted</h1><p>Tarkvara</p></body></html>",
+    }
+
+
+def google_results(company):
+    results = [f"https://www.teatmik.ee/et/personlegal/{company['regcode']}"]
+    if company["source"] == "google":
+        results.append(f"http://{company['domain']}/")
+    results.append(f"https://www.linkedin.com/company/koormustest{company['regcode']}")
+    return results
+
+
+# --- Measurement ---
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(q / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def outcome(endpoint, response):
+    body = response.get_data(as_text=True)
+    if response.status_code >= 400:
+        return f"http_{response.status_code}"
+    if endpoint == "autofill":
+        return "ok" if "Valmis" in body else "failed"
+    return "ok" if "Hoiatus" not in body and "Viga" not in body else "warning"
+
+
+def drive(apps, planned, concurrency):
+    """Sends the planned (endpoint, url) requests; returns [(endpoint, ms, outcome)]."""
+
+    def send(item):
+        endpoint, url = item
+        client = apps[endpoint].test_client()
+        started = time.perf_counter()
+        response = client.get(url)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        return endpoint, elapsed_ms, outcome(endpoint, response)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(send, planned))
+
+
+def report(results, wall_seconds):
+    header = f"{'endpoint':<14}{'n':>6}{'req/s':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  outcomes"
+    print(header)
+    print("-" * len(header))
+    for endpoint in sorted({r[0] for r in results}):
+        latencies = sorted(ms for e, ms, _ in results if e == endpoint)
+        outcomes = Counter(o for e, _, o in results if e == endpoint)
+        print(
+            f"{endpoint:<14}{len(latencies):>6}{len(latencies) / wall_seconds:>8.2f}"
+            f"{percentile(latencies, 50):>7.0f}ms{percentile(latencies, 95):>7.0f}ms"
+            f"{percentile(latencies, 99):>7.0f}ms{latencies[-1]:>7.0f}ms  "
+            + ", ".join(f"{k}={v}" for k, v in sorted(outcomes.items()))
+        )
+
+
+def parse_overrides(values, cast):
+    overrides = {}
+    for value in values or []:
+        service, _, setting = value.partition("=")
+        overrides[service] = cast(setting)
+    return overrides
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--companies", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=100, help="per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--endpoints", default="autofill,update-staff")
+    parser.add_argument(
+        "--latency", action="append", help="service=median_ms:p99_ms (repeatable)"
+    )
+    parser.add_argument("--rate-limit", action="append", help="service=requests/s")
+    parser.add_argument("--error-rate", action="append", help="service=fraction")
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="multiplies every latency"
+    )
+    parser.add_argument("--structured-share", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    latency = dict(DEFAULT_LATENCY)
+    latency.update(
+        parse_overrides(args.latency, lambda s: tuple(map(float, s.split(":"))))
+    )
+    rate_limits = dict(DEFAULT_RATE_LIMIT)
+    rate_limits.update(parse_overrides(args.rate_limit, float))
+    error_rates = parse_overrides(args.error_rate, float)
+    profiles = {
+        service: ServiceProfile(
+            median * args.scale,
+            p99 * args.scale,
+            rate_limit=rate_limits.get(service),
+            error_rate=error_rates.get(service, 0.0),
+        )
+        for service, (median, p99) in latency.items()
+    }
+
+    companies = build_companies(args.companies, args.structured_share, rng)
+    notion = FakeNotion()
+    companies_db = notion.add_database(COMPANIES_SCHEMA)
+    contacts_db = notion.add_database(CONTACTS_SCHEMA)
+    for company in companies:
+        company["page_id"] = notion.create_page(
+            companies_db,
+            {
+                "Nimi": {"title": [{"text": {"content": company["name"]}}]},
+                "Registrikood": {"number": company["regcode"]},
+            },
+        )["id"]
+    hosted = [c for c in companies if c["source"] is not None]
+    server = StandInServer(
+        notion,
+        FakeGoogle({c["name"]: google_results(c) for c in companies}),
+        FakeGemini({c["domain"]: c["staff"] for c in companies}),
+        FakeRegister([register_record(c) for c in companies]),
+        FakeWebsites({c["domain"]: site_pages(c) for c in hosted}),
+        profiles,
+        seed=args.seed,
+    ).start()
+
+    cache_dir = tempfile.mkdtemp(prefix="load_test_")
+    register_url = f"http://{ARIREGISTER_HOST}/ettevotja_rekvisiidid.json.zip"
+    os.environ.update(
+        {
+            "HTTP_PROXY": server.proxy_url,
+            "HTTPS_PROXY": server.proxy_url,
+            "http_proxy": server.proxy_url,
+            "https_proxy": server.proxy_url,
+            "NO_PROXY": "",
+            "no_proxy": "",
+            "NOTION_API_URL": f"http://{NOTION_HOST}/v1",
+            "GOOGLE_CSE_URL": f"http://{GOOGLE_HOST}/customsearch/v1",
+            "NOTION_API_KEY": "secret_load_test",
+            "NOTION_DATABASE_ID": companies_db,
+            "NOTION_API_KEY_CONTACTS": "secret_load_test_contacts",
+            "NOTION_DATABASE_ID_CONTACTS": contacts_db,
+            "ARIREGISTER_JSON_URL": register_url,
+            "GOOGLE_CSE_DAILY_QUOTA": "1000000",
+            "AUTOFILL_MEMO_SECONDS": "0",
+        }
+    )
+
+    # Imported only now: the modules read the settings above at import time
+    from api import cache_store, cse_scheduler, gemini, json_loader, resilience
+    from api.autofill import app as autofill_app
+    from api.update_staff import app as update_staff_app
+
+    json_loader.CACHE_DIR = cache_dir
+    json_loader.CACHE_FILE_PATH = os.path.join(cache_dir, "ariregister_data.zip")
+    cache_store.CACHE_DB_PATH = os.path.join(cache_dir, "cache.sqlite3")
+    cse_scheduler.CSE_DB_PATH = os.path.join(cache_dir, "google_cse.sqlite3")
+    gemini.model.model = StandInGenerativeModel()
+    if not args.verbose:
+        logging.disable(logging.CRITICAL)
+
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    planned = []
+    for n in range(args.requests):
+        if "autofill" in endpoints:
+            company = companies[n % len(companies)]
+            planned.append(
+                (
+                    "autofill",
+                    "/api/autofill?" + urlencode({"pageId": company["page_id"]}),
+                )
+            )
+        if "update-staff" in endpoints and hosted:
+            company = hosted[n % len(hosted)]
+            query = {
+                "websiteUrl": f"http://{company['domain']}",
+                "pageId": company["page_id"],
+            }
+            planned.append(("update-staff", "/api/update-staff?" + urlencode(query)))
+
+    print(
+        f"{len(companies)} companies, {len(planned)} requests, concurrency {args.concurrency}, "
+        f"latency scale {args.scale}"
+    )
+    # The register dump is downloaded once before the clock starts
+    json_loader.find_company_by_regcode(register_url, str(companies[0]["regcode"]))
+
+    apps = {"autofill": autofill_app, "update-staff": update_staff_app}
+    started = time.perf_counter()
+    output = sys.stdout if args.verbose else open(os.devnull, "w")
+    with contextlib.redirect_stdout(output):
+        results = drive(apps, planned, args.concurrency)
+    wall_seconds = time.perf_counter() - started
+    logging.disable(logging.NOTSET)
+    server.stop()
+
+    print(f"\nWall time {wall_seconds:.1f} s\n")
+    report(results, wall_seconds)
+
+    print(f"\n{'stand-in':<14}{'requests':>10}{'429':>7}{'503':>7}{'mean':>9}")
+    for service, stats in server.stats.items():
+        if stats["requests"]:
+            mean = stats["latency_ms"] / stats["requests"]
+            print(
+                f"{service:<14}{stats['requests']:>10}{stats['429']:>7}"
+                f"{stats['503']:>7}{mean:>7.0f}ms"
+            )
+    print(
+        f"\nNotion operations: {dict(notion.operations)}; "
+        f"contacts stored: {sum(1 for p in notion.pages.values() if p['parent']['database_id'] == contacts_db)}"
+    )
+
+    print("\nBulkheads and breakers:")
+    for name, state in resilience.health_report().items():
+        details = ", ".join(f"{k}={v}" for k, v in state.items() if v not in ({}, 0))
+        print(f"  {name:<12}{details}")
+
+
+if __name__ == "__main__":
+    main()
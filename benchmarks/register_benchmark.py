@@ -0,0 +1,263 @@
+"""
+Micro-benchmarks of the register code paths on synthetic dumps of
+production size.
+
+For every size a ZIP dump is generated with synthetic_register (kept in
+--data-dir and reused by later runs) and these stages are measured:
+- load_json: a full streaming scan for the last company of the dump, and
+  a lookup answered from the result cache,
+- find_company_by_regcode: a lookup of a company in the middle of the dump,
+- find_companies_by_regcodes: one pass for --batch random companies,
+- _build_properties_from_company, get_emtak_section_text and extract_text
+  (on a generated company page) for every record of the dump.
+
+Every stage reports its throughput and peak memory. The lookups run in a
+forked process each and report how much its peak RSS grew (tracemalloc
+would slow a scan down about 20 times). For the per-record functions the
+peak is the largest extra memory of a single call, measured with
+tracemalloc in a second pass over the first --memory-sample records.
+
+Usage (from the repository root):
+    python -m benchmarks.register_benchmark [--sizes 10000,100000,1000000] [--batch 100] [--memory-sample 10000]
+
+Dumps of a million companies take about 5 GB of JSON (0.4 GB zipped) and
+several minutes per scan.
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import itertools
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import ijson
+
+from api import json_loader
+from api.clients.html_extract import extract_text
+from api.sync import _build_properties_from_company, get_emtak_section_text
+from benchmarks.synthetic_register import FIRST_REGCODE, write_dump
+
+DUMP_URL = "https://avaandmed.ariregister.rik.ee/sites/default/files/avaandmed/ettevotja_rekvisiidid__yldandmed.json.zip"
+MB = 1024 * 1024
+
+
+def company_page(record):
+    """A company home page built from a register record, for extract_text."""
+    yldandmed = record["yldandmed"]
+    contacts = "".join(
+        f"<li>{item['liik_tekstina']}: <a href='#'>{item['sisu']}</a></li>"
+        for item in yldandmed["sidevahendid"]
+    )
+    activities = "".join(
+        f"<p>{item['emtak_tekstina']}</p>" for item in yldandmed["teatatud_tegevusalad"]
+    )
+    address = yldandmed["aadressid"][0]["aadress_ads__ads_normaliseeritud_taisaadress"]
+    return (
+        "<!DOCTYPE html><html><head><title>" + record["nimi"] + "</title>"
+        "<style>body{font-family:sans-serif} .menu li{display:inline}</style>"
+        "<script>window.dataLayer=window.dataLayer||[];function gtag(){}</script>"
+        "</head><body><nav><ul class='menu'><li>Avaleht</li><li>Teenused</li>"
+        "<li>Meeskond</li><li>Kontakt</li></ul></nav><main>"
+        f"<h1>{record['nimi']}</h1>{activities}"
+        f"<section><h2>Kontakt</h2><p>{address}</p><ul>{contacts}</ul></section>"
+        "</main><footer>&copy; 2025 " + record["nimi"] + "  |  Kõik õigused kaitstud"
+        "</footer></body></html>"
+    )
+
+
+def dump_records(dump_path):
+    with zipfile.ZipFile(dump_path) as z:
+        with z.open(z.namelist()[0]) as f:
+            yield from ijson.items(f, "item")
+
+
+def clear_result_cache():
+    for path in glob.glob(os.path.join(json_loader.CACHE_DIR, "cache_*.json")):
+        os.remove(path)
+
+
+def scan(function, *args):
+    """A lookup that has to read the dump: result cache emptied, ZIP cache fresh."""
+
+    def run():
+        clear_result_cache()
+        os.utime(json_loader.CACHE_FILE_PATH)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return function(DUMP_URL, *args)
+
+    return run
+
+
+def per_record_pass(dump_path, measure_memory, limit=None):
+    """
+    Times the per-record functions over every record of the dump (or the
+    first `limit` records).
+
+    Returns:
+        {stage: [calls, seconds, largest extra memory of one call]}.
+    """
+    stages = {
+        "_build_properties_from_company": [0, 0.0, 0],
+        "get_emtak_section_text": [0, 0.0, 0],
+        "extract_text": [0, 0.0, 0],
+    }
+
+    def timed(stage, function, *args):
+        if measure_memory:
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        started = time.perf_counter()
+        function(*args)
+        elapsed = time.perf_counter() - started
+        totals = stages[stage]
+        totals[0] += 1
+        totals[1] += elapsed
+        if measure_memory:
+            totals[2] = max(totals[2], tracemalloc.get_traced_memory()[1] - before)
+
+    for record in itertools.islice(dump_records(dump_path), limit):
+        code = str(record["ariregistri_kood"])
+        timed(
+            "_build_properties_from_company",
+            _build_properties_from_company,
+            record,
+            code,
+            record["nimi"],
+        )
+        for activity in record["yldandmed"]["teatatud_tegevusalad"]:
+            timed(
+                "get_emtak_section_text", get_emtak_section_text, activity["emtak_kood"]
+            )
+        timed("extract_text", extract_text, company_page(record))
+    return stages
+
+
+def isolated(run):
+    """
+    Runs `run` in a forked process.
+
+    Returns:
+        (seconds, growth of the peak RSS in bytes, the result of `run`).
+    """
+    reader, writer = multiprocessing.Pipe(duplex=False)
+
+    def child():
+        before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        started = time.perf_counter()
+        result = run()
+        seconds = time.perf_counter() - started
+        # ru_maxrss is in kilobytes on Linux
+        growth = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before) * 1024
+        writer.send((seconds, growth, result))
+
+    process = multiprocessing.get_context("fork").Process(target=child)
+    process.start()
+    outcome = reader.recv()
+    process.join()
+    return outcome
+
+
+def print_row(stage, items, seconds, peak, megabytes=None):
+    rate = f"{items / seconds:>12,.0f}/s" if seconds else f"{'-':>14}"
+    throughput = (
+        f"{megabytes / seconds:>8.1f} MB/s" if megabytes and seconds else f"{'':>13}"
+    )
+    memory = f"{peak / MB:>9.2f} MB"
+    print(f"  {stage:<34}{items:>10,}{seconds:>10.3f} s{rate}{throughput}{memory}")
+
+
+def bench_size(size, args):
+    dump_path = Path(args.data_dir) / f"ariregister_{size}_{args.seed}.zip"
+    if not dump_path.exists():
+        started = time.perf_counter()
+        write_dump(dump_path, size, "zip", args.seed)
+        print(f"Genereeritud {dump_path} ({time.perf_counter() - started:.1f} s)")
+    with zipfile.ZipFile(dump_path) as z:
+        json_mb = z.infolist()[0].file_size / MB
+    print(
+        f"\n{size:,} ettevõtet: ZIP {dump_path.stat().st_size / MB:.1f} MB, "
+        f"JSON {json_mb:.1f} MB"
+    )
+    print(
+        f"  {'stage':<34}{'items':>10}{'time':>12}{'throughput':>14}{'':>13}{'peak':>12}"
+    )
+
+    json_loader.CACHE_DIR = tempfile.mkdtemp(prefix="register_benchmark_")
+    json_loader.CACHE_FILE_PATH = str(dump_path)
+
+    rng = random.Random(args.seed)
+    last = str(FIRST_REGCODE + size - 1)
+    middle = str(FIRST_REGCODE + size // 2)
+    batch = [
+        str(FIRST_REGCODE + i) for i in rng.sample(range(size), min(args.batch, size))
+    ]
+
+    def cached_lookups():
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(args.cached_rounds):
+                json_loader.load_json(DUMP_URL, last)
+
+    lookups = (
+        # (stage, run, items, MB read from the dump)
+        ("load_json (full scan)", scan(json_loader.load_json, last), size, json_mb),
+        ("load_json (result cache)", cached_lookups, args.cached_rounds, None),
+        (
+            "find_company_by_regcode (middle)",
+            scan(json_loader.find_company_by_regcode, middle),
+            size // 2 + 1,
+            json_mb / 2,
+        ),
+        (
+            f"find_companies_by_regcodes ({len(batch)})",
+            scan(json_loader.find_companies_by_regcodes, batch),
+            size,
+            json_mb,
+        ),
+    )
+    for stage, run, items, megabytes in lookups:
+        seconds, peak, found = isolated(run)
+        if stage.startswith("find_companies"):
+            assert len(found) == len(batch), "kõik ettevõtted peavad leiduma"
+        print_row(stage, items, seconds, peak, megabytes)
+
+    stages = per_record_pass(dump_path, False)
+    tracemalloc.start()
+    try:
+        peaks = per_record_pass(dump_path, True, args.memory_sample)
+    finally:
+        tracemalloc.stop()
+    for stage, (calls, seconds, _) in stages.items():
+        print_row(stage, calls, seconds, peaks[stage][2])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--batch", type=int, default=100)
+    parser.add_argument("--cached-rounds", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--data-dir", default=os.path.join(tempfile.gettempdir(), "register_benchmark")
+    )
+    parser.add_argument("--memory-sample", type=int, default=10000)
+    args = parser.parse_args()
+
+    print(f"ijson backend: {ijson.backend}")
+    for size in (int(value) for value in args.sizes.split(",")):
+        bench_size(size, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,533 @@
+"""
+Local HTTP stand-ins for the services the API talks to, for load tests.
+
+One threaded HTTP server plays every service. The clients reach it as an
+HTTP proxy (HTTP_PROXY/HTTPS_PROXY), so the request's host picks the service:
+
+- api.notion.test          fake Notion API with databases that store pages
+                           (create, get, update, filtered and paginated query)
+- customsearch.googleapis.test   Google Custom Search
+- gemini.test              text generation (see StandInGenerativeModel)
+- avaandmed.ariregister.test     the register ZIP dump
+- any other host           a company website from the dataset, or 404
+
+Every service has a ServiceProfile: a log-normal latency distribution
+(median and p99), a token-bucket rate limit answered with 429, and an error
+rate answered with 503. HTTPS requests (CONNECT) are refused, the way a
+site without TLS would fail.
+"""
+
+import io
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+import zipfile
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+NOTION_HOST = "api.notion.test"
+GOOGLE_HOST = "customsearch.googleapis.test"
+GEMINI_HOST = "gemini.test"
+ARIREGISTER_HOST = "avaandmed.ariregister.test"
+
+# 99th percentile of the standard normal distribution
+Z_99 = 2.3263
+
+
+class ServiceProfile:
+    """Latency, rate limit and injected errors of one stand-in service."""
+
+    def __init__(
+        self,
+        median_ms: float = 50.0,
+        p99_ms: float = 200.0,
+        rate_limit: Optional[float] = None,
+        burst: Optional[float] = None,
+        error_rate: float = 0.0,
+    ):
+        self.median_ms = median_ms
+        self.p99_ms = max(p99_ms, median_ms)
+        self.rate_limit = rate_limit
+        self.burst = burst or (max(1.0, 2 * rate_limit) if rate_limit else None)
+        self.error_rate = error_rate
+        # One token bucket per API key, like Notion's per-integration limit
+        self._buckets: Dict[Optional[str], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def sample_delay(self, rng: random.Random) -> float:
+        """Seconds of latency, log-normal with the configured median and p99."""
+        if self.median_ms <= 0:
+            return 0.0
+        sigma = math.log(self.p99_ms / self.median_ms) / Z_99
+        return rng.lognormvariate(math.log(self.median_ms), sigma) / 1000
+
+    def take_token(self, key: Optional[str] = None) -> bool:
+        """False if the request is over the rate limit of its key."""
+        if not self.rate_limit:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._buckets.setdefault(key, [self.burst, now])
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate_limit)
+            bucket[1] = now
+            if bucket[0] < 1:
+                return False
+            bucket[0] -= 1
+            return True
+
+
+Response = Tuple[int, Dict[str, str], bytes]
+
+
+def json_response(status: int, data: Any) -> Response:
+    return status, {"Content-Type": "application/json"}, json.dumps(data).encode()
+
+
+# --- Notion ---
+
+
+def _plain_text(items: List[dict]) -> str:
+    return "".join(item.get("plain_text", "") for item in items or [])
+
+
+def _read_value(kind: str, value: Any) -> Any:
+    """Converts a written property value to the shape Notion returns."""
+    if kind in ("title", "rich_text"):
+        return [
+            {
+                "type": "text",
+                "text": {"content": item["text"]["content"]},
+                "plain_text": item["text"]["content"],
+            }
+            for item in value or []
+        ]
+    if kind == "relation":
+        return [{"id": item["id"]} for item in value or []]
+    return value
+
+
+def _comparable(prop: dict) -> Any:
+    kind = prop.get("type")
+    value = prop.get(kind)
+    if kind in ("title", "rich_text"):
+        return _plain_text(value)
+    if kind == "relation":
+        return [item["id"].replace("-", "") for item in value or []]
+    if kind == "multi_select":
+        return [item["name"] for item in value or []]
+    if kind == "select":
+        return value["name"] if value else None
+    return value
+
+
+def _condition_matches(value: Any, operator: str, argument: Any) -> bool:
+    if operator == "is_empty":
+        return value in (None, "", [])
+    if operator == "is_not_empty":
+        return value not in (None, "", [])
+    if isinstance(value, list):
+        found = argument in value
+        return {"contains": found, "does_not_contain": not found}.get(operator, False)
+    if operator == "equals":
+        return value == argument
+    if operator == "does_not_equal":
+        return value != argument
+    if value is None:
+        return False
+    if operator == "contains":
+        return str(argument).lower() in str(value).lower()
+    if operator == "does_not_contain":
+        return str(argument).lower() not in str(value).lower()
+    if operator == "starts_with":
+        return str(value).lower().startswith(str(argument).lower())
+    if operator == "greater_than":
+        return value > argument
+    if operator == "less_than":
+        return value < argument
+    raise ValueError(f"unsupported filter operator: {operator}")
+
+
+def filter_matches(page: dict, query_filter: Optional[dict]) -> bool:
+    """Evaluates a Notion database query filter against a stored page."""
+    if not query_filter:
+        return True
+    if "and" in query_filter:
+        return all(filter_matches(page, f) for f in query_filter["and"])
+    if "or" in query_filter:
+        return any(filter_matches(page, f) for f in query_filter["or"])
+    prop = page["properties"].get(query_filter["property"], {})
+    kind = next(key for key in query_filter if key != "property")
+    operator, argument = next(iter(query_filter[kind].items()))
+    if kind == "relation" and isinstance(argument, str):
+        argument = argument.replace("-", "")
+    return _condition_matches(_comparable(prop), operator, argument)
+
+
+class FakeNotion:
+    """
+    In-memory Notion databases. Writes are checked against the database
+    schema (unknown properties and wrong types give 400 like the real API),
+    archived pages are left out of queries, and queries are paginated.
+    """
+
+    def __init__(self):
+        self.databases: Dict[str, Dict[str, Any]] = {}
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        self.operations: Counter = Counter()
+        self._lock = threading.RLock()
+
+    def add_database(self, schema: Dict[str, str]) -> str:
+        """Creates a database with {property name: type} and returns its id."""
+        database_id = str(uuid.uuid4())
+        self.databases[database_id] = {
+            "id": database_id,
+            "object": "database",
+            "properties": {
+                name: {"id": name, "name": name, "type": kind, kind: {}}
+                for name, kind in schema.items()
+            },
+        }
+        return database_id
+
+    def _properties(self, database_id: str, written: dict) -> Dict[str, dict]:
+        schema = self.databases[database_id]["properties"]
+        properties = {}
+        for name, value in written.items():
+            if name not in schema:
+                raise ValueError(f"{name} is not a property that exists.")
+            kind = schema[name]["type"]
+            if kind not in value:
+                raise ValueError(f"{name} is expected to be {kind}.")
+            properties[name] = {
+                "id": name,
+                "type": kind,
+                kind: _read_value(kind, value[kind]),
+            }
+        return properties
+
+    def create_page(self, database_id: str, properties: dict) -> dict:
+        with self._lock:
+            page = {
+                "object": "page",
+                "id": str(uuid.uuid4()),
+                "parent": {"type": "database_id", "database_id": database_id},
+                "archived": False,
+                "properties": self._properties(database_id, properties),
+            }
+            self.pages[page["id"].replace("-", "")] = page
+            return page
+
+    def _page(self, page_id: str) -> Optional[dict]:
+        return self.pages.get(page_id.replace("-", "").lower())
+
+    def _query(self, database_id: str, body: dict) -> dict:
+        matches = [
+            page
+            for page in self.pages.values()
+            if page["parent"]["database_id"] == database_id
+            and not page["archived"]
+            and filter_matches(page, body.get("filter"))
+        ]
+        start = int(body.get("start_cursor") or 0)
+        size = min(int(body.get("page_size") or 100), 100)
+        end = start + size
+        return {
+            "object": "list",
+            "results": matches[start:end],
+            "has_more": end < len(matches),
+            "next_cursor": str(end) if end < len(matches) else None,
+        }
+
+    def handle(self, method: str, path: str, query: dict, body: Any) -> Response:
+        parts = [part for part in path.split("/") if part][1:]  # without "v1"
+        try:
+            with self._lock:
+                if parts == ["pages"] and method == "POST":
+                    self.operations["create"] += 1
+                    database_id = body["parent"]["database_id"]
+                    if database_id not in self.databases:
+                        return self._not_found(database_id)
+                    return json_response(
+                        200, self.create_page(database_id, body["properties"])
+                    )
+                if len(parts) == 2 and parts[0] == "pages":
+                    page = self._page(parts[1])
+                    if page is None:
+                        return self._not_found(parts[1])
+                    if method == "GET":
+                        self.operations["get"] += 1
+                    elif method == "PATCH":
+                        self.operations["update"] += 1
+                        database_id = page["parent"]["database_id"]
+                        page["properties"].update(
+                            self._properties(database_id, body.get("properties", {}))
+                        )
+                        if "archived" in body:
+                            page["archived"] = bool(body["archived"])
+                    return json_response(200, page)
+                if parts and parts[0] == "databases" and len(parts) >= 2:
+                    database = self.databases.get(parts[1])
+                    if database is None:
+                        return self._not_found(parts[1])
+                    if len(parts) == 3 and parts[2] == "query" and method == "POST":
+                        self.operations["query"] += 1
+                        return json_response(200, self._query(parts[1], body or {}))
+                    if len(parts) == 2 and method == "GET":
+                        return json_response(200, database)
+        except (KeyError, ValueError, TypeError) as e:
+            return json_response(
+                400,
+                {
+                    "object": "error",
+                    "status": 400,
+                    "code": "validation_error",
+                    "message": str(e),
+                },
+            )
+        return json_response(
+            400, {"object": "error", "status": 400, "code": "invalid_request_url"}
+        )
+
+    @staticmethod
+    def _not_found(object_id: str) -> Response:
+        return json_response(
+            404,
+            {
+                "object": "error",
+                "status": 404,
+                "code": "object_not_found",
+                "message": f"Could not find object with ID: {object_id}.",
+            },
+        )
+
+
+# --- Google, Gemini, register, websites ---
+
+
+class FakeGoogle:
+    """Answers CSE queries from a {company name: [result URLs]} table."""
+
+    def __init__(self, results: Dict[str, List[str]]):
+        self.results = {name.lower(): urls for name, urls in results.items()}
+
+    def handle(self, method: str, path: str, query: dict, body: Any) -> Response:
+        q = (query.get("q") or [""])[0].lower().replace(" official website", "")
+        items = [
+            {"link": url, "title": url, "snippet": ""}
+            for url in self.results.get(q.strip(), [])
+        ]
+        return json_response(200, {"kind": "customsearch#search", "items": items})
+
+
+EMAIL_RE = re.compile(r"[\w.+-]+@([\w-]+(?:\.[\w-]+)+)")
+URL_LINE_RE = re.compile(r"https?://\S+")
+
+
+class FakeGemini:
+    """
+    Answers the two staff search prompts: a link choice (the first team page
+    link, or NONE) and the staff extraction (the staff of the site whose
+    e-mail domain appears in the text).
+    """
+
+    def __init__(self, staff_by_domain: Dict[str, List[dict]]):
+        self.staff_by_domain = staff_by_domain
+
+    def answer(self, prompt: str) -> str:
+        if "TEXT CONTENT" in prompt:
+            for domain in EMAIL_RE.findall(prompt):
+                staff = self.staff_by_domain.get(domain.lower())
+                if staff is not None:
+                    return json.dumps(staff, ensure_ascii=False)
+            return "[]"
+        for url in URL_LINE_RE.findall(prompt):
+            if "meeskond" in url or "team" in url:
+                return url
+        return "NONE"
+
+    def handle(self, method: str, path: str, query: dict, body: Any) -> Response:
+        return json_response(200, {"text": self.answer((body or {}).get("prompt", ""))})
+
+
+class FakeRegister:
+    """Serves the register dump (a ZIP with one JSON array) built from records."""
+
+    def __init__(self, records: List[dict]):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr(
+                "ettevotja_rekvisiidid.json", json.dumps(records, ensure_ascii=False)
+            )
+        self.body = buffer.getvalue()
+
+    def handle(self, method: str, path: str, query: dict, body: Any) -> Response:
+        return 200, {"Content-Type": "application/zip"}, self.body
+
+
+class FakeWebsites:
+    """Company websites: {host: {path: html}}; www. and apex are the same site."""
+
+    def __init__(self, sites: Dict[str, Dict[str, str]]):
+        self.sites = sites
+
+    def handle_host(self, host: str, path: str) -> Response:
+        host = host[4:] if host.startswith("www.") else host
+        pages = self.sites.get(host)
+        html = pages.get(path.rstrip("/") or "/") if pages else None
+        if html is None:
+            return 404, {"Content-Type": "text/html"}, b"<h1>404</h1>"
+        return 200, {"Content-Type": "text/html; charset=utf-8"}, html.encode("utf-8")
+
+
+# --- The server ---
+
+
+class StandInServer:
+    """Starts the stand-ins on 127.0.0.1 and counts what they answered."""
+
+    def __init__(
+        self,
+        notion: FakeNotion,
+        google: FakeGoogle,
+        gemini: FakeGemini,
+        register: FakeRegister,
+        websites: FakeWebsites,
+        profiles: Dict[str, ServiceProfile],
+        seed: int = 0,
+    ):
+        self.services = {
+            NOTION_HOST: ("notion", notion),
+            GOOGLE_HOST: ("google_cse", google),
+            GEMINI_HOST: ("gemini", gemini),
+            ARIREGISTER_HOST: ("ariregister", register),
+        }
+        self.websites = websites
+        self.profiles = profiles
+        self.stats: Dict[str, Counter] = {
+            name: Counter() for name in ("notion", "google_cse", "gemini")
+        }
+        self.stats.update(ariregister=Counter(), websites=Counter())
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+
+    @property
+    def proxy_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self) -> "StandInServer":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _answer(
+        self, method: str, url: str, body: Optional[bytes], api_key: Optional[str]
+    ) -> Response:
+        parsed = urlsplit(url)
+        host = (parsed.hostname or "").lower()
+        name, service = self.services.get(host, ("websites", None))
+        profile = self.profiles.get(name) or ServiceProfile(median_ms=0)
+        with self._lock:
+            delay = profile.sample_delay(self._rng)
+            fail = self._rng.random() < profile.error_rate
+        stats = self.stats[name]
+
+        throttled = not profile.take_token(api_key)
+        time.sleep(delay)
+        with self._lock:
+            stats["requests"] += 1
+            stats["latency_ms"] += delay * 1000
+            if throttled:
+                stats["429"] += 1
+            elif fail:
+                stats["503"] += 1
+        if throttled:
+            status, headers, data = json_response(
+                429, {"object": "error", "status": 429, "code": "rate_limited"}
+            )
+            headers["Retry-After"] = "1"
+            return status, headers, data
+        if fail:
+            return json_response(
+                503, {"object": "error", "status": 503, "code": "service_unavailable"}
+            )
+
+        if service is None:
+            return self.websites.handle_host(host, parsed.path)
+        payload = json.loads(body) if body else None
+        return service.handle(method, parsed.path, parse_qs(parsed.query), payload)
+
+    def _handler_class(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _serve(self, method, send_body=True):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else None
+                url = self.path
+                if not url.startswith("http"):
+                    url = f"http://{self.headers.get('Host', '')}{url}"
+                api_key = self.headers.get("Authorization")
+                status, headers, data = stand_in._answer(method, url, body, api_key)
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(data)
+
+            def do_GET(self):
+                self._serve("GET")
+
+            def do_HEAD(self):
+                self._serve("GET", send_body=False)
+
+            def do_POST(self):
+                self._serve("POST")
+
+            def do_PATCH(self):
+                self._serve("PATCH")
+
+            def do_CONNECT(self):
+                self.send_error(501, "HTTPS is not served by the stand-ins")
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+class StandInGenerativeModel:
+    """
+    Replaces the Gemini SDK model: sends the prompt to the Gemini stand-in
+    over HTTP, through the same bulkhead and circuit breaker.
+    """
+
+    def __init__(self, url: str = f"http://{GEMINI_HOST}/generate", timeout=60):
+        self.url = url
+        self.timeout = timeout
+
+    def generate_content(self, prompt: str):
+        from api.gemini import CachedResponse
+        from api.resilience import gemini as gemini_dependency
+
+        response = gemini_dependency.call(
+            requests.post, self.url, json={"prompt": prompt}, timeout=self.timeout
+        )
+        response.raise_for_status()
+        return CachedResponse(response.json()["text"])
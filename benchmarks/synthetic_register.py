@@ -0,0 +1,480 @@
+"""
+Synthetic Äriregister dumps of any size, for benchmarks and load tests.
+
+The records have the shape of the open-data JSON dump (registry code, name
+and the nested `yldandmed`: statuses, business names, addresses, legal
+forms, capital, contacts, EMTAK activities and annual report summaries).
+The same companies can also be written as the semicolon-separated CSV
+(`ettevotja_rekvisiidid`) read by csv_loader. Output is streamed, so dumps
+of a million companies do not have to fit in memory. The same seed always
+gives the same dump; company i has the registry code FIRST_REGCODE + i.
+
+Usage (from the repository root):
+    python -m benchmarks.synthetic_register --companies 100000 --output /tmp/ariregister_100k.zip
+    python -m benchmarks.synthetic_register --companies 10000 --format csv --output /tmp/rekvisiidid.csv
+"""
+
+import argparse
+import csv
+import io
+import json
+import random
+import time
+import zipfile
+from pathlib import Path
+
+FIRST_REGCODE = 10000000
+JSON_MEMBER_NAME = "ettevotja_rekvisiidid__yldandmed.json"
+FORMATS = ("zip", "json", "csv")
+
+CSV_COLUMNS = (
+    "nimi",
+    "ariregistri_kood",
+    "ettevotja_oiguslik_vorm",
+    "ettevotja_oigusliku_vormi_alaliik",
+    "kmkr_nr",
+    "ettevotja_staatus",
+    "ettevotja_staatus_tekstina",
+    "ettevotja_esmakande_kpv",
+    "ettevotja_aadress",
+    "asukoht_ettevotja_aadressis",
+    "asukoha_ehak_kood",
+    "asukoha_ehak_tekstina",
+    "indeks_ettevotja_aadressis",
+    "ads_adr_id",
+    "ads_ads_oid",
+    "ads_normaliseeritud_taisaadress",
+    "teabesysteemi_link",
+)
+
+NAME_WORDS = (
+    "Põhja",
+    "Lõuna",
+    "Balti",
+    "Kalevi",
+    "Meri",
+    "Tamme",
+    "Kase",
+    "Järve",
+    "Vilja",
+    "Kivi",
+    "Valge",
+    "Päikese",
+    "Linnu",
+    "Metsa",
+    "Raba",
+    "Laine",
+)
+NAME_SUFFIXES = (
+    "Ehitus",
+    "Tarkvara",
+    "Logistika",
+    "Konsult",
+    "Kaubandus",
+    "Disain",
+    "Invest",
+    "Teenused",
+    "Puit",
+    "Energia",
+    "Meedia",
+    "Tehnika",
+)
+LEGAL_FORMS = (
+    # (code, number, text, share of the companies)
+    ("OÜ", 5, "Osaühing", 0.86),
+    ("AS", 4, "Aktsiaselts", 0.04),
+    ("FIE", 1, "Füüsilisest isikust ettevõtja", 0.06),
+    ("MTÜ", 9, "Mittetulundusühing", 0.04),
+)
+STATUSES = (
+    ("R", "Registrisse kantud", 0.9),
+    ("L", "Likvideerimisel", 0.04),
+    ("N", "Pankrotis", 0.02),
+    ("K", "Kustutatud", 0.04),
+)
+# (county, city, court region number, court region, EHAK code, postcode prefix)
+LOCATIONS = (
+    ("Harju maakond", "Tallinn", 1, "Tallinn", "0784", "1"),
+    ("Harju maakond", "Maardu linn", 1, "Tallinn", "0446", "74"),
+    ("Tartu maakond", "Tartu linn", 2, "Tartu", "0793", "5"),
+    ("Pärnu maakond", "Pärnu linn", 3, "Pärnu", "0624", "80"),
+    ("Ida-Viru maakond", "Narva linn", 4, "Jõhvi", "0511", "20"),
+    ("Lääne-Viru maakond", "Rakvere linn", 4, "Jõhvi", "0663", "44"),
+    ("Viljandi maakond", "Viljandi linn", 3, "Pärnu", "0899", "71"),
+    ("Saare maakond", "Saaremaa vald", 3, "Pärnu", "0714", "93"),
+)
+TALLINN_DISTRICTS = ("Kesklinna linnaosa", "Kristiine linnaosa", "Mustamäe linnaosa")
+STREETS = (
+    "Narva mnt",
+    "Pärnu mnt",
+    "Tartu mnt",
+    "Riia tn",
+    "Kalda tee",
+    "Pikk tn",
+    "Tööstuse tn",
+    "Ringtee",
+    "Kooli tn",
+    "Aia tn",
+    "Jaama tn",
+    "Lossi tn",
+)
+EMTAK_ACTIVITIES = (
+    ("01111", "Teravilja (v.a riis), kaunvilja ja õliseemnete kasvatamine"),
+    ("02201", "Metsavarumine"),
+    ("10711", "Leiva ja saia tootmine"),
+    ("16231", "Puitehitusdetailide ja puittoodete tootmine"),
+    ("25621", "Metallitöötlus"),
+    ("33121", "Masinate remont"),
+    ("35111", "Elektrienergia tootmine"),
+    ("41201", "Elamute ja mitteeluhoonete ehitus"),
+    ("43321", "Ehituspuusepatööd"),
+    ("45201", "Mootorsõidukite hooldus ja remont"),
+    ("46901", "Spetsialiseerimata hulgikaubandus"),
+    ("47911", "Jaemüük posti või Interneti teel"),
+    ("49411", "Maanteekaubavedu"),
+    ("55101", "Hotellide tegevus"),
+    ("56101", "Restoranide tegevus"),
+    ("62011", "Programmeerimine"),
+    ("62101", "Programmeerimine"),
+    ("62021", "Arvutialased konsultatsioonid"),
+    ("63111", "Andmetöötlus, veebihostimine ja seotud tegevused"),
+    ("68201", "Enda või renditud kinnisvara üürileandmine ja käitus"),
+    ("69201", "Raamatupidamine, finantsaruandlus ja auditeerimine"),
+    ("70221", "Ärinõustamine ja muu juhtimisalane nõustamine"),
+    ("71121", "Ehitusprojektide koostamine"),
+    ("73111", "Reklaamiagentuuride tegevus"),
+    ("74101", "Disainerite tegevus"),
+    ("81211", "Hoonete üldpuhastus"),
+    ("85591", "Täienduskoolitus"),
+    ("86231", "Hambaravi"),
+    ("93131", "Spordiklubide tegevus"),
+    ("96021", "Juuksuri- ja iluteenindus"),
+)
+
+
+def _weighted(rng, options):
+    """Picks one option; the last element of every option is its weight."""
+    pick = rng.random()
+    for option in options:
+        pick -= option[-1]
+        if pick <= 0:
+            return option
+    return options[-1]
+
+
+def _date(rng, first_year, last_year=2025):
+    return f"{rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.{rng.randint(first_year, last_year)}"
+
+
+def _entry(kirje_id, region, kande_nr):
+    return {
+        "kirje_id": kirje_id,
+        "kaardi_piirkond": region,
+        "kaardi_nr": 1,
+        "kaardi_tyyp": "R",
+        "kande_nr": kande_nr,
+    }
+
+
+def _address(rng, location, kirje_id, registered):
+    county, city, region, _, ehak, postcode_prefix = location
+    street = f"{rng.choice(STREETS)} {rng.randint(1, 120)}"
+    if rng.random() < 0.3:
+        street += f"-{rng.randint(1, 60)}"
+    district = rng.choice(TALLINN_DISTRICTS) if city == "Tallinn" else city
+    digits = 5 - len(postcode_prefix)
+    postcode = postcode_prefix + str(rng.randrange(10**digits)).zfill(digits)
+    return {
+        **_entry(kirje_id, region, rng.randint(1, 9)),
+        "riik": "EST",
+        "riik_tekstina": "Eesti",
+        "ehak": ehak,
+        "ehak_nimetus": f"{district}, {city}, {county}",
+        "tanav_maja_korter": street,
+        "aadress_ads__ads_oid": f"EE{rng.randint(0, 99999999):08d}",
+        "aadress_ads__adr_id": rng.randint(1000000, 9999999),
+        "aadress_ads__ads_normaliseeritud_taisaadress": f"{county}, {city}, {district}, {street}",
+        "aadress_ads__ads_normaliseeritud_taisaadress_tapsustus": None,
+        "aadress_ads__koodaadress": f"{rng.getrandbits(128):032X}",
+        "aadress_ads__adob_id": str(rng.randint(1000000, 9999999)),
+        "aadress_ads__tyyp": None,
+        "postiindeks": postcode,
+        "algus_kpv": registered,
+        "lopp_kpv": None,
+    }
+
+
+def _contacts(rng, slug, region, kirje_id):
+    contacts = []
+
+    def contact(liik, liik_tekstina, sisu):
+        contacts.append(
+            {
+                "kirje_id": kirje_id + len(contacts),
+                "liik": liik,
+                "liik_tekstina": liik_tekstina,
+                "sisu": sisu,
+                "lopp_kpv": None,
+                "kaardi_piirkond": region,
+                "kaardi_nr": 1,
+                "kaardi_tyyp": "R",
+                "kande_nr": rng.randint(1, 9),
+            }
+        )
+
+    if rng.random() < 0.85:
+        contact("EMAIL", "Elektronposti aadress", f"info@{slug}.ee")
+    if rng.random() < 0.7:
+        contact("MOB", "Mobiiltelefon", f"+372 5{rng.randint(1000000, 9999999)}")
+    if rng.random() < 0.2:
+        contact("TEL", "Telefon", f"+372 6{rng.randint(100000, 999999)}")
+    if rng.random() < 0.55:
+        contact("WWW", "Veebilehe aadress", f"https://www.{slug}.ee")
+    return contacts
+
+
+def company_record(index, rng):
+    """One register record of the JSON dump, for company number `index`."""
+    regcode = FIRST_REGCODE + index
+    form, form_nr, form_text, _ = _weighted(rng, LEGAL_FORMS)
+    status, status_text, _ = _weighted(rng, STATUSES)
+    location = rng.choice(LOCATIONS)
+    region, region_text = location[2], location[3]
+    base_name = f"{rng.choice(NAME_WORDS)} {rng.choice(NAME_SUFFIXES)}"
+    name = f"{base_name} {index}" if form == "FIE" else f"{base_name} {index} {form}"
+    slug = f"{base_name.lower().replace(' ', '')}{index}".translate(
+        str.maketrans("õäöü", "oaou")
+    )
+    registered = _date(rng, 1995)
+    kirje_id = 2000000 + index * 100
+
+    activities = rng.sample(EMTAK_ACTIVITIES, rng.choice((1, 1, 1, 2, 3)))
+    reported_activities = [
+        {
+            "kirje_id": 9000000000 + index * 10 + n,
+            "emtak_kood": code,
+            "emtak_tekstina": text,
+            "emtak_versioon": 3,
+            "emtak_versioon_tekstina": "EMTAK 2025",
+            "nace_kood": f"{code[:2]}.{code[2:4]}",
+            # Some companies have not named a main activity
+            "on_pohitegevusala": n == 0 and rng.random() < 0.92,
+            "algus_kpv": _date(rng, 2015),
+            "lopp_kpv": None,
+        }
+        for n, (code, text) in enumerate(activities)
+    ]
+
+    employees = rng.randint(0, 40)
+    annual_reports = []
+    for year in range(2024, 2024 - rng.randint(0, 6), -1):
+        code, text = activities[0]
+        employees = max(0, employees + rng.randint(-3, 3))
+        annual_reports.append(
+            {
+                "kirje_id": 3000000 + index * 10 + (2024 - year),
+                "majandusaasta_perioodi_algus_kpv": f"01.01.{year}",
+                "majandusaasta_perioodi_lopp_kpv": f"31.12.{year}",
+                "tootajate_arv": str(employees),
+                "ettevotja_aadress_aruandes": f"{location[1]}, {location[0]}",
+                "tegevusala_emtak_kood": code,
+                "tegevusala_emtak_tekstina": text,
+                "tegevusala_emtak_versioon": "EMTAK 2008",
+                "tegevusala_emtak_versioon_tekstina": None,
+                "tegevusala_nace_kood": f"{code[:2]}.{code[2:4]}",
+            }
+        )
+
+    addresses = [_address(rng, location, kirje_id + 1, registered)]
+    if rng.random() < 0.25:
+        # An earlier address that has ended
+        previous = _address(rng, rng.choice(LOCATIONS), kirje_id + 2, registered)
+        previous["lopp_kpv"] = _date(rng, 2010)
+        addresses.append(previous)
+
+    yldandmed = {
+        "ettevotteregistri_nr": None,
+        "esmaregistreerimise_kpv": registered,
+        "kustutamise_kpv": _date(rng, 2020) if status == "K" else None,
+        "staatus": status,
+        "staatus_tekstina": status_text,
+        "piirkond": region,
+        "piirkond_tekstina": region_text,
+        "piirkond_tekstina_pikk": f"{region_text} Maakohtu registriosakond",
+        "evks_registreeritud": None,
+        "evks_registreeritud_kande_kpv": None,
+        "oiguslik_vorm": form,
+        "oiguslik_vorm_nr": form_nr,
+        "oiguslik_vorm_tekstina": form_text,
+        "oigusliku_vormi_alaliik": None,
+        "lahknevusteade_puudumisest": False,
+        "oigusliku_vormi_alaliik_tekstina": "",
+        "asutatud_sissemakset_tegemata": rng.random() < 0.1,
+        "loobunud_vorminouetest": None,
+        "on_raamatupidamiskohustuslane": form != "FIE",
+        "tegutseb": None,
+        "tegutseb_tekstina": "Jah" if status == "R" else "Ei",
+        "staatused": [
+            {
+                "kaardi_piirkond": region,
+                "kaardi_nr": 1,
+                "kaardi_tyyp": "R",
+                "kande_nr": 1,
+                "staatus": status,
+                "staatus_tekstina": status_text,
+                "algus_kpv": registered,
+            }
+        ],
+        "arinimed": [
+            {
+                **_entry(kirje_id, region, 1),
+                "sisu": name,
+                "algus_kpv": registered,
+                "lopp_kpv": None,
+            }
+        ],
+        "aadressid": addresses,
+        "oiguslikud_vormid": [
+            {
+                **_entry(kirje_id + 3, region, 1),
+                "sisu": form,
+                "sisu_nr": form_nr,
+                "sisu_tekstina": form_text,
+                "algus_kpv": registered,
+                "lopp_kpv": None,
+            }
+        ],
+        "kapitalid": (
+            []
+            if form in ("FIE", "MTÜ")
+            else [
+                {
+                    **_entry(kirje_id + 4, region, 1),
+                    "kapitali_suurus": f"{rng.choice((2500, 2500, 2556.46, 25000, 100000)):.2f}",
+                    "kapitali_valuuta": "EUR",
+                    "kapitali_valuuta_tekstina": "Euro",
+                    "algus_kpv": registered,
+                    "lopp_kpv": None,
+                }
+            ]
+        ),
+        "majandusaastad": [
+            {
+                **_entry(kirje_id + 5, region, 1),
+                "maj_aasta_algus": "01.01",
+                "maj_aasta_lopp": "31.12",
+                "algus_kpv": registered,
+                "lopp_kpv": None,
+            }
+        ],
+        "markused_kaardil": [],
+        "sidevahendid": _contacts(rng, slug, region, kirje_id + 10),
+        "teatatud_tegevusalad": reported_activities,
+        "info_majandusaasta_aruannetest": annual_reports,
+        "esitab_kasusaajad": form != "FIE",
+    }
+    return {"ariregistri_kood": regcode, "nimi": name, "yldandmed": yldandmed}
+
+
+def iter_records(count, seed=0):
+    """The `count` records of the dump for `seed`, one at a time."""
+    rng = random.Random(seed)
+    for index in range(count):
+        yield company_record(index, rng)
+
+
+def csv_row(record):
+    """The `ettevotja_rekvisiidid` CSV row of a JSON dump record."""
+    yldandmed = record["yldandmed"]
+    address = yldandmed["aadressid"][0]
+    _, city, county = address["ehak_nimetus"].split(", ")
+    return {
+        "nimi": record["nimi"],
+        "ariregistri_kood": record["ariregistri_kood"],
+        "ettevotja_oiguslik_vorm": yldandmed["oiguslik_vorm_tekstina"],
+        "ettevotja_oigusliku_vormi_alaliik": "",
+        "kmkr_nr": (
+            f"EE10{record['ariregistri_kood'] % 10000000:07d}"
+            if yldandmed["on_raamatupidamiskohustuslane"]
+            else ""
+        ),
+        "ettevotja_staatus": yldandmed["staatus"],
+        "ettevotja_staatus_tekstina": yldandmed["staatus_tekstina"],
+        "ettevotja_esmakande_kpv": yldandmed["esmaregistreerimise_kpv"],
+        "ettevotja_aadress": address["tanav_maja_korter"],
+        "asukoht_ettevotja_aadressis": address["tanav_maja_korter"],
+        "asukoha_ehak_kood": address["ehak"],
+        "asukoha_ehak_tekstina": f"{city}, {county}",
+        "indeks_ettevotja_aadressis": address["postiindeks"],
+        "ads_adr_id": address["aadress_ads__adr_id"],
+        "ads_ads_oid": address["aadress_ads__ads_oid"],
+        "ads_normaliseeritud_taisaadress": address[
+            "aadress_ads__ads_normaliseeritud_taisaadress"
+        ],
+        "teabesysteemi_link": f"https://ariregister.rik.ee/est/company/{record['ariregistri_kood']}",
+    }
+
+
+def _write_json(stream, records):
+    stream.write("[")
+    for n, record in enumerate(records):
+        stream.write(",\n" if n else "\n")
+        stream.write(json.dumps(record, ensure_ascii=False))
+    stream.write("\n]\n")
+
+
+def write_dump(path, count, fmt="zip", seed=0):
+    """
+    Writes a dump of `count` companies to `path`.
+
+    Args:
+        path: The output file.
+        count: The number of companies.
+        fmt: "zip" (the JSON dump in a ZIP, as json_loader downloads it),
+            "json" or "csv".
+        seed: The seed of the random generator.
+
+    Returns:
+        The size of the written file in bytes.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Tundmatu formaat: {fmt}")
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    records = iter_records(count, seed)
+
+    if fmt == "zip":
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+            with z.open(JSON_MEMBER_NAME, "w", force_zip64=True) as member:
+                with io.TextIOWrapper(member, encoding="utf-8") as stream:
+                    _write_json(stream, records)
+    elif fmt == "json":
+        with open(path, "w", encoding="utf-8") as stream:
+            _write_json(stream, records)
+    else:
+        with open(path, "w", encoding="utf-8", newline="") as stream:
+            writer = csv.DictWriter(stream, fieldnames=CSV_COLUMNS, delimiter=";")
+            writer.writeheader()
+            for record in records:
+                writer.writerow(csv_row(record))
+    return path.stat().st_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--companies", type=int, default=10000)
+    parser.add_argument("--format", choices=FORMATS, default="zip")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    size = write_dump(args.output, args.companies, args.format, args.seed)
+    print(
+        f"{args.companies} ettevõtet -> {args.output} "
+        f"({size / (1024 * 1024):.1f} MB, {time.perf_counter() - started:.1f} s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,17 @@
 import argparse
+import contextlib
 import sys
 from src.ui.config_loader import load_config
 
 # EELDAME, ET NEED FUNKTSIOONID ON JUBA ÕIGESTI DEFINEERITUD
 from api.sync import load_company_data, process_company_sync, autofill_page_by_page_id
+from api.bulk_autofill import run_bulk_autofill, BULK_MAX_WORKERS
+from api.bulk_board_update import run_bulk_board_update
+from api.bulk_import import (
+    run_bulk_import,
+    read_regcodes_file,
+    read_regcodes_ndjson,
+)
 
 
 def print_properties(properties: dict):
@@ -108,6 +116,34 @@ def handle_autofill_mode(config: dict):
     autofill_page_by_page_id(page_id, config)
 
 
+def handle_bulk_import_mode(config: dict, args: argparse.Namespace):
+    """Impordib registrikoodide nimekirja; stdout-i lähevad ainult JSON-read."""
+
+    try:
+        if args.stdin:
+            codes = read_regcodes_ndjson(sys.stdin)
+        else:
+            with open(args.regcodes_file, "r", encoding="utf-8") as f:
+                codes = read_regcodes_file(f)
+    except (OSError, ValueError) as e:
+        print(f"Registrikoodide lugemine ebaõnnestus: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    out = sys.stdout
+    # Progress prints of the loaders go to stderr to keep the output pipeable
+    with contextlib.redirect_stdout(sys.stderr):
+        stats = run_bulk_import(codes, config, out, max_workers=args.workers)
+
+    print(
+        "Valmis: {success} õnnestus, {warning} hoiatusega, {error} ebaõnnestus.".format(
+            **stats
+        ),
+        file=sys.stderr,
+    )
+    if stats["error"]:
+        sys.exit(1)
+
+
 def run_cli():
 
     config = load_config()
@@ -124,9 +160,70 @@ def run_cli():
         group.add_argument(
             "--page-id", help="Notioni lehe ID (id()) automaattäitmiseks"
         )
+        group.add_argument(
+            "--autofill-all",
+            action="store_true",
+            help="Täida kõik Companies andmebaasi lehed, millel on Registrikood, kuid tühjad väljad",
+        )
+        group.add_argument(
+            "--board-members",
+            action="store_true",
+            help="Loo kõigi registrikoodiga ettevõtete kontaktisikud Äriregistri juhatuse liikmetest",
+        )
+        group.add_argument(
+            "--regcodes-file",
+            help="Fail registrikoodidega (üks rea kohta); tulemused väljastatakse JSON-ridadena",
+        )
+        group.add_argument(
+            "--stdin",
+            action="store_true",
+            help='Loe registrikoodid stdin-ist NDJSON-ina ({"regcode": ...} või kood rea kohta)',
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=BULK_MAX_WORKERS,
+            help="Samaaegsete Notioni uuenduste arv hulgi- ja importrežiimis",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Alusta hulgitäitmist otsast (eira salvestatud checkpointi)",
+        )
+        parser.add_argument(
+            "--with-google",
+            action="store_true",
+            help="Otsi puuduvad veebilehed Google CSE abil (kulutab päringukvooti)",
+        )
         args = parser.parse_args()
 
-        if args.page_id:
+        if args.regcodes_file or args.stdin:
+            handle_bulk_import_mode(config, args)
+        elif args.autofill_all:
+            print("Käivitatud režiimis: Kogu andmebaasi automaatne täitmine.")
+            try:
+                stats = run_bulk_autofill(
+                    config,
+                    max_workers=args.workers,
+                    restart=args.restart,
+                    use_google=args.with_google,
+                )
+            except KeyboardInterrupt:
+                sys.exit(130)
+            if stats["failed"]:
+                sys.exit(1)
+        elif args.board_members:
+            print("Käivitatud režiimis: Juhatuse liikmete sünkroonimine Äriregistrist.")
+            try:
+                stats = run_bulk_board_update(config, max_workers=args.workers)
+            except ValueError as e:
+                print(f"Viga: {e}")
+                sys.exit(1)
+            except KeyboardInterrupt:
+                sys.exit(130)
+            if stats["failed"]:
+                sys.exit(1)
+        elif args.page_id:
             # Otsetäitmine lehe ID kaudu (ilma kinnituseta)
             print("Käivitatud režiimis: Automaatne lehe täitmine.")
             autofill_page_by_page_id(args.page_id, config)
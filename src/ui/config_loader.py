@@ -37,4 +37,9 @@ def load_config(path=config_path):
     if "ARZ_CSV_PATH" in os.environ:
         config["ariregister"]["csv_path"] = os.environ["ARZ_CSV_PATH"]
 
+    # EMTA maksuandmed on valikulised
+    config.setdefault("emta", {})
+    if "EMTA_TAX_CSV_URL" in os.environ:
+        config["emta"]["tax_csv_url"] = os.environ["EMTA_TAX_CSV_URL"]
+
     return config
@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from api import sync
+
+STAGE_SECONDS = 0.3
+CONFIG = {
+    "notion": {"token": "t", "database_id": "db"},
+    "ariregister": {"json_url": "unused"},
+}
+
+
+class SlowNotion:
+    def __init__(self, *args):
+        pass
+
+    def get_page(self, page_id):
+        return {
+            "id": page_id,
+            "properties": {"Registrikood": {"type": "number", "number": 10000001}},
+        }
+
+    def query_by_regcode(self, regcode, exclude_page_id=None):
+        time.sleep(STAGE_SECONDS)
+        return None
+
+
+def slow_register(url, regcode):
+    time.sleep(STAGE_SECONDS)
+    return {"nimi": "Firma OÜ", "yldandmed": {}}
+
+
+@pytest.fixture()
+def stages(monkeypatch):
+    monkeypatch.setattr(sync, "NotionClient", SlowNotion)
+    monkeypatch.setattr(sync, "_find_company_coalesced", slow_register)
+    monkeypatch.setattr(
+        sync, "_fill_missing_website", lambda *args: time.sleep(STAGE_SECONDS)
+    )
+    monkeypatch.setattr(sync, "_write_autofill_update", lambda *args: {"success": True})
+
+
+def test_duplicate_check_overlaps_register_lookup_and_website_search(stages):
+    started = time.perf_counter()
+    result = sync.autofill_page_by_page_id("page-1", CONFIG)
+    elapsed = time.perf_counter() - started
+
+    assert result == {"success": True}
+    # Sequential stages would take 3 x STAGE_SECONDS
+    assert elapsed < 2.5 * STAGE_SECONDS
+
+
+def test_failed_website_search_gives_a_structured_error(stages, monkeypatch):
+    def broken(*args):
+        raise KeyError("homepage")
+
+    monkeypatch.setattr(sync, "_fill_missing_website", broken)
+
+    result = sync.autofill_page_by_page_id("page-1", CONFIG)
+
+    assert result["success"] is False
+    assert result["step"] == "prepare_payload"
@@ -0,0 +1,84 @@
+import json
+import zipfile
+
+import pytest
+
+from api import board_loader
+
+URL = "https://example.invalid/kaardile_kantud_isikud.json.zip"
+
+
+def person(first, last, role, ended=None, kind="F"):
+    return {
+        "isiku_tyyp": kind,
+        "isiku_roll": "JJUH",
+        "isiku_roll_tekstina": role,
+        "eesnimi": first,
+        "nimi_arinimi": last,
+        "isikukood_registrikood": "38001010000",
+        "algus_kpv": "01.01.2020",
+        "lopp_kpv": ended,
+    }
+
+
+RECORDS = [
+    {
+        "ariregistri_kood": 10000001,
+        "nimi": "Firma OÜ",
+        "kaardile_kantud_isikud": [
+            person("Mari", "Maasikas", "Juhatuse liige"),
+            person("Jüri", "Juurikas", "Juhatuse esimees"),
+            person("Endine", "Juht", "Juhatuse liige", ended="01.01.2023"),
+            person("Peeter", "Prokurist", "Prokurist"),
+            person(None, "Emafirma OÜ", "Juhatuse liige", kind="J"),
+        ],
+    },
+    {
+        "ariregistri_kood": 10000002,
+        "nimi": "Teine AS",
+        "kaardile_kantud_isikud": [person("Kati", "Kask", "Juhatuse liige")],
+    },
+]
+
+
+@pytest.fixture
+def dataset(tmp_path, monkeypatch):
+    zip_path = tmp_path / "ariregister_board.zip"
+    with zipfile.ZipFile(zip_path, "w") as z:
+        z.writestr("isikud.json", json.dumps(RECORDS))
+    monkeypatch.setattr(board_loader, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(board_loader, "BOARD_CACHE_FILE_PATH", str(zip_path))
+    return zip_path
+
+
+def test_only_current_natural_person_board_members(dataset):
+    members = board_loader.find_board_members(URL, "10000001")
+
+    assert members == [
+        {
+            "name": "Mari Maasikas",
+            "role": "Juhatuse liige",
+            "email": None,
+            "phone": None,
+        },
+        {
+            "name": "Jüri Juurikas",
+            "role": "Juhatuse esimees",
+            "email": None,
+            "phone": None,
+        },
+    ]
+
+
+def test_batch_lookup_caches_results_and_missing_codes(dataset, tmp_path):
+    found = board_loader.load_board_members_batch(URL, ["10000002", "99999999"])
+
+    assert found["10000002"][0]["name"] == "Kati Kask"
+    assert found["99999999"] == []
+    cached = json.loads((tmp_path / "board_10000002.json").read_text("utf-8"))
+    assert "38001010000" not in json.dumps(cached)
+
+    # Answered from the result cache without the dataset
+    dataset.unlink()
+    again = board_loader.load_board_members_batch(URL, ["10000002", "99999999"])
+    assert again == found
@@ -0,0 +1,200 @@
+import shutil
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from api import bulk_autofill, cache_store, cse_scheduler, json_loader, sync
+
+
+def company_page(page_id, regcode, **props):
+    properties = {"Registrikood": {"type": "number", "number": regcode}}
+    properties.update(props)
+    return {"id": page_id, "properties": properties}
+
+
+FILLED_EMAIL = {"E-post": {"type": "email", "email": "info@firma.ee"}}
+PLACEHOLDER_EMAIL = {"E-post": {"type": "email", "email": "E-maili ei leitud."}}
+
+
+class FakeNotionClient:
+    """Serves the Companies database in batches of two pages."""
+
+    pages = [
+        company_page("p1", 11043099, **PLACEHOLDER_EMAIL),
+        company_page("p2", 17281782, **FILLED_EMAIL),  # nothing to fill
+        company_page("p3", 16359677, **PLACEHOLDER_EMAIL),
+        company_page("p4", 14543684, **PLACEHOLDER_EMAIL),
+        company_page("p5", 14543684, **PLACEHOLDER_EMAIL),  # duplicate code
+        company_page("p6", 99, **PLACEHOLDER_EMAIL),  # not in the register
+    ]
+
+    def __init__(self, token, database_id, api_version):
+        self.database_id = database_id
+        self.update_page = MagicMock(return_value={})
+        self.queries = 0
+
+    def query_database_page(self, filter_dict=None, start_cursor=None, page_size=100):
+        self.queries += 1
+        start = int(start_cursor or 0)
+        end = start + 2
+        return {
+            "results": self.pages[start:end],
+            "has_more": end < len(self.pages),
+            "next_cursor": str(end) if end < len(self.pages) else None,
+        }
+
+    def get_page(self, page_id):
+        return next(page for page in self.pages if page["id"] == page_id)
+
+
+@pytest.fixture()
+def register_cache(monkeypatch, tmp_path):
+    shutil.copy("test/mock_cache/ariregister_data.zip", tmp_path / "data.zip")
+    monkeypatch.setattr(json_loader, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(json_loader, "CACHE_FILE_PATH", str(tmp_path / "data.zip"))
+    monkeypatch.setattr(json_loader, "CACHE_EXPIRATION", timedelta(weeks=52 * 1000))
+
+
+@pytest.fixture()
+def notion(monkeypatch):
+    instances = []
+
+    def constructor(*args):
+        instances.append(FakeNotionClient(*args))
+        return instances[-1]
+
+    monkeypatch.setattr(bulk_autofill, "NotionClient", constructor)
+    return instances
+
+
+CONFIG = {
+    "notion": {"token": "t", "database_id": "db", "api_version": None},
+    "ariregister": {"json_url": "unused"},
+}
+
+
+def test_bulk_autofill_fills_selected_pages(register_cache, notion, tmp_path):
+    stats = bulk_autofill.run_bulk_autofill(
+        CONFIG, checkpoint_path=str(tmp_path / "cp.json"), progress=lambda m: None
+    )
+
+    assert stats == {
+        "updated": 2,
+        "failed": 0,
+        "not_found": 1,
+        "duplicates": 2,
+        "skipped_done": 0,
+        "deferred": 0,
+    }
+    assert notion[0].queries == 3
+    updated = {call.args[0] for call in notion[0].update_page.call_args_list}
+    assert updated == {"p1", "p3"}
+
+
+def test_bulk_autofill_resumes_from_checkpoint(register_cache, notion, tmp_path):
+    checkpoint = bulk_autofill.BulkCheckpoint(str(tmp_path / "cp.json"), "db")
+    checkpoint.state.update(
+        {
+            "scan_complete": True,
+            "regcode_counts": {"11043099": 1, "16359677": 1},
+            "candidates": [
+                {"page_id": "p1", "regcode": "11043099", "props": PLACEHOLDER_EMAIL},
+                {"page_id": "p3", "regcode": "16359677", "props": PLACEHOLDER_EMAIL},
+            ],
+            "done": {"p1": "ok"},
+        }
+    )
+    checkpoint.save()
+
+    stats = bulk_autofill.run_bulk_autofill(
+        CONFIG, checkpoint_path=checkpoint.path, progress=lambda m: None
+    )
+
+    assert stats["skipped_done"] == 1
+    assert stats["updated"] == 1
+    assert notion[0].queries == 0
+    notion[0].update_page.assert_called_once()
+    assert notion[0].update_page.call_args.args[0] == "p3"
+
+
+def test_page_needs_autofill():
+    assert bulk_autofill.page_needs_autofill(PLACEHOLDER_EMAIL)
+    assert not bulk_autofill.page_needs_autofill(FILLED_EMAIL)
+    assert bulk_autofill.page_needs_autofill(
+        {"Maakond": {"type": "multi_select", "multi_select": []}}
+    )
+
+
+def test_google_searches_over_quota_are_deferred(
+    register_cache, notion, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(cache_store, "CACHE_DB_PATH", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(cse_scheduler, "CSE_DB_PATH", str(tmp_path / "cse.sqlite3"))
+    monkeypatch.setattr(sync, "infer_website", lambda *args: None)
+    monkeypatch.setattr(
+        bulk_autofill,
+        "CseScheduler",
+        lambda: cse_scheduler.CseScheduler(
+            quota=cse_scheduler.CseQuota(daily_quota=0), max_qps=0, reserve=0
+        ),
+    )
+
+    stats = bulk_autofill.run_bulk_autofill(
+        CONFIG,
+        use_google=True,
+        checkpoint_path=str(tmp_path / "cp.json"),
+        progress=lambda m: None,
+    )
+
+    assert stats["updated"] == 2
+    assert stats["deferred"] > 0
+    assert len(cse_scheduler.CseBacklog()) == stats["deferred"]
+
+
+def test_deferred_pages_are_re_read_before_autofill(
+    register_cache, notion, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(cse_scheduler, "CSE_DB_PATH", str(tmp_path / "cse.sqlite3"))
+    monkeypatch.setattr(cse_scheduler, "quota_day", lambda: "2026-01-01")
+    backlog = cse_scheduler.CseBacklog()
+    for page_id in ["p1", "p2", "p3", "p9"]:
+        saved = {"page_id": page_id, "regcode": "1", "props": PLACEHOLDER_EMAIL}
+        backlog.defer(page_id, saved)
+    monkeypatch.setattr(cse_scheduler, "quota_day", lambda: "2026-01-02")
+    archived = {**FakeNotionClient.pages[2], "archived": True}
+    monkeypatch.setattr(
+        FakeNotionClient, "pages", FakeNotionClient.pages[:2] + [archived]
+    )
+
+    checkpoint = bulk_autofill.BulkCheckpoint(str(tmp_path / "cp.json"), "db")
+    checkpoint.state.update({"scan_complete": True})
+    checkpoint.save()
+    monkeypatch.setattr(
+        bulk_autofill, "_autofill_candidate", lambda n, c, *a: {"success": True}
+    )
+
+    stats = bulk_autofill.run_bulk_autofill(
+        CONFIG,
+        use_google=True,
+        checkpoint_path=checkpoint.path,
+        progress=lambda m: None,
+    )
+
+    # p2 was filled in and p3 archived since they were deferred; p9 could
+    # not be read and is tried again on the next run
+    assert stats["updated"] == 1
+    assert [c["page_id"] for c in backlog.due()] == ["p1", "p9"]
+
+
+def test_crm_importance():
+    assert (
+        bulk_autofill.crm_importance(
+            {
+                "Prioriteet": {"type": "select", "select": {"name": "Kõrge"}},
+                "Kontaktisikud": {"type": "relation", "relation": [{"id": "c1"}]},
+            }
+        )
+        == 31
+    )
+    assert bulk_autofill.crm_importance({}) == 0
@@ -0,0 +1,64 @@
+import io
+import json
+import shutil
+from datetime import timedelta
+
+import pytest
+
+from api import bulk_import, json_loader
+
+
+@pytest.fixture()
+def register_cache(monkeypatch, tmp_path):
+    shutil.copy("test/mock_cache/ariregister_data.zip", tmp_path / "data.zip")
+    monkeypatch.setattr(json_loader, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(json_loader, "CACHE_FILE_PATH", str(tmp_path / "data.zip"))
+    monkeypatch.setattr(json_loader, "CACHE_EXPIRATION", timedelta(weeks=52 * 1000))
+
+
+def test_read_regcodes():
+    assert bulk_import.read_regcodes_file(
+        ["# prospects\n", "11043099\n", "\n", "16359677;Accelerator OÜ\n"]
+    ) == ["11043099", "16359677"]
+    assert bulk_import.read_regcodes_ndjson(
+        ['{"regcode": 11043099}\n', "16359677\n", '"17281782"\n']
+    ) == ["11043099", "16359677", "17281782"]
+    with pytest.raises(ValueError):
+        bulk_import.read_regcodes_ndjson(["{broken"])
+
+
+def test_dedupe_regcodes():
+    assert bulk_import.dedupe_regcodes(["1", "2", "1", "2.0", "x1"]) == (
+        ["1", "2"],
+        ["x1"],
+    )
+
+
+def test_bulk_import_streams_one_line_per_code(register_cache, monkeypatch):
+    synced = []
+
+    def fake_sync(data, config):
+        synced.append(data["regcode"])
+        return {
+            "status": "success",
+            "message": "ok",
+            "company_name": data["company_name"],
+        }
+
+    monkeypatch.setattr(bulk_import, "process_company_sync", fake_sync)
+    out = io.StringIO()
+
+    stats = bulk_import.run_bulk_import(
+        ["11043099", "16359677", "11043099", "99", "abc"],
+        {"ariregister": {"json_url": "unused"}},
+        out,
+    )
+
+    lines = {
+        row["regcode"]: row for row in map(json.loads, out.getvalue().splitlines())
+    }
+    assert stats == {"success": 2, "warning": 0, "error": 2}
+    assert sorted(synced) == ["11043099", "16359677"]
+    assert lines["11043099"]["company_name"] == "OÜ Ideelabor"
+    assert lines["99"]["status"] == "error"
+    assert lines["abc"]["status"] == "error"
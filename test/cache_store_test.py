@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+import pytest
+
+from api import cache_store, cse_scheduler, sync
+from api.cache_store import CACHE_MISS, PersistentCache
+
+
+@pytest.fixture()
+def cache_db(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache_store, "CACHE_DB_PATH", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(cse_scheduler, "CSE_DB_PATH", str(tmp_path / "cse.sqlite3"))
+
+
+def test_get_set_and_hit_counters(cache_db):
+    cache = PersistentCache("test", timedelta(hours=1))
+
+    assert cache.get("a") is CACHE_MISS
+    cache.set("a", {"url": None})
+    assert cache.get("a") == {"url": None}
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["stored_hits"] == 1
+
+
+def test_expired_entries_are_misses(cache_db):
+    cache = PersistentCache("test", timedelta(hours=1))
+    cache.set("old", "value", ttl=timedelta(seconds=-1))
+
+    assert cache.get("old") is CACHE_MISS
+    assert cache.get("old", default=None) is None
+
+
+def test_least_recently_used_entries_are_evicted(cache_db):
+    cache = PersistentCache("test", timedelta(hours=1), max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is CACHE_MISS
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+class CountingGoogleClient:
+    calls = []
+
+    def __init__(self, key, cx):
+        pass
+
+    def get_search_results(self, query, gl="ee", lr="lang_et|lang_en", **kwargs):
+        self.calls.append((query, gl, lr))
+        if query.startswith("Ideelabor"):
+            return {"items": [{"link": "https://ideelabor.ee"}]}
+        return {"items": [{"link": "https://www.facebook.com/someone"}]}
+
+
+def test_google_lookups_are_cached_including_misses(cache_db, monkeypatch):
+    CountingGoogleClient.calls = []
+    monkeypatch.setattr(sync, "GoogleClient", CountingGoogleClient)
+    monkeypatch.setattr(sync, "GOOGLE_API_KEY", "key")
+    monkeypatch.setattr(sync, "GOOGLE_CSE_CX", "cx")
+
+    assert sync.google_find_website("Ideelabor") == "https://ideelabor.ee"
+    assert sync.google_find_website("  IDEELABOR ") == "https://ideelabor.ee"
+    assert sync.google_find_website("Tundmatu") is None
+    assert sync.google_find_website("Tundmatu") is None
+
+    assert [call[0] for call in CountingGoogleClient.calls] == [
+        "Ideelabor official website",
+        "Tundmatu official website",
+    ]
@@ -0,0 +1,90 @@
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from api.cache_store import PersistentCache
+from api.clients import company_website_client
+from api.clients.company_website_client import CompanyWebsiteClient
+
+PAGE = "<html><body><a href='/meeskond'>Meeskond</a><script>x()</script></body></html>"
+
+
+class EtagHandler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        conditional = self.headers.get("If-None-Match") == '"v1"'
+        self.requests.append((self.path, conditional))
+        if conditional:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = PAGE.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def site():
+    EtagHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), EtagHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_request_scope_downloads_and_parses_once(site):
+    client = CompanyWebsiteClient()
+
+    with client.request_scope():
+        soup = client.get_soup(site, {})
+        assert client.get_soup(site, {}) is soup
+        assert client.get_company_website(site, {}).text == PAGE
+
+    assert len(EtagHandler.requests) == 1
+    # Outside the scope nothing is memoized
+    client.get_company_website(site, {})
+    assert len(EtagHandler.requests) == 2
+
+
+def test_persistent_cache_revalidates_with_etag(site, tmp_path, monkeypatch):
+    cache = PersistentCache(
+        "web_pages", timedelta(days=1), db_path=str(tmp_path / "cache.sqlite3")
+    )
+
+    first = CompanyWebsiteClient(page_cache=cache).get_company_website(site, {})
+    # A fresh entry is served without a request
+    CompanyWebsiteClient(page_cache=cache).get_company_website(site, {})
+    assert EtagHandler.requests == [("/", False)]
+
+    monkeypatch.setattr(company_website_client, "PAGE_FRESH_SECONDS", 0)
+    again = CompanyWebsiteClient(page_cache=cache).get_company_website(site, {})
+
+    assert EtagHandler.requests == [("/", False), ("/", True)]
+    assert again.text == first.text == PAGE
+
+
+def test_revalidating_scope_asks_the_server_even_for_fresh_pages(site, tmp_path):
+    cache = PersistentCache(
+        "web_pages", timedelta(days=1), db_path=str(tmp_path / "cache.sqlite3")
+    )
+    client = CompanyWebsiteClient(page_cache=cache)
+    client.get_company_website(site, {})
+
+    with client.request_scope(revalidate=True):
+        assert client.get_company_website(site, {}).text == PAGE
+        # Repeated reads within the scope are not revalidated again
+        client.get_company_website(site, {})
+    client.get_company_website(site, {})
+
+    assert EtagHandler.requests == [("/", False), ("/", True)]
@@ -0,0 +1,76 @@
+import time
+
+import pytest
+
+from api import cse_scheduler
+from api.cse_scheduler import (
+    CseBacklog,
+    CseQuota,
+    CseQuotaExceeded,
+    CseScheduler,
+    RateLimiter,
+)
+
+
+@pytest.fixture(autouse=True)
+def cse_db(monkeypatch, tmp_path):
+    monkeypatch.setattr(cse_scheduler, "CSE_DB_PATH", str(tmp_path / "cse.sqlite3"))
+
+
+def test_quota_keeps_interactive_reserve():
+    quota = CseQuota(daily_quota=3)
+    scheduler = CseScheduler(quota=quota, max_qps=0, reserve=1)
+
+    assert scheduler.acquire()
+    assert scheduler.acquire()
+    with pytest.raises(CseQuotaExceeded):
+        scheduler.acquire()
+
+    # Interactive searches may use the reserve
+    assert quota.try_acquire()
+    assert not quota.try_acquire()
+    assert quota.remaining() == 0
+
+
+def test_released_queries_go_back_to_the_quota():
+    quota = CseQuota(daily_quota=2)
+    scheduler = CseScheduler(quota=quota, max_qps=0, reserve=0)
+
+    assert scheduler.acquire()
+    scheduler.release()
+    assert quota.remaining() == 2
+    scheduler.release()
+    assert quota.remaining() == 2
+
+
+def test_quota_resets_with_the_pacific_day(monkeypatch):
+    quota = CseQuota(daily_quota=1)
+    monkeypatch.setattr(cse_scheduler, "quota_day", lambda: "2026-01-01")
+    assert quota.try_acquire()
+    assert not quota.try_acquire()
+
+    monkeypatch.setattr(cse_scheduler, "quota_day", lambda: "2026-01-02")
+    assert quota.try_acquire()
+
+
+def test_backlog_is_due_on_a_later_day(monkeypatch):
+    backlog = CseBacklog()
+    monkeypatch.setattr(cse_scheduler, "quota_day", lambda: "2026-01-01")
+    backlog.defer("p1", {"page_id": "p1"}, priority=1)
+    backlog.defer("p2", {"page_id": "p2"}, priority=20)
+    assert backlog.due() == []
+
+    monkeypatch.setattr(cse_scheduler, "quota_day", lambda: "2026-01-02")
+    assert backlog.due() == [{"page_id": "p2"}, {"page_id": "p1"}]
+
+    backlog.remove("p2")
+    assert len(backlog) == 1
+
+
+def test_rate_limiter_spaces_calls():
+    limiter = RateLimiter(qps=20)
+    started = time.monotonic()
+    for _ in range(5):
+        limiter.wait()
+
+    assert time.monotonic() - started >= 0.19
@@ -0,0 +1,112 @@
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+from api.cache_store import PersistentCache
+from api import gemini
+from api.gemini import CachedGenerativeModel, LazyGenerativeModel
+
+
+class FakeModel:
+    def __init__(self):
+        self.prompts = []
+
+    def generate_content(self, prompt):
+        self.prompts.append(prompt)
+        return SimpleNamespace(
+            text=f"answer {len(self.prompts)}",
+            usage_metadata=SimpleNamespace(total_token_count=120),
+        )
+
+
+def make_model(tmp_path, name="gemini-test"):
+    cache = PersistentCache(
+        "gemini_responses", timedelta(days=1), db_path=str(tmp_path / "c.sqlite3")
+    )
+    return CachedGenerativeModel(FakeModel(), name, cache)
+
+
+def test_identical_prompts_are_answered_from_cache(tmp_path):
+    model = make_model(tmp_path)
+
+    first = model.generate_content("Which link?\n    a: https://firma.ee/meeskond")
+    second = model.generate_content("Which link?  a: https://firma.ee/meeskond  ")
+
+    assert first.text == second.text == "answer 1"
+    assert len(model.model.prompts) == 1
+    stats = model.stats()
+    assert (stats["hits"], stats["misses"], stats["saved_tokens"]) == (1, 1, 120)
+
+
+def test_cache_is_keyed_on_model_and_persists(tmp_path):
+    make_model(tmp_path).generate_content("prompt")
+
+    again = make_model(tmp_path)
+    assert again.generate_content("prompt").text == "answer 1"
+    assert again.model.prompts == []
+
+    other = make_model(tmp_path, name="gemini-other")
+    assert other.generate_content("prompt").text == "answer 1"
+    assert other.model.prompts == ["prompt"]
+
+
+def test_api_import_does_not_load_generativeai():
+    code = "import sys, api.update_staff; print('google.generativeai' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).resolve().parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == "False"
+
+
+def test_lazy_model_is_built_once_across_threads():
+    lazy = LazyGenerativeModel("gemini-test")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        models = list(executor.map(lambda _: lazy._get_model(), range(8)))
+
+    assert all(m is models[0] for m in models)
+
+
+def test_unusable_answers_are_not_cached_and_refresh_skips_the_cache(tmp_path):
+    model = make_model(tmp_path)
+    model.cache.set(model._key("staff?"), {"text": "[{", "tokens": 5})
+
+    # An old cut-off answer is dropped; "answer 1" is not JSON either
+    assert model.generate_content("staff?", valid=gemini._is_json_list).text == (
+        "answer 1"
+    )
+    assert model.generate_content("staff?", valid=gemini._is_json_list).text == (
+        "answer 2"
+    )
+    assert model.generate_content("staff?").text == "answer 3"
+    assert model.generate_content("staff?").text == "answer 3"
+    assert model.generate_content("staff?", refresh=True).text == "answer 4"
+    assert model.generate_content("staff?").text == "answer 4"
+    assert gemini._is_json_list('```json\n[{"name": "Mari"}]\n```')
+
+
+def test_structured_staff_skips_the_dom_and_survives_bad_pages(monkeypatch):
+    client = gemini.company_website_client
+    pages = {"https://a.ee": "<p>Mari Maasikas</p>", "https://b.ee": "mailto:x"}
+    soups = []
+    monkeypatch.setattr(
+        client, "has_structured_markup", lambda url, h: "mailto:" in pages[url]
+    )
+    monkeypatch.setattr(client, "get_soup", lambda url, h: soups.append(url))
+
+    def broken(soup):
+        raise AttributeError("'NoneType' object has no attribute 'lower'")
+
+    monkeypatch.setattr(gemini, "extract_structured_contacts", broken)
+
+    assert gemini.find_structured_staff("https://a.ee") == []
+    assert gemini.find_structured_staff("https://b.ee") == []
+    assert soups == ["https://b.ee"]
@@ -0,0 +1,102 @@
+import pytest
+import requests
+
+from api import cache_store, cse_scheduler, sync
+
+
+@pytest.fixture()
+def cache_db(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache_store, "CACHE_DB_PATH", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(cse_scheduler, "CSE_DB_PATH", str(tmp_path / "cse.sqlite3"))
+
+
+SEARCH_ITEMS = [
+    {"link": "https://www.linkedin.com/in/juhan-juurikas"},
+    {"link": "https://ee.linkedin.com/company/flowerflake/about/"},
+    {"link": "https://www.facebook.com/sharer.php?u=x"},
+    {"link": "https://www.facebook.com/flowerflake.ee/"},
+    {"link": "https://www.teatmik.ee/et/personlegal/17281782"},
+    {"link": "https://flowerflake.ee/en"},
+]
+
+
+def test_search_results_give_homepage_and_social_profiles():
+    result = sync._pick_search_results(SEARCH_ITEMS, "Flowerflake OÜ")
+
+    assert result == {
+        "homepage": "https://flowerflake.ee/en",
+        "linkedin": "https://www.linkedin.com/company/flowerflake",
+        "socials": {"facebook": "https://www.facebook.com/flowerflake.ee"},
+    }
+
+
+def test_one_query_fills_website_and_linkedin(cache_db, monkeypatch):
+    calls = []
+
+    class Client:
+        def __init__(self, key, cx):
+            pass
+
+        def get_search_results(self, query, **kwargs):
+            calls.append(query)
+            return {"items": SEARCH_ITEMS}
+
+    monkeypatch.setattr(sync, "GoogleClient", Client)
+    monkeypatch.setattr(sync, "GOOGLE_API_KEY", "key")
+    monkeypatch.setattr(sync, "GOOGLE_CSE_CX", "cx")
+    monkeypatch.setattr(sync, "infer_website", lambda *args: None)
+    properties = {
+        "Veebileht": {"url": "Veebilehte ei leitud."},
+        "LinkedIn": {"url": "LinkedIn-i ei leitud."},
+    }
+    empty_fields = ["Veebileht (Website)", "LinkedIn"]
+
+    sync._fill_missing_website(properties, empty_fields, "Flowerflake OÜ", {})
+
+    assert calls == ["Flowerflake OÜ official website"]
+    assert properties["Veebileht"]["url"] == "https://flowerflake.ee/en"
+    assert properties["LinkedIn"]["url"] == (
+        "https://www.linkedin.com/company/flowerflake"
+    )
+    assert empty_fields == []
+
+
+def test_cache_entries_of_another_shape_are_read_safely(cache_db):
+    key = sync._google_cache_key("Vana OÜ", sync.GOOGLE_CSE_GL, sync.GOOGLE_CSE_LR)
+    sync.google_cache.set(key, {"url": "https://vana.ee"})
+
+    assert sync.google_search_company("Vana OÜ") == {
+        "homepage": None,
+        "linkedin": None,
+        "socials": {},
+    }
+
+
+@pytest.mark.parametrize(
+    "error, refunded",
+    [
+        (requests.ConnectionError("down"), True),
+        (requests.Timeout("slow"), True),
+        (requests.HTTPError(response=type("R", (), {"status_code": 503})()), True),
+        (requests.HTTPError(response=type("R", (), {"status_code": 400})()), False),
+    ],
+)
+def test_failed_queries_give_the_quota_back(cache_db, monkeypatch, error, refunded):
+    class Client:
+        def __init__(self, key, cx):
+            pass
+
+        def get_search_results(self, query, **kwargs):
+            raise error
+
+    quota = cse_scheduler.CseQuota(daily_quota=5)
+    monkeypatch.setattr(sync, "GoogleClient", Client)
+    monkeypatch.setattr(sync, "GOOGLE_API_KEY", "key")
+    monkeypatch.setattr(sync, "GOOGLE_CSE_CX", "cx")
+
+    result = sync.google_search_company(
+        "Flowerflake OÜ", acquire=quota.try_acquire, release=quota.release
+    )
+
+    assert result is None
+    assert quota.remaining() == (5 if refunded else 4)
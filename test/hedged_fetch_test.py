@@ -0,0 +1,81 @@
+import time
+
+import pytest
+import requests
+
+from api import cache_store
+from api.clients.hedged_fetch import hedged_get, url_variants
+
+
+@pytest.fixture(autouse=True)
+def variant_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache_store, "CACHE_DB_PATH", str(tmp_path / "cache.sqlite3"))
+
+
+class FakeResponse:
+    def __init__(self, url, status_code=200):
+        self.url = url
+        self.status_code = status_code
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSite:
+    """Answers only on the given variant; the apex https host hangs."""
+
+    def __init__(self, answering):
+        self.answering = answering
+        self.calls = []
+        self.responses = []
+
+    def get(self, url, headers, timeout, stream):
+        self.calls.append(url)
+        if url == self.answering:
+            response = FakeResponse(url)
+        elif url.startswith("https://firma.ee"):
+            time.sleep(0.5)
+            raise requests.Timeout(url)
+        else:
+            raise requests.ConnectionError(url)
+        self.responses.append(response)
+        return response
+
+
+def test_variants_keep_the_given_url_first():
+    assert url_variants("firma.ee/meeskond") == [
+        "https://firma.ee/meeskond",
+        "https://www.firma.ee/meeskond",
+        "http://firma.ee/meeskond",
+        "http://www.firma.ee/meeskond",
+    ]
+    assert url_variants("http://127.0.0.1:8000/") == [
+        "http://127.0.0.1:8000/",
+        "https://127.0.0.1:8000/",
+    ]
+
+
+def test_first_good_variant_wins_and_is_remembered():
+    site = FakeSite("http://www.firma.ee/")
+
+    started = time.perf_counter()
+    response = hedged_get(
+        "https://firma.ee/", {}, timeout=10, stagger=0.05, get=site.get
+    )
+
+    assert response.url == "http://www.firma.ee/"
+    # Did not wait for the hanging https://firma.ee/
+    assert time.perf_counter() - started < 0.4
+
+    again = FakeSite("http://www.firma.ee/kontakt")
+    hedged_get("https://firma.ee/kontakt", {}, timeout=10, stagger=0.05, get=again.get)
+    assert again.calls == ["http://www.firma.ee/kontakt"]
+
+
+def test_no_good_variant_raises_the_first_variants_error():
+    site = FakeSite(None)
+
+    with pytest.raises(requests.Timeout):
+        hedged_get("firma.ee", {}, timeout=10, stagger=0.01, get=site.get)
+    assert len(site.calls) == 4
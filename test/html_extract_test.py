@@ -0,0 +1,68 @@
+from bs4 import BeautifulSoup
+
+from api.clients.html_extract import (
+    decode_body,
+    extract_links,
+    extract_text,
+    has_structured_markup,
+    normalize_text,
+    read_body,
+)
+
+PAGE = """<html><head><title>Meeskond</title><style>p {color: red}</style></head>
+<body><nav><a href="/">Avaleht</a> <a href="/meeskond"><b>Meie</b> meeskond</a></nav>
+<p>Mari Maasikas  Tegevjuht</p><script>var x = "<a href='/x'>";</script>
+<p>Tel:   +372 5123 4567 &amp; info@firma.ee</p><a name="top">ankur</a></body></html>"""
+
+
+def bs4_text(html):
+    """The previous get_website_text implementation."""
+    soup = BeautifulSoup(html, "html.parser")
+    for script_or_style in soup(["script", "style"]):
+        script_or_style.decompose()
+    lines = (line.strip() for line in soup.get_text().splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    return "\n".join(chunk for chunk in chunks if chunk)
+
+
+def test_text_matches_the_previous_extraction():
+    assert extract_text(PAGE) == bs4_text(PAGE)
+    assert "var x" not in extract_text(PAGE)
+
+
+def test_links_without_building_a_dom():
+    assert extract_links(PAGE) == [("Avaleht", "/"), ("Meiemeeskond", "/meeskond")]
+
+
+def test_normalize_text_splits_lines_and_double_spaces():
+    assert normalize_text(" a  b\r\n\n c   d  e ") == "a\nb\nc\nd\ne"
+
+
+def test_charset_from_header_meta_or_content():
+    text = "Müügijuht Õie Šõra"
+    assert decode_body(text.encode("cp1257"), "text/html; charset=windows-1257") == text
+    meta = f'<meta charset="iso-8859-15"><p>{text[:9]}</p>'
+    assert text[:9] in decode_body(meta.encode("iso-8859-15"), "text/html")
+    # A multibyte character cut by the byte cap does not break UTF-8 detection
+    assert decode_body(text.encode("utf-8")[:2]) == "M"
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), 10):
+            yield self.body[start : start + 10]
+
+
+def test_read_body_stops_at_the_byte_cap():
+    assert read_body(FakeResponse(b"x" * 95), max_bytes=40) == (b"x" * 40, True)
+    assert read_body(FakeResponse(b"x" * 15), max_bytes=40) == (b"x" * 15, False)
+
+
+def test_structured_markup_signals():
+    assert not has_structured_markup(PAGE)
+    assert has_structured_markup('<a href="MAILTO:info@firma.ee">kiri</a>')
+    assert has_structured_markup('<script type="application/ld+json">{}</script>')
+    assert has_structured_markup('<div class="h-card"><span itemprop="name">')
@@ -0,0 +1,98 @@
+import time
+
+import pytest
+from flask import Flask
+
+from api import job_routes
+from api.job_queue import (
+    JobQueue,
+    JobWorkerPool,
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    STATUS_DONE,
+    STATUS_FAILED,
+    STATUS_QUEUED,
+)
+
+
+@pytest.fixture()
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.sqlite3"))
+
+
+def test_interactive_jobs_are_claimed_before_bulk_jobs(queue):
+    bulk_id = queue.enqueue("autofill", {"page_id": "bulk"}, PRIORITY_BULK)
+    click_id = queue.enqueue("autofill", {"page_id": "click"}, PRIORITY_INTERACTIVE)
+
+    assert queue.claim_next(["autofill"])["id"] == click_id
+    assert queue.claim_next(["autofill"])["id"] == bulk_id
+    assert queue.claim_next(["autofill"]) is None
+
+
+def test_claim_respects_kinds_and_priority_limit(queue):
+    queue.enqueue("update_staff", {}, PRIORITY_INTERACTIVE)
+    queue.enqueue("autofill", {}, PRIORITY_BULK)
+
+    assert queue.claim_next(["autofill"], max_priority=PRIORITY_INTERACTIVE) is None
+    assert queue.claim_next(["autofill"])["kind"] == "autofill"
+
+
+def test_worker_records_progress_and_result(queue):
+    def handler(payload, report_progress):
+        report_progress(50, "poolel")
+        return {"success": True, "message": f"ok {payload['page_id']}"}
+
+    job_id = queue.enqueue("autofill", {"page_id": "p1"})
+    pool = JobWorkerPool(queue, {"autofill": handler})
+
+    assert pool.run_one() is True
+    job = queue.get(job_id)
+    assert job["status"] == STATUS_DONE
+    assert job["progress"] == 100
+    assert job["result"] == {"success": True, "message": "ok p1"}
+
+
+def test_worker_marks_failed_jobs(queue):
+    def handler(payload, report_progress):
+        raise RuntimeError("boom")
+
+    job_id = queue.enqueue("autofill", {})
+    JobWorkerPool(queue, {"autofill": handler}).run_one()
+
+    job = queue.get(job_id)
+    assert job["status"] == STATUS_FAILED
+    assert "boom" in job["message"]
+
+
+def test_stale_running_jobs_are_requeued(queue):
+    job_id = queue.enqueue("autofill", {})
+    queue.claim_next(["autofill"])
+
+    assert queue.requeue_interrupted(stale_after=3600) == 0
+    time.sleep(0.01)
+    assert queue.requeue_interrupted(stale_after=0) == 1
+    assert queue.get(job_id)["status"] == STATUS_QUEUED
+
+
+def test_status_url_points_to_the_app_that_queued_the_job(queue, monkeypatch):
+    monkeypatch.setattr(job_routes, "get_job_queue", lambda: queue)
+    app = Flask(__name__)
+    app.register_blueprint(job_routes.jobs_blueprint)
+    job_id = queue.enqueue("update_staff", {"notion_url": None})
+
+    with app.test_request_context("/api/update-staff?format=json"):
+        body, status = job_routes.job_accepted_response(job_id)
+    assert status == 202
+    assert body["status_url"] == f"/api/update-staff/jobs/{job_id}"
+
+    response = app.test_client().get(f"{body['status_url']}?format=json")
+    assert response.get_json()["kind"] == "update_staff"
+
+
+def test_async_is_ignored_without_persistent_workers(monkeypatch):
+    app = Flask(__name__)
+    with app.test_request_context("/api/autofill?async=1"):
+        monkeypatch.setattr(job_routes, "ASYNC_JOBS_ENABLED", False)
+        assert not job_routes.wants_async()
+        monkeypatch.setattr(job_routes, "ASYNC_JOBS_ENABLED", True)
+        assert job_routes.wants_async()
@@ -0,0 +1,41 @@
+from api.link_ranking import confident_choice, rank_links
+
+BASE = "https://firma.ee/"
+
+
+def choose(links):
+    return confident_choice(rank_links(links, BASE))
+
+
+def test_team_page_wins_over_contact_and_about():
+    links = [
+        ("avaleht", "https://firma.ee/"),
+        ("meist", "https://firma.ee/meist"),
+        ("kontakt", "https://firma.ee/kontakt"),
+        ("meie meeskond", "https://firma.ee/meeskond/"),
+        ("meie meeskond", "https://firma.ee/meeskond#top"),
+        ("blogi", "https://firma.ee/blog/meeskonna-suvepaevad"),
+    ]
+
+    assert choose(links) == "https://firma.ee/meeskond/"
+
+
+def test_contact_page_is_enough_when_there_is_no_team_page():
+    links = [
+        ("tooted", "https://firma.ee/tooted"),
+        ("Kontakt", "https://firma.ee/kontakt"),
+    ]
+
+    assert choose(links) == "https://firma.ee/kontakt"
+
+
+def test_ambiguous_or_weak_rankings_are_left_to_gemini():
+    two_team_pages = [
+        ("meeskond", "https://firma.ee/et/meeskond"),
+        ("team", "https://firma.ee/en/team"),
+    ]
+    only_about = [("meist", "https://firma.ee/meist")]
+
+    assert choose(two_team_pages) is None
+    assert choose(only_about) is None
+    assert choose([]) is None
@@ -0,0 +1,42 @@
+import requests
+
+from api.clients import notion_client
+from api.clients.notion_client import NotionClient
+
+
+def response(status, headers=None):
+    r = requests.Response()
+    r.status_code = status
+    r.headers.update(headers or {})
+    r._content = b"{}"
+    return r
+
+
+def test_rate_limited_requests_are_retried_after_retry_after(monkeypatch):
+    answers = [response(429, {"Retry-After": "2"}), response(429), response(200)]
+    waits = []
+    monkeypatch.setattr(
+        notion_client.requests, "request", lambda *a, **k: answers.pop(0)
+    )
+    monkeypatch.setattr(notion_client.time, "sleep", waits.append)
+
+    assert NotionClient("t", "db").get_page("p1") == {}
+    assert waits == [2.0, 2]
+
+
+def test_retries_are_bounded(monkeypatch):
+    calls = []
+
+    def rate_limited(*args, **kwargs):
+        calls.append(args)
+        return response(429, {"Retry-After": "600"})
+
+    monkeypatch.setattr(notion_client.requests, "request", rate_limited)
+    monkeypatch.setattr(notion_client.time, "sleep", lambda s: None)
+    monkeypatch.setattr(notion_client, "NOTION_MAX_RETRIES", 2)
+
+    r = NotionClient("t", "db")._request("GET", "https://api.notion.com/v1/x")
+
+    assert r.status_code == 429
+    assert len(calls) == 3
+    assert notion_client._retry_after_seconds("600", 0) == 30
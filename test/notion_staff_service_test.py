@@ -0,0 +1,190 @@
+import threading
+
+from api.staff_update_services import notion_staff_service
+from api.staff_update_services.notion_staff_service import (
+    plan_staff_sync,
+    sync_staff_data,
+)
+
+COMPANY = "company-1"
+
+
+def contact(page_id, name, role, email=None):
+    return {
+        "id": page_id,
+        "archived": False,
+        "properties": {
+            "Name": {"type": "title", "title": [{"plain_text": name}] if name else []},
+            "Amet": {"type": "rich_text", "rich_text": [{"plain_text": role}]},
+            "E-mail": {"type": "email", "email": email},
+            "Tel. nr": {"type": "phone_number", "phone_number": None},
+        },
+    }
+
+
+def member(name, role="Juhatuse liige"):
+    return {"name": name, "role": role, "email": None, "phone": None}
+
+
+def operations(plan):
+    return sorted(
+        (op, target or payload["properties"]["Name"]["title"][0]["text"]["content"])
+        for task in plan["tasks"]
+        for op, target, payload in task["steps"]
+    )
+
+
+class FakeNotion:
+    def __init__(self, pages):
+        self.pages = pages
+        self.queries = []
+        self.writes = []
+        self.lock = threading.Lock()
+
+    def query_database_all(self, filter_dict=None):
+        self.queries.append(filter_dict)
+        return list(self.pages)
+
+    def create_page(self, payload):
+        with self.lock:
+            self.writes.append(("create", payload))
+
+    def update_page(self, page_id, properties):
+        with self.lock:
+            self.writes.append(("update", page_id))
+
+    def delete_page(self, page_id):
+        with self.lock:
+            self.writes.append(("archive", page_id))
+
+
+def test_board_members_with_the_same_role_do_not_retire_each_other():
+    contacts = [
+        contact("p-mari", "Mari Maasikas", "Juhatuse liige"),
+        contact("p-juri", "Jüri Juurikas", "Juhatuse liige"),
+    ]
+    staff = [member("Jüri Juurikas"), member("Mari Maasikas")]
+
+    plan = plan_staff_sync(staff, contacts, COMPANY, "db", None, retire_missing=True)
+
+    assert plan["tasks"] == []
+    assert plan["skipped"] == 2
+
+
+def test_new_board_member_replaces_the_one_who_left():
+    contacts = [
+        contact("p-mari", "Mari Maasikas", "Juhatuse liige"),
+        contact("p-mari-2", "Mari Maasikas", "Juhatuse liige"),
+        contact("p-vana", "Vana Juht", "Juhatuse liige"),
+        contact("p-teine", "Teine Juht", "Juhatuse liige"),
+        contact("p-endine", "Ammune Juht", "Juhatuse liige (endine)"),
+    ]
+    staff = [member("Mari Maasikas"), member("Kati Kask")]
+
+    plan = plan_staff_sync(staff, contacts, COMPANY, "db", None, retire_missing=True)
+
+    assert operations(plan) == [
+        ("archive", "p-mari-2"),
+        ("create", "Kati Kask"),
+        ("endine", "p-teine"),
+        ("endine", "p-vana"),
+    ]
+
+
+def test_general_contact_pages_are_never_archived_as_duplicates():
+    contacts = [
+        contact("p-sales", None, "General Contact", email="sales@firma.ee"),
+        contact("p-info", None, "General Contact", email="info@firma.ee"),
+        contact("p-arved", None, "General Contact", email="arved@firma.ee"),
+    ]
+    staff = [
+        {"name": None, "role": "General Contact", "email": "info@firma.ee"},
+        {"name": None, "role": "General Contact", "email": "uus@firma.ee"},
+    ]
+
+    plan = plan_staff_sync(staff, contacts, COMPANY, "db", None)
+
+    # info@ matches its own page, the new address gets a page of its own
+    steps = [step for task in plan["tasks"] for step in task["steps"]]
+    assert [(op, payload["properties"]["E-mail"]) for op, _, payload in steps] == [
+        ("create", {"email": "uus@firma.ee"})
+    ]
+    assert plan["skipped"] == 1
+
+
+def test_returning_board_member_gets_the_role_back():
+    contacts = [contact("p-mari", "Mari Maasikas", "Juhatuse liige (endine)")]
+
+    plan = plan_staff_sync(
+        [member("Mari Maasikas")], contacts, COMPANY, "db", None, retire_missing=True
+    )
+
+    assert operations(plan) == [("update", "p-mari")]
+
+
+def test_sync_loads_existing_contacts_with_one_query():
+    notion = FakeNotion(
+        [
+            contact("p-ceo", "Mari Maasikas", "CEO", email="vana@firma.ee"),
+            contact("p-cto", "Vana Juht", "CTO"),
+        ]
+    )
+    staff = [
+        {"name": "Mari Maasikas", "role": "CEO", "email": "mari@firma.ee"},
+        member("Jüri Juurikas", "CTO"),
+        member("Kati Kask", "CFO"),
+    ]
+
+    result = sync_staff_data(notion, staff, COMPANY, "db", None, max_workers=2)
+
+    assert result == (2, 1, 0, 0, [])
+    assert notion.queries == [
+        {"property": "Organisatsioon", "relation": {"contains": COMPANY}}
+    ]
+    assert sorted(op for op, _ in notion.writes) == [
+        "create",
+        "create",
+        "update",
+        "update",
+    ]
+
+
+def test_failed_endine_mark_is_counted_as_a_failure():
+    class NoUpdates(FakeNotion):
+        def update_page(self, page_id, properties):
+            raise notion_staff_service.requests.HTTPError("409 Conflict")
+
+    notion = NoUpdates(
+        [
+            contact("p-vana", "Vana Juht", "Juhatuse liige"),
+            contact("p-lahkunud", "Lahkunud Juht", "Juhatuse esimees"),
+            contact("p-teine", "Teine Juht", "Juhatuse liige"),
+        ]
+    )
+    staff = [member("Kati Kask"), member("Mari Maasikas", "Juhatuse esimees")]
+
+    created, updated, failed, skipped, errors = sync_staff_data(
+        notion, staff, COMPANY, "db", None, retire_missing=True
+    )
+
+    # No successor is created next to an unmarked page, and the retired
+    # page that could not be marked is not counted as updated
+    assert (created, updated, failed) == (0, 0, 3)
+    assert all("(endine)" in error for error in errors)
+    assert notion.writes == []
+
+
+def test_sync_fails_instead_of_writing_blind_when_contacts_cannot_be_loaded():
+    class BrokenNotion(FakeNotion):
+        def query_database_all(self, filter_dict=None):
+            raise notion_staff_service.requests.HTTPError("503 Service Unavailable")
+
+    notion = BrokenNotion([])
+
+    created, updated, failed, skipped, errors = sync_staff_data(
+        notion, [member("Mari Maasikas")], COMPANY, "db", None
+    )
+
+    assert (created, updated, failed) == (0, 0, 1)
+    assert "Kontaktisikute laadimine" in errors[0]
+    assert notion.writes == []
@@ -0,0 +1,114 @@
+import json
+import time
+
+import pytest
+
+from api import autofill, profiling, update_staff
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_SECRET", "test-secret")
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(profiling, "PROFILE_REQUESTS", False)
+    return tmp_path
+
+
+def busy_autofill_work(duration=0.05):
+    deadline = time.perf_counter() + duration
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(200))
+    return total
+
+
+def test_profile_token_is_bound_to_path_and_expiry(profile_dir):
+    token = profiling.profile_token("/api/autofill", ttl=60)
+
+    assert profiling.valid_profile_token(token, "/api/autofill")
+    assert not profiling.valid_profile_token(token, "/api/update-staff")
+    assert not profiling.valid_profile_token(
+        token, "/api/autofill", now=time.time() + 120
+    )
+    expires, _, signature = token.partition(".")
+    assert not profiling.valid_profile_token(
+        f"{int(expires) + 3600}.{signature}", "/api/autofill"
+    )
+    assert not profiling.valid_profile_token("1", "/api/autofill")
+
+
+def test_signed_flag_profiles_one_autofill_request(profile_dir, monkeypatch):
+    def fake_autofill(page_id, config):
+        busy_autofill_work()
+        return {"success": True, "message": "Täidetud", "company_name": "Firma OÜ"}
+
+    monkeypatch.setattr(autofill, "autofill_page_by_page_id", fake_autofill)
+    client = autofill.app.test_client()
+    token = profiling.profile_token("/api/autofill")
+
+    response = client.get(
+        f"/api/autofill?pageId=profiil-1&profile={token}",
+        headers={"X-Request-Id": "req:42"},
+    )
+
+    html = response.get_data(as_text=True)
+    saved = list(profile_dir.glob("*_autofill_req-42.pstats"))
+    assert len(saved) == 1
+    assert "Profiil req-42 (cprofile" in html
+    assert "busy_autofill_work" in html
+
+    # Without the flag nothing is profiled
+    html = client.get("/api/autofill?pageId=profiil-2").get_data(as_text=True)
+    assert "Profiil" not in html
+    assert len(list(profile_dir.iterdir())) == 1
+
+
+def test_invalid_flag_is_ignored(profile_dir, monkeypatch):
+    monkeypatch.setattr(
+        autofill,
+        "autofill_page_by_page_id",
+        lambda page_id, config: {"success": True, "message": "Täidetud"},
+    )
+    client = autofill.app.test_client()
+
+    html = client.get("/api/autofill?pageId=profiil-3&profile=123.abc").get_data(
+        as_text=True
+    )
+
+    assert "Profiil" not in html
+    assert list(profile_dir.iterdir()) == []
+
+
+def test_sampling_profile_of_update_staff_is_speedscope_json(profile_dir, monkeypatch):
+    def fake_staff_update(website_url, page_id, force=False, crawl_pages=0):
+        busy_autofill_work(0.2)
+        return {
+            "success": True,
+            "kind": "success",
+            "status": "Edukas",
+            "status_class": "success",
+            "message": "✅ Valmis",
+            "debug_info": None,
+        }
+
+    monkeypatch.setattr(update_staff, "validate_config", lambda: ("key", "db"))
+    monkeypatch.setattr(update_staff, "run_staff_update", fake_staff_update)
+    monkeypatch.setattr(profiling, "PROFILE_REQUESTS", True)
+    monkeypatch.setattr(profiling, "PROFILE_SAMPLE_INTERVAL_MS", 2)
+    client = update_staff.app.test_client()
+
+    response = client.post(
+        "/api/update-staff?profiler=sampling",
+        json={"websiteUrl": "https://firma.ee"},
+    )
+
+    html = response.get_data(as_text=True)
+    assert "(sampling," in html
+    assert "busy_autofill_work" in html
+    [saved] = profile_dir.glob("*_update-staff_*.speedscope.json")
+    document = json.loads(saved.read_text("utf-8"))
+    names = {frame["name"] for frame in document["shared"]["frames"]}
+    assert "busy_autofill_work" in names
+    profile = document["profiles"][0]
+    assert profile["type"] == "sampled"
+    assert len(profile["samples"]) == len(profile["weights"]) > 10
@@ -0,0 +1,268 @@
+import os
+import threading
+from datetime import timedelta
+
+import pytest
+import requests
+
+from api import json_loader, resilience
+from api.cache_store import PersistentCache
+from api.clients import company_website_client
+from api.clients.company_website_client import CompanyWebsiteClient
+from api.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    Dependency,
+    DependencyUnavailable,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+def http_error(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.HTTPError(f"{status_code}", response=response)
+
+
+def fail(error):
+    raise error
+
+
+def test_breaker_opens_fails_fast_and_probes_after_reset():
+    clock = FakeClock()
+    dependency = Dependency(
+        "notion", max_in_flight=2, failure_threshold=2, reset_timeout=30, clock=clock
+    )
+
+    for _ in range(2):
+        with pytest.raises(requests.ConnectionError):
+            dependency.call(fail, requests.ConnectionError("down"))
+    assert dependency.breaker().state == OPEN
+
+    calls = []
+    with pytest.raises(DependencyUnavailable):
+        dependency.call(calls.append, 1)
+    assert calls == []
+
+    # Half-open: one probe; its failure opens the breaker again
+    clock.now = 30
+    assert dependency.breaker().state == HALF_OPEN
+    with pytest.raises(requests.ConnectionError):
+        dependency.call(fail, requests.ConnectionError("still down"))
+    assert dependency.breaker().state == OPEN
+
+    clock.now = 60
+    assert dependency.call(lambda: "ok") == "ok"
+    assert dependency.snapshot()["state"] == CLOSED
+    assert dependency.snapshot()["times_opened"] == 2
+
+
+def test_half_open_lets_one_probe_through():
+    clock = FakeClock()
+    dependency = Dependency("gemini", 4, failure_threshold=1, clock=clock)
+    with pytest.raises(RuntimeError):
+        dependency.call(fail, RuntimeError("503"))
+    clock.now = 100
+
+    probe_started = threading.Event()
+    release_probe = threading.Event()
+
+    def slow_probe():
+        probe_started.set()
+        release_probe.wait(5)
+        return "ok"
+
+    probe = threading.Thread(target=dependency.call, args=(slow_probe,))
+    probe.start()
+    probe_started.wait(5)
+    with pytest.raises(DependencyUnavailable):
+        dependency.call(lambda: "second probe")
+    release_probe.set()
+    probe.join()
+
+    assert dependency.breaker().state == CLOSED
+
+
+def test_client_errors_and_throttling_do_not_count_but_5xx_responses_do():
+    dependency = Dependency("google_cse", 2, failure_threshold=2)
+
+    for status in (404, 429, 429):
+        with pytest.raises(requests.HTTPError):
+            dependency.call(fail, http_error(status))
+    dependency.call(FakeResponse, 429)
+    assert dependency.breaker().state == CLOSED
+
+    # A returned 5xx response reaches the caller but counts as a failure
+    assert dependency.call(FakeResponse, 503).status_code == 503
+    dependency.call(FakeResponse, 502)
+    assert dependency.breaker().state == OPEN
+
+
+def test_bulkhead_rejects_when_full():
+    dependency = Dependency("ariregister", max_in_flight=1, acquire_timeout=0.05)
+    started = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        started.set()
+        release.wait(5)
+
+    holder = threading.Thread(target=dependency.call, args=(hold,))
+    holder.start()
+    started.wait(5)
+    assert dependency.snapshot()["in_flight"] == 1
+    with pytest.raises(DependencyUnavailable):
+        dependency.call(lambda: None)
+    release.set()
+    holder.join()
+
+    snapshot = dependency.snapshot()
+    assert snapshot["rejected"] == 1
+    assert snapshot["in_flight"] == 0
+    # Rejections by the bulkhead say nothing about the dependency's health
+    assert snapshot["state"] == CLOSED
+
+
+def test_open_host_breaker_serves_stale_page(tmp_path, monkeypatch):
+    websites = Dependency("websites", 4, failure_threshold=1, reset_timeout=60)
+    monkeypatch.setattr(company_website_client, "websites", websites)
+    cache = PersistentCache(
+        "web_pages", timedelta(days=1), db_path=str(tmp_path / "cache.sqlite3")
+    )
+    cache.set(
+        "https://firma.ee/meeskond",
+        {"url": "https://firma.ee/meeskond", "text": "vana", "fetched_at": 0},
+    )
+
+    def hedged_get(url, headers, timeout):
+        raise requests.ConnectionError("down")
+
+    monkeypatch.setattr(company_website_client, "hedged_get", hedged_get)
+    client = CompanyWebsiteClient(page_cache=cache)
+
+    with pytest.raises(requests.ConnectionError):
+        client.get_company_website("https://firma.ee/meeskond", {})
+    # The breaker is shared by www. and apex; the cached copy is returned
+    assert client.get_company_website("https://firma.ee/meeskond", {}).text == "vana"
+    with pytest.raises(DependencyUnavailable):
+        client.get_company_website("https://www.firma.ee/", {})
+    assert websites.snapshot()["open_breakers"]["firma.ee"]["state"] == OPEN
+
+
+def test_health_report_lists_every_dependency():
+    report = resilience.health_report()
+    assert set(report) == {
+        "notion",
+        "google_cse",
+        "gemini",
+        "ariregister",
+        "emta",
+        "websites",
+    }
+    assert {"state", "in_flight", "max_in_flight"} <= set(report["notion"])
+
+
+def test_per_key_breakers_are_bounded_and_open_ones_are_kept():
+    clock = FakeClock()
+    websites = Dependency("websites", 4, failure_threshold=1, max_keys=3, clock=clock)
+
+    def down():
+        raise requests.ConnectionError("down")
+
+    with pytest.raises(requests.ConnectionError):
+        websites.call(down, breaker_key="katki.ee")
+    for host in ("a.ee", "b.ee", "c.ee", "d.ee"):
+        assert websites.available(host)
+
+    assert websites.snapshot()["tracked_keys"] == 3
+    assert not websites.available("katki.ee")
+
+
+class StreamedResponse:
+    status_code = 200
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for chunk in self.chunks:
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk() if callable(chunk) else chunk
+
+
+def test_concurrent_zip_refreshes_do_not_share_a_temporary_file(tmp_path, monkeypatch):
+    cache_path = str(tmp_path / "data.zip")
+    barrier = threading.Barrier(2)
+
+    def streamed_get(url, **kwargs):
+        body = url[-1].encode() * (3 if url.endswith("A") else 1)
+
+        def after_both_started():
+            # Both downloads are half written before either finishes
+            barrier.wait(5)
+            return body
+
+        return StreamedResponse([body, after_both_started])
+
+    monkeypatch.setattr(requests, "get", streamed_get)
+    dependency = Dependency("ariregister", 2)
+    errors = []
+
+    def refresh(url):
+        try:
+            json_loader._ensure_zip_cache(url, cache_path, dependency)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [
+        threading.Thread(target=refresh, args=(url,))
+        for url in ("https://x.ee/A", "https://x.ee/B")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    with open(cache_path, "rb") as f:
+        assert f.read() in (b"AAAAAA", b"BB")
+    assert errors == []
+    assert os.listdir(tmp_path) == ["data.zip"]
+
+
+def test_interrupted_zip_download_keeps_the_stale_file(tmp_path, monkeypatch):
+    cache_path = tmp_path / "data.zip"
+    cache_path.write_bytes(b"vana")
+    monkeypatch.setattr(json_loader, "CACHE_EXPIRATION", timedelta(0))
+    monkeypatch.setattr(
+        requests,
+        "get",
+        lambda url, **kwargs: StreamedResponse([b"uu", requests.ConnectionError()]),
+    )
+
+    json_loader._ensure_zip_cache("https://x.ee/data.zip", str(cache_path))
+
+    assert cache_path.read_bytes() == b"vana"
+    assert os.listdir(tmp_path) == ["data.zip"]
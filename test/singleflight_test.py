@@ -0,0 +1,56 @@
+import threading
+import time
+
+import pytest
+
+from api.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_run():
+    flights = SingleFlight()
+    calls = []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"success": True}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flights.do("page", work)))
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"success": True}] * 3
+
+
+def test_memo_window_only_keeps_accepted_results():
+    flights = SingleFlight(memo_seconds=60)
+    calls = []
+
+    def work():
+        calls.append(1)
+        return {"success": len(calls) > 1}
+
+    flights.do("page", work, memoize_if=lambda r: r["success"])
+    flights.do("page", work, memoize_if=lambda r: r["success"])
+    flights.do("page", work, memoize_if=lambda r: r["success"])
+
+    # The failed first result was not memoized, the successful second one was
+    assert len(calls) == 2
+
+
+def test_exceptions_are_not_memoized():
+    flights = SingleFlight(memo_seconds=60)
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        flights.do("page", fail)
+    assert flights.do("page", lambda: "ok") == "ok"
@@ -0,0 +1,107 @@
+import gzip
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from api import cache_store, sitemap_discovery
+
+URLSET = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+{}
+</urlset>"""
+
+
+def urlset(*urls):
+    return URLSET.format("\n".join(f"<url><loc>{u}</loc></url>" for u in urls))
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    files = {}
+    delays = {}
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(self.path)
+        time.sleep(self.delays.get(self.path, 0))
+        body = self.files.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def site(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache_store, "CACHE_DB_PATH", str(tmp_path / "cache.sqlite3"))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SiteHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    SiteHandler.requests = []
+    SiteHandler.delays = {}
+    yield base
+    server.shutdown()
+    server.server_close()
+
+
+def test_nested_and_gzipped_sitemaps_from_robots(site):
+    SiteHandler.files = {
+        "/robots.txt": f"User-agent: *\nSitemap: {site}/sitemap-index.xml\n",
+        "/sitemap-index.xml": f"""<?xml version="1.0"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>{site}/pages.xml</loc></sitemap>
+  <sitemap><loc>{site}/posts.xml.gz</loc></sitemap>
+</sitemapindex>""",
+        "/pages.xml": urlset(f"{site}/", f"{site}/teenused", f"{site}/meeskond"),
+        "/posts.xml.gz": gzip.compress(
+            urlset(f"{site}/blog/uus-kontor", "https://muu.ee/team").encode()
+        ),
+    }
+
+    urls = sitemap_discovery.collect_sitemap_urls(site + "/")
+    assert f"{site}/blog/uus-kontor" in urls
+    assert "https://muu.ee/team" not in urls
+
+    assert sitemap_discovery.find_contact_page_from_sitemap(site + "/") == (
+        f"{site}/meeskond"
+    )
+    # The URL list is cached per site
+    requests_before = len(SiteHandler.requests)
+    sitemap_discovery.find_contact_page_from_sitemap(site + "/")
+    assert len(SiteHandler.requests) == requests_before
+
+
+def test_default_location_and_no_clear_winner(site):
+    SiteHandler.files = {
+        "/sitemap.xml": urlset(f"{site}/et/meeskond", f"{site}/en/team"),
+    }
+
+    assert sitemap_discovery.find_contact_page_from_sitemap(site) is None
+    assert "/robots.txt" in SiteHandler.requests
+
+
+def test_slow_site_is_given_up_at_the_deadline(site, monkeypatch):
+    monkeypatch.setattr(sitemap_discovery, "SITEMAP_DEADLINE_SECONDS", 0.5)
+    SiteHandler.files = {
+        "/robots.txt": f"Sitemap: {site}/a.xml\nSitemap: {site}/b.xml\n",
+        "/a.xml": urlset(f"{site}/meeskond"),
+        "/b.xml": urlset(f"{site}/kontakt"),
+    }
+    SiteHandler.delays = {"/b.xml": 2}
+
+    started = time.monotonic()
+    urls = sitemap_discovery.collect_sitemap_urls(site)
+
+    # b.xml gets only what is left of the budget, not SITEMAP_TIMEOUT
+    assert time.monotonic() - started < 1
+    assert urls == [f"{site}/meeskond"]
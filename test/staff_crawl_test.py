@@ -0,0 +1,78 @@
+import threading
+import time
+
+from api.staff_crawl import CHARS_PER_TOKEN, crawl_staff_pages, merge_pages
+
+MENU = "Avaleht\nMeist\nKontakt"
+
+
+def test_merge_drops_lines_repeated_across_pages():
+    pages = [
+        {"url": "https://firma.ee/kontakt", "text": MENU + "\ninfo@firma.ee"},
+        {"url": "https://firma.ee/meist", "text": MENU + "\nJuhatus: Mari Maasikas"},
+    ]
+
+    merged = merge_pages(pages)
+
+    assert merged.count("Avaleht") == 1
+    assert "=== Leht: https://firma.ee/meist ===" in merged
+    assert "Juhatus: Mari Maasikas" in merged
+
+
+def test_merge_fits_the_token_budget_and_keeps_every_page():
+    long_text = "\n".join(f"Rida {i} " + "x" * 60 for i in range(500))
+    pages = [
+        {"url": "https://firma.ee/kontakt", "text": long_text},
+        {"url": "https://firma.ee/meist", "text": "Tegevjuht: Jaan Tamm"},
+    ]
+
+    merged = merge_pages(pages, token_budget=200)
+
+    assert len(merged) <= 200 * CHARS_PER_TOKEN
+    # The short second page still fits after the long first page
+    assert "Tegevjuht: Jaan Tamm" in merged
+
+
+def test_crawl_fetches_pages_in_parallel_in_ranking_order():
+    active = {"now": 0, "max": 0}
+    lock = threading.Lock()
+
+    def fetch_text(url):
+        with lock:
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+        time.sleep(0.05)
+        with lock:
+            active["now"] -= 1
+        return None if url.endswith("/viga") else f"Sisu {url}"
+
+    merged = crawl_staff_pages(
+        "https://firma.ee/kontakt",
+        "Kontakt",
+        ["https://firma.ee/meist", "https://firma.ee/viga", "https://firma.ee/tiim"],
+        fetch_text,
+    )
+
+    assert active["max"] > 1
+    assert merged.index("firma.ee/kontakt") < merged.index("firma.ee/meist")
+    assert merged.index("firma.ee/meist") < merged.index("firma.ee/tiim")
+    assert "firma.ee/viga" not in merged
+
+
+def test_crawl_stops_downloading_after_the_byte_cap():
+    fetched = []
+
+    def fetch_text(url):
+        fetched.append(url)
+        return "y" * 100
+
+    crawl_staff_pages(
+        "https://firma.ee/kontakt",
+        "x" * 100,
+        ["https://firma.ee/a", "https://firma.ee/b", "https://firma.ee/c"],
+        fetch_text,
+        max_workers=1,
+        max_bytes=250,
+    )
+
+    assert fetched == ["https://firma.ee/a", "https://firma.ee/b"]
@@ -0,0 +1,59 @@
+import pytest
+
+from api import cache_store
+from api.staff_update_services import staff_updater
+
+STAFF = [{"name": "Mari Maasikas", "role": "CEO", "email": None, "phone": None}]
+
+
+@pytest.fixture()
+def pipeline(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache_store, "CACHE_DB_PATH", str(tmp_path / "cache.sqlite3"))
+    calls = {"search": 0, "sync": 0, "revalidated": 0}
+    site = {"text": "Meeskond: Mari Maasikas, CEO"}
+
+    def fetch_staff_page(website_url, crawl_pages=0, revalidate=False):
+        calls["search"] += 1
+        calls["revalidated"] += revalidate
+        return {
+            "contact_url": website_url + "/meeskond",
+            "website_text": site["text"],
+            "staff": list(STAFF),
+        }, None
+
+    def sync_staff_data(*args):
+        calls["sync"] += 1
+        return 1, 0, 0, 1, []
+
+    monkeypatch.setattr(staff_updater, "validate_config", lambda: ("key", "db"))
+    monkeypatch.setattr(staff_updater, "fetch_staff_page", fetch_staff_page)
+    monkeypatch.setattr(staff_updater, "fetch_page_text", lambda url: site["text"])
+    monkeypatch.setattr(staff_updater, "NotionClient", lambda *args: None)
+    monkeypatch.setattr(staff_updater, "get_database_properties", lambda n: {})
+    monkeypatch.setattr(staff_updater, "sync_staff_data", sync_staff_data)
+    return calls, site
+
+
+def test_unchanged_page_skips_gemini_and_sync(pipeline):
+    calls, site = pipeline
+
+    first = staff_updater.run_staff_update("https://firma.ee", "page-1")
+    second = staff_updater.run_staff_update("https://firma.ee", "PAGE1")
+
+    assert first["kind"] == "success" and not first.get("unchanged")
+    assert second["unchanged"] and second["status"] == "Muutusteta"
+    assert calls == {"search": 1, "sync": 1, "revalidated": 0}
+
+
+def test_changed_page_or_force_runs_the_pipeline(pipeline):
+    calls, site = pipeline
+
+    staff_updater.run_staff_update("https://firma.ee", "page-1")
+    site["text"] = "Meeskond: Mari Maasikas, CEO; Jüri Juurikas, CTO"
+    changed = staff_updater.run_staff_update("https://firma.ee", "page-1")
+    forced = staff_updater.run_staff_update("https://firma.ee", "page-1", force=True)
+
+    assert not changed.get("unchanged")
+    assert not forced.get("unchanged")
+    # Only the forced run skips the page cache's freshness window
+    assert calls == {"search": 3, "sync": 3, "revalidated": 1}
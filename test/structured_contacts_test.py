@@ -0,0 +1,139 @@
+from bs4 import BeautifulSoup
+
+from api.structured_contacts import (
+    extract_structured_contacts,
+    has_enough_roles,
+    recover_emails,
+    unreverse_email,
+)
+
+
+def contacts(html):
+    return extract_structured_contacts(BeautifulSoup(html, "html.parser"))
+
+
+def test_json_ld_people_and_organization():
+    html = """
+    <script type="application/ld+json">
+    {"@context": "https://schema.org", "@graph": [
+      {"@type": "Organization", "name": "Firma OÜ", "email": "info@firma.ee",
+       "founder": {"@type": "Person", "name": "Jaan Tamm"}},
+      {"@type": "Person", "name": "Mari Maasikas", "jobTitle": "Tegevjuht",
+       "email": "mailto:mari@firma.ee", "telephone": "+372 5123 4567"},
+      {"@type": "Person", "name": "Peeter Pärn", "jobTitle": "Arendaja"}
+    ]}
+    </script>
+    """
+
+    result = contacts(html)
+
+    assert {
+        "name": None,
+        "role": "General Contact",
+        "email": "info@firma.ee",
+        "phone": None,
+    } in result
+    assert {
+        "name": "Jaan Tamm",
+        "role": "Founder",
+        "email": None,
+        "phone": None,
+    } in result
+    assert {
+        "name": "Mari Maasikas",
+        "role": "Tegevjuht",
+        "email": "mari@firma.ee",
+        "phone": "+372 5123 4567",
+    } in result
+    assert all(c["name"] != "Peeter Pärn" for c in result)
+    assert has_enough_roles(result)
+
+
+def test_microdata_and_hcard():
+    html = """
+    <div itemscope itemtype="https://schema.org/Person">
+      <span itemprop="name">Kati Kask</span>
+      <span itemprop="jobTitle">Turundusjuht</span>
+      <a itemprop="email" href="mailto:kati@firma.ee">kati@firma.ee</a>
+      <div itemprop="worksFor" itemscope itemtype="https://schema.org/Organization">
+        <span itemprop="name">Firma OÜ</span>
+      </div>
+    </div>
+    <div class="vcard">
+      <span class="fn">Andres Mänd</span>
+      <span class="title">Head of Sales</span>
+      <a class="tel" href="tel:+37253456789">+372 5345 6789</a>
+    </div>
+    """
+
+    result = contacts(html)
+
+    assert result == [
+        {
+            "name": "Kati Kask",
+            "role": "Turundusjuht",
+            "email": "kati@firma.ee",
+            "phone": None,
+        },
+        {
+            "name": "Andres Mänd",
+            "role": "Head of Sales",
+            "email": None,
+            "phone": "+37253456789",
+        },
+    ]
+
+
+def test_mailto_links_next_to_names():
+    html = """
+    <div class="team">
+      <div class="member"><h3>Mari Maasikas</h3><p>CEO</p>
+        <a href="mailto:mari@firma.ee">E-post</a><a href="tel:+3725123456">Helista</a></div>
+      <div class="member"><h3>Liis Lepp</h3><p>Arendaja</p>
+        <a href="mailto:liis@firma.ee">E-post</a></div>
+    </div>
+    <footer><p>Kontakt</p><a href="mailto:info@firma.ee">info@firma.ee</a></footer>
+    """
+
+    result = contacts(html)
+
+    assert result == [
+        {
+            "name": "Mari Maasikas",
+            "role": "CEO",
+            "email": "mari@firma.ee",
+            "phone": "+3725123456",
+        },
+        {
+            "name": None,
+            "role": "General Contact",
+            "email": "info@firma.ee",
+            "phone": None,
+        },
+    ]
+    assert not has_enough_roles(result)
+
+
+def test_obfuscated_and_reversed_emails():
+    assert unreverse_email("ee.amrif@iram") == "mari@firma.ee"
+    assert unreverse_email("mari@firma.ee") == "mari@firma.ee"
+    assert recover_emails("Kirjuta: mari [at] firma [dot] ee või ee.amrif@naaj") == [
+        "mari@firma.ee",
+        "jaan@firma.ee",
+    ]
+
+
+def test_json_ld_names_that_are_objects_or_lists():
+    html = """
+    <script type="application/ld+json">
+    [{"@type": "Person", "name": {"@value": "Mari Maasikas"}, "jobTitle": "CEO"},
+     {"@type": "Person", "name": [{"@value": "Jüri Juurikas"}], "jobTitle": "CTO"},
+     {"@type": "Person", "givenName": {"@value": "Kati"}, "familyName": ["Kask"],
+      "jobTitle": {"@value": "Turundusjuht"}},
+     {"@type": "Person", "name": {"@id": "#x"}, "givenName": 7, "jobTitle": "CFO"}]
+    </script>
+    """
+
+    names = sorted(c["name"] for c in contacts(html))
+
+    assert names == ["Jüri Juurikas", "Kati Kask", "Mari Maasikas"]
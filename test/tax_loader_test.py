@@ -0,0 +1,162 @@
+import os
+import threading
+import time
+
+import pytest
+import requests
+
+from api import json_loader, sync, tax_loader
+from api.resilience import CLOSED, OPEN, Dependency
+
+Q1_URL = "https://www.emta.ee/files/tasutud_maksud_2025_i_kvartal.csv"
+Q2_URL = "https://www.emta.ee/files/tasutud_maksud_2025_ii_kvartal.csv"
+
+HEADER = (
+    "Registrikood;Nimi;Liik;Registreeritud käibemaksukohustuslaste registrisse;"
+    "EMTAK tegevusvaldkond, mis on EMTAKi struktuuris tähistatud tähega;Maakond;"
+    "Riiklikud maksud;Tööjõumaksud ja maksed;Käive;Töötajate arv\n"
+)
+
+
+def row(regcode, taxes, revenue, employees, name="Firma OÜ"):
+    """A CSV row: registry code, name, type, VAT, EMTAK, county, then the figures."""
+    registry = [regcode, name, "Äriühing", "jah", "J", "Harju"]
+    return registry + [taxes, "", revenue, employees]
+
+
+def write_quarter(cache_dir, url, rows):
+    path = os.path.join(cache_dir, f"emta_tax_{tax_loader.quarter_from_url(url)}.data")
+    with open(path, "w", encoding="utf-8-sig") as f:
+        f.write(HEADER)
+        for values in rows:
+            f.write(";".join(values) + "\n")
+    return path
+
+
+@pytest.fixture
+def tax_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(tax_loader, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(tax_loader, "TAX_INDEX_PATH", str(tmp_path / "tax.sqlite3"))
+    monkeypatch.setattr(tax_loader, "TAX_CHUNK_ROWS", 2)
+    write_quarter(
+        tmp_path,
+        Q1_URL,
+        [
+            row("10000001", "1000,5", "25 000,00", "3"),
+            row("10000002", "", "", ""),
+            row("", "", "", "", name="Tühi"),
+            row("10000003", "10", "100", "1"),
+        ],
+    )
+    return tmp_path
+
+
+def test_quarter_from_file_name():
+    assert tax_loader.quarter_from_url(Q1_URL) == "2025-Q1"
+    assert tax_loader.quarter_from_url(Q2_URL) == "2025-Q2"
+    assert (
+        tax_loader.quarter_from_url("https://x.ee/maksud_2024_iv_kvartal.csv")
+        == "2024-Q4"
+    )
+
+
+def test_streamed_index_returns_latest_quarter(tax_dir):
+    assert tax_loader.ensure_tax_index([Q1_URL]) == ["2025-Q1"]
+    assert tax_loader.lookup_tax_stats("10000001") == {
+        "quarter": "2025-Q1",
+        "revenue": 25000.0,
+        "employees": 3,
+        "taxes": 1000.5,
+    }
+    assert tax_loader.lookup_tax_stats("10000002")["revenue"] is None
+    assert tax_loader.lookup_tax_stats("99999999") is None
+
+    write_quarter(
+        tax_dir,
+        Q2_URL,
+        [row("10000001", "2000", "40000", "4")],
+    )
+    assert tax_loader.ensure_tax_index([Q1_URL, Q2_URL]) == ["2025-Q1", "2025-Q2"]
+    assert tax_loader.lookup_tax_stats("10000001")["employees"] == 4
+    assert tax_loader.lookup_tax_stats("10000003")["quarter"] == "2025-Q1"
+
+
+def test_refreshed_file_replaces_its_quarter(tax_dir):
+    tax_loader.ensure_tax_index([Q1_URL])
+    path = write_quarter(
+        tax_dir,
+        Q1_URL,
+        [row("10000003", "20", "200", "2")],
+    )
+    later = time.time() + 5
+    os.utime(path, (later, later))
+
+    tax_loader.ensure_tax_index([Q1_URL])
+
+    assert tax_loader.lookup_tax_stats("10000003")["revenue"] == 200.0
+    assert tax_loader.lookup_tax_stats("10000001") is None
+
+
+def test_single_lookup_never_waits_for_the_index(tax_dir, monkeypatch):
+    monkeypatch.setattr(tax_loader, "_refresh_started_at", float("-inf"))
+    ensure = tax_loader.ensure_tax_index
+    built = []
+    release = threading.Event()
+
+    def slow_ensure(urls):
+        release.wait(5)
+        built.append(ensure(urls))
+
+    monkeypatch.setattr(tax_loader, "ensure_tax_index", slow_ensure)
+
+    # Nothing is indexed yet: no figures, and the refresh runs in the background
+    assert tax_loader.find_tax_stats("10000001", Q1_URL) is None
+    assert tax_loader.find_tax_stats("10000001", Q1_URL) is None
+    release.set()
+    tax_loader._refresh_thread.join(5)
+
+    assert tax_loader.find_tax_stats("10000001", Q1_URL)["revenue"] == 25000.0
+    assert len(built) == 1
+
+
+def test_tax_figures_are_written_only_to_existing_properties(tax_dir):
+    tax_loader.ensure_tax_index([Q1_URL])
+    company = {"nimi": "Firma OÜ", "yldandmed": {}}
+    properties, empty_fields, _ = sync._build_properties_from_company(
+        company, "10000001", "Firma OÜ", tax_loader.lookup_tax_stats("10000001")
+    )
+    assert properties["Käive"] == {"number": 25000.0}
+    assert properties["Töötajate arv"] == {"number": 3}
+    assert not any("Käive" in field for field in empty_fields)
+
+    class FakeNotion:
+        def update_page(self, page_id, properties):
+            self.written = properties
+
+    notion = FakeNotion()
+    page_props = {"Käive": {"type": "number", "number": 10.0}}
+    sync._write_autofill_update(
+        notion, "page-1", page_props, properties, empty_fields, "Firma OÜ", "10000001"
+    )
+
+    assert notion.written["Käive"] == {"number": 25000.0}
+    assert "Töötajate arv" not in notion.written
+    assert "Tasutud maksud" not in notion.written
+
+
+def test_failed_tax_downloads_do_not_open_the_register_breaker(tax_dir, monkeypatch):
+    emta = Dependency("emta", 1, failure_threshold=2, reset_timeout=300)
+    ariregister = Dependency("ariregister", 1, failure_threshold=2, reset_timeout=300)
+    monkeypatch.setattr(tax_loader, "emta_dependency", emta)
+    monkeypatch.setattr(json_loader, "ariregister", ariregister)
+
+    def failing_get(url, **kwargs):
+        raise requests.ConnectionError("down")
+
+    monkeypatch.setattr(requests, "get", failing_get)
+    missing = "https://www.emta.ee/files/tasutud_maksud_2024_iv_kvartal.csv"
+    for _ in range(3):
+        tax_loader.ensure_tax_index([missing])
+
+    assert emta.breaker().state == OPEN
+    assert ariregister.breaker().state == CLOSED
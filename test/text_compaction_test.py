@@ -0,0 +1,48 @@
+from api.text_compaction import GAP_MARKER, compact_text, line_score
+
+TEAM = "\n".join(
+    [
+        "Mari Maasikas",
+        "Tegevjuht",
+        "mari@firma.ee",
+        "+372 5123 4567",
+    ]
+)
+FILLER = "\n".join(
+    f"Aastal {year} valmis kliendiportaal ja arendasime torujuhtme automaatikat."
+    for year in range(1900, 2100)
+)
+
+
+def test_short_text_is_returned_unchanged():
+    assert compact_text(TEAM, token_budget=1000) == TEAM
+
+
+def test_team_section_after_long_text_is_kept_within_budget():
+    text = (
+        "info@firma.ee\nAvaleht\nTeenused\nKontakt\n"
+        + FILLER
+        + "\nJuhatus\n"
+        + TEAM
+        + "\n© 2024"
+    )
+
+    compacted = compact_text(text, token_budget=100)
+
+    assert len(compacted) <= 400
+    assert TEAM in compacted
+    assert "1950" not in compacted
+    assert GAP_MARKER in compacted
+
+
+def test_text_without_contacts_falls_back_to_the_beginning():
+    compacted = compact_text(FILLER, token_budget=50)
+
+    assert compacted == FILLER[:200]
+
+
+def test_line_scores():
+    assert line_score("Müügijuht") > 0
+    assert line_score("CTO, kaasasutaja") > line_score("Jaan Tamm")
+    assert line_score("info@firma.ee") > 0
+    assert line_score("Arendasime torujuhtme automaatikat.") == 0
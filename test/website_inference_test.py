@@ -0,0 +1,132 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from api import cache_store, sync
+
+# Host -> (status, body) served by the local stand-in
+SITES = {
+    "firma.ee": (200, "<html>Firma</html>"),
+    "accelerator.ee": (200, "<html>Accelerator OÜ, registrikood 16359677</html>"),
+    "tundmatu.ee": (200, "<html>Domeen müügiks</html>"),
+}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answers proxied requests based on the Host header."""
+
+    def _respond(self, with_body: bool):
+        host = self.headers.get("Host", "").split(":")[0]
+        status, body = SITES.get(host, (404, "not found"))
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.end_headers()
+        if with_body:
+            self.wfile.write(body.encode("utf-8"))
+
+    def do_HEAD(self):
+        self._respond(with_body=False)
+
+    def do_GET(self):
+        self._respond(with_body=True)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def probe_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache_store, "CACHE_DB_PATH", str(tmp_path / "cache.sqlite3"))
+
+
+@pytest.fixture()
+def stand_in(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    # Route every probe through the stand-in, which plays all the websites
+    proxy = f"http://127.0.0.1:{server.server_address[1]}"
+    for name in ("HTTP_PROXY", "http_proxy"):
+        monkeypatch.setenv(name, proxy)
+    for name in ("NO_PROXY", "no_proxy"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr(sync, "PROBE_SCHEMES", ("http",))
+    yield
+    server.shutdown()
+    server.server_close()
+
+
+def test_website_candidates_skip_freemail_and_prefer_email_domains():
+    candidates = sync.website_candidates(
+        ["juhan@gmail.com", "info@www.firma.ee", None], "2S2B Social Media OÜ"
+    )
+
+    assert candidates == [
+        ("firma.ee", "email"),
+        ("2s2bsocialmedia.ee", "name"),
+        ("2s2b-social-media.ee", "name"),
+        ("2s2b.ee", "name"),
+    ]
+
+
+def test_email_domain_wins(stand_in):
+    url = sync.infer_website(["info@hot.ee", "info@firma.ee"], "Accelerator OÜ")
+
+    assert url == "http://firma.ee"
+
+
+def test_name_guess_must_mention_company(stand_in):
+    assert sync.infer_website([], "Accelerator OÜ", 16359677) == "http://accelerator.ee"
+    assert sync.infer_website([], "Tundmatu OÜ", 12345678) is None
+
+
+def test_google_is_not_called_when_inference_succeeds(stand_in, monkeypatch):
+    def no_google(company_name):
+        raise AssertionError("Google CSE should not be called")
+
+    monkeypatch.setattr(sync, "google_find_website", no_google)
+    properties = {
+        "Registrikood": {"number": 16359677},
+        "E-post": {"email": "info@firma.ee"},
+        "Veebileht": {"url": "Veebilehte ei leitud."},
+    }
+    empty_fields = ["Veebileht (Website)"]
+
+    sync._fill_missing_website(properties, empty_fields, "Accelerator OÜ", {})
+
+    assert properties["Veebileht"]["url"] == "http://firma.ee"
+    assert empty_fields == []
+
+
+def test_ip_literal_email_domains_are_not_probed():
+    assert sync._email_domain("x@10.0.0.1") is None
+    assert sync._email_domain("x@[127.0.0.1]") is None
+    assert sync._email_domain("x@firma.ee:8080") is None
+    assert sync.website_candidates(["x@169.254.169.254"], "") == []
+
+
+def test_probe_verdicts_are_cached(stand_in, monkeypatch):
+    calls = []
+    probe = sync.probe_website
+    monkeypatch.setattr(
+        sync, "probe_website", lambda *args: calls.append(args) or probe(*args)
+    )
+
+    for _ in range(2):
+        assert sync.infer_website(["info@firma.ee"], "") == "http://firma.ee"
+        assert sync.infer_website([], "Tundmatu OÜ", 12345678) is None
+
+    assert len(calls) == 2
+
+
+def test_inference_gives_up_at_the_deadline(monkeypatch):
+    monkeypatch.setattr(sync, "INFER_DEADLINE_SECONDS", 0.2)
+    monkeypatch.setattr(
+        sync, "probe_website", lambda *args: time.sleep(1) or "https://firma.ee"
+    )
+
+    started = time.monotonic()
+    assert sync.infer_website(["info@firma.ee"], "") is None
+    assert time.monotonic() - started < 0.5